@@ -0,0 +1,28 @@
+"""Add covering index for progress stats.
+
+Revision ID: a7d3e5f1c2b8
+Revises: f3c1a2b9d4e7
+Create Date: 2026-10-18 10:00:00.000000
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a7d3e5f1c2b8"
+down_revision = "f3c1a2b9d4e7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add (profile_id, score, content_id) index used by the stats aggregate."""
+    op.create_index(
+        "ix_progress_profile_score_content",
+        "progress",
+        ["profile_id", "score", "content_id"],
+    )
+
+
+def downgrade() -> None:
+    """Drop the progress stats index."""
+    op.drop_index("ix_progress_profile_score_content", table_name="progress")
@@ -0,0 +1,61 @@
+"""Add background data export jobs.
+
+Revision ID: a9e4d2c7b1f5
+Revises: f8c3e5a2b7d4
+Create Date: 2026-10-18 17:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a9e4d2c7b1f5"
+down_revision = "f8c3e5a2b7d4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the data_export_jobs queue table."""
+    op.create_table(
+        "data_export_jobs",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("format", sa.String(), nullable=False),
+        sa.Column("include_progress", sa.Boolean(), nullable=False),
+        sa.Column("include_subscriptions", sa.Boolean(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("rows_total", sa.Integer(), nullable=False),
+        sa.Column("rows_written", sa.Integer(), nullable=False),
+        sa.Column("artifact_name", sa.String(), nullable=True),
+        sa.Column("artifact_size", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_data_export_jobs_status_created",
+        "data_export_jobs",
+        ["status", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_data_export_jobs_user_created",
+        "data_export_jobs",
+        ["user_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the data_export_jobs table."""
+    op.drop_index("ix_data_export_jobs_user_created", table_name="data_export_jobs")
+    op.drop_index("ix_data_export_jobs_status_created", table_name="data_export_jobs")
+    op.drop_table("data_export_jobs")
@@ -0,0 +1,90 @@
+"""Store refresh token digests and rotation families.
+
+Revision ID: b3d7f1e9c2a4
+Revises: a9e4d2c7b1f5
+Create Date: 2026-10-18 18:00:00.000000
+
+Existing tokens keep working: their digest is computed here and each becomes
+its own family.  Downgrading can't recover the raw tokens, so every refresh
+token is invalidated and users sign in again.
+"""
+
+import hashlib
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b3d7f1e9c2a4"
+down_revision = "a9e4d2c7b1f5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Replace the token column with its digest; add families and a (user, active) index."""
+    op.add_column("refresh_tokens", sa.Column("token_hash", sa.String(64), nullable=True))
+    op.add_column("refresh_tokens", sa.Column("family_id", sa.String(), nullable=True))
+    op.add_column("refresh_tokens", sa.Column("replaced_by", sa.String(), nullable=True))
+
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            "UPDATE refresh_tokens"
+            " SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex'), family_id = id"
+        )
+    else:
+        # SQLite has no sha256(); hash row by row
+        tokens = sa.table(
+            "refresh_tokens",
+            sa.column("id", sa.String),
+            sa.column("token", sa.String),
+            sa.column("token_hash", sa.String),
+            sa.column("family_id", sa.String),
+        )
+        rows = bind.execute(sa.select(tokens.c.id, tokens.c.token)).all()
+        for row in rows:
+            bind.execute(
+                tokens.update()
+                .where(tokens.c.id == row.id)
+                .values(
+                    token_hash=hashlib.sha256(row.token.encode()).hexdigest(),
+                    family_id=row.id,
+                )
+            )
+
+    op.drop_index("ix_refresh_tokens_token", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_user_id", table_name="refresh_tokens")
+    with op.batch_alter_table("refresh_tokens", schema=None) as batch_op:
+        batch_op.alter_column("token_hash", existing_type=sa.String(64), nullable=False)
+        batch_op.alter_column("family_id", existing_type=sa.String(), nullable=False)
+        batch_op.drop_column("token")
+
+    op.create_index(
+        "ix_refresh_tokens_token_hash", "refresh_tokens", ["token_hash"], unique=True
+    )
+    op.create_index("ix_refresh_tokens_family_id", "refresh_tokens", ["family_id"])
+    op.create_index(
+        "ix_refresh_tokens_user_active", "refresh_tokens", ["user_id", "is_active"]
+    )
+
+
+def downgrade() -> None:
+    """Restore the token column; digests can't be reversed, so tokens are revoked."""
+    op.drop_index("ix_refresh_tokens_user_active", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_family_id", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_token_hash", table_name="refresh_tokens")
+
+    op.add_column("refresh_tokens", sa.Column("token", sa.String(), nullable=True))
+    op.execute(
+        "UPDATE refresh_tokens SET token = token_hash, is_active = false, is_revoked = true"
+    )
+    with op.batch_alter_table("refresh_tokens", schema=None) as batch_op:
+        batch_op.alter_column("token", existing_type=sa.String(), nullable=False)
+        batch_op.drop_column("replaced_by")
+        batch_op.drop_column("family_id")
+        batch_op.drop_column("token_hash")
+
+    op.create_index("ix_refresh_tokens_token", "refresh_tokens", ["token"], unique=True)
+    op.create_index("ix_refresh_tokens_user_id", "refresh_tokens", ["user_id"])
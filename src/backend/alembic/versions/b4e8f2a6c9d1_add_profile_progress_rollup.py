@@ -0,0 +1,62 @@
+"""Add profile progress rollup table.
+
+Revision ID: b4e8f2a6c9d1
+Revises: a7d3e5f1c2b8
+Create Date: 2026-10-18 11:00:00.000000
+
+Existing progress is folded into the new table in the same migration.
+``python scripts/backfill_progress_rollup.py`` rebuilds it if it ever drifts.
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b4e8f2a6c9d1"
+down_revision = "a7d3e5f1c2b8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create profile_progress_rollup and populate it from progress."""
+    op.create_table(
+        "profile_progress_rollup",
+        sa.Column("profile_id", sa.String(), nullable=False),
+        sa.Column("activity_type", sa.String(), nullable=False),
+        sa.Column("content_id", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_score", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("best_score", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_duration_seconds", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_completed_at", sa.DateTime(), nullable=True),
+        sa.Column("completed", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.ForeignKeyConstraint(["profile_id"], ["profiles.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("profile_id", "activity_type", "content_id"),
+    )
+    op.execute(
+        """
+        INSERT INTO profile_progress_rollup (
+            profile_id, activity_type, content_id, attempts, total_score,
+            best_score, total_duration_seconds, last_completed_at, completed
+        )
+        SELECT
+            profile_id,
+            activity_type,
+            content_id,
+            count(*),
+            coalesce(sum(score), 0),
+            coalesce(max(score), 0),
+            coalesce(sum(duration_seconds), 0),
+            max(completed_at),
+            max(CASE WHEN completed THEN 1 ELSE 0 END) = 1
+        FROM progress
+        GROUP BY profile_id, activity_type, content_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop profile_progress_rollup."""
+    op.drop_table("profile_progress_rollup")
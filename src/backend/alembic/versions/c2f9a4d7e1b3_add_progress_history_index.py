@@ -0,0 +1,30 @@
+"""Add keyset pagination index for progress history.
+
+Revision ID: c2f9a4d7e1b3
+Revises: b4e8f2a6c9d1
+Create Date: 2026-10-18 12:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c2f9a4d7e1b3"
+down_revision = "b4e8f2a6c9d1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add (profile_id, completed_at DESC, id) index for GET /progress."""
+    op.create_index(
+        "ix_progress_profile_completed_at_id",
+        "progress",
+        ["profile_id", sa.text("completed_at DESC"), "id"],
+    )
+
+
+def downgrade() -> None:
+    """Drop the progress history index."""
+    op.drop_index("ix_progress_profile_completed_at_id", table_name="progress")
@@ -0,0 +1,67 @@
+"""Add pre-aggregated game stats table.
+
+Revision ID: d5a1c8e3f6b2
+Revises: c2f9a4d7e1b3
+Create Date: 2026-10-18 13:00:00.000000
+
+Existing game progress is folded into the new table in the same migration.
+``python scripts/backfill_game_stats.py`` rebuilds it if it ever drifts.
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d5a1c8e3f6b2"
+down_revision = "c2f9a4d7e1b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create game_stats_daily and populate it from progress."""
+    op.create_table(
+        "game_stats_daily",
+        sa.Column("game_key", sa.String(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("age_bucket", sa.Float(), nullable=False),
+        sa.Column("plays", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("completed_sum", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("duration_sum", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("game_key", "day", "age_bucket"),
+    )
+    op.create_index("ix_game_stats_daily_day", "game_stats_daily", ["day"])
+
+    # Ages are floored to the half year, as GameStatsService.age_bucket does
+    # (SQLite's CAST truncates; Postgres' rounds, so it uses floor())
+    if op.get_bind().dialect.name == "postgresql":
+        bucket = "floor(profiles.age * 2) / 2"
+    else:
+        bucket = "CAST(CAST(profiles.age * 2 AS INTEGER) AS FLOAT) / 2"
+    op.execute(
+        f"""
+        INSERT INTO game_stats_daily (
+            game_key, day, age_bucket, plays, completed_sum, duration_sum
+        )
+        SELECT
+            progress.content_id,
+            date(progress.completed_at),
+            {bucket},
+            count(*),
+            sum(CASE WHEN progress.completed THEN 1 ELSE 0 END),
+            coalesce(sum(progress.duration_seconds), 0)
+        FROM progress
+        JOIN profiles ON profiles.id = progress.profile_id
+        WHERE progress.activity_type = 'game'
+          AND progress.completed_at IS NOT NULL
+          AND profiles.age IS NOT NULL
+        GROUP BY progress.content_id, date(progress.completed_at), {bucket}
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop game_stats_daily."""
+    op.drop_index("ix_game_stats_daily_day", table_name="game_stats_daily")
+    op.drop_table("game_stats_daily")
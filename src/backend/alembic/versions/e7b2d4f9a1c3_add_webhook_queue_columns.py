@@ -0,0 +1,46 @@
+"""Add work-queue columns to dodo_webhook_events.
+
+Revision ID: e7b2d4f9a1c3
+Revises: d5a1c8e3f6b2
+Create Date: 2026-10-18 14:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e7b2d4f9a1c3"
+down_revision = "d5a1c8e3f6b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Store webhook payloads and retry scheduling for queue workers."""
+    op.add_column("dodo_webhook_events", sa.Column("payload", sa.Text(), nullable=True))
+    op.add_column(
+        "dodo_webhook_events",
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "dodo_webhook_events",
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_dodo_webhook_events_status_next_attempt",
+        "dodo_webhook_events",
+        ["status", "next_attempt_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop webhook queue columns."""
+    op.drop_index(
+        "ix_dodo_webhook_events_status_next_attempt",
+        table_name="dodo_webhook_events",
+    )
+    op.drop_column("dodo_webhook_events", "locked_at")
+    op.drop_column("dodo_webhook_events", "next_attempt_at")
+    op.drop_column("dodo_webhook_events", "payload")
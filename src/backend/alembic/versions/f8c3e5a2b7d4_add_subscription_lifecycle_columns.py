@@ -0,0 +1,41 @@
+"""Add subscription lifecycle sweep support.
+
+Revision ID: f8c3e5a2b7d4
+Revises: e7b2d4f9a1c3
+Create Date: 2026-10-18 15:00:00.000000
+
+``next_refresh_at`` is filled in by the first run of
+``python scripts/sweep_subscriptions.py``.
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f8c3e5a2b7d4"
+down_revision = "e7b2d4f9a1c3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add next_refresh_at and a partial index over active subscriptions' end dates."""
+    op.add_column(
+        "subscriptions",
+        sa.Column("next_refresh_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_subscriptions_active_end_date",
+        "subscriptions",
+        ["end_date"],
+        unique=False,
+        postgresql_where=sa.text("status = 'active'"),
+        sqlite_where=sa.text("status = 'active'"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the lifecycle sweep index and column."""
+    op.drop_index("ix_subscriptions_active_end_date", table_name="subscriptions")
+    op.drop_column("subscriptions", "next_refresh_at")
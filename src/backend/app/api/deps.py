@@ -1,6 +1,6 @@
 """API dependencies."""
 
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, Awaitable, Callable, Optional
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
@@ -9,9 +9,12 @@ from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.rate_limit import limiter
 from app.db.models.user import User
 from app.db.session import async_session
 from app.schemas.token import TokenPayload
+from app.schemas.user import AuthPrincipal
+from app.services.principal_cache_service import principal_cache
 from app.services.token_service import TokenService
 
 oauth2_scheme = OAuth2PasswordBearer(
@@ -40,17 +43,28 @@ async def get_token_from_request(request: Request) -> Optional[str]:
     return request.cookies.get(ACCESS_TOKEN_COOKIE)
 
 
-async def get_current_user(
-    request: Request,
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """Get current user from JWT token (header or cookie)."""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+async def get_current_principal(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+) -> AuthPrincipal:
+    """Resolve the authenticated principal from the JWT (header or cookie).
+
+    The revocation check is answered by the in-memory revocation index and
+    the principal is served from ``principal_cache`` when possible, so a warm
+    request costs no database queries.  Use ``get_current_user`` instead
+    when the handler needs the ORM ``User`` (e.g. to mutate it or verify
+    the password).
+    """
+    credentials_exception = _credentials_exception()
+
     # Get token from header or cookie
     token = await get_token_from_request(request)
     if not token:
@@ -65,7 +79,9 @@ async def get_current_user(
     except (JWTError, ValidationError):
         raise credentials_exception
 
-    # check revocation if enabled
+    user_id = token_data.sub
+
+    # check revocation if enabled (served from the in-memory revocation index)
     if settings.ENABLE_ACCESS_TOKEN_BLACKLIST:
         jti = payload.get("jti")
         if jti:
@@ -73,12 +89,39 @@ async def get_current_user(
             if revoked:
                 raise credentials_exception
 
+    principal = await principal_cache.get_principal(user_id)
+    if principal is None:
+        # Import here to avoid circular dependency
+        from app.services.user_service import UserService
+
+        user = await UserService.get_by_id(db, user_id=user_id)
+        if user is None:
+            raise credentials_exception
+
+        principal = AuthPrincipal.model_validate(user)
+        await principal_cache.set_principal(principal)
+
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user",
+        )
+
+    return principal
+
+
+async def get_current_user(
+    principal: AuthPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Get the current user's ORM row from the JWT (header or cookie)."""
     # Import here to avoid circular dependency
     from app.services.user_service import UserService
 
-    user = await UserService.get_by_id(db, user_id=token_data.sub)
+    user = await UserService.get_by_id(db, user_id=principal.id)
     if user is None:
-        raise credentials_exception
+        await principal_cache.invalidate_user(principal.id)
+        raise _credentials_exception()
 
     if not user.is_active:
         raise HTTPException(
@@ -99,3 +142,19 @@ async def get_current_active_superuser(
             detail="Not enough permissions",
         )
     return current_user
+
+
+def rate_limit_per_user(rate: str, scope: str) -> Callable[..., Awaitable[None]]:
+    """Dependency limiting the authenticated user to ``rate`` across ``scope``.
+
+    Keyed by user id rather than IP, so children sharing a classroom network
+    each get their own budget.  Routes using it share one budget per scope.
+    """
+
+    async def check_rate_limit(
+        request: Request,
+        principal: AuthPrincipal = Depends(get_current_principal),
+    ) -> None:
+        await limiter.check(request, rate, f"{scope}:user:{principal.id}")
+
+    return check_rate_limit
@@ -3,8 +3,8 @@ from typing import Iterable
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user
-from app.db.models.user import User, UserRole
+from app.api.deps import get_current_principal
+from app.schemas.user import AuthPrincipal, UserRole
 from app.services.profile_service import ProfileService
 
 
@@ -16,12 +16,14 @@ def require_roles(roles: Iterable[UserRole]):
 
         @router.post("/admin")
         async def admin_action(
-            current_user: User = Depends(require_roles([UserRole.ADMIN])),
+            current_user: AuthPrincipal = Depends(require_roles([UserRole.ADMIN])),
         ):
             ...
     """
 
-    async def _require(current_user: User = Depends(get_current_user)) -> User:
+    async def _require(
+        current_user: AuthPrincipal = Depends(get_current_principal),
+    ) -> AuthPrincipal:
         if current_user.is_superuser:
             return current_user
         if current_user.role not in roles:
@@ -34,7 +36,9 @@ def require_roles(roles: Iterable[UserRole]):
     return _require
 
 
-def require_superuser(current_user: User = Depends(get_current_user)) -> User:
+def require_superuser(
+    current_user: AuthPrincipal = Depends(get_current_principal),
+) -> AuthPrincipal:
     """Ensure current user is marked superuser."""
     if not current_user.is_superuser:
         raise HTTPException(
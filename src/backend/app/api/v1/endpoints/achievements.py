@@ -3,11 +3,11 @@ from typing import Sequence
 from fastapi import APIRouter, Depends, HTTPException, Path, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_principal, get_db
 from app.api.permissions import assert_access
 from app.db.models.achievement import Achievement
 from app.schemas.achievement import AchievementCreate, AchievementResponse
-from app.schemas.user import User
+from app.schemas.user import AuthPrincipal
 from app.services.achievement_service import AchievementService
 
 router = APIRouter()
@@ -16,7 +16,7 @@ router = APIRouter()
 @router.get("/{profile_id}", response_model=list[AchievementResponse])
 async def get_achievements(
     profile_id: str = Path(..., description="ID of the profile"),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Sequence[Achievement]:
     """Get all achievements for a profile."""
@@ -29,7 +29,7 @@ async def get_achievements(
 @router.post("/", response_model=AchievementResponse, status_code=status.HTTP_201_CREATED)
 async def unlock_achievement(
     obj_in: AchievementCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Achievement:
     """Unlock a new achievement for a profile."""
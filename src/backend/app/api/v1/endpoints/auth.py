@@ -116,10 +116,11 @@ async def login(
 ) -> dict:
     """Login and set authentication cookies with account lockout protection."""
     email = form_data.username
+    client_ip = request.client.host if request.client else None
 
-    # Check if account is locked
-    if await AccountLockoutService.is_account_locked(email):
-        remaining_time = await AccountLockoutService.get_remaining_lockout_time(email)
+    # Check if the account or the client IP is locked
+    remaining_time = await AccountLockoutService.get_remaining_lockout_time(email, client_ip)
+    if remaining_time:
         raise AccountLockedError(
             retry_after_seconds=remaining_time,
             locked_until=f"{remaining_time}s" if remaining_time else None,
@@ -128,8 +129,11 @@ async def login(
     # Authenticate user
     user = await UserService.authenticate(db, email, form_data.password)
     if not user:
-        # Record failed attempt
-        should_lock = await AccountLockoutService.record_failed_attempt(email)
+        # Record failed attempt; only unknown emails count against the IP
+        known_account = await UserService.get_by_email(db, email) is not None
+        should_lock = await AccountLockoutService.record_failed_attempt(
+            email, client_ip, known_account=known_account
+        )
 
         if should_lock:
             raise AccountLockedError()
@@ -300,16 +304,16 @@ async def refresh_token(
     if not user or not user.is_active:
         raise AuthenticationError("User not found or inactive")
 
-    # Validate the refresh token against the database
-    is_valid = await RefreshTokenService.validate_refresh_token(db, refresh_token, user)
-    if not is_valid:
+    # Validate and retire the refresh token in one statement (rotation); a
+    # token that was already rotated revokes its whole family
+    db_new_refresh_token = await RefreshTokenService.rotate_refresh_token(
+        db, refresh_token, user.id
+    )
+    if db_new_refresh_token is None:
         # Invalid or revoked token, clear cookies
         clear_auth_cookies(response)
         raise TokenInvalidError("Invalid or revoked refresh token")
 
-    # Revoke the old refresh token (rotation)
-    await RefreshTokenService.revoke_refresh_token(db, refresh_token)
-
     # Also revoke the current access token if blacklisting enabled
     if settings.ENABLE_ACCESS_TOKEN_BLACKLIST:
         access_token = request.cookies.get(ACCESS_TOKEN_COOKIE)
@@ -326,9 +330,6 @@ async def refresh_token(
 
     # Create new tokens
     new_access_token = create_access_token(data={"sub": user.id})
-
-    # Create new refresh token in database
-    db_new_refresh_token = await RefreshTokenService.create_refresh_token(db, user.id)
     new_refresh_token = db_new_refresh_token.token
 
     # Update cookies
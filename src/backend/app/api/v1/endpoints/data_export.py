@@ -1,15 +1,23 @@
 """Data export endpoints for GDPR/COPPA compliance."""
 
-import io
+from datetime import datetime, timezone
 from typing import Any, Dict
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
-from app.schemas.data_export import DataExportRequest, DataExportResponse
-from app.schemas.user import User
+from app.api.deps import get_current_principal, get_db
+from app.core.config import settings
+from app.db.models.data_export_job import DataExportJob
+from app.schemas.data_export import (
+    DataExportJobRequest,
+    DataExportJobResponse,
+    DataExportRequest,
+    DataExportResponse,
+)
+from app.schemas.user import AuthPrincipal
+from app.services.data_export_jobs import data_export_queue, data_export_worker
 from app.services.data_export_service import DataExportService
 
 router = APIRouter()
@@ -20,7 +28,7 @@ async def export_user_data(
     format: str = "json",
     include_progress: bool = True,
     include_subscriptions: bool = True,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> DataExportResponse:
     """Export all user data for GDPR/COPPA compliance.
@@ -48,41 +56,36 @@ async def download_user_data(
     format: str = "json",
     include_progress: bool = True,
     include_subscriptions: bool = True,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> StreamingResponse:
     """Download user data as a file.
 
-    Supports JSON and CSV formats.
+    Supports JSON and CSV formats.  The file is streamed as it is read from
+    the database, so large progress histories are never held in memory.
     """
-    export_data = await DataExportService.export_user_data(
-        db=db,
-        user_id=current_user.id,
-        include_progress=include_progress,
-        include_subscriptions=include_subscriptions,
-    )
+    user_export = await DataExportService.get_user_export(db, current_user.id)
+    if user_export is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    timestamp = export_data.generated_at.strftime("%Y%m%d_%H%M%S")
+    generated_at = datetime.now(timezone.utc)
+    timestamp = generated_at.strftime("%Y%m%d_%H%M%S")
 
     if format.lower() == "csv":
-        # Generate CSV content
-        csv_content = _generate_csv(export_data)
         filename = f"advay_export_{timestamp}.csv"
         media_type = "text/csv"
-        content = csv_content.encode("utf-8")
     else:
-        # JSON format
-        import json
-
-        # Convert datetime objects to ISO strings
-        data_dict = export_data.model_dump(mode="json")
-        json_content = json.dumps(data_dict, indent=2)
         filename = f"advay_export_{timestamp}.json"
         media_type = "application/json"
-        content = json_content.encode("utf-8")
 
     return StreamingResponse(
-        io.BytesIO(content),
+        DataExportService.stream_export(
+            user_export,
+            format=format,
+            include_progress=include_progress,
+            include_subscriptions=include_subscriptions,
+            generated_at=generated_at,
+        ),
         media_type=media_type,
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
@@ -92,13 +95,14 @@ async def download_user_data(
 
 @router.get("/export/summary", response_model=Dict[str, Any])
 async def get_export_summary(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Dict[str, Any]:
     """Get summary of data that would be exported.
 
     Returns counts of profiles, progress records, and subscriptions
-    without returning the actual data.
+    without returning the actual data, plus estimated download sizes per
+    format and whether to download inline or via ``POST /export/jobs``.
     """
     summary = await DataExportService.get_data_summary(
         db=db,
@@ -107,78 +111,10 @@ async def get_export_summary(
     return summary
 
 
-def _generate_csv(export_data: DataExportResponse) -> str:
-    """Generate CSV content from export data."""
-    import csv
-    import io
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # User info section
-    writer.writerow(["USER INFORMATION"])
-    writer.writerow(["ID", export_data.user.id])
-    writer.writerow(["Email", export_data.user.email])
-    writer.writerow(["Role", export_data.user.role])
-    writer.writerow(["Email Verified", export_data.user.email_verified])
-    writer.writerow(["Active", export_data.user.is_active])
-    writer.writerow(["Created At", export_data.user.created_at])
-    writer.writerow(["Updated At", export_data.user.updated_at])
-    writer.writerow([])
-
-    # Profiles section
-    writer.writerow(["PROFILES"])
-    writer.writerow(["ID", "Name", "Age", "Language", "Settings", "Created", "Updated"])
-    for profile in export_data.profiles:
-        writer.writerow([
-            profile.id,
-            profile.name,
-            profile.age,
-            profile.preferred_language,
-            str(profile.settings),
-            profile.created_at,
-            profile.updated_at,
-        ])
-    writer.writerow([])
-
-    # Progress section
-    if export_data.progress:
-        writer.writerow(["PROGRESS"])
-        writer.writerow(["ID", "Profile ID", "Activity", "Content", "Score", "Duration", "Completed", "Completed At"])
-        for progress in export_data.progress:
-            writer.writerow([
-                progress.id,
-                progress.profile_id,
-                progress.activity_type,
-                progress.content_id,
-                progress.score,
-                progress.duration_seconds,
-                progress.completed,
-                progress.completed_at,
-            ])
-        writer.writerow([])
-
-    # Subscriptions section
-    if export_data.subscriptions:
-        writer.writerow(["SUBSCRIPTIONS"])
-        writer.writerow(["ID", "Status", "Plan", "Started", "Expires", "Created"])
-        for sub in export_data.subscriptions:
-            writer.writerow([
-                sub.id,
-                sub.status,
-                sub.plan_type,
-                sub.started_at,
-                sub.expires_at,
-                sub.created_at,
-            ])
-
-    return output.getvalue()
-
-
 @router.post("/export", response_model=DataExportResponse)
 async def request_data_export(
     request: DataExportRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> DataExportResponse:
     """Request data export with options.
@@ -199,3 +135,88 @@ async def request_data_export(
     )
 
     return export_data
+
+
+async def _job_response(job: DataExportJob) -> DataExportJobResponse:
+    response = DataExportJobResponse.model_validate(job)
+    response.rows_written = await data_export_queue.live_rows_written(job)
+    if job.status == "running" and job.rows_total:
+        response.progress_percent = min(99, response.rows_written * 100 // job.rows_total)
+    if data_export_queue.artifact_path(job) is not None:
+        response.download_url = (
+            f"{settings.API_V1_PREFIX}/export/export/jobs/{job.id}/download"
+        )
+    return response
+
+
+@router.post(
+    "/export/jobs",
+    response_model=DataExportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_export_job(
+    request: DataExportJobRequest,
+    response: Response,
+    current_user: AuthPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> DataExportJobResponse:
+    """Queue a background export archive (zip, one file per section).
+
+    Returns 202 with the new job, or 200 with an identical job requested
+    recently.  Poll ``GET /export/jobs/{id}`` until it is completed.
+    """
+    job, created = await data_export_queue.enqueue(
+        db,
+        user_id=current_user.id,
+        format=request.format,
+        include_progress=request.include_progress,
+        include_subscriptions=request.include_subscriptions,
+    )
+    if created:
+        data_export_worker.notify()
+    else:
+        response.status_code = status.HTTP_200_OK
+    return await _job_response(job)
+
+
+@router.get("/export/jobs/{job_id}", response_model=DataExportJobResponse)
+async def get_export_job(
+    job_id: str,
+    current_user: AuthPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> DataExportJobResponse:
+    """Get the status and progress of a background export."""
+    job = await data_export_queue.get_for_user(db, job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    return await _job_response(job)
+
+
+@router.get("/export/jobs/{job_id}/download")
+async def download_export_job(
+    job_id: str,
+    current_user: AuthPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> FileResponse:
+    """Download a finished export archive.
+
+    Supports ``Range`` requests, so interrupted downloads can be resumed.
+    """
+    job = await data_export_queue.get_for_user(db, job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    if job.status != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export job is {job.status}",
+        )
+    path = data_export_queue.artifact_path(job)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Export has expired")
+
+    timestamp = job.created_at.strftime("%Y%m%d_%H%M%S")
+    return FileResponse(
+        path,
+        media_type="application/zip",
+        filename=f"advay_export_{timestamp}.zip",
+    )
@@ -5,25 +5,27 @@ import re
 from datetime import datetime, timedelta, timezone
 
 from cachetools import TTLCache
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
-from sqlalchemy import Float, Integer, and_, cast, func, select
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_principal, get_db
 from app.api.permissions import require_roles
-from app.db.models.game import Game as GameModel
-from app.db.models.profile import Profile
-from app.db.models.progress import Progress
+from app.core.config import settings
 from app.schemas.game import (
     Game,
+    GameAccessBatchRequest,
+    GameAccessBatchResponse,
+    GameAccessResult,
     GameCreate,
     GameList,
     GameUpdate,
     GlobalGameStat,
     GlobalGameStatsResponse,
 )
-from app.schemas.user import User, UserRole
+from app.schemas.user import AuthPrincipal, UserRole
+from app.services.cache_service import single_flight
 from app.services.game_service import GameService
+from app.services.game_stats_service import GameStatsService
 from app.services.subscription_service import SubscriptionService
 
 router = APIRouter()
@@ -31,12 +33,12 @@ logger = logging.getLogger(__name__)
 
 UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.I)
 
-CACHE_TTL_SECONDS = 3600
-# WARNING: This is a process-local cache suitable for single-worker deployments.
-# In multi-worker or multi-instance deployments, each worker will have its own cache,
-# leading to inconsistent stats and higher database load. Consider Redis for production.
-# Cache invalidation on new progress writes is not implemented; stats may be stale up to TTL.
-_GAME_STATS_CACHE: TTLCache[str, GlobalGameStatsResponse] = TTLCache(maxsize=100, ttl=CACHE_TTL_SECONDS)
+CACHE_TTL_SECONDS = 300
+# Stats responses are shared through Redis (via single_flight) when REDIS_URL is
+# configured; this process-local cache is only used without Redis.  Keys carry
+# the stats version, so GameStatsService.bump_version() retires them.  Both
+# hold the rendered JSON body, which is written out without re-validation.
+_GAME_STATS_CACHE: TTLCache[str, bytes] = TTLCache(maxsize=100, ttl=CACHE_TTL_SECONDS)
 
 
 def is_uuid(value: str) -> bool:
@@ -86,9 +88,79 @@ def _popularity_score(total_plays: int, completion_rate: float) -> float:
     return round((total_plays * 0.6) + ((completion_rate * 100.0) * 0.4), 2)
 
 
-def _stats_cache_key(period: str, age_group: str | None) -> str:
+def _stats_cache_key(version: str, period: str, age_group: str | None) -> str:
     """Build cache key for stats request."""
-    return f"period:{period}|age_group:{age_group or 'all'}"
+    return f"v{version}|period:{period}|age_group:{age_group or 'all'}"
+
+
+def _json_response(body: bytes) -> Response:
+    """Send an already-serialized JSON body as-is."""
+    return Response(content=body, media_type="application/json")
+
+
+@single_flight(
+    "games:stats",
+    ttl=CACHE_TTL_SECONDS,
+    stale_ttl=CACHE_TTL_SECONDS,
+    encode=bytes.decode,
+    decode=str.encode,
+)
+async def _compute_games_stats(
+    db: AsyncSession, version: str, period: str, age_group: str | None
+) -> bytes:
+    """Sum the pre-aggregated counters into a ranked, serialized stats response.
+
+    Coalesced per (version, period, age group): concurrent requests share one
+    computation, and with Redis one worker revalidates while others serve the
+    stale answer.
+    """
+    cutoff = _period_cutoff(period)
+    age_min, age_max = _parse_age_group(age_group)
+
+    rows = await GameStatsService.get_stats(
+        db,
+        since=cutoff.date() if cutoff is not None else None,
+        age_min=age_min,
+        age_max=age_max,
+    )
+
+    stats: list[dict] = []
+    for row in rows:
+        total_plays = row["total_plays"]
+        completion_rate = row["completion_rate"]
+        stats.append(
+            {
+                "game_key": row["game_key"],
+                "game_name": row["game_name"],
+                "total_plays": total_plays,
+                "avg_session_minutes": round(row["avg_session_minutes"], 2),
+                "completion_rate": round(completion_rate, 4),
+                "popularity_score": _popularity_score(total_plays, completion_rate),
+            }
+        )
+
+    stats.sort(key=lambda item: (item["popularity_score"], item["total_plays"]), reverse=True)
+
+    games: list[GlobalGameStat] = []
+    for idx, item in enumerate(stats, start=1):
+        games.append(
+            GlobalGameStat(
+                game_key=item["game_key"],
+                game_name=item["game_name"],
+                total_plays=item["total_plays"],
+                avg_session_minutes=item["avg_session_minutes"],
+                completion_rate=item["completion_rate"],
+                popularity_score=item["popularity_score"],
+                age_cohort_rank=idx,
+            )
+        )
+
+    return GlobalGameStatsResponse(
+        period=period,
+        age_group=age_group,
+        generated_at=datetime.now(timezone.utc),
+        games=games,
+    ).model_dump_json(by_alias=True).encode()
 
 
 async def resolve_game_identifier(
@@ -119,118 +191,63 @@ async def list_games(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
     db: AsyncSession = Depends(get_db),
-) -> GameList:
-    """List all published games with optional filters and pagination."""
+) -> Response:
+    """List all published games with optional filters and pagination.
 
-    games, total = await GameService.get_all(
-        db,
-        category=category,
-        age_min=age_min,
-        age_max=age_max,
-        difficulty=difficulty,
-        is_published=True,
-        is_featured=is_featured,
-        page=page,
-        page_size=page_size,
-    )
+    The body is assembled from the catalog snapshot's pre-rendered game JSON.
+    """
 
-    return GameList(
-        games=games,  # type: ignore[arg-type]
-        total=total,
-        page=page,
-        page_size=page_size,
+    catalog = await GameService.get_catalog(db)
+    return _json_response(
+        catalog.filter_json(
+            category=category,
+            age_min=age_min,
+            age_max=age_max,
+            difficulty=difficulty,
+            is_published=True,
+            is_featured=is_featured,
+            page=page,
+            page_size=page_size,
+        )
     )
 
 
 @router.get("/stats", response_model=GlobalGameStatsResponse)
 async def get_games_stats(
-    period: str = Query("week", description="Time window: week, month, or all"),
-    age_group: str | None = Query(None, alias="ageGroup", description="Age cohort filter (e.g. 4-6)"),
+    period: str = Query(
+        "week",
+        description="Time window: week, month, or all (counted in whole UTC days)",
+    ),
+    age_group: str | None = Query(
+        None,
+        alias="ageGroup",
+        description=(
+            "Age cohort filter (e.g. 4-6), matched in half-year steps: "
+            "an upper bound of 6 covers ages below 6.5"
+        ),
+    ),
     db: AsyncSession = Depends(get_db),
-) -> GlobalGameStatsResponse:
-    """Get global game statistics with optional time and age-cohort filtering."""
-    cache_key = _stats_cache_key(period, age_group)
-    cached = _GAME_STATS_CACHE.get(cache_key)
-    if cached is not None:
-        return cached
-
-    try:
-        cutoff = _period_cutoff(period)
-        age_min, age_max = _parse_age_group(age_group)
-
-        filters = [Progress.activity_type == "game"]
-        if cutoff is not None:
-            filters.append(Progress.completed_at >= cutoff)
-        if age_min is not None:
-            filters.append(Profile.age >= age_min)
-        if age_max is not None:
-            filters.append(Profile.age <= age_max)
-
-        # Create reusable expressions for cleaner group_by clause
-        game_key_expr = func.coalesce(GameModel.slug, Progress.content_id)
-        game_name_expr = func.coalesce(GameModel.title, Progress.content_id)
-
-        stmt = (
-            select(
-                game_key_expr.label("game_key"),
-                game_name_expr.label("game_name"),
-                func.count(Progress.id).label("total_plays"),
-                func.coalesce(func.avg(cast(Progress.duration_seconds, Float)) / 60.0, 0.0).label("avg_session_minutes"),
-                func.coalesce(func.avg(cast(Progress.completed, Integer)), 0.0).label("completion_rate"),
-            )
-            .join(Profile, Profile.id == Progress.profile_id)
-            .outerjoin(GameModel, GameModel.slug == Progress.content_id)
-            .where(and_(*filters))
-            .group_by(game_key_expr, game_name_expr)
-        )
+) -> Response | GlobalGameStatsResponse:
+    """Get global game statistics with optional time and age-cohort filtering.
 
-        result = await db.execute(stmt)
-        rows = result.all()
-
-        stats: list[dict] = []
-        for row in rows:
-            total_plays = int(row.total_plays or 0)
-            completion_rate = float(row.completion_rate or 0.0)
-            avg_session_minutes = round(float(row.avg_session_minutes or 0.0), 2)
-
-            stats.append(
-                {
-                    "game_key": str(row.game_key),
-                    "game_name": str(row.game_name),
-                    "total_plays": total_plays,
-                    "avg_session_minutes": avg_session_minutes,
-                    "completion_rate": round(completion_rate, 4),
-                    "popularity_score": _popularity_score(total_plays, completion_rate),
-                }
-            )
-
-        stats.sort(key=lambda item: (item["popularity_score"], item["total_plays"]), reverse=True)
-
-        games: list[GlobalGameStat] = []
-        for idx, item in enumerate(stats, start=1):
-            games.append(
-                GlobalGameStat(
-                    game_key=item["game_key"],
-                    game_name=item["game_name"],
-                    total_plays=item["total_plays"],
-                    avg_session_minutes=item["avg_session_minutes"],
-                    completion_rate=item["completion_rate"],
-                    popularity_score=item["popularity_score"],
-                    age_cohort_rank=idx,
-                )
-            )
+    Answers are summed from the pre-aggregated ``game_stats_daily`` counters
+    and cached under the current stats version.  The period starts at the
+    beginning of the UTC day it falls in, and ages are matched by half-year
+    bucket (see ``GameStatsService.get_stats``).
+    """
+    # Validate up front so bad input is never coalesced or cached
+    _period_cutoff(period)
+    _parse_age_group(age_group)
 
-        response = GlobalGameStatsResponse(
-            period=period,
-            age_group=age_group,
-            generated_at=datetime.now(timezone.utc),
-            games=games,
-        )
-        _GAME_STATS_CACHE[cache_key] = response
-        return response
+    version = await GameStatsService.get_version()
+    local_key = _stats_cache_key(version, period, age_group)
+    if not settings.REDIS_URL:
+        cached = _GAME_STATS_CACHE.get(local_key)
+        if cached is not None:
+            return _json_response(cached)
 
-    except HTTPException:
-        raise
+    try:
+        body = await _compute_games_stats(db, version, period, age_group)
     except Exception as e:
         logger.exception("Failed to compute games stats; returning empty response")
         return GlobalGameStatsResponse(
@@ -242,6 +259,65 @@ async def get_games_stats(
             error_code="STATS_COMPUTE_FAILED",
         )
 
+    if not settings.REDIS_URL:
+        _GAME_STATS_CACHE[local_key] = body
+    return _json_response(body)
+
+
+@router.post("/access:batch", response_model=GameAccessBatchResponse)
+async def check_game_access_batch(
+    payload: GameAccessBatchRequest,
+    current_user: AuthPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> GameAccessBatchResponse:
+    """Check access to up to 100 games (slugs or IDs) at once.
+
+    Games resolve from the in-process catalog and every decision comes from a
+    single entitlement lookup, so the cost doesn't grow with the batch size.
+    Unknown identifiers are reported with ``found: false`` rather than failing
+    the whole batch.
+    """
+    try:
+        entitlement = await SubscriptionService.get_entitlement(db=db, parent_id=current_user.id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc),
+        ) from exc
+
+    catalog = await GameService.get_catalog(db)
+    results = []
+    for identifier in dict.fromkeys(payload.identifiers):
+        game = catalog.by_id.get(identifier) if is_uuid(identifier) else catalog.by_slug.get(identifier)
+        if game is None:
+            results.append(
+                GameAccessResult(
+                    identifier=identifier, found=False, can_access=False, reason="Game not found"
+                )
+            )
+            continue
+
+        if entitlement is None:
+            can_access, reason = False, "No active subscription"
+        else:
+            can_access, reason = entitlement.can_access(game.id)
+        results.append(
+            GameAccessResult(
+                identifier=identifier,
+                found=True,
+                can_access=can_access,
+                reason=reason,
+                game_id=game.id,
+                game_slug=game.slug,
+            )
+        )
+
+    return GameAccessBatchResponse(
+        subscription_status="active" if entitlement else "none",
+        plan_type=entitlement.plan_type.value if entitlement else None,
+        results=results,
+    )
+
 
 @router.get("/{identifier}", response_model=Game)
 async def get_game(identifier: str = Path(..., description="Game slug or ID"), db: AsyncSession = Depends(get_db)) -> Game:
@@ -252,7 +328,7 @@ async def get_game(identifier: str = Path(..., description="Game slug or ID"), d
 @router.get("/{identifier}/access")
 async def check_game_access(
     identifier: str = Path(..., description="Game slug or ID"),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> dict:
     """Check if the current user can access a game.
@@ -270,12 +346,17 @@ async def check_game_access(
     # Get game
     game = await resolve_game_identifier(identifier=identifier, db=db)
 
-    # Check subscription
-    subscription = await SubscriptionService.get_active_subscription(
-        db=db, parent_id=current_user.id
-    )
+    # One cached entitlement lookup answers both "is there a subscription" and "is
+    # this game in it"
+    try:
+        entitlement = await SubscriptionService.get_entitlement(db=db, parent_id=current_user.id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc),
+        ) from exc
 
-    if not subscription:
+    if entitlement is None:
         return {
             "can_access": False,
             "reason": "No active subscription",
@@ -284,17 +365,7 @@ async def check_game_access(
             "subscription_status": "none",
         }
 
-    # Check game access
-    try:
-        can_access, reason = await SubscriptionService.can_access_game(
-            db=db, parent_id=current_user.id, game_id=game.id
-        )
-        normalized_plan = SubscriptionService._normalize_plan_type(subscription.plan_type)
-    except ValueError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=str(exc),
-        ) from exc
+    can_access, reason = entitlement.can_access(game.id)
 
     response = {
         "can_access": can_access,
@@ -302,7 +373,7 @@ async def check_game_access(
         "game_id": game.id,
         "game_slug": game.slug,
         "subscription_status": "active",  # We only return here if subscription exists and is active
-        "plan_type": normalized_plan.value,
+        "plan_type": entitlement.plan_type.value,
     }
 
     return response
@@ -311,7 +382,7 @@ async def check_game_access(
 @router.post("/", response_model=Game, status_code=status.HTTP_201_CREATED)
 async def create_game(
     game_in: GameCreate,
-    current_user: User = Depends(require_roles([UserRole.ADMIN])),
+    current_user: AuthPrincipal = Depends(require_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ) -> Game:
     """Create a new game (admin only)."""
@@ -330,7 +401,7 @@ async def create_game(
 async def update_game(
     game_id: str,
     game_in: GameUpdate,
-    current_user: User = Depends(require_roles([UserRole.ADMIN])),
+    current_user: AuthPrincipal = Depends(require_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ) -> Game:
     """Update an existing game (admin only)."""
@@ -348,7 +419,7 @@ async def update_game(
 @router.delete("/{game_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_game(
     game_id: str,
-    current_user: User = Depends(require_roles([UserRole.ADMIN])),
+    current_user: AuthPrincipal = Depends(require_roles([UserRole.ADMIN])),
     db: AsyncSession = Depends(get_db),
 ) -> None:
     """Delete a game (admin only)."""
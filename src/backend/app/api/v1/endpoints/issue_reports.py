@@ -7,8 +7,7 @@ from uuid import uuid4
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
 
-from app.api.deps import get_current_user
-from app.db.models.user import User
+from app.api.deps import get_current_principal
 from app.schemas.issue_report import (
     IssueReportFinalize,
     IssueReportResponse,
@@ -16,6 +15,7 @@ from app.schemas.issue_report import (
     IssueReportSessionCreate,
     IssueReportUploadResponse,
 )
+from app.schemas.user import AuthPrincipal
 from app.services.cache_service import cache_service
 
 router = APIRouter()
@@ -25,6 +25,8 @@ CHUNK_SIZE = 1024 * 1024  # 1MB
 ALLOWED_VIDEO_MIME_TYPES = {"video/webm", "video/mp4"}
 ISSUE_REPORT_STORAGE_DIR = Path("storage/issue_reports")
 SESSION_TTL_SECONDS = 86400  # 24 hours
+# Sessions are read-modify-written across workers, so they bypass the
+# per-worker L1 cache (local_ttl=0) and always read Redis.
 
 
 def normalize_video_mime_type(value: str | None) -> str:
@@ -41,7 +43,7 @@ def get_session_cache_key(report_id: str) -> str:
 @router.post("/sessions", response_model=IssueReportSession)
 async def create_issue_report_session(
     payload: IssueReportSessionCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
 ) -> IssueReportSession:
     """Create an issue report session before clip upload."""
     report_id = str(uuid4())
@@ -56,7 +58,7 @@ async def create_issue_report_session(
     }
 
     success = await cache_service.set(
-        get_session_cache_key(report_id), session_data, ttl=SESSION_TTL_SECONDS
+        get_session_cache_key(report_id), session_data, ttl=SESSION_TTL_SECONDS, local_ttl=0
     )
     if not success:
         raise HTTPException(
@@ -76,11 +78,11 @@ async def upload_issue_report_clip(
     report_id: str,
     clip: UploadFile = File(...),
     mime_type: str | None = Form(default=None),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
 ) -> IssueReportUploadResponse:
     """Upload a recorded issue clip for an existing report session."""
     cache_key = get_session_cache_key(report_id)
-    report = await cache_service.get(cache_key)
+    report = await cache_service.get(cache_key, local_ttl=0)
 
     if not report:
         raise HTTPException(
@@ -152,7 +154,7 @@ async def upload_issue_report_clip(
         "uploaded_at": datetime.now(UTC).isoformat(),
     }
 
-    await cache_service.set(cache_key, report, ttl=SESSION_TTL_SECONDS)
+    await cache_service.set(cache_key, report, ttl=SESSION_TTL_SECONDS, local_ttl=0)
 
     return IssueReportUploadResponse(
         report_id=report_id,
@@ -166,11 +168,11 @@ async def upload_issue_report_clip(
 async def finalize_issue_report(
     report_id: str,
     payload: IssueReportFinalize,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
 ) -> IssueReportResponse:
     """Finalize issue report metadata after clip upload."""
     cache_key = get_session_cache_key(report_id)
-    report = await cache_service.get(cache_key)
+    report = await cache_service.get(cache_key, local_ttl=0)
 
     if not report:
         raise HTTPException(
@@ -195,7 +197,7 @@ async def finalize_issue_report(
     report["submitted_at"] = submitted_at.isoformat()
     report["finalize_payload"] = payload.model_dump()
 
-    await cache_service.set(cache_key, report, ttl=SESSION_TTL_SECONDS)
+    await cache_service.set(cache_key, report, ttl=SESSION_TTL_SECONDS, local_ttl=0)
 
     return IssueReportResponse(
         report_id=report_id,
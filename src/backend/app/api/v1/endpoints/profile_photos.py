@@ -12,10 +12,10 @@ from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_principal, get_db
 from app.db.models.profile import Profile
-from app.db.models.user import User
 from app.schemas.profile import ProfilePhotoResponse
+from app.schemas.user import AuthPrincipal
 
 router = APIRouter()
 
@@ -49,7 +49,7 @@ def validate_image_magic_bytes(content: bytes) -> str | None:
 async def upload_profile_photo(
     profile_id: str,
     photo: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> ProfilePhotoResponse:
     """Upload and associate a photo with a child profile."""
@@ -131,7 +131,7 @@ async def upload_profile_photo(
 @router.get("/api/v1/users/me/profiles/{profile_id}/photo", response_model=ProfilePhotoResponse)
 async def get_profile_photo(
     profile_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> ProfilePhotoResponse:
     """Get a child's profile photo URL (avatar_url first, fall back to profile_photo)."""
@@ -151,7 +151,7 @@ async def get_profile_photo(
 @router.delete("/api/v1/users/me/profiles/{profile_id}/photo", response_model=dict)
 async def delete_profile_photo(
     profile_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> dict:
     """Delete a child's profile photo (both avatar_url and profile_photo)."""
@@ -1,27 +1,51 @@
 """Progress tracking endpoints."""
 
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_principal, get_db, rate_limit_per_user
+from app.core.rate_limit import RateLimits
 from app.core.validation import ValidationError, validate_uuid
+from app.db import session as db_session
 from app.schemas.progress import Progress, ProgressCreate
-from app.schemas.user import User
+from app.schemas.user import AuthPrincipal
 from app.services.profile_service import ProfileService
-from app.services.progress_service import DuplicateProgressError, ProgressService
+from app.services.progress_service import InvalidCursorError, ProgressService
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Page size when a cursor is given without a limit
+DEFAULT_PAGE_SIZE = 100
 
 router = APIRouter()
 
+read_limit = Depends(rate_limit_per_user(RateLimits.PROGRESS_READ, "progress:read"))
+write_limit = Depends(rate_limit_per_user(RateLimits.PROGRESS_WRITE, "progress:write"))
+
 
-@router.get("/", response_model=List[Progress])
+@router.get("/", response_model=List[Progress], dependencies=[read_limit])
 async def get_progress(
     profile_id: str,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    activity_type: Optional[str] = None,
+    content_id: Optional[str] = None,
+    since: Optional[datetime] = Query(None, description="Earliest completed_at (inclusive)"),
+    until: Optional[datetime] = Query(None, description="Latest completed_at (exclusive)"),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> List[Progress]:
-    """Get learning progress for a profile."""
+    """Get learning progress for a profile, newest first.
+
+    Results are keyset-paginated when ``limit`` or ``cursor`` is given; when
+    more rows remain the cursor for the next page is returned in the
+    ``X-Next-Cursor`` header.  Without either the full history is returned,
+    as it was before pagination existed.
+    """
     # Validate profile_id format
     try:
         validate_uuid(profile_id, "profile_id")
@@ -45,15 +69,87 @@ async def get_progress(
             detail="Not enough permissions",
         )
 
-    progress = await ProgressService.get_by_profile(db, profile_id)
+    if cursor and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+
+    try:
+        progress, next_cursor = await ProgressService.get_page(
+            db,
+            profile_id,
+            limit=limit,
+            cursor=cursor,
+            activity_type=activity_type,
+            content_id=content_id,
+            since=since,
+            until=until,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return progress  # type: ignore[return-value]
 
 
-@router.post("/", response_model=Progress)
+@router.get("/stream", dependencies=[read_limit])
+async def stream_progress(
+    profile_id: str,
+    activity_type: Optional[str] = None,
+    content_id: Optional[str] = None,
+    since: Optional[datetime] = Query(None, description="Earliest completed_at (inclusive)"),
+    until: Optional[datetime] = Query(None, description="Latest completed_at (exclusive)"),
+    current_user: AuthPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """Stream a profile's full progress history as NDJSON, newest first."""
+    # Validate profile_id format
+    try:
+        validate_uuid(profile_id, "profile_id")
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+
+    # Verify profile belongs to current user
+    profile = await ProfileService.get_by_id(db, profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found",
+        )
+
+    if profile.parent_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+
+    async def rows() -> AsyncIterator[str]:
+        # The request session is released before the body is sent, so the
+        # stream holds its own session for as long as the client reads.
+        async with db_session.async_session() as stream_db:
+            async for item in ProgressService.stream_by_profile(
+                stream_db,
+                profile_id,
+                activity_type=activity_type,
+                content_id=content_id,
+                since=since,
+                until=until,
+            ):
+                yield Progress.model_validate(item).model_dump_json() + "\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+@router.post("/", response_model=Progress, dependencies=[write_limit])
 async def save_progress(
     progress_in: ProgressCreate,
     profile_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Progress:
     """Save learning progress."""
@@ -84,15 +180,15 @@ async def save_progress(
     return progress  # type: ignore[return-value]
 
 
-@router.post("/batch")
+@router.post("/batch", dependencies=[write_limit])
 async def save_progress_batch(
     payload: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> dict:
     """Batch save progress items. Expects body: { profile_id: string, items: [ { idempotency_key, activity_type, content_id, score, duration_seconds?, meta_data?, timestamp } ] }
 
-    Simple dedupe by idempotency_key implemented at service layer if available.
+    Items are deduped by idempotency_key at the service layer.
     """
     profile_id = payload.get("profile_id")
     items = payload.get("items") or []
@@ -119,36 +215,16 @@ async def save_progress_batch(
             detail="Not enough permissions",
         )
 
-    results = []
-    for it in items:
-        key = it.get("idempotency_key")
-        try:
-            # Try to create; ProgressService.create will raise DuplicateProgressError if duplicate
-            progress = await ProgressService.create(db, profile_id, it)  # type: ignore[arg-type]
-            results.append({"idempotency_key": key, "status": "ok", "server_id": str(progress.id)})
-        except Exception as e:
-            # Handle duplicate specifically
-            if isinstance(e, DuplicateProgressError):
-                # Attempt to get existing id if available
-                existing_id = getattr(e, "existing_id", None)
-                results.append(
-                    {
-                        "idempotency_key": key,
-                        "status": "duplicate",
-                        "server_id": existing_id,
-                    }
-                )
-            else:
-                # Other errors reported as error for that item
-                results.append({"idempotency_key": key, "status": "error", "error": str(e)})
-
+    # Validated up front and inserted in one statement; duplicates are skipped
+    # by ON CONFLICT and reported per item
+    results = await ProgressService.create_many(db, profile_id, items)  # type: ignore[arg-type]
     return {"results": results}
 
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[read_limit])
 async def get_progress_stats(
     profile_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> dict:
     """Get progress statistics for a profile."""
@@ -175,20 +251,4 @@ async def get_progress_stats(
             detail="Not enough permissions",
         )
 
-    progress = await ProgressService.get_by_profile(db, profile_id)
-
-    # Calculate stats
-    total_activities = len(progress)
-    total_score = sum(p.score for p in progress)
-    avg_score = total_score / total_activities if total_activities > 0 else 0
-
-    # Get unique completed content
-    completed_content = set(p.content_id for p in progress if p.score >= 80)
-
-    return {
-        "total_activities": total_activities,
-        "total_score": total_score,
-        "average_score": round(avg_score, 2),
-        "completed_content": list(completed_content),
-        "completion_count": len(completed_content),
-    }
+    return await ProgressService.get_stats(db, profile_id)
@@ -3,12 +3,11 @@
 import logging
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_principal, get_db
 from app.db.models.subscription_model import SubscriptionPlanType
-from app.db.models.user import User as UserModel
 from app.schemas.game import Game
 from app.schemas.subscription_schema import (
     SubscriptionAvailableGames,
@@ -22,18 +21,31 @@ from app.schemas.subscription_schema import (
 from app.schemas.subscription_schema import (
     SubscriptionPlanType as SchemaPlanType,
 )
-from app.services.dodo_payment_service import DodoPaymentService, get_dodo_client
+from app.schemas.user import AuthPrincipal
+from app.services.dodo_payment_service import get_dodo_client
 from app.services.game_service import GameService
+from app.services.payment_gateway import PaymentGateway, PaymentGatewayUnavailable
 from app.services.subscription_service import SubscriptionService
+from app.services.webhook_queue import InvalidWebhookPayload, webhook_queue, webhook_worker
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def _gateway_unavailable(exc: PaymentGatewayUnavailable) -> HTTPException:
+    """503 telling the client when to retry a payment provider call."""
+    headers = {"Retry-After": str(int(exc.retry_after))} if exc.retry_after else None
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Payment provider temporarily unavailable, please retry shortly",
+        headers=headers,
+    )
+
+
 @router.get("/games/catalog")
 async def get_games_catalog(
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
 ):
     """Get list of available games for selection."""
     games, total = await GameService.get_all(
@@ -54,7 +66,7 @@ async def purchase_subscription(
     plan_type: SchemaPlanType,
     request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
 ):
     """Purchase a new subscription - creates Dodo checkout session."""
     try:
@@ -69,16 +81,18 @@ async def purchase_subscription(
     success_url = f"{base_url}/api/v1/subscriptions/payment-success"
     cancel_url = f"{base_url}/api/v1/subscriptions/payment-cancelled"
 
-    dodo_service: DodoPaymentService = get_dodo_client()
+    gateway: PaymentGateway = get_dodo_client()
 
     try:
-        checkout = dodo_service.create_checkout_session(
+        checkout = await gateway.create_checkout_session(
             plan_type=plan,
             user_id=current_user.id,
             user_email=current_user.email,
             success_url=success_url,
             cancel_url=cancel_url,
         )
+    except PaymentGatewayUnavailable as e:
+        raise _gateway_unavailable(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -96,13 +110,15 @@ async def purchase_subscription(
 async def payment_success(
     session_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
 ):
     """Handle successful payment redirect from Dodo."""
-    dodo_service: DodoPaymentService = get_dodo_client()
+    gateway: PaymentGateway = get_dodo_client()
 
     try:
-        payment = dodo_service.get_payment_status(session_id)
+        payment = await gateway.get_payment_status(session_id)
+    except PaymentGatewayUnavailable as e:
+        raise _gateway_unavailable(e)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -163,12 +179,13 @@ async def payment_cancelled():
     }
 
 
-@router.post("/webhook")
+@router.post("/webhook", status_code=status.HTTP_202_ACCEPTED)
 async def handle_webhook(
     request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ):
-    """Handle Dodo payment webhooks."""
+    """Verify and queue a Dodo payment webhook (202), see ``app.services.webhook_queue``."""
     body = await request.body()
 
     # Extract all three required Dodo webhook headers (case-insensitive)
@@ -188,265 +205,47 @@ async def handle_webhook(
         request.headers.get("Webhook-SIGNATURE", "")
     )
 
-    dodo_service: DodoPaymentService = get_dodo_client()
+    gateway: PaymentGateway = get_dodo_client()
 
-    if not dodo_service.verify_webhook_signature(body, webhook_id, webhook_timestamp, webhook_signature):
+    if not gateway.verify_webhook_signature(body, webhook_id, webhook_timestamp, webhook_signature):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid webhook signature",
         )
 
-    # CRITICAL: Record webhook receipt in separate transaction for crash safety
-    # This ensures we never lose track of a received webhook even if processing fails
-    from uuid import uuid4
-
-    from sqlalchemy import select
-    from sqlalchemy.exc import IntegrityError
-
-    from app.db.models.subscription_model import DodoWebhookEvent
-
-    # Step 1: Insert webhook receipt and commit immediately (separate transaction)
-    webhook_event = DodoWebhookEvent(
-        id=str(uuid4()),
-        webhook_id=webhook_id,
-        event_type="unknown",  # Will update after parsing
-        status="received",  # Explicit status tracking
-        session_id=None,  # Will update after processing
-        processed_at=None,  # Explicitly mark as not yet processed (received-first pattern)
-        attempts=1,  # Track first attempt
-    )
-
+    # Record the verified body and acknowledge; WebhookQueue workers run the
+    # business logic (and retries) outside the request.
     try:
-        db.add(webhook_event)
-        await db.commit()  # Commit receipt immediately - this webhook is now "ours"
-    except IntegrityError:
-        await db.rollback()
-        # Webhook ID already exists - fetch and check processing state
-        existing_webhook = await db.execute(
-            select(DodoWebhookEvent).where(DodoWebhookEvent.webhook_id == webhook_id)
-        )
-        existing = existing_webhook.scalar_one_or_none()
-
-        if existing:
-            if existing.processed_at is not None:
-                # Successfully processed before
-                return {
-                    "received": True,
-                    "status": "already_processed",
-                    "processed_at": existing.processed_at.isoformat()
-                }
-            else:
-                # Received but not processed - retry processing
-                # Business logic is idempotent on payment_reference, so this is safe
-                logger.warning(f"Retrying webhook {webhook_id} that was received but not processed")
-                # Increment attempt counter
-                existing.attempts += 1
-
-                # Continue to business logic with existing webhook event
-                webhook_event = existing
-        else:
-            # Should not happen, but handle gracefully
-            return {"received": True, "status": "already_processed"}
-    except Exception:
-        await db.rollback()
-        raise  # Re-raise system errors to trigger retry
-
-    import json
-    event = json.loads(body.decode("utf-8"))
-
-    event_type = event.get("type")
-
-    # Validate event_type exists (critical for routing)
-    if not event_type:
-        # Mark webhook as failed due to invalid payload
-        webhook_event.event_type = "unknown"
-        webhook_event.status = "failed"
-        webhook_event.last_error = "Missing required field: event_type"
-        webhook_event.processed_at = datetime.now(timezone.utc)
-        await db.commit()
-
-        logger.error("Received webhook without event_type field")
+        webhook_event, queued = await webhook_queue.enqueue(db, webhook_id, body)
+    except InvalidWebhookPayload as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Missing required field: event_type"
-        )
-
-    data = event.get("data", {})
-
-    # Official Dodo payment event types (per Dodo webhook documentation)
-    # See: https://dodopayments.com/docs/webhooks
-    # Map non-standard event types to canonical Dodo event types
-    canonical_event_map = {
-        # Legacy/compatibility aliases -> official Dodo events
-        "payment.completed": "payment.succeeded",
-        "payment.success": "payment.succeeded",
-        # Add other mappings as needed:
-        # "payment.paid": "payment.succeeded",
-    }
-
-    # Normalize event type to canonical form
-    canonical_event_type = canonical_event_map.get(event_type, event_type)
-
-    # Log if we normalized a non-standard event type
-    if canonical_event_type != event_type:
-        logger.warning(
-            f"Received non-standard Dodo event '{event_type}', normalized to '{canonical_event_type}'. "
-            f"Update webhook configuration to use official '{canonical_event_type}' event."
-        )
-
-    # Update event_type to canonical form for routing
-    event_type = canonical_event_type
-
-    # Declarative event routing for extensibility
-    async def handle_payment_success(event_data: dict, db: AsyncSession):
-        """Handle successful payment events."""
-        session_id = event_data.get("id")
-        metadata = event_data.get("metadata", {})
-        user_id = metadata.get("user_id")
-        plan_type_value = metadata.get("plan_type")
-
-        if not user_id or not plan_type_value:
-            raise ValueError("Missing payment metadata (user_id or plan_type)")
-
-        try:
-            plan = SubscriptionPlanType(plan_type_value)
-        except ValueError:
-            raise ValueError(f"Invalid plan type in payment: {plan_type_value}")
-
-        # Payment validation (using metadata as primary source)
-        expected_amount = metadata.get("expected_amount")
-        if not expected_amount:
-            raise ValueError("Missing expected_amount in payment metadata")
-
-        try:
-            expected_amount = int(expected_amount)
-        except (ValueError, TypeError):
-            raise ValueError(f"Invalid expected_amount type in metadata: {type(expected_amount)}")
-
-        # Validate product_id if present in webhook payload
-        # Per Dodo FAQ: subscription webhooks may not include product_id and use subscription_id instead
-        # So this validation is optional and informational only
-        webhook_product_id = (
-            event_data.get("product_id") or
-            event_data.get("product", {}).get("id") if isinstance(event_data.get("product"), dict) else None
-        )
-
-        if webhook_product_id:
-            from app.services.dodo_payment_service import PLAN_PRODUCT_IDS
-            expected_product_id = PLAN_PRODUCT_IDS.get(plan)
-            if expected_product_id and webhook_product_id != expected_product_id:
-                # Log warning but don't fail - subscription flows may legitimately differ
-                logger.warning(
-                    f"Product ID mismatch for {plan}: expected {expected_product_id}, "
-                    f"got {webhook_product_id}. Continuing as this may be a subscription flow."
-                )
-        else:
-            # Log absence of product_id (normal for subscription flows per Dodo FAQ)
-            logger.debug(f"No product_id in webhook payload for {plan} - may be subscription flow")
-
-        # Validate webhook amount using exact Dodo schema field names
-        webhook_amount = None
-        for field_name in ["amount_total", "amount", "total"]:
-            if field_name in event_data:
-                webhook_amount = event_data.get(field_name)
-                break
-
-        if webhook_amount is not None:
-            try:
-                webhook_amount = int(webhook_amount)
-                if webhook_amount != expected_amount:
-                    raise ValueError(
-                        f"Payment amount mismatch for {plan}: expected {expected_amount}, "
-                        f"got {webhook_amount} from field '{field_name}'"
-                    )
-            except TypeError:
-                logger.warning(
-                    f"Invalid webhook amount type in payload: {type(webhook_amount)} for field '{field_name}'"
-                )
-
-        # Create subscription (idempotent on payment_reference)
-        subscription = await SubscriptionService.create_subscription(
-            db=db,
-            parent_id=user_id,
-            plan_type=plan,
-            payment_reference=session_id,
-        )
-
-        return subscription
-
-    # Event routing table (official Dodo events only)
-    handlers = {
-        "payment.succeeded": handle_payment_success,  # Official Dodo event
-        # Future official Dodo events (add as needed):
-        # "payment.failed": handle_payment_failed,
-        # "payment.processing": handle_payment_processing,
-        # "payment.cancelled": handle_payment_cancelled,
-        # "refund.created": handle_refund_created,
-        # "subscription.cancelled": handle_subscription_cancelled,
-    }
+            detail=str(exc),
+        ) from exc
 
-    # Route event to appropriate handler (FIX: was missing handler assignment)
-    handler = handlers.get(event_type)
-
-    if handler:
-        try:
-            # Call the event handler
-            result = await handler(data, db)
-
-            # Update webhook event as processed
-            webhook_event.event_type = event_type
-            webhook_event.status = "processed"
-            webhook_event.session_id = data.get("id")
-            webhook_event.processed_at = datetime.now(timezone.utc)
-            await db.commit()
-
-            return {
-                "received": True,
-                "status": "processed",
-                "event_type": event_type,
-                "subscription_id": result.id if hasattr(result, 'id') else None
-            }
-
-        except ValueError as e:
-            # Business logic errors (validation, etc.)
-            await db.rollback()
-            webhook_event.event_type = event_type
-            webhook_event.status = "failed"
-            webhook_event.last_error = str(e)
-            webhook_event.processed_at = datetime.now(timezone.utc)
-            await db.commit()
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=str(e)
-            )
-        except Exception:
-            # System errors - rollback and return 500 so Dodo retries
-            await db.rollback()
-            logger.exception(f"Webhook processing failed for event {event_type}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Webhook processing failed - please retry"
-            )
-    else:
-        # Unknown event type - mark as processed but ignored
-        webhook_event.event_type = event_type
-        webhook_event.status = "processed"  # Successfully received and handled (by ignoring)
-        webhook_event.last_error = f"Unhandled event type: {event_type}"
-        webhook_event.processed_at = datetime.now(timezone.utc)
-        await db.commit()
-
-        logger.info(f"Received unhandled webhook event type: {event_type}")
+    if webhook_event.processed_at is not None:
+        response.status_code = status.HTTP_200_OK
         return {
             "received": True,
-            "status": "ignored",
-            "event_type": event_type
+            "status": "already_processed",
+            "processed_at": webhook_event.processed_at.isoformat(),
         }
 
+    if queued:
+        webhook_worker.notify()
+    else:
+        logger.warning(f"Webhook {webhook_id} redelivered before processing finished")
+    return {
+        "received": True,
+        "status": "queued",
+        "event_type": webhook_event.event_type,
+    }
+
 
 @router.get("/current", response_model=SubscriptionStatusResponse)
 async def get_current_subscription(
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
 ):
     """Get current active subscription for the user."""
     def normalize_utc(value: datetime) -> datetime:
@@ -502,7 +301,7 @@ async def get_current_subscription(
 async def get_available_games(
     subscription_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
 ):
     """Get available games info for a subscription."""
     subscription = await SubscriptionService.get_subscription_by_id(
@@ -539,7 +338,7 @@ async def update_game_selection(
     subscription_id: str,
     games: SubscriptionGameSelectionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
 ):
     """Add game selections to a subscription (at purchase time)."""
     subscription = await SubscriptionService.get_subscription_by_id(
@@ -581,7 +380,7 @@ async def swap_game(
     subscription_id: str,
     swap: SubscriptionGameSwap,
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
 ):
     """Legacy swap endpoint retained as an explicit error for prelaunch reset clients."""
     subscription = await SubscriptionService.get_subscription_by_id(
@@ -626,7 +425,7 @@ async def upgrade_subscription(
     subscription_id: str,
     upgrade: SubscriptionUpgrade,
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
 ):
     """Upgrade to a new subscription plan with prorated credit."""
     subscription = await SubscriptionService.get_subscription_by_id(
@@ -682,7 +481,7 @@ async def upgrade_subscription(
 async def get_subscription_status(
     subscription_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
 ):
     """Get detailed status of a specific subscription."""
     subscription = await SubscriptionService.get_subscription_by_id(
@@ -5,20 +5,21 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_principal, get_current_user, get_db
 from app.core.exceptions import (
     AuthenticationError,
     AuthorizationError,
     ResourceNotFoundError,
     ValidationError as AppValidationError,
 )
-from app.core.security import verify_password
+from app.core.password_hasher import password_hasher
 from app.core.validation import ValidationError, validate_uuid
 from app.db.models.user import User as UserModel
 from app.schemas.profile import Profile, ProfileCreate, ProfileUpdate
-from app.schemas.user import User, UserRole, UserRoleUpdate, UserUpdate
+from app.schemas.user import AuthPrincipal, User, UserRole, UserRoleUpdate, UserUpdate
 from app.schemas.verification import DeleteAccountRequest, DeleteProfileRequest
 from app.services.audit_service import AuditService
+from app.services.principal_cache_service import principal_cache
 from app.services.profile_service import ProfileService
 from app.services.user_service import UserService
 
@@ -27,7 +28,7 @@ router = APIRouter()
 
 async def get_and_validate_profile(
     profile_id: str,
-    current_user: UserModel,
+    current_user: AuthPrincipal | UserModel,
     db: AsyncSession,
 ) -> "Profile":
     """Validate profile_id format and ownership.
@@ -70,7 +71,7 @@ async def get_me(current_user: User = Depends(get_current_user)) -> User:
 @router.get("/{user_id}", response_model=User)
 async def get_user(
     user_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> User:
     """Get user by ID."""
@@ -114,7 +115,7 @@ async def delete_my_account(
     This is a destructive operation that cannot be undone.
     """
     # Verify password (parent verification)
-    if not verify_password(delete_req.password, current_user.hashed_password):
+    if not await password_hasher.verify(delete_req.password, current_user.hashed_password):
         # Log failed verification attempt
         await AuditService.log_action(
             db,
@@ -157,7 +158,7 @@ async def delete_my_account(
 # Profile endpoints (nested under users)
 @router.get("/me/profiles", response_model=List[Profile])
 async def get_my_profiles(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> List[Profile]:
     """Get current user's profiles (children)."""
@@ -168,7 +169,7 @@ async def get_my_profiles(
 @router.post("/me/profiles", response_model=Profile)
 async def create_profile(
     profile_in: ProfileCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Profile:
     """Create a new profile (child) for current user."""
@@ -179,7 +180,7 @@ async def create_profile(
 @router.get("/me/profiles/{profile_id}", response_model=Profile)
 async def get_profile(
     profile_id: str,
-    current_user: UserModel = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Profile:
     """Get a specific profile by ID."""
@@ -200,7 +201,7 @@ async def get_profile(
 async def update_profile(
     profile_id: str,
     profile_in: ProfileUpdate,
-    current_user: UserModel = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Profile:
     """Update a child's profile (name, age, preferred_language, settings).
@@ -244,7 +245,7 @@ async def delete_profile(
     profile = await get_and_validate_profile(profile_id, current_user, db)
 
     # Verify password (parent verification)
-    if not verify_password(delete_req.password, current_user.hashed_password):
+    if not await password_hasher.verify(delete_req.password, current_user.hashed_password):
         # Log failed verification attempt
         await AuditService.log_action(
             db,
@@ -284,7 +285,7 @@ async def delete_profile(
 async def update_user_role(
     user_id: str,
     role_update: UserRoleUpdate,
-    current_user: UserModel = Depends(get_current_user),
+    current_user: AuthPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> User:
     """Update a user's role (admin only).
@@ -310,6 +311,7 @@ async def update_user_role(
     target_user.role = role_update.role
     await db.commit()
     await db.refresh(target_user)
+    await principal_cache.invalidate_user(target_user.id)
 
     # Log the action
     await AuditService.log_action(
@@ -3,7 +3,7 @@
 from functools import lru_cache
 from typing import List, Optional
 
-from pydantic import field_validator
+from pydantic import field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -67,6 +67,13 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     # security features
     ENABLE_ACCESS_TOKEN_BLACKLIST: bool = True
+    # Authenticated-principal cache (bounds how long a role change or
+    # deactivation on another worker can take to be observed)
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # Fallback resync interval for the in-memory revocation index when the
+    # Redis pub/sub channel is unavailable
+    REVOCATION_INDEX_RESYNC_SECONDS: int = 30
 
     # CORS
     ALLOWED_ORIGINS: List[str] = ["http://localhost:6173", "http://localhost:3000"]
@@ -88,8 +95,134 @@ class Settings(BaseSettings):
     # Redis (optional)
     REDIS_URL: Optional[str] = None
 
+    # CacheService tiers: a per-worker LRU (L1) in front of Redis, and a
+    # bounded store used while Redis is unreachable.  L1 entries live at most
+    # CACHE_L1_TTL_SECONDS, which bounds cross-worker staleness after a delete.
+    CACHE_L1_TTL_SECONDS: float = 2.0
+    CACHE_L1_MAX_BYTES: int = 32 * 1024 * 1024
+    CACHE_FALLBACK_MAX_BYTES: int = 16 * 1024 * 1024
+    # Cache value encoding: "orjson", "msgpack" or "json", with "zlib", "lz4"
+    # or "none" compression for values of CACHE_COMPRESSION_MIN_BYTES or more.
+    # Unavailable optional packages fall back to json / zlib.
+    CACHE_CODEC: str = "orjson"
+    CACHE_COMPRESSION: str = "zlib"
+    CACHE_COMPRESSION_MIN_BYTES: int = 1024
+
+    # Payment gateway: "dodo", or "fake" for the in-process gateway used by
+    # load tests and local development.  The fake completes every checkout,
+    # so it is refused when APP_ENV is production or DODO_ENV is live, and it
+    # verifies webhooks with DODO_WEBHOOK_SECRET like the real gateway.
+    PAYMENT_GATEWAY: str = "dodo"
+    DODO_ENV: str = "test"
+    DODO_WEBHOOK_SECRET: str = ""
+    FAKE_PAYMENT_LATENCY_SECONDS: float = 0.0
+    DODO_TIMEOUT_SECONDS: float = 10.0
+    DODO_MAX_RETRIES: int = 2
+    DODO_MAX_CONCURRENCY: int = 10
+    DODO_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    DODO_CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # Subscription lifecycle sweeper: expires subscriptions, advances refresh
+    # windows and purges stale webhook events / tokens.  Runs in-process every
+    # LIFECYCLE_SWEEP_INTERVAL_SECONDS (0 disables it; use
+    # scripts/sweep_subscriptions.py from cron instead).
+    LIFECYCLE_SWEEP_INTERVAL_SECONDS: int = 900
+    LIFECYCLE_SWEEP_CHUNK_SIZE: int = 1000
+    WEBHOOK_EVENT_RETENTION_DAYS: int = 30
+
+    # Password hashing.  Hashes made with a different BCRYPT_ROUNDS are
+    # upgraded on the next successful login.  Hashing runs on a dedicated
+    # executor ("thread" or "process") with PASSWORD_HASH_WORKERS slots;
+    # requests beyond PASSWORD_HASH_MAX_PENDING queued, or waiting longer
+    # than PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS, get a 503.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+
+    # Login lockout.  Failures are counted per email, and failures for emails
+    # with no account also per client IP, in a sliding LOCKOUT_WINDOW_SECONDS
+    # window; reaching either limit locks that email / IP for
+    # LOCKOUT_DURATION_SECONDS.  Counters live in Redis when REDIS_URL is set,
+    # otherwise in a per-worker LRU of at most LOCKOUT_MEMORY_MAX_KEYS swept
+    # every LOCKOUT_MEMORY_SWEEP_SECONDS.
+    LOCKOUT_MAX_FAILED_ATTEMPTS: int = 5
+    # The client IP is the connection's peer address.  Behind a reverse proxy
+    # or load balancer that is the proxy, so every login would share one IP
+    # window: run uvicorn with --proxy-headers and --forwarded-allow-ips set
+    # to the proxy's address, or raise this limit.  Users behind one NAT (a
+    # school, an office) share a window too.
+    LOCKOUT_IP_MAX_FAILED_ATTEMPTS: int = 100
+    LOCKOUT_WINDOW_SECONDS: int = 900
+    LOCKOUT_DURATION_SECONDS: int = 900
+    LOCKOUT_MEMORY_MAX_KEYS: int = 100_000
+    LOCKOUT_MEMORY_SWEEP_SECONDS: float = 60.0
+
+    # Request rate limits (GCRA).  Budgets are shared across workers in Redis
+    # when REDIS_URL is set; otherwise each worker keeps its own, in an LRU of
+    # at most RATE_LIMIT_MEMORY_MAX_KEYS keys.
+    RATE_LIMIT_MEMORY_MAX_KEYS: int = 100_000
+
+    # Rows fetched per server-side cursor round trip when streaming data
+    # export downloads.
+    DATA_EXPORT_STREAM_CHUNK_SIZE: int = 500
+    # GET /export/summary is cached per user (dropped on progress and profile
+    # writes) and recommends a background job above DATA_EXPORT_INLINE_MAX_BYTES.
+    DATA_EXPORT_SUMMARY_CACHE_TTL_SECONDS: int = 300
+    DATA_EXPORT_INLINE_MAX_BYTES: int = 10 * 1024 * 1024
+
+    # Background export jobs (POST /export/jobs).  Workers run in-process (0
+    # disables them; run scripts/run_export_worker.py instead) and write zip
+    # artifacts under LOCAL_STORAGE_PATH/exports.  Identical requests within
+    # DATA_EXPORT_JOB_DEDUPE_SECONDS share one job; artifacts are purged by
+    # the lifecycle sweep after DATA_EXPORT_ARTIFACT_TTL_HOURS.
+    DATA_EXPORT_JOB_WORKERS: int = 1
+    DATA_EXPORT_JOB_POLL_SECONDS: float = 5.0
+    DATA_EXPORT_JOB_LEASE_SECONDS: int = 1800
+    DATA_EXPORT_JOB_MAX_ATTEMPTS: int = 3
+    DATA_EXPORT_JOB_DEDUPE_SECONDS: int = 900
+    DATA_EXPORT_ARTIFACT_TTL_HOURS: int = 24
+
+    # Dodo webhook queue.  Workers run in-process (0 disables them; run
+    # scripts/run_webhook_worker.py instead) and retry failures with
+    # exponential backoff up to WEBHOOK_QUEUE_MAX_ATTEMPTS.
+    WEBHOOK_QUEUE_WORKERS: int = 1
+    WEBHOOK_QUEUE_BATCH_SIZE: int = 10
+    WEBHOOK_QUEUE_POLL_SECONDS: float = 2.0
+    WEBHOOK_QUEUE_MAX_ATTEMPTS: int = 8
+    WEBHOOK_QUEUE_BACKOFF_BASE_SECONDS: float = 5.0
+    WEBHOOK_QUEUE_BACKOFF_MAX_SECONDS: float = 3600.0
+    WEBHOOK_QUEUE_LEASE_SECONDS: int = 300
+
     # Progress event-time handling
     USE_CLIENT_EVENT_TIME: bool = False
+    # Per-profile /progress/stats cache (0 disables it)
+    PROGRESS_STATS_CACHE_TTL_SECONDS: int = 60
+    PROGRESS_STATS_CACHE_MAX_ENTRIES: int = 10000
+    # In-process game catalog: how often to poll the Redis version key, and
+    # the rebuild interval when Redis isn't configured
+    GAME_CATALOG_VERSION_CHECK_SECONDS: float = 2.0
+    GAME_CATALOG_REFRESH_SECONDS: float = 60.0
+    # Per-parent subscription entitlement cache (0 disables it).  Without
+    # Redis, invalidations from the webhook worker can't reach API workers,
+    # so "no subscription" is only remembered for the shorter negative TTL.
+    SUBSCRIPTION_ENTITLEMENT_CACHE_TTL_SECONDS: int = 60
+    SUBSCRIPTION_ENTITLEMENT_LOCAL_NEGATIVE_TTL_SECONDS: int = 3
+    SUBSCRIPTION_ENTITLEMENT_CACHE_MAX_ENTRIES: int = 10000
+
+    @model_validator(mode="after")
+    def validate_payment_gateway(self) -> "Settings":
+        """Never let the fake payment gateway take real traffic."""
+        if self.PAYMENT_GATEWAY != "fake":
+            return self
+        if self.APP_ENV.lower() == "production" or self.DODO_ENV.lower() == "live":
+            raise ValueError(
+                "PAYMENT_GATEWAY=fake is not allowed when APP_ENV=production or DODO_ENV=live"
+            )
+        if not self.DODO_WEBHOOK_SECRET:
+            raise ValueError("DODO_WEBHOOK_SECRET is required when PAYMENT_GATEWAY=fake")
+        return self
 
     # AI/LLM API Keys
     GEMINI_API_KEY: Optional[str] = None
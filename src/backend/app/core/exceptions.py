@@ -15,11 +15,13 @@ class AppException(Exception):
         status_code: int = 500,
         error_code: Optional[str] = None,
         details: Optional[dict[str, Any]] = None,
+        headers: Optional[dict[str, str]] = None,
     ):
         self.message = message
         self.status_code = status_code
         self.error_code = error_code or self.__class__.__name__
         self.details = details or {}
+        self.headers = headers
         super().__init__(self.message)
 
 
@@ -142,15 +144,30 @@ class DuplicateResourceError(ResourceConflictError):
 class RateLimitExceededError(AppException):
     """Raised when rate limit is exceeded."""
 
-    def __init__(self, retry_after: Optional[int] = None):
+    def __init__(self, retry_after: Optional[int] = None, headers: Optional[dict[str, str]] = None):
         details = {}
         if retry_after:
             details["retry_after_seconds"] = retry_after
+            headers = {"Retry-After": str(retry_after), **(headers or {})}
         super().__init__(
             message="Rate limit exceeded. Please try again later.",
             status_code=429,
             error_code="RATE_LIMIT_EXCEEDED",
             details=details,
+            headers=headers,
+        )
+
+
+class ServiceOverloadedError(AppException):
+    """Raised when a bounded resource is saturated and the request is shed."""
+
+    def __init__(self, message: str = "Service is busy, please retry shortly", retry_after: int = 1):
+        super().__init__(
+            message=message,
+            status_code=503,
+            error_code="SERVICE_OVERLOADED",
+            details={"retry_after_seconds": retry_after},
+            headers={"Retry-After": str(retry_after)},
         )
 
 
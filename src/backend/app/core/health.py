@@ -6,6 +6,8 @@ from typing import Any, Dict
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.password_hasher import password_hasher
+
 
 async def check_database(db: AsyncSession) -> Dict[str, Any]:
     """Check database connectivity with performance metrics.
@@ -46,6 +48,8 @@ async def get_health_status(db: AsyncSession) -> Dict[str, Any]:
         "status": overall_status,
         "response_time_ms": round(overall_response_time, 2),
         "components": {"database": db_status},
+        # Saturation of the bcrypt pool (logins/registrations shed above it)
+        "password_hasher": password_hasher.stats(),
         "metadata": {
             "checks_performed": 1,
             "timestamp": time.time(),
@@ -0,0 +1,155 @@
+"""Bcrypt hashing off the event loop.
+
+A bcrypt check at cost 12 takes ~250ms of CPU; run inline it stalls every
+other request on the worker.  ``PasswordHasher`` runs hashes and checks on a
+dedicated executor (threads by default: bcrypt releases the GIL, so they run
+in parallel) with at most ``PASSWORD_HASH_WORKERS`` in flight.  Callers queue
+for a slot; once ``PASSWORD_HASH_MAX_PENDING`` are already waiting, or a slot
+doesn't free up within ``PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS``, the call is
+shed with ServiceOverloadedError (503 + Retry-After) rather than letting
+logins pile up behind each other.
+
+``needs_rehash`` reports hashes made with a cost other than
+``BCRYPT_ROUNDS``; ``UserService.authenticate`` upgrades them on login.
+"""
+
+import asyncio
+import logging
+import secrets
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.exceptions import ServiceOverloadedError
+from app.core.security import get_password_hash, password_hash_rounds, verify_password
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Bounded executor for bcrypt hashing and verification."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        executor: Optional[str] = None,
+    ):
+        self.max_workers = max_workers or settings.PASSWORD_HASH_WORKERS
+        self.max_pending = settings.PASSWORD_HASH_MAX_PENDING if max_pending is None else max_pending
+        self.queue_timeout = (
+            settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS if queue_timeout is None else queue_timeout
+        )
+        self.executor_kind = executor or settings.PASSWORD_HASH_EXECUTOR
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._dummy_hash: Optional[str] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    def _shed(self, reason: str) -> ServiceOverloadedError:
+        self.rejected += 1
+        logger.warning("Shedding password hash request: %s", reason)
+        return ServiceOverloadedError(
+            "Too many sign-in requests, please retry shortly", retry_after=1
+        )
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` on the executor once a slot is free."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        if self._slots.locked() and self.waiting >= self.max_pending:
+            raise self._shed(f"{self.waiting} requests already queued")
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._shed(f"no free slot within {self.queue_timeout}s") from None
+        finally:
+            self.waiting -= 1
+
+        started_at = time.perf_counter()
+        self.wait_seconds += started_at - queued_at
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.run_seconds += time.perf_counter() - started_at
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        """Hash ``password`` at the configured cost."""
+        return await self._run(get_password_hash, password, settings.BCRYPT_ROUNDS)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Check ``password`` against a bcrypt hash."""
+        return await self._run(verify_password, password, hashed_password)
+
+    async def verify_dummy(self, password: str) -> bool:
+        """Spend the same time as a real check, for users that don't exist.
+
+        The dummy hash uses the configured cost, so unknown emails can't be
+        told apart by timing after ``BCRYPT_ROUNDS`` changes.
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash(secrets.token_urlsafe(16))
+        await self.verify(password, self._dummy_hash)
+        return False
+
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        """Whether a hash was made with a cost other than ``BCRYPT_ROUNDS``."""
+        return password_hash_rounds(hashed_password) != settings.BCRYPT_ROUNDS
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth and timing counters for monitoring."""
+        return {
+            "executor": self.executor_kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_seconds / self.completed * 1000, 2)
+            if self.completed
+            else 0.0,
+            "avg_run_ms": round(self.run_seconds / self.completed * 1000, 2)
+            if self.completed
+            else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the executor; it is recreated on next use."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher()
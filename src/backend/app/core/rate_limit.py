@@ -1,30 +1,227 @@
-"""Rate limiting configuration."""
+"""Rate limiting configuration.
 
+Limits are enforced with GCRA (the generic cell rate algorithm, a token
+bucket that stores one timestamp per key): each key keeps a "theoretical
+arrival time" that advances by ``period / limit`` per request, and a request
+is allowed while that time is less than one period ahead of now.  One check is
+one read-modify-write of one value:
+
+* with ``REDIS_URL`` set, a Lua script does it in a single round trip using
+  the Redis server clock, so every worker shares one budget per key;
+* otherwise (and while Redis is unreachable) a per-worker LRU capped at
+  ``RATE_LIMIT_MEMORY_MAX_KEYS`` stands in.
+
+Results are exposed as ``RateLimit-Limit`` / ``RateLimit-Remaining`` /
+``RateLimit-Reset`` / ``RateLimit-Policy`` headers, and rejected requests get
+a 429 with ``Retry-After``.  Auth endpoints are limited per client IP with
+``@limiter.limit``; progress endpoints per authenticated user with
+``deps.rate_limit_per_user`` (classrooms share one NAT address).
+"""
+
+import functools
+import inspect
+import logging
+import math
 import os
-from typing import Any
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
 
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.exceptions import RateLimitExceededError
+
+logger = logging.getLogger(__name__)
 
 # Check if we're in testing mode
 TESTING = os.environ.get("TESTING", "false").lower() == "true"
 
-# Create limiter instance
-# Uses client IP as key for rate limiting
-# In testing, use a very high limit to avoid interfering with tests
-if TESTING:
-    # High limit for tests, but still enable rate limiting code paths
-    DEFAULT_LIMITS = ["10000/minute"]
-else:
-    DEFAULT_LIMITS = ["100/minute"]  # Default: 100 requests per minute per IP
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# KEYS[1]: the key's theoretical arrival time (ms); ARGV: ms per request,
+# period in ms.  Returns {allowed, remaining, reset_ms, retry_after_ms}.
+_GCRA_SCRIPT = """
+redis.replicate_commands()
+local clock = redis.call("time")
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local tat = tonumber(redis.call("get", KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return {0, 0, math.ceil(tat - now), math.ceil(allow_at - now)}
+end
+redis.call("set", KEYS[1], string.format("%.3f", new_tat), "px", math.ceil(new_tat - now))
+return {1, math.floor((period - (new_tat - now)) / interval + 1e-6), math.ceil(new_tat - now), 0}
+"""
+
+
+@dataclass(frozen=True)
+class Rate:
+    """``limit`` requests per ``period`` seconds, parsed from e.g. ``"5/minute"``."""
+
+    limit: int
+    period: float
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.limit
+
+
+@functools.cache
+def parse_rate(rate: str) -> Rate:
+    """Parse ``"<count>/<second|minute|hour|day>"``."""
+    count, _, unit = rate.partition("/")
+    return Rate(limit=int(count), period=_PERIODS[unit.strip().rstrip("s")])
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of one limiter check."""
+
+    allowed: bool
+    rate: Rate
+    remaining: int
+    reset_after: float
+    retry_after: float = 0.0
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.rate.limit),
+            "RateLimit-Remaining": str(max(0, self.remaining)),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+            "RateLimit-Policy": f"{self.rate.limit};w={int(self.rate.period)}",
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class MemoryRateLimitStore:
+    """Per-worker GCRA state, capped at ``max_keys`` least recently used keys."""
+
+    def __init__(self, max_keys: Optional[int] = None):
+        self.max_keys = max_keys or settings.RATE_LIMIT_MEMORY_MAX_KEYS
+        self._tats: OrderedDict[str, float] = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    async def hit(self, key: str, rate: Rate) -> RateLimitResult:
+        now = time.monotonic()
+        tat = max(self._tats.pop(key, now), now)
+        new_tat = tat + rate.interval
+        allow_at = new_tat - rate.period
+        if now < allow_at:
+            # Denied requests don't consume budget
+            self._tats[key] = tat
+            return RateLimitResult(False, rate, 0, tat - now, allow_at - now)
 
-limiter = Limiter(key_func=get_remote_address, default_limits=DEFAULT_LIMITS)  # type: ignore[arg-type]
+        self._tats[key] = new_tat
+        while len(self._tats) > self.max_keys:
+            self._tats.popitem(last=False)
+            self.evictions += 1
+        remaining = math.floor((rate.period - (new_tat - now)) / rate.interval + 1e-6)
+        return RateLimitResult(True, rate, remaining, new_tat - now)
 
 
-def get_rate_limit_exceeded_handler() -> Any:
-    """Get the handler for rate limit exceeded errors."""
-    return _rate_limit_exceeded_handler
+class RedisRateLimitStore:
+    """GCRA state shared by every worker, one script call per check."""
+
+    def __init__(self) -> None:
+        self._script = None
+
+    async def hit(self, key: str, rate: Rate) -> RateLimitResult:
+        if self._script is None:
+            from app.services.cache_service import cache_service
+
+            client = await cache_service.get_client()
+            self._script = client.register_script(_GCRA_SCRIPT)
+        allowed, remaining, reset_ms, retry_ms = await self._script(
+            keys=[key], args=[rate.interval * 1000, rate.period * 1000]
+        )
+        return RateLimitResult(
+            bool(allowed), rate, int(remaining), int(reset_ms) / 1000, int(retry_ms) / 1000
+        )
+
+
+def client_ip(request: Request) -> str:
+    """Client address used to key anonymous limits."""
+    return request.client.host if request.client else "127.0.0.1"
+
+
+class Limiter:
+    """GCRA limiter over a shared (Redis) or per-worker store."""
+
+    def __init__(self, key_func: Callable[[Request], str] = client_ip, store: Any = None):
+        self.key_func = key_func
+        self._store = store
+        self._fallback: Optional[MemoryRateLimitStore] = None
+
+    def get_store(self) -> Any:
+        if self._store is None:
+            self._store = RedisRateLimitStore() if settings.REDIS_URL else MemoryRateLimitStore()
+        return self._store
+
+    def set_store(self, store: Any) -> None:
+        """Swap the store (tests); ``None`` re-selects from settings."""
+        self._store = store
+
+    async def hit(self, key: str, rate: str) -> RateLimitResult:
+        """Count one request against ``key``."""
+        parsed = parse_rate(rate)
+        full_key = f"ratelimit:{key}"
+        try:
+            return await self.get_store().hit(full_key, parsed)
+        except Exception as e:
+            logger.warning("Rate limit store unavailable, using local state: %s", e)
+            if self._fallback is None:
+                self._fallback = MemoryRateLimitStore()
+            return await self._fallback.hit(full_key, parsed)
+
+    async def check(self, request: Request, rate: str, key: str) -> RateLimitResult:
+        """Count the request, record the result for headers, and raise 429 if over."""
+        result = await self.hit(key, rate)
+        request.state.rate_limit = result
+        if not result.allowed:
+            raise RateLimitExceededError(
+                retry_after=max(1, math.ceil(result.retry_after)), headers=result.headers()
+            )
+        return result
+
+    def limit(
+        self, rate: str, key_func: Optional[Callable[[Request], str]] = None
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Limit an endpoint that takes a ``request: Request`` argument.
+
+        Each endpoint has its own budget per key (client IP by default).
+        """
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            if "request" not in inspect.signature(func).parameters:
+                raise TypeError(f"{func.__name__} needs a 'request: Request' argument")
+            scope = f"{func.__module__}.{func.__name__}"
+
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                request: Request = kwargs["request"]
+                identity = (key_func or self.key_func)(request)
+                await self.check(request, rate, f"{scope}:{identity}")
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+limiter = Limiter()
 
 
 # Rate limit strings for different endpoint categories
@@ -40,12 +237,14 @@ class RateLimits:
     API_GENERAL = "10000/minute" if TESTING else "100/minute"  # Most API operations
     API_HEAVY = "10000/minute" if TESTING else "20/minute"  # Heavy operations (stats, exports)
 
-    # Progress tracking - higher limits for game interactions
+    # Progress tracking - higher limits for game interactions, per user
     PROGRESS_WRITE = "10000/minute" if TESTING else "60/minute"  # Saving progress (1 per second)
     PROGRESS_READ = "10000/minute" if TESTING else "120/minute"  # Reading progress/stats
 
 
 def setup_rate_limiting(app: Any) -> None:
     """Setup rate limiting for the FastAPI app."""
+    from app.middleware.rate_limit_headers import RateLimitHeadersMiddleware
+
     app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    app.add_middleware(RateLimitHeadersMiddleware)
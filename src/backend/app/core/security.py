@@ -1,5 +1,6 @@
 """Security utilities."""
 
+import hashlib
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
@@ -10,22 +11,38 @@ from app.core.config import settings
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash using bcrypt."""
+    """Verify a password against its hash using bcrypt.
+
+    Blocks for the full bcrypt cost; async code should use
+    ``password_hasher.verify`` from ``app.core.password_hasher`` instead.
+    """
     # Encode passwords to bytes for bcrypt
     plain_bytes = plain_password.encode("utf-8")
     hash_bytes = hashed_password.encode("utf-8")
     return bcrypt.checkpw(plain_bytes, hash_bytes)
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt."""
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
+    """Hash a password using bcrypt at ``rounds`` (default ``BCRYPT_ROUNDS``).
+
+    Blocks for the full bcrypt cost; async code should use
+    ``password_hasher.hash`` from ``app.core.password_hasher`` instead.
+    """
     # Truncate to 72 bytes for bcrypt compatibility
     password_bytes = password[:72].encode("utf-8")
     # Use bcrypt directly to avoid passlib's crypt deprecation warning
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=rounds or settings.BCRYPT_ROUNDS)
     return bcrypt.hashpw(password_bytes, salt).decode("utf-8")
 
 
+def password_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Cost factor of a ``$2b$12$...`` bcrypt hash, or None if it isn't one."""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
 def create_access_token(data: dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token with a jti claim for revocation.
 
@@ -56,3 +73,8 @@ def create_refresh_token(data: dict[str, Any]) -> str:
     expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire})
     return str(jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256"))
+
+
+def token_digest(token: str) -> str:
+    """SHA-256 hex digest of a token, stored in place of the token itself."""
+    return hashlib.sha256(token.encode()).hexdigest()
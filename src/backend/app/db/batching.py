@@ -0,0 +1,30 @@
+"""Chunked bulk statements for maintenance jobs."""
+
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+async def delete_in_chunks(
+    db: AsyncSession,
+    pk: InstrumentedAttribute,
+    *criteria: Any,
+    chunk_size: int = 1000,
+) -> int:
+    """Delete rows matching ``criteria`` ``chunk_size`` at a time, committing each chunk.
+
+    Short transactions keep lock times and WAL bursts small on large purges.
+    Returns the number of rows deleted.
+    """
+    model = pk.class_
+    total = 0
+    while True:
+        ids = select(pk).where(*criteria).limit(chunk_size).scalar_subquery()
+        result = await db.execute(delete(model).where(pk.in_(ids)))
+        await db.commit()
+        deleted = result.rowcount or 0
+        total += deleted
+        if deleted < chunk_size:
+            return total
@@ -0,0 +1,59 @@
+"""Named loader strategies for model relationships.
+
+Relationships on ``User`` and ``Profile`` are declared ``lazy="raise"`` so an
+unplanned attribute access fails loudly instead of issuing a hidden query.
+Services that need related rows opt in by passing one of these load profiles,
+which map to explicit ``selectinload`` options.
+"""
+
+from enum import Enum
+
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.db.models.profile import Profile
+from app.db.models.user import User
+
+
+class ProfileLoad(str, Enum):
+    """What to load alongside a ``Profile``."""
+
+    SUMMARY = "summary"
+    WITH_PROGRESS = "with_progress"
+    WITH_ACHIEVEMENTS = "with_achievements"
+    FULL = "full"
+
+
+class UserLoad(str, Enum):
+    """What to load alongside a ``User``."""
+
+    SUMMARY = "summary"
+    WITH_PROFILES = "with_profiles"
+    WITH_SUBSCRIPTIONS = "with_subscriptions"
+
+
+_PROFILE_OPTIONS: dict[ProfileLoad, tuple[LoaderOption, ...]] = {
+    ProfileLoad.SUMMARY: (),
+    ProfileLoad.WITH_PROGRESS: (selectinload(Profile.progress),),
+    ProfileLoad.WITH_ACHIEVEMENTS: (selectinload(Profile.achievements),),
+    ProfileLoad.FULL: (
+        selectinload(Profile.progress),
+        selectinload(Profile.achievements),
+    ),
+}
+
+_USER_OPTIONS: dict[UserLoad, tuple[LoaderOption, ...]] = {
+    UserLoad.SUMMARY: (),
+    UserLoad.WITH_PROFILES: (selectinload(User.profiles),),
+    UserLoad.WITH_SUBSCRIPTIONS: (selectinload(User.subscriptions),),
+}
+
+
+def profile_load_options(load: ProfileLoad) -> tuple[LoaderOption, ...]:
+    """Return the loader options for a profile load strategy."""
+    return _PROFILE_OPTIONS[load]
+
+
+def user_load_options(load: UserLoad) -> tuple[LoaderOption, ...]:
+    """Return the loader options for a user load strategy."""
+    return _USER_OPTIONS[load]
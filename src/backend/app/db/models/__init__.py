@@ -2,8 +2,11 @@
 
 from app.db.models.achievement import Achievement
 from app.db.models.audit_log import AuditLog
+from app.db.models.data_export_job import DataExportJob
+from app.db.models.game_stats import GameStatsDaily
 from app.db.models.profile import Profile
 from app.db.models.progress import Progress
+from app.db.models.progress_rollup import ProfileProgressRollup
 from app.db.models.refresh_token import RefreshToken
 from app.db.models.subscription_model import Subscription, SubscriptionGameSelection
 from app.db.models.user import User
@@ -12,8 +15,11 @@ __all__ = [
     "User",
     "Profile",
     "Progress",
+    "ProfileProgressRollup",
     "Achievement",
     "AuditLog",
+    "DataExportJob",
+    "GameStatsDaily",
     "RefreshToken",
     "Subscription",
     "SubscriptionGameSelection",
@@ -29,4 +29,6 @@ class Achievement(Base):
     unlocked_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     # Relationships
-    profile: Mapped["Profile"] = relationship("Profile", back_populates="achievements")
+    profile: Mapped["Profile"] = relationship(
+        "Profile", back_populates="achievements", lazy="raise"
+    )
@@ -0,0 +1,62 @@
+"""Background data export job model."""
+
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+
+
+class DataExportJob(Base):
+    """A queued export whose artifact is built by ``DataExportJobQueue`` workers."""
+
+    __tablename__ = "data_export_jobs"
+    __table_args__ = (
+        # Workers claim queued jobs oldest first
+        Index("ix_data_export_jobs_status_created", "status", "created_at"),
+        # Dedupe lookups: the user's recent jobs with the same options
+        Index("ix_data_export_jobs_user_created", "user_id", "created_at"),
+    )
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid4()))
+    user_id: Mapped[str] = mapped_column(
+        String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+
+    # Export options: json, jsonl or csv; one archive member per section
+    format: Mapped[str] = mapped_column(String, nullable=False, default="json")
+    include_progress: Mapped[bool] = mapped_column(Boolean, default=True)
+    include_subscriptions: Mapped[bool] = mapped_column(Boolean, default=True)
+
+    # Queue state: queued -> running -> completed | failed
+    status: Mapped[str] = mapped_column(String, nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # When a worker claimed the job; stale claims are picked up again
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Progress, updated once per streamed chunk
+    rows_total: Mapped[int] = mapped_column(Integer, default=0)
+    rows_written: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Finished artifact, relative to the export storage directory
+    artifact_name: Mapped[str | None] = mapped_column(String, nullable=True)
+    artifact_size: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Artifact is deleted by the lifecycle sweep after this
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def progress_percent(self) -> int:
+        if self.status == "completed":
+            return 100
+        if not self.rows_total:
+            return 0
+        return min(99, self.rows_written * 100 // self.rows_total)
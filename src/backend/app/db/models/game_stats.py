@@ -0,0 +1,29 @@
+"""Pre-aggregated game statistics model."""
+
+from datetime import date
+
+from sqlalchemy import Date, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+
+
+class GameStatsDaily(Base):
+    """Play counters per game, UTC day and profile age bucket.
+
+    Updated in the same transaction as ``progress`` writes by
+    ``GameStatsService`` so ``/games/stats`` sums a few hundred rows instead
+    of scanning ``progress``.
+    """
+
+    __tablename__ = "game_stats_daily"
+
+    # Progress.content_id; equals Game.slug for known games
+    game_key: Mapped[str] = mapped_column(String, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    # Profile age at write time, floored to the half year
+    age_bucket: Mapped[float] = mapped_column(Float, primary_key=True)
+
+    plays: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completed_sum: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    duration_sum: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
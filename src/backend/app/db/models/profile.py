@@ -38,16 +38,20 @@ class Profile(Base):
     )
 
     # Relationships
-    parent: Mapped["User"] = relationship("User", back_populates="profiles")
+    # Collections are never loaded implicitly; services opt in through
+    # app.db.loaders.ProfileLoad.  Deletes rely on the FK ON DELETE CASCADE.
+    parent: Mapped["User"] = relationship("User", back_populates="profiles", lazy="raise")
     progress: Mapped[list["Progress"]] = relationship(
         "Progress",
         back_populates="profile",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     achievements: Mapped[list["Achievement"]] = relationship(
         "Achievement",
         back_populates="profile",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
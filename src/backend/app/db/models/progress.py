@@ -4,7 +4,16 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from uuid import uuid4
 
-from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base_class import Base
@@ -48,10 +57,19 @@ class Progress(Base):
         UniqueConstraint(
             "profile_id", "idempotency_key", name="uix_profile_id_idempotency_key"
         ),
+        # Covers the /progress/stats aggregate without touching the heap
+        Index("ix_progress_profile_score_content", "profile_id", "score", "content_id"),
+        # Keyset pagination of a profile's history, newest first
+        Index(
+            "ix_progress_profile_completed_at_id",
+            "profile_id",
+            completed_at.desc(),
+            "id",
+        ),
     )
     # Relationships
     profile: Mapped["Profile"] = relationship(
         "Profile",
         back_populates="progress",
-        lazy="joined",
+        lazy="raise",
     )
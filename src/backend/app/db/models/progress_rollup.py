@@ -0,0 +1,32 @@
+"""Per-profile progress rollup model."""
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+
+
+class ProfileProgressRollup(Base):
+    """Running totals of a profile's progress per activity and content item.
+
+    Maintained in the same transaction as ``progress`` writes by
+    ``ProgressRollupService`` so readers can scan one row per distinct
+    content item instead of the append-only history.
+    """
+
+    __tablename__ = "profile_progress_rollup"
+
+    profile_id: Mapped[str] = mapped_column(
+        ForeignKey("profiles.id", ondelete="CASCADE"), primary_key=True
+    )
+    activity_type: Mapped[str] = mapped_column(String, primary_key=True)
+    content_id: Mapped[str] = mapped_column(String, primary_key=True)
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_score: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    best_score: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_duration_seconds: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    completed: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
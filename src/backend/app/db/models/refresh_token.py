@@ -1,26 +1,54 @@
 """Refresh token model for tracking and rotation."""
 
 from datetime import datetime
+from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
+from app.core.security import token_digest
 from app.db.base_class import Base
 
 
 class RefreshToken(Base):
-    """Refresh token model for tracking and rotation."""
+    """Refresh token model for tracking and rotation.
+
+    Only the SHA-256 digest of the JWT is stored.  The raw token is available
+    as ``token`` on the instance that was created with it, so it can be set
+    as a cookie, and is never persisted.
+    """
 
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Bulk revocation and "active sessions" lookups per user
+        Index("ix_refresh_tokens_user_active", "user_id", "is_active"),
+    )
 
+    # The JWT's jti
     id: Mapped[str] = mapped_column(
         String, primary_key=True, default=lambda: str(uuid4())
     )
-    token: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True, nullable=False)
     user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Tokens rotated from one login share a family; reusing a rotated token
+    # revokes the whole family
+    family_id: Mapped[str] = mapped_column(
+        String, index=True, nullable=False, default=lambda: str(uuid4())
+    )
+    # Token this one was rotated into, if any
+    replaced_by: Mapped[str | None] = mapped_column(String, nullable=True)
     expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_revoked: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     revoked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    @property
+    def token(self) -> Optional[str]:
+        return getattr(self, "_token", None)
+
+    @token.setter
+    def token(self, value: str) -> None:
+        self._token = value
+        self.token_hash = token_digest(value)
@@ -54,6 +54,13 @@ class Subscription(Base):
         CheckConstraint("end_date > start_date", name="ck_end_after_start"),
         # Validate amount_paid is non-negative (allow 0 for fully credited upgrades)
         CheckConstraint("amount_paid >= 0", name="ck_amount_nonneg"),
+        # Lifecycle sweeper scans only active rows for expiry
+        Index(
+            "ix_subscriptions_active_end_date",
+            "end_date",
+            postgresql_where=text("status = 'active'"),
+            sqlite_where=text("status = 'active'"),
+        ),
     )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid4()))
@@ -86,6 +93,11 @@ class Subscription(Base):
     # Quarterly packs can refresh once per monthly checkpoint (cycles 2 and 3).
     # Stores the last cycle index that consumed a refresh. 0 means none used yet.
     last_refresh_cycle_used: Mapped[int] = mapped_column(default=0)
+    # Start of the next monthly refresh window (quarterly packs only), kept
+    # current by the lifecycle sweeper
+    next_refresh_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
     # Payment reference (from payment gateway)
     payment_reference: Mapped[str | None] = mapped_column(String, nullable=True)
@@ -127,14 +139,16 @@ class DodoWebhookEvent(Base):
     __table_args__ = (
         # Ensure webhook_id is unique - prevents duplicate processing
         UniqueConstraint("webhook_id", name="uq_webhook_id"),
+        # Queue workers claim due events by status and next_attempt_at
+        Index("ix_dodo_webhook_events_status_next_attempt", "status", "next_attempt_at"),
     )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid4()))
     webhook_id: Mapped[str] = mapped_column(String, nullable=False, index=True)
     event_type: Mapped[str] = mapped_column(String, nullable=False)
 
-    # Processing status for ops visibility
-    status: Mapped[str] = mapped_column(String, default="received")  # received | processed | failed
+    # Queue state: received -> processing -> processed | failed
+    status: Mapped[str] = mapped_column(String, default="received")
     processed_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True, default=None
     )
@@ -146,6 +160,15 @@ class DodoWebhookEvent(Base):
     # Store the session_id for reference
     session_id: Mapped[str | None] = mapped_column(String, nullable=True)
 
+    # Raw webhook body, processed later by WebhookQueue workers
+    payload: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Earliest time a worker may (re)try a received event
+    next_attempt_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # When a worker claimed the event; stale claims are picked up again
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
 
 class SubscriptionGameSelection(Base):
     """Game selections for a subscription."""
@@ -42,17 +42,20 @@ class User(Base):
     )
 
     # Relationships - cascade deletes to profiles (and their progress/achievements)
+    # are handled by the FK ON DELETE CASCADE; load explicitly via UserLoad.
     profiles: Mapped[list["Profile"]] = relationship(
         "Profile",
         back_populates="parent",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     # Subscriptions
     subscriptions: Mapped[list["Subscription"]] = relationship(
         "Subscription",
         back_populates="parent",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
@@ -73,6 +73,25 @@ async def validate_database_schema() -> None:
         await conn.run_sync(check_tables)
 
 
+async def warm_revocation_index() -> None:
+    """Load revoked access tokens into memory and subscribe to new revocations."""
+    from app.db.session import async_session
+    from app.services.revocation_index import revocation_index
+
+    if not settings.ENABLE_ACCESS_TOKEN_BLACKLIST:
+        return
+
+    try:
+        async with async_session() as session:
+            count = await revocation_index.load(session)
+        logger.info(f"Loaded {count} revoked access tokens into memory")
+    except Exception as e:
+        # Not fatal: the index loads lazily on the first revocation check
+        logger.warning(f"Could not warm revocation index: {e}")
+
+    revocation_index.start_listener()
+
+
 # Validate settings before creating app to catch issues early
 try:
     settings = get_settings()
@@ -120,6 +139,7 @@ app.add_middleware(
     allow_credentials=settings.CORS_ALLOW_CREDENTIALS,  # Use setting instead of hardcoded True
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type", "X-Requested-With"],
+    expose_headers=["X-Next-Cursor"],
     max_age=600,  # Cache preflight for 10 minutes
 )
 
@@ -138,6 +158,41 @@ async def startup_event():
         logger.error(f"❌ Startup validation failed: {e}")
         raise
 
+    await warm_revocation_index()
+
+    if settings.WEBHOOK_QUEUE_WORKERS > 0:
+        from app.services.webhook_queue import webhook_worker
+
+        webhook_worker.start()
+
+    if settings.DATA_EXPORT_JOB_WORKERS > 0:
+        from app.services.data_export_jobs import data_export_worker
+
+        data_export_worker.start()
+
+    if settings.LIFECYCLE_SWEEP_INTERVAL_SECONDS > 0:
+        from app.services.subscription_lifecycle import lifecycle_sweeper
+
+        lifecycle_sweeper.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background listeners and workers."""
+    from app.core.password_hasher import password_hasher
+    from app.services.data_export_jobs import data_export_worker
+    from app.services.dodo_payment_service import close_dodo_client
+    from app.services.revocation_index import revocation_index
+    from app.services.subscription_lifecycle import lifecycle_sweeper
+    from app.services.webhook_queue import webhook_worker
+
+    await revocation_index.stop_listener()
+    await webhook_worker.stop()
+    await data_export_worker.stop()
+    await lifecycle_sweeper.stop()
+    await close_dodo_client()
+    password_hasher.shutdown()
+
 
 @app.get("/")
 async def root() -> dict:
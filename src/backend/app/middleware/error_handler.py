@@ -64,6 +64,7 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
         return JSONResponse(
             status_code=exc.status_code,
             content=response_data,
+            headers=exc.headers,
         )
 
     def _handle_unexpected_exception(self, exc: Exception, request: Request) -> JSONResponse:
@@ -0,0 +1,14 @@
+from starlette.middleware.base import BaseHTTPMiddleware
+
+
+class RateLimitHeadersMiddleware(BaseHTTPMiddleware):
+    """Middleware that adds RateLimit-* headers for requests checked by the limiter."""
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+
+        result = getattr(request.state, "rate_limit", None)
+        if result is not None:
+            response.headers.update(result.headers())
+
+        return response
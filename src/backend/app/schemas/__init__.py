@@ -18,9 +18,10 @@ from app.schemas.issue_report import (
 from app.schemas.profile import Profile, ProfileCreate, ProfileUpdate
 from app.schemas.progress import Progress, ProgressCreate, ProgressUpdate
 from app.schemas.token import Token, TokenPayload
-from app.schemas.user import User, UserCreate, UserInDB, UserUpdate
+from app.schemas.user import AuthPrincipal, User, UserCreate, UserInDB, UserUpdate
 
 __all__ = [
+    "AuthPrincipal",
     "User",
     "UserCreate",
     "UserUpdate",
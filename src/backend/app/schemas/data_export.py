@@ -1,7 +1,7 @@
 """Data export schemas for GDPR/COPPA compliance."""
 
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -84,3 +84,33 @@ class DataExportRequest(BaseModel):
     format: str = "json"  # "json" or "csv"
     include_progress: bool = True
     include_subscriptions: bool = True
+
+
+class DataExportJobRequest(BaseModel):
+    """Request a background export archive."""
+
+    format: Literal["json", "jsonl", "csv"] = "json"
+    include_progress: bool = True
+    include_subscriptions: bool = True
+
+
+class DataExportJobResponse(BaseModel):
+    """Status of a background export job."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    status: str  # queued, running, completed or failed
+    format: str
+    include_progress: bool
+    include_subscriptions: bool
+    progress_percent: int
+    rows_written: int
+    rows_total: int
+    artifact_size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    download_url: Optional[str] = None
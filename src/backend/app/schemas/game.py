@@ -111,6 +111,31 @@ class GameFilter(BaseModel):
     page_size: int = Field(default=20, ge=1, le=100)
 
 
+class GameAccessBatchRequest(BaseModel):
+    """Games (slugs or IDs) to check access for in one call."""
+
+    identifiers: List[str] = Field(min_length=1, max_length=100)
+
+
+class GameAccessResult(BaseModel):
+    """Access decision for one requested game."""
+
+    identifier: str
+    found: bool
+    can_access: bool
+    reason: str
+    game_id: Optional[str] = None
+    game_slug: Optional[str] = None
+
+
+class GameAccessBatchResponse(BaseModel):
+    """Access decisions for a batch of games, in request order."""
+
+    subscription_status: Literal["active", "none"]
+    plan_type: Optional[str] = None
+    results: List[GameAccessResult]
+
+
 class GlobalGameStat(BaseModel):
     """Aggregated global game statistics for one game."""
 
@@ -166,6 +166,24 @@ class User(UserBase):
     updated_at: datetime
 
 
+class AuthPrincipal(BaseModel):
+    """Slim authenticated principal resolved from an access token.
+
+    Holds only the identity and authorization fields request handlers need,
+    so it can be cached without loading the full ``User`` row (or its
+    profile/subscription relationships) on every request.
+    """
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: str
+    email: str
+    role: UserRole = UserRole.PARENT
+    is_active: bool = True
+    is_superuser: bool = False
+    email_verified: bool = False
+
+
 class UserInDB(UserBase):
     """User in database schema."""
 
@@ -1,149 +1,370 @@
-"""Account lockout service for tracking failed login attempts and implementing account lockout."""
-
+"""Account lockout service for tracking failed login attempts and implementing account lockout.
+
+Failed logins are counted per email, and failures for emails with no account
+are also counted per client IP.  Either key reaching its limit within
+``LOCKOUT_WINDOW_SECONDS`` locks that key for ``LOCKOUT_DURATION_SECONDS``: a
+locked email can't sign in from anywhere, and a locked IP can't sign in to any
+account.  Credential stuffing spreads guesses over many emails, mostly ones
+that were never registered here, so the per-email limit alone never trips it;
+users sharing an address behind NAT mistype passwords, not emails, so their
+failures don't add up to an IP lock.
+
+Each key holds a sliding-window counter (the current and previous window's
+counts, the previous one weighted by how much of it still overlaps), so a
+check or a recorded failure is O(1) regardless of how many attempts were made.
+State lives in a ``LockoutBackend``:
+
+* ``RedisLockoutBackend`` (when ``REDIS_URL`` is set) keeps one hash per key
+  with ``PEXPIRE``, updated by a Lua script so concurrent workers see one
+  atomic count;
+* ``MemoryLockoutBackend`` keeps a per-worker LRU capped at
+  ``LOCKOUT_MEMORY_MAX_KEYS`` and sweeps expired keys every
+  ``LOCKOUT_MEMORY_SWEEP_SECONDS``.
+
+Keys are SHA-256 digests of the normalized email / IP, so attacker-chosen
+emails can't inflate memory.  If Redis is unreachable the service falls back
+to the in-memory backend rather than failing logins.
+"""
+
+import abc
+import hashlib
+import logging
 import time
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Optional, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMAIL_SCOPE = "email"
+IP_SCOPE = "ip"
+
+# KEYS: one hash per scope; ARGV: now_ms, window_ms, lockout_ms, then one
+# limit per key.  Returns the longest lock in ms across KEYS (0 if none).
+_RECORD_FAILURE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local lockout = tonumber(ARGV[3])
+local longest = 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[3 + i])
+    local state = redis.call("hmget", key, "start", "prev", "curr", "locked_until")
+    local start = tonumber(state[1]) or now
+    local prev = tonumber(state[2]) or 0
+    local curr = tonumber(state[3]) or 0
+    local locked_until = tonumber(state[4]) or 0
+    local elapsed = now - start
+    if elapsed >= 2 * window then
+        start, prev, curr, elapsed = now, 0, 0, 0
+    elseif elapsed >= window then
+        start, prev, curr, elapsed = start + window, curr, 0, elapsed - window
+    end
+    curr = curr + 1
+    if locked_until <= now and prev * (window - elapsed) / window + curr >= limit then
+        locked_until = now + lockout
+    end
+    redis.call("hset", key, "start", start, "prev", prev, "curr", curr,
+        "locked_until", locked_until)
+    redis.call("pexpire", key, math.max(start + 2 * window, locked_until) - now)
+    if locked_until - now > longest then
+        longest = locked_until - now
+    end
+end
+return longest
+"""
+
+# KEYS: one hash per scope; ARGV: now_ms.  Returns the longest lock in ms.
+_CHECK_SCRIPT = """
+local now = tonumber(ARGV[1])
+local longest = 0
+for _, key in ipairs(KEYS) do
+    local locked_until = tonumber(redis.call("hget", key, "locked_until")) or 0
+    if locked_until - now > longest then
+        longest = locked_until - now
+    end
+end
+return longest
+"""
+
+
+def lockout_key(scope: str, value: str) -> str:
+    """Bounded-size key for an email or IP."""
+    digest = hashlib.sha256(value.strip().lower().encode()).hexdigest()
+    return f"lockout:{scope}:{digest}"
+
+
+class LockoutBackend(abc.ABC):
+    """Storage for sliding-window failure counters and lock deadlines."""
+
+    @abc.abstractmethod
+    async def locked_for(self, keys: Sequence[str]) -> float:
+        """Seconds until the longest lock among ``keys`` ends (0 if none)."""
+
+    @abc.abstractmethod
+    async def record_failure(
+        self, limits: dict[str, int], window: float, lockout: float
+    ) -> float:
+        """Count a failure against each key and lock keys that reach their limit.
+
+        Returns the seconds until the longest lock among the keys ends.
+        """
 
-class AccountLockoutService:
-    """Service for tracking failed login attempts and implementing account lockout."""
+    @abc.abstractmethod
+    async def clear(self, keys: Sequence[str]) -> bool:
+        """Forget counters and locks; returns whether any key was locked."""
 
-    # In-memory storage for failed attempts (would use Redis in production)
-    _failed_attempts: Dict[str, list] = {}
-    _account_lockouts: Dict[str, datetime] = {}
 
-    # Configuration
-    MAX_FAILED_ATTEMPTS = 5
-    LOCKOUT_DURATION_MINUTES = 15
-    ATTEMPT_WINDOW_SECONDS = 900  # 15 minutes window
+class MemoryLockoutBackend(LockoutBackend):
+    """Per-worker LRU of counters, capped at ``max_keys``."""
 
-    @classmethod
-    async def record_failed_attempt(cls, email: str) -> bool:
-        """Record a failed login attempt and check if account should be locked.
+    def __init__(self, max_keys: Optional[int] = None, sweep_interval: Optional[float] = None):
+        self.max_keys = max_keys or settings.LOCKOUT_MEMORY_MAX_KEYS
+        self.sweep_interval = (
+            settings.LOCKOUT_MEMORY_SWEEP_SECONDS if sweep_interval is None else sweep_interval
+        )
+        # key -> [window_start, prev_count, curr_count, locked_until, expires_at]
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+        self._next_sweep = 0.0
+        self.evictions = 0
 
-        Args:
-            email: The email for which login failed
+    def __len__(self) -> int:
+        return len(self._entries)
 
-        Returns:
-            True if account should be locked, False otherwise
-        """
+    def _maybe_sweep(self, now: float) -> None:
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval
+        expired = [key for key, entry in self._entries.items() if entry[4] <= now]
+        for key in expired:
+            del self._entries[key]
+
+    async def locked_for(self, keys: Sequence[str]) -> float:
+        now = time.time()
+        self._maybe_sweep(now)
+        longest = 0.0
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None:
+                longest = max(longest, entry[3] - now)
+        return longest
+
+    async def record_failure(
+        self, limits: dict[str, int], window: float, lockout: float
+    ) -> float:
         now = time.time()
+        self._maybe_sweep(now)
+        longest = 0.0
+        for key, limit in limits.items():
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[4] <= now:
+                entry = [now, 0.0, 0.0, 0.0, 0.0]
+            start, prev, curr, locked_until, _ = entry
+            elapsed = now - start
+            if elapsed >= 2 * window:
+                start, prev, curr, elapsed = now, 0.0, 0.0, 0.0
+            elif elapsed >= window:
+                start, prev, curr, elapsed = start + window, curr, 0.0, elapsed - window
+            curr += 1
+            if locked_until <= now and prev * (window - elapsed) / window + curr >= limit:
+                locked_until = now + lockout
+            self._entries[key] = [
+                start, prev, curr, locked_until, max(start + 2 * window, locked_until)
+            ]
+            longest = max(longest, locked_until - now)
+
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return longest
+
+    async def clear(self, keys: Sequence[str]) -> bool:
+        now = time.time()
+        was_locked = False
+        for key in keys:
+            entry = self._entries.pop(key, None)
+            if entry is not None and entry[3] > now:
+                was_locked = True
+        return was_locked
+
 
-        # Initialize attempts list if not exists
-        if email not in cls._failed_attempts:
-            cls._failed_attempts[email] = []
+class RedisLockoutBackend(LockoutBackend):
+    """Counters shared by every worker, updated atomically by Lua scripts."""
 
-        # Add current attempt
-        cls._failed_attempts[email].append(now)
+    def __init__(self) -> None:
+        self._record_script = None
+        self._check_script = None
 
-        # Remove attempts older than the window
-        cls._failed_attempts[email] = [
-            attempt for attempt in cls._failed_attempts[email]
-            if now - attempt <= cls.ATTEMPT_WINDOW_SECONDS
-        ]
+    async def _scripts(self):
+        if self._record_script is None:
+            from app.services.cache_service import cache_service
 
-        # Check if we've exceeded the limit
-        should_lock = len(cls._failed_attempts[email]) >= cls.MAX_FAILED_ATTEMPTS
+            client = await cache_service.get_client()
+            self._record_script = client.register_script(_RECORD_FAILURE_SCRIPT)
+            self._check_script = client.register_script(_CHECK_SCRIPT)
+        return self._record_script, self._check_script
 
-        if should_lock:
-            # Lock the account
-            cls._account_lockouts[email] = datetime.now() + timedelta(minutes=cls.LOCKOUT_DURATION_MINUTES)
+    async def locked_for(self, keys: Sequence[str]) -> float:
+        _, check = await self._scripts()
+        longest_ms = await check(keys=list(keys), args=[int(time.time() * 1000)])
+        return int(longest_ms) / 1000
 
-        return should_lock
+    async def record_failure(
+        self, limits: dict[str, int], window: float, lockout: float
+    ) -> float:
+        record, _ = await self._scripts()
+        args = [int(time.time() * 1000), int(window * 1000), int(lockout * 1000)]
+        longest_ms = await record(keys=list(limits), args=args + list(limits.values()))
+        return int(longest_ms) / 1000
+
+    async def clear(self, keys: Sequence[str]) -> bool:
+        from app.services.cache_service import cache_service
+
+        was_locked = await self.locked_for(keys) > 0
+        client = await cache_service.get_client()
+        await client.delete(*keys)
+        return was_locked
+
+
+class AccountLockoutService:
+    """Service for tracking failed login attempts and implementing account lockout."""
+
+    _backend: Optional[LockoutBackend] = None
+    _fallback: Optional[MemoryLockoutBackend] = None
+
+    @classmethod
+    def get_backend(cls) -> LockoutBackend:
+        """Shared backend: Redis when configured, otherwise in-memory."""
+        if cls._backend is None:
+            if settings.REDIS_URL:
+                cls._backend = RedisLockoutBackend()
+            else:
+                cls._backend = MemoryLockoutBackend()
+        return cls._backend
 
     @classmethod
-    async def is_account_locked(cls, email: str) -> bool:
-        """Check if an account is currently locked.
+    def set_backend(cls, backend: Optional[LockoutBackend]) -> None:
+        """Swap the backend (tests); ``None`` re-selects from settings."""
+        cls._backend = backend
 
-        Uses constant-time operations to prevent timing attacks.
+    @classmethod
+    def _local(cls) -> MemoryLockoutBackend:
+        backend = cls.get_backend()
+        if isinstance(backend, MemoryLockoutBackend):
+            return backend
+        if cls._fallback is None:
+            cls._fallback = MemoryLockoutBackend()
+        return cls._fallback
+
+    @staticmethod
+    def _keys(email: str, ip: Optional[str]) -> list[str]:
+        keys = [lockout_key(EMAIL_SCOPE, email)]
+        if ip:
+            keys.append(lockout_key(IP_SCOPE, ip))
+        return keys
+
+    @classmethod
+    async def _locked_for(cls, keys: list[str]) -> float:
+        try:
+            return await cls.get_backend().locked_for(keys)
+        except Exception as e:
+            logger.warning("Lockout backend unavailable, using local state: %s", e)
+            return await cls._local().locked_for(keys)
+
+    @classmethod
+    async def record_failed_attempt(
+        cls, email: str, ip: Optional[str] = None, known_account: bool = False
+    ) -> bool:
+        """Record a failed login attempt and check if account should be locked.
 
         Args:
-            email: The email to check
+            email: The email for which login failed
+            ip: Client IP the attempt came from, counted in its own window
+            known_account: Whether ``email`` belongs to an account; only
+                failures for unknown emails count against ``ip``
 
         Returns:
-            True if account is locked, False otherwise
+            True if the email or IP is now locked, False otherwise
         """
-        # Always access dict to prevent timing attack
-        # Use get() which has more consistent timing than 'in' operator
-        lockout_time = cls._account_lockouts.get(email)
-
-        if lockout_time is None:
-            return False
+        keys = cls._keys(email, ip)
+        limits = {keys[0]: settings.LOCKOUT_MAX_FAILED_ATTEMPTS}
+        if ip and not known_account:
+            limits[keys[1]] = settings.LOCKOUT_IP_MAX_FAILED_ATTEMPTS
+        window = settings.LOCKOUT_WINDOW_SECONDS
+        lockout = settings.LOCKOUT_DURATION_SECONDS
+        try:
+            locked_for = await cls.get_backend().record_failure(limits, window, lockout)
+        except Exception as e:
+            logger.warning("Lockout backend unavailable, using local state: %s", e)
+            locked_for = await cls._local().record_failure(limits, window, lockout)
+        return locked_for > 0
 
-        # Check if lockout has expired
-        if datetime.now() < lockout_time:
-            return True
+    @classmethod
+    async def is_account_locked(cls, email: str, ip: Optional[str] = None) -> bool:
+        """Check if an account (or the client IP) is currently locked.
 
-        # Lockout expired - remove it (best effort, ignore errors)
-        try:
-            cls._account_lockouts.pop(email, None)
-        except Exception:
-            pass
+        Args:
+            email: The email to check
+            ip: Client IP to check alongside the email
 
-        return False
+        Returns:
+            True if account is locked, False otherwise
+        """
+        return await cls._locked_for(cls._keys(email, ip)) > 0
 
     @classmethod
-    async def get_remaining_lockout_time(cls, email: str) -> Optional[int]:
+    async def get_remaining_lockout_time(
+        cls, email: str, ip: Optional[str] = None
+    ) -> Optional[int]:
         """Get remaining lockout time in seconds.
 
-        Uses constant-time operations to prevent timing attacks.
-
         Args:
             email: The email to check
+            ip: Client IP to check alongside the email
 
         Returns:
             Remaining lockout time in seconds, or None if not locked
         """
-        # Always access dict to prevent timing attack
-        lockout_time = cls._account_lockouts.get(email)
-
-        if lockout_time is None:
+        remaining = await cls._locked_for(cls._keys(email, ip))
+        if remaining <= 0:
             return None
-
-        remaining = lockout_time - datetime.now()
-        if remaining.total_seconds() > 0:
-            return int(remaining.total_seconds())
-
-        # Lockout expired - remove it (best effort)
-        try:
-            cls._account_lockouts.pop(email, None)
-        except Exception:
-            pass
-
-        return None
+        return max(1, int(remaining))
 
     @classmethod
     async def clear_failed_attempts(cls, email: str) -> None:
         """Clear failed attempts for an email after successful login.
 
+        The IP window is left alone, so one valid account can't be used to
+        reset an attacker's per-IP count.
+
         Args:
             email: The email for which to clear attempts
         """
-        if email in cls._failed_attempts:
-            del cls._failed_attempts[email]
+        await cls._clear([lockout_key(EMAIL_SCOPE, email)])
 
-        if email in cls._account_lockouts:
-            del cls._account_lockouts[email]
+    @classmethod
+    async def _clear(cls, keys: list[str]) -> bool:
+        was_locked = await cls._local().clear(keys)
+        try:
+            return await cls.get_backend().clear(keys) or was_locked
+        except Exception as e:
+            logger.warning("Lockout backend unavailable, cleared local state only: %s", e)
+            return was_locked
 
     @classmethod
-    async def reset_account_lockout(cls, db: AsyncSession, email: str) -> bool:
+    async def reset_account_lockout(
+        cls, db: AsyncSession, email: str, ip: Optional[str] = None
+    ) -> bool:
         """Manually reset account lockout status.
 
         Args:
             db: Database session
             email: Email of account to unlock
+            ip: Client IP to unlock as well
 
         Returns:
             True if account was locked and unlocked, False otherwise
         """
-        was_locked = email in cls._account_lockouts
-
-        if email in cls._account_lockouts:
-            del cls._account_lockouts[email]
-
-        if email in cls._failed_attempts:
-            del cls._failed_attempts[email]
-
-        return was_locked
+        return await cls._clear(cls._keys(email, ip))
@@ -0,0 +1,179 @@
+"""Serialization codecs for ``CacheService``.
+
+Cached values are stored as bytes framed as::
+
+    FRAME_MAGIC | codec id (1 byte) | compression id (1 byte) | body
+
+so a reader can always decode what another worker wrote, whatever the
+local ``CACHE_CODEC``/``CACHE_COMPRESSION`` settings are.  Values without
+the magic byte are read as plain JSON (entries written before framing).
+
+``orjson`` (the default) is a required dependency; ``msgpack`` and ``lz4``
+come with the ``cache`` extra, and when one of those is configured but not
+installed the stdlib ``json``/``zlib`` equivalents are used instead.
+Pydantic models, datetimes, UUIDs, enums and sets are encoded to their JSON
+forms, so models can be cached without dumping them first.
+"""
+
+import abc
+import datetime
+import enum
+import json
+import logging
+import uuid
+import zlib
+from typing import Any, Callable, Optional
+
+import orjson
+from pydantic import BaseModel
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on installed extras
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - depends on installed extras
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+FRAME_MAGIC = b"\x01"
+
+
+class CacheDecodeError(ValueError):
+    """Raised when a cached payload can't be decoded (corrupt or unknown codec)."""
+
+
+def encode_default(obj: Any) -> Any:
+    """Fallback encoder for types the codecs don't handle natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not cache serializable")
+
+
+class Codec(abc.ABC):
+    """Turns JSON-compatible values into bytes and back."""
+
+    name = ""
+    id = b""
+
+    @abc.abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """Encode ``value``; raises TypeError for unsupported values."""
+
+    @abc.abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """Decode bytes produced by ``dumps``."""
+
+
+class JsonCodec(Codec):
+    name = "json"
+    id = b"j"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=encode_default, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    name = "orjson"
+    id = b"o"
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=encode_default, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    name = "msgpack"
+    id = b"m"
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=encode_default, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+CODECS: dict[str, Codec] = {"json": JsonCodec(), "orjson": OrjsonCodec()}
+if msgpack is not None:
+    CODECS["msgpack"] = MsgpackCodec()
+
+# compression name -> (id, compress, decompress)
+COMPRESSORS: dict[str, tuple[bytes, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "none": (b"0", lambda data: data, lambda data: data),
+    "zlib": (b"z", lambda data: zlib.compress(data, 1), zlib.decompress),
+}
+if lz4_frame is not None:
+    COMPRESSORS["lz4"] = (b"4", lz4_frame.compress, lz4_frame.decompress)
+
+_CODECS_BY_ID = {codec.id: codec for codec in CODECS.values()}
+_DECOMPRESSORS_BY_ID = {cid: decompress for cid, _, decompress in COMPRESSORS.values()}
+
+
+class CacheSerializer:
+    """Encode values with one codec, compressing bodies of ``min_compress_bytes`` or more."""
+
+    def __init__(
+        self, codec: str = "orjson", compression: str = "zlib", min_compress_bytes: int = 1024
+    ):
+        if codec not in CODECS:
+            logger.warning("Cache codec %r is not available; using json", codec)
+            codec = "json"
+        if compression not in COMPRESSORS:
+            logger.warning("Cache compression %r is not available; using zlib", compression)
+            compression = "zlib"
+        self.codec = CODECS[codec]
+        self.compression = compression
+        self.compression_id, self._compress, _ = COMPRESSORS[compression]
+        self.min_compress_bytes = min_compress_bytes
+
+    @classmethod
+    def from_settings(cls) -> "CacheSerializer":
+        from app.core.config import settings
+
+        return cls(
+            codec=settings.CACHE_CODEC,
+            compression=settings.CACHE_COMPRESSION,
+            min_compress_bytes=settings.CACHE_COMPRESSION_MIN_BYTES,
+        )
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize ``value``; raises TypeError for unsupported values."""
+        body = self.codec.dumps(value)
+        compression_id = b"0"
+        if self.compression != "none" and len(body) >= self.min_compress_bytes:
+            body = self._compress(body)
+            compression_id = self.compression_id
+        return b"".join((FRAME_MAGIC, self.codec.id, compression_id, body))
+
+    def decode(self, payload: Optional[bytes | str]) -> Any:
+        """Deserialize a payload written by any codec; raises CacheDecodeError."""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        if not payload:
+            raise CacheDecodeError("Empty cache payload")
+        try:
+            if payload[:1] != FRAME_MAGIC:
+                return json.loads(payload)
+            codec = _CODECS_BY_ID[payload[1:2]]
+            decompress = _DECOMPRESSORS_BY_ID[payload[2:3]]
+            return codec.loads(decompress(payload[3:]))
+        except KeyError as e:
+            raise CacheDecodeError(f"Unsupported cache codec or compression {e}") from e
+        except Exception as e:
+            raise CacheDecodeError(str(e)) from e
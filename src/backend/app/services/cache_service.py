@@ -1,45 +1,215 @@
-"""Redis cache service for API response caching."""
+"""Two-tier cache service for API response caching.
 
-import json
+Values are serialized to bytes once by ``CacheSerializer`` (see
+``cache_codecs``) and kept in a per-worker LRU (L1) for at most
+``CACHE_L1_TTL_SECONDS`` in front of Redis (L2).  L1 is bounded by
+``CACHE_L1_MAX_BYTES``; hits, misses and evictions are counted for
+``CacheService.stats``.  Deletes only clear the local worker's L1, so callers
+that need cross-worker read-after-write (session state) pass ``local_ttl=0``.
+
+Groups of keys are invalidated in O(1) rather than by scanning the keyspace:
+
+* namespaces: keys built with ``namespace_key(name, ...)`` embed the
+  namespace's version (``ns:{name}:v{n}:...``), and ``bump_namespace`` is a
+  single ``INCR`` that orphans every older key until it expires;
+* tags: ``set(..., tags=...)`` records the key in a Redis set per tag, and
+  ``invalidate_tag`` deletes exactly those keys.
+"""
+
+import asyncio
+import fnmatch
+import functools
+import inspect
 import logging
 import os
-from typing import Any, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable, Optional, TypeVar
+from uuid import uuid4
 
 import redis.asyncio as redis
 
+from app.core.config import settings
+from app.services.cache_codecs import CacheDecodeError, CacheSerializer
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+NAMESPACE_PREFIX = "ns"
+TAG_PREFIX = "tag"
+
+# Compare-and-delete so a worker only releases a lock it still owns
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class LocalCache:
+    """Byte-bounded LRU of serialized values with per-key expiry.
+
+    Sizes are approximated by key plus payload length.  Expired entries are
+    dropped when read and otherwise age out through LRU eviction.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        default_ttl: float = 300.0,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.timer = timer
+        # key -> (payload, expires_at, tags)
+        self._entries: OrderedDict[str, tuple[bytes, float, frozenset[str]]] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(key: str, payload: bytes) -> int:
+        return len(key) + len(payload)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the payload for ``key`` if present and unexpired."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] <= self.timer():
+            self.pop(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(
+        self,
+        key: str,
+        payload: bytes,
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = (),
+    ) -> None:
+        """Store ``payload`` for ``ttl`` seconds; a ttl of 0 just drops the key."""
+        ttl = self.default_ttl if ttl is None else ttl
+        self.pop(key)
+        size = self._size(key, payload)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        self._entries[key] = (payload, self.timer() + ttl, frozenset(tags))
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            old_key, (old_payload, _, _) = self._entries.popitem(last=False)
+            self.bytes -= self._size(old_key, old_payload)
+            self.evictions += 1
+
+    def pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= self._size(key, entry[0])
+
+    def discard_matching(self, pattern: str) -> int:
+        """Drop every key matching a Redis-style glob ``pattern``."""
+        matched = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+        for key in matched:
+            self.pop(key)
+        return len(matched)
+
+    def discard_tagged(self, tag: str) -> int:
+        """Drop every key stored with ``tag``."""
+        matched = [key for key, entry in self._entries.items() if tag in entry[2]]
+        for key in matched:
+            self.pop(key)
+        return len(matched)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key)  # type: ignore[arg-type]
+        return entry is not None and entry[1] > self.timer()
+
+    def __setitem__(self, key: str, payload: bytes) -> None:
+        self.set(key, payload)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class CacheService:
-    """Redis-based caching service with optional in-memory fallback.
+    """Redis-based caching service with a local LRU tier and in-memory fallback.
 
     In development and CI we often don't have a Redis instance running, so
-    the service automatically falls back to a simple dictionary.  Any errors
-    communicating with Redis (connection issues, closed event loops, etc.)
-    will be logged and handled gracefully.
+    the service automatically falls back to a bounded local store whose
+    entries keep the TTL they were set with.  Any errors communicating with
+    Redis (connection issues, closed event loops, etc.) will be logged and
+    handled gracefully.
+
+    Every method takes ``remote=False`` to use the local tier only (no
+    Redis configured) and ``local_ttl`` to override how long L1 keeps a key.
     """
 
-    def __init__(self):
+    def __init__(self, serializer: Optional[CacheSerializer] = None):
         self._client: Optional[redis.Redis] = None
-        # simple in-memory cache for fallback when Redis is unavailable
-        self._fallback: dict[str, str] = {}
+        self.serializer = serializer or CacheSerializer.from_settings()
+        self.l1 = LocalCache(max_bytes=settings.CACHE_L1_MAX_BYTES)
+        # in-memory cache for fallback when Redis is unavailable
+        self._fallback = LocalCache(max_bytes=settings.CACHE_FALLBACK_MAX_BYTES)
+        # namespace -> (version, monotonic time it was read or bumped)
+        self._namespaces: dict[str, tuple[int, float]] = {}
 
     async def get_client(self) -> redis.Redis:
         """Get or create Redis client."""
         if self._client is None:
             redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-            self._client = redis.from_url(redis_url, decode_responses=True)
+            self._client = redis.from_url(redis_url)
         return self._client
 
-    async def get(self, key: str) -> Optional[Any]:
+    @staticmethod
+    def _l1_ttl(local_ttl: Optional[float], ttl: Optional[float] = None) -> float:
+        l1_ttl = settings.CACHE_L1_TTL_SECONDS if local_ttl is None else local_ttl
+        return l1_ttl if ttl is None else min(l1_ttl, ttl)
+
+    def _decode(self, key: str, payload: bytes) -> Optional[Any]:
+        try:
+            return self.serializer.decode(payload)
+        except CacheDecodeError as e:
+            logger.warning("Cache decoding error for key %s: %s", key, e)
+            return None
+
+    async def get(
+        self, key: str, local_ttl: Optional[float] = None, remote: bool = True
+    ) -> Optional[Any]:
         """Get value from cache."""
+        payload = self.l1.get(key)
+        if payload is not None:
+            return self._decode(key, payload)
+        if not remote:
+            return None
         try:
             client = await self.get_client()
             value = await client.get(key)
             if value:
-                return json.loads(value)
+                decoded = self.serializer.decode(value)
+                self.l1.set(key, value, self._l1_ttl(local_ttl))
+                return decoded
             return None
-        except json.JSONDecodeError as e:
+        except CacheDecodeError as e:
             logger.warning("Cache decoding error for key %s: %s", key, e)
             return None
         except redis.RedisError as e:
@@ -47,35 +217,142 @@ class CacheService:
         except Exception as e:  # catch any unexpected errors (e.g. event loop issues)
             logger.warning("Unexpected cache error getting key %s: %s", key, e)
         # fall back to in-memory store if available
-        if key in self._fallback:
-            try:
-                return json.loads(self._fallback[key])
-            except json.JSONDecodeError:
-                return None
-        return None
+        payload = self._fallback.get(key)
+        return self._decode(key, payload) if payload is not None else None
+
+    async def get_many(
+        self, keys: Iterable[str], local_ttl: Optional[float] = None, remote: bool = True
+    ) -> dict[str, Any]:
+        """Get several values with one ``MGET``; missing keys are left out."""
+        found: dict[str, Any] = {}
+        missing: list[str] = []
+        for key in dict.fromkeys(keys):
+            payload = self.l1.get(key)
+            if payload is None:
+                missing.append(key)
+            elif (value := self._decode(key, payload)) is not None:
+                found[key] = value
+        if not missing or not remote:
+            return found
 
-    async def set(self, key: str, value: Any, ttl: int = 300) -> bool:
-        """Set value in cache with TTL (default 5 minutes)."""
         try:
             client = await self.get_client()
-            await client.setex(key, ttl, json.dumps(value))
-            return True
+            payloads = await client.mget(missing)
+        except Exception as e:
+            logger.warning("Redis error getting %d keys: %s", len(missing), e)
+            payloads = [self._fallback.get(key) for key in missing]
+            return found | {
+                key: value
+                for key, payload in zip(missing, payloads)
+                if payload is not None and (value := self._decode(key, payload)) is not None
+            }
+
+        l1_ttl = self._l1_ttl(local_ttl)
+        for key, payload in zip(missing, payloads):
+            if payload and (value := self._decode(key, payload)) is not None:
+                found[key] = value
+                self.l1.set(key, payload, l1_ttl)
+        return found
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = 300,
+        local_ttl: Optional[float] = None,
+        remote: bool = True,
+        tags: Iterable[str] = (),
+    ) -> bool:
+        """Set value in cache with TTL (default 5 minutes).
+
+        ``tags`` register the key for ``invalidate_tag``.
+        """
+        try:
+            payload = self.serializer.encode(value)
         except TypeError as e:
             logger.warning("Cache serialization error for key %s: %s", key, e)
             return False
+        tags = tuple(tags)
+        if not remote:
+            self.l1.set(key, payload, ttl if local_ttl is None else min(ttl, local_ttl), tags)
+            return True
+
+        self.l1.set(key, payload, self._l1_ttl(local_ttl, ttl), tags)
+        try:
+            client = await self.get_client()
+            if not tags:
+                await client.setex(key, ttl, payload)
+                return True
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, payload)
+                self._queue_tags(pipe, key, tags, ttl)
+                await pipe.execute()
+            return True
         except redis.RedisError as e:
             logger.warning("Redis error setting key %s: %s", key, e)
         except Exception as e:
             logger.warning("Unexpected cache error setting key %s: %s", key, e)
         # if we reached here it means redis failed; store in fallback
+        self._fallback.set(key, payload, ttl, tags)
+        return True
+
+    async def set_many(
+        self,
+        values: dict[str, Any],
+        ttl: int = 300,
+        local_ttl: Optional[float] = None,
+        remote: bool = True,
+        tags: Iterable[str] = (),
+    ) -> bool:
+        """Set several values with the same TTL (and tags) in one pipelined round-trip."""
         try:
-            self._fallback[key] = json.dumps(value)
-        except Exception:
-            pass
+            payloads = {key: self.serializer.encode(value) for key, value in values.items()}
+        except TypeError as e:
+            logger.warning("Cache serialization error for %d keys: %s", len(values), e)
+            return False
+        tags = tuple(tags)
+        if not remote:
+            l1_ttl = ttl if local_ttl is None else min(ttl, local_ttl)
+        else:
+            l1_ttl = self._l1_ttl(local_ttl, ttl)
+        for key, payload in payloads.items():
+            self.l1.set(key, payload, l1_ttl, tags)
+        if not remote or not payloads:
+            return True
+
+        try:
+            client = await self.get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                for key, payload in payloads.items():
+                    pipe.setex(key, ttl, payload)
+                    self._queue_tags(pipe, key, tags, ttl)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning("Redis error setting %d keys: %s", len(payloads), e)
+        for key, payload in payloads.items():
+            self._fallback.set(key, payload, ttl, tags)
         return True
 
-    async def delete(self, key: str) -> bool:
+    @staticmethod
+    def _queue_tags(pipe: Any, key: str, tags: tuple[str, ...], ttl: int) -> None:
+        """Queue SADDs recording ``key`` under each tag.
+
+        Tag sets expire with their longest-lived member: NX sets a TTL on a
+        new set and GT only ever extends it (Redis 7+).
+        """
+        for tag in tags:
+            tag_key = f"{TAG_PREFIX}:{tag}"
+            pipe.sadd(tag_key, key)
+            pipe.expire(tag_key, ttl, nx=True)
+            pipe.expire(tag_key, ttl, gt=True)
+
+    async def delete(self, key: str, remote: bool = True) -> bool:
         """Delete key from cache."""
+        self.l1.pop(key)
+        self._fallback.pop(key)
+        if not remote:
+            return True
         try:
             client = await self.get_client()
             await client.delete(key)
@@ -84,8 +361,16 @@ class CacheService:
             logger.warning("Redis error deleting key %s: %s", key, e)
             return False
 
-    async def invalidate_pattern(self, pattern: str) -> bool:
-        """Invalidate all keys matching pattern."""
+    async def invalidate_pattern(self, pattern: str, remote: bool = True) -> bool:
+        """Invalidate all keys matching pattern.
+
+        Walks the whole Redis keyspace with SCAN; prefer ``bump_namespace``
+        or ``invalidate_tag`` for anything on a request path.
+        """
+        self.l1.discard_matching(pattern)
+        self._fallback.discard_matching(pattern)
+        if not remote:
+            return True
         try:
             client = await self.get_client()
             keys = []
@@ -98,6 +383,109 @@ class CacheService:
             logger.warning("Redis error invalidating pattern %s: %s", pattern, e)
             return False
 
+    async def invalidate_tag(self, tag: str, remote: bool = True) -> bool:
+        """Delete every key stored with ``tag``.
+
+        The tag set is renamed away first, so keys tagged while the delete
+        runs land in a fresh set instead of being lost.
+        """
+        self.l1.discard_tagged(tag)
+        self._fallback.discard_tagged(tag)
+        if not remote:
+            return True
+        tag_key = f"{TAG_PREFIX}:{tag}"
+        doomed = f"{tag_key}:{uuid4().hex}"
+        try:
+            client = await self.get_client()
+            try:
+                await client.rename(tag_key, doomed)
+            except redis.ResponseError:
+                return True  # no keys carry this tag
+            keys = list(await client.smembers(doomed))
+            async with client.pipeline(transaction=False) as pipe:
+                for start in range(0, len(keys), 500):
+                    pipe.unlink(*keys[start : start + 500])
+                pipe.unlink(doomed)
+                await pipe.execute()
+            return True
+        except redis.RedisError as e:
+            logger.warning("Redis error invalidating tag %s: %s", tag, e)
+            return False
+
+    async def namespace_version(
+        self, name: str, max_age: Optional[float] = None, remote: bool = True
+    ) -> int:
+        """Current version of namespace ``name`` (0 until first bumped).
+
+        Versions read from Redis are reused for ``max_age`` seconds (default
+        ``CACHE_L1_TTL_SECONDS``).  Without Redis, or while it's unreachable,
+        the last known / locally bumped version is used.
+        """
+        known = self._namespaces.get(name)
+        if not remote:
+            return known[0] if known else 0
+        max_age = settings.CACHE_L1_TTL_SECONDS if max_age is None else max_age
+        now = time.monotonic()
+        if known is not None and now - known[1] < max_age:
+            return known[0]
+        try:
+            client = await self.get_client()
+            raw = await client.get(f"{NAMESPACE_PREFIX}:{name}:version")
+            version = int(raw) if raw else 0
+        except Exception as e:
+            logger.warning("Cache namespace version unavailable for %s: %s", name, e)
+            return known[0] if known else 0
+        self._namespaces[name] = (version, now)
+        return version
+
+    async def bump_namespace(self, name: str, remote: bool = True) -> int:
+        """Retire every key in namespace ``name`` with a single INCR."""
+        known = self._namespaces.get(name)
+        version = (known[0] if known else 0) + 1
+        if remote:
+            try:
+                client = await self.get_client()
+                version = int(await client.incr(f"{NAMESPACE_PREFIX}:{name}:version"))
+            except Exception as e:
+                logger.warning("Redis error bumping namespace %s: %s", name, e)
+        self._namespaces[name] = (version, time.monotonic())
+        return version
+
+    async def namespace_key(
+        self, name: str, *args: object, remote: bool = True, **kwargs: object
+    ) -> str:
+        """``cache_key`` under the current version of namespace ``name``."""
+        version = await self.namespace_version(name, remote=remote)
+        return cache_key(f"{NAMESPACE_PREFIX}:{name}:v{version}", *args, **kwargs)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Entry counts, sizes and hit/miss/eviction counters per local tier."""
+        return {"l1": self.l1.stats(), "fallback": self._fallback.stats()}
+
+    async def acquire_lock(self, key: str, ttl_ms: int) -> Optional[str]:
+        """Try to take a short-lived lock with ``SET NX PX``.
+
+        Returns an owner token on success and None if another holder has it.
+        If Redis is unreachable the lock is treated as granted so callers
+        degrade to computing locally.
+        """
+        token = uuid4().hex
+        try:
+            client = await self.get_client()
+            acquired = await client.set(key, token, nx=True, px=ttl_ms)
+            return token if acquired else None
+        except Exception as e:
+            logger.warning("Cache lock unavailable for key %s: %s", key, e)
+            return token
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """Release a lock taken with ``acquire_lock`` if still owned by ``token``."""
+        try:
+            client = await self.get_client()
+            await client.eval(_RELEASE_LOCK_SCRIPT, 1, key, token)
+        except Exception as e:
+            logger.warning("Failed to release cache lock %s: %s", key, e)
+
     async def close(self):
         """Close Redis connection."""
         if self._client:
@@ -115,3 +503,167 @@ def cache_key(prefix: str, *args: object, **kwargs: object) -> str:
     for k, v in sorted(kwargs.items()):
         parts.append(f"{k}={v}")
     return ":".join(parts)
+
+
+def _key_builder(
+    fn: Callable[..., Any], prefix: str, exclude: tuple[str, ...]
+) -> Callable[[tuple, dict], str]:
+    """Build ``cache_key(prefix, **arguments)`` from a call's bound arguments."""
+    signature = inspect.signature(fn)
+
+    def build_key(args: tuple, kwargs: dict) -> str:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        params = {k: v for k, v in bound.arguments.items() if k not in exclude}
+        return cache_key(prefix, **params)
+
+    return build_key
+
+
+def cached(
+    prefix: str,
+    ttl: int,
+    local_ttl: Optional[float] = None,
+    exclude: tuple[str, ...] = ("db",),
+    encode: Optional[Callable[[Any], Any]] = None,
+    decode: Optional[Callable[[Any], Any]] = None,
+    cache: Optional[CacheService] = None,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Cache an async function's results for ``ttl`` seconds.
+
+    Keys are ``cache_key(prefix, **arguments)`` over the call's arguments
+    minus ``exclude``; ``wrapper.key_for(*args, **kwargs)`` returns the key
+    for explicit invalidation.  Results (including None) go through L1 and,
+    when ``REDIS_URL`` is configured, Redis.  ``encode``/``decode`` convert
+    results to and from JSON-compatible values.
+    """
+    encode = encode or (lambda value: value)
+    decode = decode or (lambda value: value)
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        build_key = _key_builder(fn, prefix, exclude)
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            shared = cache or cache_service
+            remote = bool(settings.REDIS_URL)
+            key = build_key(args, kwargs)
+            envelope = await shared.get(key, local_ttl=local_ttl, remote=remote)
+            if envelope is not None:
+                return decode(envelope["value"])
+            result = await fn(*args, **kwargs)
+            await shared.set(
+                key, {"value": encode(result)}, ttl=ttl, local_ttl=local_ttl, remote=remote
+            )
+            return result
+
+        wrapper.key_for = lambda *args, **kwargs: build_key(args, kwargs)  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+def single_flight(
+    prefix: str,
+    ttl: int,
+    stale_ttl: int = 0,
+    exclude: tuple[str, ...] = ("db",),
+    encode: Optional[Callable[[Any], Any]] = None,
+    decode: Optional[Callable[[Any], Any]] = None,
+    lock_timeout_ms: int = 10_000,
+    cache: Optional[CacheService] = None,
+    session_arg: Optional[str] = "db",
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Collapse concurrent identical calls of an async function.
+
+    Within a worker, callers with the same arguments (minus ``exclude``) share
+    one in-flight computation.  When ``REDIS_URL`` is configured the result is
+    also stored in Redis for ``ttl`` seconds and kept ``stale_ttl`` seconds
+    longer; once it is stale, one worker takes a ``SET NX PX`` lock and
+    recomputes while the others keep serving the stale value.  Workers that
+    find neither a value nor the lock wait briefly for the holder's result.
+
+    ``encode``/``decode`` convert results to and from JSON-compatible values
+    for the Redis tier.
+
+    The shared computation outlives any one caller, so it doesn't use the
+    first caller's request-scoped session: the ``session_arg`` argument is
+    replaced with a session of its own.  Pass ``session_arg=None`` for
+    functions that take no session.
+    """
+    encode = encode or (lambda value: value)
+    decode = decode or (lambda value: value)
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        build_key = _key_builder(fn, prefix, exclude)
+        signature = inspect.signature(fn)
+        inflight: dict[str, asyncio.Future] = {}
+
+        async def call(args: tuple, kwargs: dict) -> T:
+            if session_arg is None or session_arg not in signature.parameters:
+                return await fn(*args, **kwargs)
+
+            from app.db import session as db_session
+
+            bound = signature.bind(*args, **kwargs)
+            async with db_session.async_session() as db:
+                bound.arguments[session_arg] = db
+                return await fn(*bound.args, **bound.kwargs)
+
+        async def load(key: str, args: tuple, kwargs: dict) -> T:
+            shared = cache or cache_service
+            if not settings.REDIS_URL:
+                return await call(args, kwargs)
+
+            envelope = await shared.get(key)
+            if envelope and envelope.get("fresh_until", 0) > time.time():
+                return decode(envelope["value"])
+
+            lock_key = f"{key}:lock"
+            token = await shared.acquire_lock(lock_key, lock_timeout_ms)
+            if token is None:
+                if envelope:
+                    # Another worker is revalidating; serve the stale value
+                    return decode(envelope["value"])
+                deadline = time.monotonic() + lock_timeout_ms / 1000
+                delay = 0.02
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 0.5)
+                    envelope = await shared.get(key)
+                    if envelope:
+                        return decode(envelope["value"])
+                return await call(args, kwargs)
+
+            try:
+                result = await call(args, kwargs)
+                await shared.set(
+                    key,
+                    {"value": encode(result), "fresh_until": time.time() + ttl},
+                    ttl=ttl + stale_ttl,
+                )
+                return result
+            finally:
+                await shared.release_lock(lock_key, token)
+
+        def forget(key: str, future: asyncio.Future) -> None:
+            if inflight.get(key) is future:
+                del inflight[key]
+            if not future.cancelled():
+                future.exception()  # mark retrieved if every caller went away
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            key = build_key(args, kwargs)
+            future = inflight.get(key)
+            if future is None:
+                future = asyncio.ensure_future(load(key, args, kwargs))
+                inflight[key] = future
+                future.add_done_callback(functools.partial(forget, key))
+            # Shield so one caller's cancellation doesn't cancel the others
+            return await asyncio.shield(future)
+
+        wrapper.inflight = inflight  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
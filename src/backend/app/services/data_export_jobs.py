@@ -0,0 +1,506 @@
+"""Background data export jobs.
+
+``POST /export/jobs`` records a ``data_export_jobs`` row (status ``queued``)
+and returns immediately.  Workers claim queued jobs with ``FOR UPDATE SKIP
+LOCKED`` (status ``running``) and build a zip archive under
+``LOCAL_STORAGE_PATH/exports`` with one member per section (``user.json``,
+``profiles``, ``progress``, ``subscriptions``) as JSON arrays, JSON Lines or
+CSV.  Sections are read through ``DataExportService``'s server-side cursors
+and written to the archive chunk by chunk, so memory stays flat however long
+the history is.
+
+Each attempt writes to its own temporary file that is renamed into place
+when complete.  While it runs, the worker renews its lease (``locked_at``)
+every third of ``DATA_EXPORT_JOB_LEASE_SECONDS``; the claim's ``attempts``
+value identifies the lease, so a worker whose job was re-claimed stops and
+discards its file instead of finishing it.  Live progress is kept in the
+cache (the export cursors hold a read transaction open, so it isn't written
+to the job row until the end).
+
+Identical requests from the same user within
+``DATA_EXPORT_JOB_DEDUPE_SECONDS`` return the existing job.  Finished
+artifacts expire after ``DATA_EXPORT_ARTIFACT_TTL_HOURS`` and are removed by
+the lifecycle sweep.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import zipfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+from uuid import uuid4
+
+from pydantic import BaseModel
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.models.data_export_job import DataExportJob
+from app.services.cache_service import cache_service
+from app.services.data_export_service import (
+    CSV_PROFILE_HEADER,
+    CSV_PROGRESS_HEADER,
+    CSV_SUBSCRIPTION_HEADER,
+    CsvLineWriter,
+    DataExportService,
+    csv_profile_row,
+    csv_progress_row,
+    csv_subscription_row,
+    csv_user_rows,
+)
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+EXPORT_FORMATS = ("json", "jsonl", "csv")
+
+# Archive members are written in chunks of about this many bytes
+ARCHIVE_FLUSH_BYTES = 64 * 1024
+
+PROGRESS_KEY_PREFIX = "export_jobs:progress"
+
+
+class LeaseLost(Exception):
+    """Raised when a running job was re-claimed by another worker."""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def export_dir() -> Path:
+    """Directory holding finished export artifacts."""
+    return Path(settings.LOCAL_STORAGE_PATH) / "exports"
+
+
+class DataExportJobQueue:
+    """Enqueue, claim and build ``data_export_jobs`` rows."""
+
+    @staticmethod
+    def artifact_path(job: DataExportJob) -> Optional[Path]:
+        """Path of a job's finished artifact, or None if there is none."""
+        if job.status != COMPLETED or not job.artifact_name:
+            return None
+        expires_at = _aware(job.expires_at)
+        if expires_at is not None and expires_at <= _utcnow():
+            return None
+        path = export_dir() / job.artifact_name
+        return path if path.is_file() else None
+
+    @staticmethod
+    async def enqueue(
+        db: AsyncSession,
+        user_id: str,
+        format: str = "json",
+        include_progress: bool = True,
+        include_subscriptions: bool = True,
+    ) -> tuple[DataExportJob, bool]:
+        """Queue an export, or return a recent job with the same options.
+
+        Returns the job and whether it was newly queued.
+        """
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Format must be one of {', '.join(EXPORT_FORMATS)}")
+        now = _utcnow()
+        window_start = now - timedelta(seconds=settings.DATA_EXPORT_JOB_DEDUPE_SECONDS)
+        result = await db.execute(
+            select(DataExportJob)
+            .where(DataExportJob.user_id == user_id)
+            .where(DataExportJob.created_at >= window_start)
+            .where(DataExportJob.status.in_([QUEUED, RUNNING, COMPLETED]))
+            .where(DataExportJob.format == format)
+            .where(DataExportJob.include_progress == include_progress)
+            .where(DataExportJob.include_subscriptions == include_subscriptions)
+            .order_by(DataExportJob.created_at.desc())
+        )
+        for existing in result.scalars():
+            # A completed job only counts while its artifact is still there
+            if existing.status != COMPLETED or DataExportJobQueue.artifact_path(existing):
+                return existing, False
+
+        job = DataExportJob(
+            id=str(uuid4()),
+            user_id=user_id,
+            format=format,
+            include_progress=include_progress,
+            include_subscriptions=include_subscriptions,
+            status=QUEUED,
+            attempts=0,
+            rows_total=0,
+            rows_written=0,
+            created_at=now,
+        )
+        db.add(job)
+        await db.commit()
+        return job, True
+
+    @staticmethod
+    async def get_for_user(
+        db: AsyncSession, job_id: str, user_id: str
+    ) -> Optional[DataExportJob]:
+        """Load a job owned by ``user_id``."""
+        result = await db.execute(
+            select(DataExportJob)
+            .where(DataExportJob.id == job_id)
+            .where(DataExportJob.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def live_rows_written(job: DataExportJob) -> int:
+        """Rows written so far, including progress not yet saved on the row."""
+        if job.status != RUNNING:
+            return job.rows_written
+        cached = await cache_service.get(
+            f"{PROGRESS_KEY_PREFIX}:{job.id}", local_ttl=0, remote=bool(settings.REDIS_URL)
+        )
+        return max(job.rows_written, int(cached or 0))
+
+    @staticmethod
+    async def claim(db: AsyncSession, limit: int) -> list[str]:
+        """Mark up to ``limit`` queued jobs as running and return their ids.
+
+        Jobs running longer than ``DATA_EXPORT_JOB_LEASE_SECONDS`` (a crashed
+        worker) are claimed again.
+        """
+        now = _utcnow()
+        stale = now - timedelta(seconds=settings.DATA_EXPORT_JOB_LEASE_SECONDS)
+        result = await db.execute(
+            select(DataExportJob)
+            .where(
+                or_(
+                    DataExportJob.status == QUEUED,
+                    and_(DataExportJob.status == RUNNING, DataExportJob.locked_at < stale),
+                )
+            )
+            .order_by(DataExportJob.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        jobs = list(result.scalars().all())
+        for job in jobs:
+            job.status = RUNNING
+            job.locked_at = now
+            job.started_at = now
+            job.attempts += 1
+        await db.commit()
+        return [job.id for job in jobs]
+
+    @staticmethod
+    async def renew_lease(job_id: str, attempt: int) -> bool:
+        """Push back ``locked_at`` for a running job; False if the lease was lost."""
+        async with db_session.async_session() as db:
+            result = await db.execute(
+                update(DataExportJob)
+                .where(DataExportJob.id == job_id)
+                .where(DataExportJob.status == RUNNING)
+                .where(DataExportJob.attempts == attempt)
+                .values(locked_at=_utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            return result.rowcount > 0
+
+    @staticmethod
+    async def _get_owned(
+        db: AsyncSession, job_id: str, attempt: int
+    ) -> tuple[DataExportJob, bool]:
+        """Lock a job row and report whether this attempt still holds its lease."""
+        result = await db.execute(
+            select(DataExportJob)
+            .where(DataExportJob.id == job_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        job = result.scalar_one()
+        return job, job.status == RUNNING and job.attempts == attempt
+
+    async def process(self, job_id: str) -> str:
+        """Build the artifact for one claimed job and record the outcome."""
+        async with db_session.async_session() as db:
+            job = await db.get(DataExportJob, job_id)
+            if job is None:
+                return FAILED
+            attempt = job.attempts
+            user = await DataExportService.get_user_export(db, job.user_id)
+            counts = await DataExportService.count_export_rows(db, job.user_id)
+            job.rows_total = (
+                counts["profiles"]
+                + (counts["progress"] if job.include_progress else 0)
+                + (counts["subscriptions"] if job.include_subscriptions else 0)
+            )
+            await db.commit()
+
+        directory = export_dir()
+        artifact_name = f"{job_id}.zip"
+        part_path = directory / f"{job_id}.{uuid4().hex}.part"
+        progress_key = f"{PROGRESS_KEY_PREFIX}:{job_id}"
+        try:
+            if user is None:
+                raise ValueError("User no longer exists")
+            directory.mkdir(parents=True, exist_ok=True)
+            rows_written = await self._write_archive(
+                job, user, part_path, progress_key, attempt
+            )
+        except LeaseLost:
+            part_path.unlink(missing_ok=True)
+            logger.warning(
+                "Data export job %s was re-claimed; abandoning attempt %d", job_id, attempt
+            )
+            return RUNNING
+        except Exception as exc:
+            part_path.unlink(missing_ok=True)
+            logger.exception("Data export job %s failed", job_id)
+            async with db_session.async_session() as db:
+                job, owned = await self._get_owned(db, job_id, attempt)
+                if not owned:
+                    return job.status
+                job.error = f"{type(exc).__name__}: {exc}"
+                job.locked_at = None
+                if isinstance(exc, ValueError) or (
+                    job.attempts >= settings.DATA_EXPORT_JOB_MAX_ATTEMPTS
+                ):
+                    job.status = FAILED
+                    job.completed_at = _utcnow()
+                    job.expires_at = job.completed_at + timedelta(
+                        hours=settings.DATA_EXPORT_ARTIFACT_TTL_HOURS
+                    )
+                else:
+                    job.status = QUEUED
+                await db.commit()
+                return job.status
+        finally:
+            await cache_service.delete(progress_key, remote=bool(settings.REDIS_URL))
+
+        async with db_session.async_session() as db:
+            job, owned = await self._get_owned(db, job_id, attempt)
+            if not owned:
+                part_path.unlink(missing_ok=True)
+                logger.warning(
+                    "Data export job %s was re-claimed; discarding attempt %d", job_id, attempt
+                )
+                return job.status
+            os.replace(part_path, directory / artifact_name)
+            now = _utcnow()
+            job.status = COMPLETED
+            job.error = None
+            job.locked_at = None
+            job.rows_written = rows_written
+            job.artifact_name = artifact_name
+            job.artifact_size = (directory / artifact_name).stat().st_size
+            job.completed_at = now
+            job.expires_at = now + timedelta(hours=settings.DATA_EXPORT_ARTIFACT_TTL_HOURS)
+            await db.commit()
+        return COMPLETED
+
+    async def _write_archive(
+        self, job: DataExportJob, user: BaseModel, path: Path, progress_key: str, attempt: int
+    ) -> int:
+        """Write every section of ``job`` into a zip at ``path``; returns rows written.
+
+        Raises LeaseLost if the job is re-claimed while the archive is built.
+        """
+        ext = job.format
+        rows_written = 0
+        renew_every = settings.DATA_EXPORT_JOB_LEASE_SECONDS / 3
+        renew_at = time.monotonic() + renew_every
+
+        async def report(count: int) -> None:
+            nonlocal rows_written, renew_at
+            rows_written += count
+            await cache_service.set(
+                progress_key,
+                rows_written,
+                ttl=settings.DATA_EXPORT_JOB_LEASE_SECONDS,
+                remote=bool(settings.REDIS_URL),
+            )
+            if time.monotonic() < renew_at:
+                return
+            try:
+                renewed = await self.renew_lease(job.id, attempt)
+            except Exception as e:
+                # Try again at the next chunk; the lease has time to spare
+                logger.warning("Failed to renew lease for data export job %s: %s", job.id, e)
+                return
+            if not renewed:
+                raise LeaseLost(job.id)
+            renew_at = time.monotonic() + renew_every
+
+        async with db_session.async_session() as db:
+            sections: list[tuple[str, AsyncIterator[BaseModel], list[str], Callable]] = [
+                (
+                    f"profiles.{ext}",
+                    DataExportService.stream_profiles(db, job.user_id),
+                    CSV_PROFILE_HEADER,
+                    csv_profile_row,
+                )
+            ]
+            if job.include_progress:
+                sections.append(
+                    (
+                        f"progress.{ext}",
+                        DataExportService.stream_progress(db, job.user_id),
+                        CSV_PROGRESS_HEADER,
+                        csv_progress_row,
+                    )
+                )
+            if job.include_subscriptions:
+                sections.append(
+                    (
+                        f"subscriptions.{ext}",
+                        DataExportService.stream_subscriptions(db, job.user_id),
+                        CSV_SUBSCRIPTION_HEADER,
+                        csv_subscription_row,
+                    )
+                )
+
+            with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                if ext == "csv":
+                    user_member = ("user.csv", CsvLineWriter().rows(csv_user_rows(user)[1:-1]))
+                else:
+                    user_member = ("user.json", user.model_dump_json(indent=2))
+                await asyncio.to_thread(archive.writestr, *user_member)
+                for name, items, header, to_row in sections:
+                    with archive.open(name, "w", force_zip64=True) as member:
+                        await self._write_section(member, ext, items, header, to_row, report)
+        return rows_written
+
+    @staticmethod
+    async def _write_section(
+        member,
+        ext: str,
+        items: AsyncIterator[BaseModel],
+        header: list[str],
+        to_row: Callable,
+        report: Callable,
+    ) -> None:
+        # Compression and file I/O run off the event loop
+        writer = CsvLineWriter()
+        pending: list[str] = []
+        size = count = 0
+        if ext == "csv":
+            pending.append(writer.row(header))
+        elif ext == "json":
+            pending.append("[")
+        first = True
+        async for item in items:
+            if ext == "csv":
+                text = writer.row(to_row(item))
+            elif ext == "jsonl":
+                text = item.model_dump_json() + "\n"
+            else:
+                text = ("\n" if first else ",\n") + item.model_dump_json()
+            first = False
+            pending.append(text)
+            size += len(text)
+            count += 1
+            if size >= ARCHIVE_FLUSH_BYTES:
+                await asyncio.to_thread(member.write, "".join(pending).encode("utf-8"))
+                pending.clear()
+                size = 0
+                await report(count)
+                count = 0
+        if ext == "json":
+            pending.append("\n]\n")
+        await asyncio.to_thread(member.write, "".join(pending).encode("utf-8"))
+        await report(count)
+
+    async def process_due(self, limit: int = 1) -> int:
+        """Claim and build a batch of jobs; returns how many were claimed."""
+        async with db_session.async_session() as db:
+            job_ids = await self.claim(db, limit)
+        for job_id in job_ids:
+            await self.process(job_id)
+        return len(job_ids)
+
+    @staticmethod
+    async def purge_expired(
+        db: AsyncSession, now: Optional[datetime] = None, chunk_size: int = 1000
+    ) -> int:
+        """Delete expired jobs and their artifacts."""
+        now = now or _utcnow()
+        total = 0
+        while True:
+            result = await db.execute(
+                select(DataExportJob.id, DataExportJob.artifact_name)
+                .where(DataExportJob.expires_at < now)
+                .limit(chunk_size)
+            )
+            rows = result.all()
+            if not rows:
+                return total
+            for row in rows:
+                if row.artifact_name:
+                    (export_dir() / row.artifact_name).unlink(missing_ok=True)
+            await db.execute(
+                delete(DataExportJob)
+                .where(DataExportJob.id.in_([row.id for row in rows]))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            total += len(rows)
+            if len(rows) < chunk_size:
+                return total
+
+
+class DataExportWorker:
+    """Pool of tasks draining the export job queue."""
+
+    def __init__(self, queue: DataExportJobQueue):
+        self.queue = queue
+        self._tasks: list[asyncio.Task] = []
+        self._wake = asyncio.Event()
+
+    def start(self, concurrency: Optional[int] = None) -> None:
+        """Start ``concurrency`` polling tasks (no-op if already running)."""
+        if self._tasks:
+            return
+        concurrency = settings.DATA_EXPORT_JOB_WORKERS if concurrency is None else concurrency
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(concurrency)]
+
+    async def stop(self) -> None:
+        """Cancel the polling tasks."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def notify(self) -> None:
+        """Wake idle workers after a new job is queued."""
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self.queue.process_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Data export worker iteration failed")
+                claimed = 0
+            if claimed:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.DATA_EXPORT_JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+
+data_export_queue = DataExportJobQueue()
+data_export_worker = DataExportWorker(data_export_queue)
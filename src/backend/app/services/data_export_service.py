@@ -1,13 +1,25 @@
-"""Data export service for GDPR/COPPA compliance."""
+"""Data export service for GDPR/COPPA compliance.
 
+``export_user_data`` builds the whole export in memory and backs the JSON
+API.  File downloads go through ``stream_export`` instead, which reads
+profiles, progress and subscriptions through server-side cursors
+(``yield_per``) and writes the JSON document or CSV sections incrementally,
+so memory use doesn't grow with the size of a user's progress history.
+"""
+
+import csv
+import io
 from datetime import datetime, timezone
-from typing import List
+from functools import cache
+from typing import Any, AsyncIterator, Iterable, List, Optional
 from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.loaders import ProfileLoad, profile_load_options
 from app.db.models.profile import Profile
 from app.db.models.progress import Progress
 from app.db.models.subscription_model import Subscription
@@ -19,6 +31,254 @@ from app.schemas.data_export import (
     SubscriptionExportData,
     UserExportData,
 )
+from app.services.cache_service import cache_key, cache_service
+from app.services.progress_service import progress_tag
+
+SUMMARY_KEY_PREFIX = "export:summary"
+
+# Streamed output is coalesced into chunks of roughly this many bytes
+STREAM_FLUSH_BYTES = 64 * 1024
+
+CSV_PROFILE_HEADER = ["ID", "Name", "Age", "Language", "Settings", "Created", "Updated"]
+CSV_PROGRESS_HEADER = [
+    "ID", "Profile ID", "Activity", "Content", "Score", "Duration", "Completed", "Completed At"
+]
+CSV_SUBSCRIPTION_HEADER = ["ID", "Status", "Plan", "Started", "Expires", "Created"]
+
+# Plain column selects: streamed rows never enter the session's identity map
+_PROFILE_COLUMNS = (
+    Profile.id,
+    Profile.name,
+    Profile.age,
+    Profile.preferred_language,
+    Profile.settings,
+    Profile.created_at,
+    Profile.updated_at,
+)
+_PROGRESS_COLUMNS = (
+    Progress.id,
+    Progress.profile_id,
+    Progress.activity_type,
+    Progress.content_id,
+    Progress.score,
+    Progress.duration_seconds,
+    Progress.meta_data,
+    Progress.completed,
+    Progress.completed_at,
+    Progress.idempotency_key,
+)
+_SUBSCRIPTION_COLUMNS = (
+    Subscription.id,
+    Subscription.status,
+    Subscription.plan_type,
+    Subscription.start_date,
+    Subscription.end_date,
+    Subscription.created_at,
+    Subscription.updated_at,
+)
+
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def _user_export(user: Any) -> UserExportData:
+    return UserExportData(
+        id=user.id,
+        email=user.email,
+        role=_enum_value(user.role),
+        email_verified=user.email_verified,
+        is_active=user.is_active,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+    )
+
+
+def _profile_export(profile: Any) -> ProfileExportData:
+    """Build export data from a ``Profile`` or a row of ``_PROFILE_COLUMNS``."""
+    return ProfileExportData(
+        id=profile.id,
+        name=profile.name,
+        age=profile.age,
+        preferred_language=profile.preferred_language,
+        settings=profile.settings or {},
+        created_at=profile.created_at,
+        updated_at=profile.updated_at,
+    )
+
+
+def _progress_export(progress: Any) -> ProgressExportData:
+    """Build export data from a ``Progress`` or a row of ``_PROGRESS_COLUMNS``."""
+    return ProgressExportData(
+        id=progress.id,
+        profile_id=progress.profile_id,
+        activity_type=progress.activity_type,
+        content_id=progress.content_id,
+        score=progress.score,
+        duration_seconds=progress.duration_seconds,
+        meta_data=progress.meta_data or {},
+        completed=progress.completed,
+        completed_at=progress.completed_at,
+        idempotency_key=progress.idempotency_key,
+    )
+
+
+def _subscription_export(sub: Any) -> SubscriptionExportData:
+    """Build export data from a ``Subscription`` or a row of ``_SUBSCRIPTION_COLUMNS``."""
+    return SubscriptionExportData(
+        id=sub.id,
+        status=_enum_value(sub.status),
+        plan_type=_enum_value(sub.plan_type),
+        started_at=sub.start_date,
+        expires_at=sub.end_date,
+        created_at=sub.created_at,
+        updated_at=sub.updated_at,
+    )
+
+
+def csv_user_rows(user: UserExportData) -> List[list]:
+    """Rows of the CSV "USER INFORMATION" section, blank separator included."""
+    return [
+        ["USER INFORMATION"],
+        ["ID", user.id],
+        ["Email", user.email],
+        ["Role", user.role],
+        ["Email Verified", user.email_verified],
+        ["Active", user.is_active],
+        ["Created At", user.created_at],
+        ["Updated At", user.updated_at],
+        [],
+    ]
+
+
+def csv_profile_row(profile: ProfileExportData) -> list:
+    return [
+        profile.id,
+        profile.name,
+        profile.age,
+        profile.preferred_language,
+        str(profile.settings),
+        profile.created_at,
+        profile.updated_at,
+    ]
+
+
+def csv_progress_row(progress: ProgressExportData) -> list:
+    return [
+        progress.id,
+        progress.profile_id,
+        progress.activity_type,
+        progress.content_id,
+        progress.score,
+        progress.duration_seconds,
+        progress.completed,
+        progress.completed_at,
+    ]
+
+
+def csv_subscription_row(sub: SubscriptionExportData) -> list:
+    return [sub.id, sub.status, sub.plan_type, sub.started_at, sub.expires_at, sub.created_at]
+
+
+class CsvLineWriter:
+    """Formats one CSV row at a time without keeping earlier rows around."""
+
+    def __init__(self) -> None:
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def rows(self, rows: Iterable[list]) -> str:
+        self._writer.writerows(rows)
+        text = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return text
+
+    def row(self, row: list) -> str:
+        return self.rows([row])
+
+
+@cache
+def _row_size_estimates() -> dict[str, dict[str, int]]:
+    """Bytes per exported row by section and format, measured on typical rows."""
+    now = datetime.now(timezone.utc)
+    ids = [str(uuid4()) for _ in range(3)]
+    samples = {
+        "profiles": (
+            ProfileExportData(
+                id=ids[0],
+                name="Child Name",
+                age=6.5,
+                preferred_language="en",
+                settings={"sound": True, "difficulty": "medium"},
+                created_at=now,
+                updated_at=now,
+            ),
+            csv_profile_row,
+        ),
+        "progress": (
+            ProgressExportData(
+                id=ids[0],
+                profile_id=ids[1],
+                activity_type="drawing",
+                content_id="letter_A",
+                score=85,
+                duration_seconds=120,
+                meta_data={"accuracy": 0.92, "attempts": 3, "hints_used": 1},
+                completed=True,
+                completed_at=now,
+                idempotency_key=ids[2],
+            ),
+            csv_progress_row,
+        ),
+        "subscriptions": (
+            SubscriptionExportData(
+                id=ids[0],
+                status="active",
+                plan_type="game_pack_5",
+                started_at=now,
+                expires_at=now,
+                created_at=now,
+                updated_at=now,
+            ),
+            csv_subscription_row,
+        ),
+    }
+    writer = CsvLineWriter()
+    return {
+        section: {
+            "json": len(model.model_dump_json()) + 2,
+            "csv": len(writer.row(to_row(model))),
+        }
+        for section, (model, to_row) in samples.items()
+    }
+
+
+def estimate_export_bytes(counts: dict[str, int]) -> dict[str, int]:
+    """Rough download size per format for the given row counts."""
+    sizes = _row_size_estimates()
+    # Account section, array/section framing and headers
+    overhead = {"json": 600, "csv": 500}
+    return {
+        fmt: overhead[fmt]
+        + sum(counts.get(section, 0) * row_sizes[fmt] for section, row_sizes in sizes.items())
+        for fmt in overhead
+    }
+
+
+async def _coalesce(parts: AsyncIterator[str], flush_bytes: int) -> AsyncIterator[bytes]:
+    """Join small text pieces into encoded chunks of about ``flush_bytes``."""
+    pending: List[str] = []
+    size = 0
+    async for part in parts:
+        pending.append(part)
+        size += len(part)
+        if size >= flush_bytes:
+            yield "".join(pending).encode("utf-8")
+            pending.clear()
+            size = 0
+    if pending:
+        yield "".join(pending).encode("utf-8")
 
 
 class DataExportService:
@@ -51,7 +311,7 @@ class DataExportService:
         # Get profiles with related data
         query = select(Profile).where(Profile.parent_id == user_id)
         if include_progress:
-            query = query.options(selectinload(Profile.progress))
+            query = query.options(*profile_load_options(ProfileLoad.WITH_PROGRESS))
         profiles_result = await db.execute(query)
         profiles = profiles_result.scalars().all()
 
@@ -60,34 +320,9 @@ class DataExportService:
         progress_exports: List[ProgressExportData] = []
 
         for profile in profiles:
-            profile_exports.append(
-                ProfileExportData(
-                    id=profile.id,
-                    name=profile.name,
-                    age=profile.age,
-                    preferred_language=profile.preferred_language,
-                    settings=profile.settings or {},
-                    created_at=profile.created_at,
-                    updated_at=profile.updated_at,
-                )
-            )
-
-            if include_progress and hasattr(profile, 'progress'):
-                for progress in profile.progress:
-                    progress_exports.append(
-                        ProgressExportData(
-                            id=progress.id,
-                            profile_id=progress.profile_id,
-                            activity_type=progress.activity_type,
-                            content_id=progress.content_id,
-                            score=progress.score,
-                            duration_seconds=progress.duration_seconds,
-                            meta_data=progress.meta_data or {},
-                            completed=progress.completed,
-                            completed_at=progress.completed_at,
-                            idempotency_key=progress.idempotency_key,
-                        )
-                    )
+            profile_exports.append(_profile_export(profile))
+            if include_progress:
+                progress_exports.extend(_progress_export(p) for p in profile.progress)
 
         # Get subscriptions if requested
         subscription_exports: List[SubscriptionExportData] = []
@@ -95,31 +330,9 @@ class DataExportService:
             subs_result = await db.execute(
                 select(Subscription).where(Subscription.parent_id == user_id)
             )
-            subscriptions = subs_result.scalars().all()
-
-            for sub in subscriptions:
-                subscription_exports.append(
-                    SubscriptionExportData(
-                        id=sub.id,
-                        status=sub.status,
-                        plan_type=sub.plan_type,
-                        started_at=sub.started_at,
-                        expires_at=sub.expires_at,
-                        created_at=sub.created_at,
-                        updated_at=sub.updated_at,
-                    )
-                )
+            subscription_exports = [_subscription_export(s) for s in subs_result.scalars()]
 
-        # Build user export data
-        user_export = UserExportData(
-            id=user.id,
-            email=user.email,
-            role=user.role,
-            email_verified=user.email_verified,
-            is_active=user.is_active,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
-        )
+        user_export = _user_export(user)
 
         return DataExportResponse(
             export_id=str(uuid4()),
@@ -130,6 +343,229 @@ class DataExportService:
             subscriptions=subscription_exports,
         )
 
+    @staticmethod
+    async def get_user_export(db: AsyncSession, user_id: str) -> Optional[UserExportData]:
+        """Load the account section of an export, or None if the user is gone."""
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        return _user_export(user) if user is not None else None
+
+    @staticmethod
+    async def _summary_counts(db: AsyncSession, user_id: str) -> tuple[List[str], dict[str, int]]:
+        """Return the user's profile ids and per-section row counts in one query.
+
+        The outer join from ``users`` keeps a row for users without profiles.
+        """
+        progress = (
+            select(func.count())
+            .select_from(Progress)
+            .where(Progress.profile_id.in_(select(Profile.id).where(Profile.parent_id == user_id)))
+            .scalar_subquery()
+        )
+        subscriptions = (
+            select(func.count())
+            .select_from(Subscription)
+            .where(Subscription.parent_id == user_id)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            select(
+                Profile.id,
+                progress.label("progress"),
+                subscriptions.label("subscriptions"),
+            )
+            .select_from(User)
+            .outerjoin(Profile, Profile.parent_id == User.id)
+            .where(User.id == user_id)
+        )
+        rows = result.all()
+        profile_ids = [row.id for row in rows if row.id is not None]
+        counts = {
+            "profiles": len(profile_ids),
+            "progress": int(rows[0].progress) if rows else 0,
+            "subscriptions": int(rows[0].subscriptions) if rows else 0,
+        }
+        return profile_ids, counts
+
+    @staticmethod
+    async def count_export_rows(db: AsyncSession, user_id: str) -> dict[str, int]:
+        """Count exactly the rows an export will write, in one query."""
+        profile_ids = select(Profile.id).where(Profile.parent_id == user_id)
+        stmt = select(
+            select(func.count())
+            .select_from(Profile)
+            .where(Profile.parent_id == user_id)
+            .scalar_subquery()
+            .label("profiles"),
+            select(func.count())
+            .select_from(Progress)
+            .where(Progress.profile_id.in_(profile_ids))
+            .scalar_subquery()
+            .label("progress"),
+            select(func.count())
+            .select_from(Subscription)
+            .where(Subscription.parent_id == user_id)
+            .scalar_subquery()
+            .label("subscriptions"),
+        )
+        row = (await db.execute(stmt)).one()
+        return {key: int(value or 0) for key, value in row._mapping.items()}
+
+    @staticmethod
+    async def _stream_rows(db: AsyncSession, stmt, chunk_size: int) -> AsyncIterator[Any]:
+        """Yield rows from a server-side cursor, fetching ``chunk_size`` at a time."""
+        result = await db.stream(stmt.execution_options(yield_per=chunk_size))
+        try:
+            async for row in result:
+                yield row
+        finally:
+            await result.close()
+
+    @staticmethod
+    async def stream_profiles(
+        db: AsyncSession, user_id: str, chunk_size: Optional[int] = None
+    ) -> AsyncIterator[ProfileExportData]:
+        """Stream a user's profiles."""
+        stmt = (
+            select(*_PROFILE_COLUMNS)
+            .where(Profile.parent_id == user_id)
+            .order_by(Profile.created_at, Profile.id)
+        )
+        chunk_size = chunk_size or settings.DATA_EXPORT_STREAM_CHUNK_SIZE
+        async for row in DataExportService._stream_rows(db, stmt, chunk_size):
+            yield _profile_export(row)
+
+    @staticmethod
+    async def stream_progress(
+        db: AsyncSession, user_id: str, chunk_size: Optional[int] = None
+    ) -> AsyncIterator[ProgressExportData]:
+        """Stream progress records across all of a user's profiles."""
+        stmt = (
+            select(*_PROGRESS_COLUMNS)
+            .join(Profile, Profile.id == Progress.profile_id)
+            .where(Profile.parent_id == user_id)
+            .order_by(Progress.profile_id, Progress.id)
+        )
+        chunk_size = chunk_size or settings.DATA_EXPORT_STREAM_CHUNK_SIZE
+        async for row in DataExportService._stream_rows(db, stmt, chunk_size):
+            yield _progress_export(row)
+
+    @staticmethod
+    async def stream_subscriptions(
+        db: AsyncSession, user_id: str, chunk_size: Optional[int] = None
+    ) -> AsyncIterator[SubscriptionExportData]:
+        """Stream a user's subscriptions, oldest first."""
+        stmt = (
+            select(*_SUBSCRIPTION_COLUMNS)
+            .where(Subscription.parent_id == user_id)
+            .order_by(Subscription.created_at, Subscription.id)
+        )
+        chunk_size = chunk_size or settings.DATA_EXPORT_STREAM_CHUNK_SIZE
+        async for row in DataExportService._stream_rows(db, stmt, chunk_size):
+            yield _subscription_export(row)
+
+    @staticmethod
+    async def _json_parts(
+        db: AsyncSession,
+        user: UserExportData,
+        generated_at: datetime,
+        include_progress: bool,
+        include_subscriptions: bool,
+    ) -> AsyncIterator[str]:
+        # Render the scalar fields through the response model so the streamed
+        # document matches DataExportResponse exactly, then splice in the arrays.
+        head = DataExportResponse(
+            export_id=str(uuid4()),
+            generated_at=generated_at,
+            user=user,
+            profiles=[],
+            progress=[],
+            subscriptions=[],
+        ).model_dump_json(exclude={"profiles", "progress", "subscriptions"})
+        yield head[:-1]
+
+        sections = {
+            "profiles": DataExportService.stream_profiles(db, user.id),
+            "progress": (
+                DataExportService.stream_progress(db, user.id) if include_progress else None
+            ),
+            "subscriptions": (
+                DataExportService.stream_subscriptions(db, user.id)
+                if include_subscriptions
+                else None
+            ),
+        }
+        for name, items in sections.items():
+            yield f',"{name}":['
+            if items is not None:
+                separator = "\n"
+                async for item in items:
+                    yield separator
+                    yield item.model_dump_json()
+                    separator = ",\n"
+            yield "]"
+        yield "}\n"
+
+    @staticmethod
+    async def _csv_parts(
+        db: AsyncSession,
+        user: UserExportData,
+        include_progress: bool,
+        include_subscriptions: bool,
+    ) -> AsyncIterator[str]:
+        writer = CsvLineWriter()
+        yield writer.rows(csv_user_rows(user))
+
+        yield writer.rows([["PROFILES"], CSV_PROFILE_HEADER])
+        async for profile in DataExportService.stream_profiles(db, user.id):
+            yield writer.row(csv_profile_row(profile))
+        yield writer.row([])
+
+        # Optional sections are only written when non-empty
+        if include_progress:
+            started = False
+            async for progress in DataExportService.stream_progress(db, user.id):
+                if not started:
+                    yield writer.rows([["PROGRESS"], CSV_PROGRESS_HEADER])
+                    started = True
+                yield writer.row(csv_progress_row(progress))
+            if started:
+                yield writer.row([])
+
+        if include_subscriptions:
+            started = False
+            async for sub in DataExportService.stream_subscriptions(db, user.id):
+                if not started:
+                    yield writer.rows([["SUBSCRIPTIONS"], CSV_SUBSCRIPTION_HEADER])
+                    started = True
+                yield writer.row(csv_subscription_row(sub))
+
+    @staticmethod
+    async def stream_export(
+        user: UserExportData,
+        format: str = "json",
+        include_progress: bool = True,
+        include_subscriptions: bool = True,
+        generated_at: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream a complete export as UTF-8 encoded JSON or CSV chunks.
+
+        Uses its own session so the cursors outlive the request handler; the
+        JSON document has the same shape as ``DataExportResponse``.
+        """
+        generated_at = generated_at or datetime.now(timezone.utc)
+        async with db_session.async_session() as db:
+            if format.lower() == "csv":
+                parts = DataExportService._csv_parts(
+                    db, user, include_progress, include_subscriptions
+                )
+            else:
+                parts = DataExportService._json_parts(
+                    db, user, generated_at, include_progress, include_subscriptions
+                )
+            async for chunk in _coalesce(parts, STREAM_FLUSH_BYTES):
+                yield chunk
+
     @staticmethod
     async def get_data_summary(
         db: AsyncSession,
@@ -137,37 +573,45 @@ class DataExportService:
     ) -> dict:
         """Get summary of data that would be exported.
 
+        Counts come from a single aggregate query and are cached per user
+        until the TTL passes or one of the user's profiles records progress.
+
         Args:
             db: Database session
             user_id: User ID to summarize
 
         Returns:
-            Summary dict with counts
+            Summary dict with counts, estimated download sizes and whether
+            the export is small enough to download inline
         """
-        # Count profiles
-        profile_count_result = await db.execute(
-            select(Profile).where(Profile.parent_id == user_id)
-        )
-        profiles = profile_count_result.scalars().all()
-        profile_count = len(profiles)
-
-        # Count progress records
-        profile_ids = [p.id for p in profiles]
-        progress_count = 0
-        if profile_ids:
-            progress_result = await db.execute(
-                select(Progress).where(Progress.profile_id.in_(profile_ids))
-            )
-            progress_count = len(progress_result.scalars().all())
+        remote = bool(settings.REDIS_URL)
+        key = cache_key(SUMMARY_KEY_PREFIX, user_id)
+        cached = await cache_service.get(key, remote=remote)
+        if cached is not None:
+            return cached
 
-        # Count subscriptions
-        sub_result = await db.execute(
-            select(Subscription).where(Subscription.parent_id == user_id)
+        profile_ids, counts = await DataExportService._summary_counts(db, user_id)
+        estimated_bytes = estimate_export_bytes(counts)
+        inline = max(estimated_bytes.values()) <= settings.DATA_EXPORT_INLINE_MAX_BYTES
+        summary = {
+            "profile_count": counts["profiles"],
+            "progress_count": counts["progress"],
+            "subscription_count": counts["subscriptions"],
+            "estimated_bytes": estimated_bytes,
+            "recommended_delivery": "inline" if inline else "background",
+        }
+        await cache_service.set(
+            key,
+            summary,
+            ttl=settings.DATA_EXPORT_SUMMARY_CACHE_TTL_SECONDS,
+            remote=remote,
+            tags=[progress_tag(profile_id) for profile_id in profile_ids],
         )
-        subscription_count = len(sub_result.scalars().all())
+        return summary
 
-        return {
-            "profile_count": profile_count,
-            "progress_count": progress_count,
-            "subscription_count": subscription_count,
-        }
+    @staticmethod
+    async def invalidate_summary(user_id: str) -> None:
+        """Drop a user's cached export summary."""
+        await cache_service.delete(
+            cache_key(SUMMARY_KEY_PREFIX, user_id), remote=bool(settings.REDIS_URL)
+        )
@@ -1,13 +1,25 @@
 """Dodo Payment service for subscription purchases."""
 
+import asyncio
 import hashlib
 import hmac
 import logging
 import os
+from typing import Awaitable, Callable, Optional, TypeVar
 
-from dodopayments import DodoPayments
+import dodopayments
+import httpx
+from dodopayments import AsyncDodoPayments, DefaultAsyncHttpxClient
 
+from app.core.config import settings
 from app.db.models.subscription_model import SubscriptionPlanType
+from app.services.payment_gateway import (
+    CircuitBreaker,
+    FakePaymentGateway,
+    PaymentGateway,
+    PaymentGatewayUnavailable,
+    compute_webhook_signature,
+)
 from app.services.subscription_service import PLAN_PRICES
 
 logger = logging.getLogger(__name__)
@@ -32,6 +44,16 @@ ALLOW_PLACEHOLDER = os.getenv("ALLOW_PLACEHOLDER_MODE", "false").lower() == "tru
 # Diagnostic mode for signature verification (test only)
 DODO_VERIFY_DIAGNOSTIC = os.getenv("DODO_VERIFY_DIAGNOSTIC", "false").lower() == "true" and DODO_ENV == "test"
 
+# Provider failures that count against the circuit breaker; other API errors
+# (bad request, not found, ...) are the caller's problem, not an outage.
+TRANSIENT_ERRORS = (
+    dodopayments.APIConnectionError,  # includes APITimeoutError
+    dodopayments.InternalServerError,
+    dodopayments.RateLimitError,
+)
+
+T = TypeVar("T")
+
 PLAN_NAMES = {
     SubscriptionPlanType.GAME_PACK_5: "5-Game Pack (1 month)",
     SubscriptionPlanType.GAME_PACK_10: "10-Game Pack (3 months, monthly refresh)",
@@ -39,8 +61,15 @@ PLAN_NAMES = {
 }
 
 
-class DodoPaymentService:
-    """Service for handling Dodo Payments integration."""
+class DodoPaymentService(PaymentGateway):
+    """Service for handling Dodo Payments integration.
+
+    One instance is shared per process (see ``get_dodo_client``): the async SDK
+    client keeps a pooled HTTP connection, calls are bounded by
+    ``DODO_MAX_CONCURRENCY`` and ``DODO_TIMEOUT_SECONDS``, and repeated
+    provider failures open a circuit breaker so requests fail fast with
+    PaymentGatewayUnavailable.
+    """
 
     def __init__(self):
         self.api_key = os.getenv("DODO_API_KEY", "")
@@ -53,12 +82,60 @@ class DodoPaymentService:
         base_url = DODO_BASE_URLS.get(env, DODO_BASE_URLS["test"])
         logger.info(f"Initialized DodoPayments with environment: {env}, base_url: {base_url}")
 
-        self.client = DodoPayments(
+        self.client = AsyncDodoPayments(
             bearer_token=self.api_key,
             base_url=base_url,
+            timeout=settings.DODO_TIMEOUT_SECONDS,
+            max_retries=settings.DODO_MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.DODO_MAX_CONCURRENCY,
+                    max_keepalive_connections=settings.DODO_MAX_CONCURRENCY,
+                ),
+            ),
         )
+        self._semaphore = asyncio.Semaphore(settings.DODO_MAX_CONCURRENCY)
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.DODO_CIRCUIT_FAILURE_THRESHOLD,
+            reset_seconds=settings.DODO_CIRCUIT_RESET_SECONDS,
+        )
+
+    async def _call(self, operation: Callable[[], Awaitable[T]]) -> T:
+        """Run one SDK call under the concurrency limit and circuit breaker."""
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), settings.DODO_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise PaymentGatewayUnavailable(
+                "Too many concurrent payment requests", retry_after=1.0
+            ) from None
 
-    def create_checkout_session(
+        try:
+            self.breaker.before_call()
+            try:
+                result = await operation()
+            except TRANSIENT_ERRORS as exc:
+                self.breaker.record_failure()
+                logger.warning(f"Dodo request failed: {exc}")
+                raise PaymentGatewayUnavailable(
+                    "Payment provider request failed", retry_after=1.0
+                ) from exc
+            except Exception:
+                # A well-formed error response means the provider is up
+                self.breaker.record_success()
+                raise
+            except BaseException:
+                # Cancelled mid-call: no verdict, but don't hold the trial slot
+                self.breaker.release_trial()
+                raise
+            self.breaker.record_success()
+            return result
+        finally:
+            self._semaphore.release()
+
+    async def aclose(self) -> None:
+        await self.client.close()
+
+    async def create_checkout_session(
         self,
         plan_type: SubscriptionPlanType,
         user_id: str,
@@ -83,7 +160,7 @@ class DodoPaymentService:
                     "Please configure DODO_PRODUCT_ID_* environment variables."
                 )
 
-        response = self.client.checkout_sessions.create(
+        response = await self._call(lambda: self.client.checkout_sessions.create(
             product_cart=[
                 {
                     "product_id": product_id,
@@ -99,14 +176,14 @@ class DodoPaymentService:
                 "plan_type": plan_type.value,
                 "expected_amount": PLAN_PRICES[plan_type],  # Store expected amount for verification
             },
-        )
+        ))
 
         return {
             "checkout_url": response.url,
             "session_id": response.id,
         }
 
-    def get_payment_status(self, session_id: str) -> dict:
+    async def get_payment_status(self, session_id: str) -> dict:
         """Get payment status from Dodo."""
         if session_id.startswith("pending_"):
             return {
@@ -117,7 +194,9 @@ class DodoPaymentService:
                 "amount_paid": 0,
             }
 
-        response = self.client.checkout_sessions.retrieve(id=session_id)
+        response = await self._call(
+            lambda: self.client.checkout_sessions.retrieve(id=session_id)
+        )
         metadata = response.metadata or {}
         return {
             "id": response.id,
@@ -175,13 +254,9 @@ class DodoPaymentService:
 
             # Compute signature exactly as Dodo specifies:
             # "{webhook_id}.{webhook_timestamp}.{raw_payload}"
-            message_to_sign = f"{webhook_id}.{webhook_timestamp}.".encode() + payload
-
-            expected_signature = hmac.new(
-                self.webhook_secret.encode(),
-                message_to_sign,
-                hashlib.sha256,
-            ).hexdigest()
+            expected_signature = compute_webhook_signature(
+                self.webhook_secret, webhook_id, webhook_timestamp, payload
+            )
 
             # Use constant-time comparison to prevent timing attacks
             return hmac.compare_digest(expected_signature, webhook_signature)
@@ -271,6 +346,26 @@ class DodoPaymentService:
         return True
 
 
-def get_dodo_client() -> DodoPaymentService:
-    """Get Dodo payment service instance."""
-    return DodoPaymentService()
+_gateway: Optional[PaymentGateway] = None
+
+
+def get_dodo_client() -> PaymentGateway:
+    """Get the process-wide payment gateway (``PAYMENT_GATEWAY=fake`` for the in-process fake)."""
+    global _gateway
+    if _gateway is None:
+        if settings.PAYMENT_GATEWAY == "fake":
+            _gateway = FakePaymentGateway(
+                webhook_secret=settings.DODO_WEBHOOK_SECRET,
+                latency_seconds=settings.FAKE_PAYMENT_LATENCY_SECONDS,
+            )
+        else:
+            _gateway = DodoPaymentService()
+    return _gateway
+
+
+async def close_dodo_client() -> None:
+    """Close the shared gateway's connection pool (application shutdown)."""
+    global _gateway
+    if _gateway is not None:
+        gateway, _gateway = _gateway, None
+        await gateway.aclose()
@@ -0,0 +1,240 @@
+"""In-process snapshot of the game catalog.
+
+The ``games`` table is small and rarely changes, so each worker keeps an
+immutable ``CatalogSnapshot`` with lookups by id and slug and pre-sorted
+indexes for the list filters.  Reads never touch the database while the
+snapshot is current.  Each game's JSON is rendered once per snapshot, so
+list responses are assembled from bytes without re-validating models.
+
+A snapshot is tagged with a catalog version.  ``GameService`` bumps the
+version on create/update/delete; with Redis configured other workers notice
+the new version within ``GAME_CATALOG_VERSION_CHECK_SECONDS`` and rebuild.
+Without Redis the snapshot is simply rebuilt every
+``GAME_CATALOG_REFRESH_SECONDS``.  Any ORM commit that touches a ``Game`` in
+this process also drops the local snapshot.
+"""
+
+import asyncio
+import bisect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from uuid import uuid4
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.game import Game
+from app.schemas.game import Game as GameSchema
+from app.services.cache_service import cache_service
+
+CATALOG_NAMESPACE = "games:catalog"
+_CHANGED_FLAG = "game_catalog_changed"
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable view of every game, newest first, with filter indexes."""
+
+    version: str
+    games: tuple[GameSchema, ...]
+    by_id: dict[str, GameSchema]
+    by_slug: dict[str, GameSchema]
+    by_category: dict[str, frozenset[int]]
+    by_difficulty: dict[str, frozenset[int]]
+    by_published: dict[bool, frozenset[int]]
+    by_featured: dict[bool, frozenset[int]]
+    # Positions sorted by age_range_min / age_range_max, with the sorted keys
+    min_age_keys: list[int] = field(default_factory=list)
+    min_age_positions: list[int] = field(default_factory=list)
+    max_age_keys: list[int] = field(default_factory=list)
+    max_age_positions: list[int] = field(default_factory=list)
+    # Serialized ``Game`` JSON, parallel to ``games``
+    games_json: tuple[bytes, ...] = ()
+
+    @classmethod
+    def build(cls, version: str, games: list[GameSchema]) -> "CatalogSnapshot":
+        ordered = tuple(sorted(games, key=lambda g: g.created_at, reverse=True))
+
+        def index(attr: str) -> dict[Any, frozenset[int]]:
+            groups: dict[Any, set[int]] = {}
+            for pos, game in enumerate(ordered):
+                groups.setdefault(getattr(game, attr), set()).add(pos)
+            return {key: frozenset(positions) for key, positions in groups.items()}
+
+        by_min = sorted(range(len(ordered)), key=lambda pos: ordered[pos].age_range_min)
+        by_max = sorted(range(len(ordered)), key=lambda pos: ordered[pos].age_range_max)
+        return cls(
+            version=version,
+            games=ordered,
+            by_id={g.id: g for g in ordered},
+            by_slug={g.slug: g for g in ordered},
+            by_category=index("category"),
+            by_difficulty=index("difficulty"),
+            by_published=index("is_published"),
+            by_featured=index("is_featured"),
+            min_age_keys=[ordered[pos].age_range_min for pos in by_min],
+            min_age_positions=by_min,
+            max_age_keys=[ordered[pos].age_range_max for pos in by_max],
+            max_age_positions=by_max,
+            games_json=tuple(game.model_dump_json().encode() for game in ordered),
+        )
+
+    def _positions(
+        self,
+        category: Optional[str],
+        age_min: Optional[int],
+        age_max: Optional[int],
+        difficulty: Optional[str],
+        is_published: bool,
+        is_featured: Optional[bool],
+    ) -> list[int]:
+        candidates: set[int] = set(self.by_published.get(is_published, frozenset()))
+        if category:
+            candidates &= self.by_category.get(category, frozenset())
+        if difficulty:
+            candidates &= self.by_difficulty.get(difficulty, frozenset())
+        if is_featured is not None:
+            candidates &= self.by_featured.get(is_featured, frozenset())
+        if age_min is not None:
+            start = bisect.bisect_left(self.min_age_keys, age_min)
+            candidates &= set(self.min_age_positions[start:])
+        if age_max is not None:
+            end = bisect.bisect_right(self.max_age_keys, age_max)
+            candidates &= set(self.max_age_positions[:end])
+
+        return sorted(candidates)
+
+    def filter(
+        self,
+        category: Optional[str] = None,
+        age_min: Optional[int] = None,
+        age_max: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        is_published: bool = True,
+        is_featured: Optional[bool] = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> tuple[list[GameSchema], int]:
+        """Filter and paginate like ``GameService.get_all`` did in SQL."""
+        positions = self._positions(
+            category, age_min, age_max, difficulty, is_published, is_featured
+        )
+        offset = (page - 1) * page_size
+        return [self.games[pos] for pos in positions[offset : offset + page_size]], len(positions)
+
+    def filter_json(
+        self,
+        category: Optional[str] = None,
+        age_min: Optional[int] = None,
+        age_max: Optional[int] = None,
+        difficulty: Optional[str] = None,
+        is_published: bool = True,
+        is_featured: Optional[bool] = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> bytes:
+        """Like ``filter``, but return a serialized ``GameList`` body."""
+        positions = self._positions(
+            category, age_min, age_max, difficulty, is_published, is_featured
+        )
+        offset = (page - 1) * page_size
+        games = b",".join(self.games_json[pos] for pos in positions[offset : offset + page_size])
+        return b'{"games":[%b],"total":%d,"page":%d,"page_size":%d}' % (
+            games,
+            len(positions),
+            page,
+            page_size,
+        )
+
+
+class GameCatalog:
+    """Per-worker holder of the current ``CatalogSnapshot``."""
+
+    def __init__(self) -> None:
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._local_version = uuid4().hex[:12]
+        self._built_at = 0.0
+        self._checked_at = 0.0
+        # Bumped by invalidate() so a rebuild racing a write isn't kept
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    async def _current_version(self) -> str:
+        if not settings.REDIS_URL:
+            return self._local_version
+        version = await cache_service.namespace_version(CATALOG_NAMESPACE, max_age=0)
+        return f"v{version}"
+
+    def _is_current(self, now: float) -> bool:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return False
+        if not settings.REDIS_URL:
+            return now - self._built_at < settings.GAME_CATALOG_REFRESH_SECONDS
+        return now - self._checked_at < settings.GAME_CATALOG_VERSION_CHECK_SECONDS
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        """Return the current snapshot, rebuilding it if the version moved."""
+        now = time.monotonic()
+        if self._is_current(now):
+            return self._snapshot  # type: ignore[return-value]
+
+        async with self._lock:
+            now = time.monotonic()
+            if self._is_current(now):
+                return self._snapshot  # type: ignore[return-value]
+
+            version = await self._current_version()
+            self._checked_at = now
+            snapshot = self._snapshot
+            if snapshot is not None and settings.REDIS_URL and snapshot.version == version:
+                return snapshot
+
+            generation = self._generation
+            result = await db.execute(select(Game))
+            games = [GameSchema.model_validate(game) for game in result.scalars().all()]
+            snapshot = CatalogSnapshot.build(version, games)
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._built_at = now
+            return snapshot
+
+    async def bump(self) -> str:
+        """Publish a new catalog version after a game is created, updated or deleted."""
+        self.invalidate()
+        if settings.REDIS_URL:
+            return f"v{await cache_service.bump_namespace(CATALOG_NAMESPACE)}"
+        return self._local_version
+
+    def invalidate(self) -> None:
+        """Drop the local snapshot so the next read rebuilds it."""
+        self._local_version = uuid4().hex[:12]
+        self._generation += 1
+        self._snapshot = None
+
+
+game_catalog = GameCatalog()
+
+
+def _after_flush(session: Session, flush_context: Any) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Game):
+            session.info[_CHANGED_FLAG] = True
+            return
+
+
+def _after_commit(session: Session) -> None:
+    if session.info.pop(_CHANGED_FLAG, False):
+        game_catalog.invalidate()
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_FLAG, None)
+
+
+event.listen(Session, "after_flush", _after_flush)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
@@ -6,7 +6,10 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.game import Game
+from app.schemas.game import Game as GameSchema
 from app.schemas.game import GameCreate, GameUpdate
+from app.services.game_catalog import CatalogSnapshot, game_catalog
+from app.services.game_stats_service import GameStatsService
 
 
 class GameService:
@@ -23,49 +26,49 @@ class GameService:
         is_featured: Optional[bool] = None,
         page: int = 1,
         page_size: int = 20,
-    ) -> tuple[List[Game], int]:
-        """Get games with optional filters and pagination."""
+    ) -> tuple[List[GameSchema], int]:
+        """Get games with optional filters and pagination.
+
+        Served from the in-process catalog snapshot, so results are detached
+        ``Game`` schemas.
+        """
+
+        catalog = await game_catalog.get(db)
+        return catalog.filter(
+            category=category,
+            age_min=age_min,
+            age_max=age_max,
+            difficulty=difficulty,
+            is_published=is_published,
+            is_featured=is_featured,
+            page=page,
+            page_size=page_size,
+        )
 
-        query = select(Game).where(Game.is_published == is_published)
-
-        if category:
-            query = query.where(Game.category == category)
-        if age_min is not None:
-            query = query.where(Game.age_range_min >= age_min)
-        if age_max is not None:
-            query = query.where(Game.age_range_max <= age_max)
-        if difficulty:
-            query = query.where(Game.difficulty == difficulty)
-        if is_featured is not None:
-            query = query.where(Game.is_featured == is_featured)
-
-        from sqlalchemy import func
-
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar() or 0
-
-        query = query.order_by(Game.created_at.desc())
-        query = query.offset((page - 1) * page_size)
-        query = query.limit(page_size)
-
-        result = await db.execute(query)
-        games = result.scalars().all()
+    @staticmethod
+    async def get_catalog(db: AsyncSession) -> CatalogSnapshot:
+        """Current catalog snapshot, for callers resolving many games at once."""
 
-        return list(games), total
+        return await game_catalog.get(db)
 
     @staticmethod
-    async def get_by_slug(db: AsyncSession, slug: str) -> Optional[Game]:
+    async def get_by_slug(db: AsyncSession, slug: str) -> Optional[GameSchema]:
         """Get game by slug."""
 
-        query = select(Game).where(Game.slug == slug)
-        result = await db.execute(query)
-        return result.scalar_one_or_none()
+        catalog = await game_catalog.get(db)
+        return catalog.by_slug.get(slug)
 
     @staticmethod
-    async def get_by_id(db: AsyncSession, game_id: str) -> Optional[Game]:
+    async def get_by_id(db: AsyncSession, game_id: str) -> Optional[GameSchema]:
         """Get game by ID."""
 
+        catalog = await game_catalog.get(db)
+        return catalog.by_id.get(game_id)
+
+    @staticmethod
+    async def _get_model(db: AsyncSession, game_id: str) -> Optional[Game]:
+        """Load the ORM row for a write."""
+
         query = select(Game).where(Game.id == game_id)
         result = await db.execute(query)
         return result.scalar_one_or_none()
@@ -89,6 +92,9 @@ class GameService:
         db.add(game)
         await db.commit()
         await db.refresh(game)
+        # Stats resolve game names at read time; retire cached responses
+        await GameStatsService.bump_version()
+        await game_catalog.bump()
 
         return game
 
@@ -96,7 +102,7 @@ class GameService:
     async def update(db: AsyncSession, game_id: str, game_in: GameUpdate) -> Optional[Game]:
         """Update an existing game (admin only)."""
 
-        game = await GameService.get_by_id(db, game_id)
+        game = await GameService._get_model(db, game_id)
         if not game:
             return None
 
@@ -113,6 +119,8 @@ class GameService:
 
         await db.commit()
         await db.refresh(game)
+        await GameStatsService.bump_version()
+        await game_catalog.bump()
 
         return game
 
@@ -120,11 +128,13 @@ class GameService:
     async def delete(db: AsyncSession, game_id: str) -> bool:
         """Delete a game (admin only)."""
 
-        game = await GameService.get_by_id(db, game_id)
+        game = await GameService._get_model(db, game_id)
         if not game:
             return False
 
         await db.delete(game)
         await db.commit()
+        await GameStatsService.bump_version()
+        await game_catalog.bump()
 
         return True
@@ -0,0 +1,330 @@
+"""Pre-aggregated global game statistics.
+
+``game_stats_daily`` holds play counters per (game, UTC day, age bucket).
+Every ORM flush that inserts, updates or deletes ``activity_type == "game"``
+progress folds the change into those counters in the same transaction (see
+``_after_flush``); bulk Core inserts call ``record_rows`` explicitly.
+Deleting a profile or user removes its progress through the database's
+``ON DELETE CASCADE``, which no flush sees, so ``_before_flush`` subtracts
+that progress first.  Rows removed with raw SQL bypass both hooks; run
+``rebuild`` (``scripts/backfill_game_stats.py``) after such maintenance.
+``/games/stats`` then sums at most a few hundred rows per request.
+
+Cached responses are keyed by a stats version so a game rename or a rebuild
+can retire every cached variant at once with ``bump_version``.
+"""
+
+import logging
+import math
+from datetime import date, datetime
+from typing import Any, Iterable, Optional
+from uuid import uuid4
+
+from sqlalchemy import (
+    Float,
+    Integer,
+    and_,
+    case,
+    cast,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.game import Game
+from app.db.models.game_stats import GameStatsDaily
+from app.db.models.profile import Profile
+from app.db.models.progress import Progress
+from app.db.models.user import User
+from app.services.cache_service import cache_service
+
+logger = logging.getLogger(__name__)
+
+GAME_ACTIVITY = "game"
+STATS_NAMESPACE = "games:stats"
+_KEY_COLUMNS = ["game_key", "day", "age_bucket"]
+_COUNTED_FIELDS = ("completed", "duration_seconds", "completed_at", "content_id")
+
+# Version used when Redis isn't configured (single worker)
+_local_version = "1"
+
+
+def age_bucket(age: float) -> float:
+    """Floor an age to the half year."""
+    return math.floor(age * 2) / 2
+
+
+class GameStatsService:
+    """Maintains and reads ``game_stats_daily``."""
+
+    @staticmethod
+    def _fold(
+        rows: Iterable[tuple[int, dict[str, Any]]], ages: dict[str, float]
+    ) -> list[dict[str, Any]]:
+        """Fold signed progress snapshots into per-key counter deltas."""
+        deltas: dict[tuple[str, date, float], dict[str, Any]] = {}
+        for sign, row in rows:
+            age = ages.get(row["profile_id"])
+            if age is None or row.get("completed_at") is None:
+                continue
+            key = (row["content_id"], row["completed_at"].date(), age_bucket(age))
+            delta = deltas.setdefault(
+                key,
+                {
+                    "game_key": key[0],
+                    "day": key[1],
+                    "age_bucket": key[2],
+                    "plays": 0,
+                    "completed_sum": 0,
+                    "duration_sum": 0,
+                },
+            )
+            delta["plays"] += sign
+            delta["completed_sum"] += sign * int(bool(row.get("completed")))
+            delta["duration_sum"] += sign * int(row.get("duration_seconds") or 0)
+        return [d for d in deltas.values() if d["plays"] or d["duration_sum"] or d["completed_sum"]]
+
+    @staticmethod
+    def _upsert(session: Session, deltas: list[dict[str, Any]]) -> None:
+        connection = session.connection()
+        dialect = connection.dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(GameStatsDaily).values(deltas)
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(GameStatsDaily).values(deltas)
+        else:
+            logger.warning("Game stats counters are not maintained on %s", dialect)
+            return
+
+        excluded = stmt.excluded
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=_KEY_COLUMNS,
+                set_={
+                    "plays": GameStatsDaily.plays + excluded.plays,
+                    "completed_sum": GameStatsDaily.completed_sum + excluded.completed_sum,
+                    "duration_sum": GameStatsDaily.duration_sum + excluded.duration_sum,
+                },
+            )
+        )
+
+    @staticmethod
+    def record(session: Session, rows: list[tuple[int, dict[str, Any]]]) -> None:
+        """Apply signed (+1 insert / -1 delete) progress snapshots to the counters."""
+        rows = [(sign, row) for sign, row in rows if row.get("activity_type") == GAME_ACTIVITY]
+        if not rows:
+            return
+
+        profile_ids = {row["profile_id"] for _, row in rows}
+        result = session.connection().execute(
+            select(Profile.id, Profile.age).where(Profile.id.in_(profile_ids))
+        )
+        ages = {profile_id: age for profile_id, age in result.all()}
+
+        deltas = GameStatsService._fold(rows, ages)
+        if deltas:
+            GameStatsService._upsert(session, deltas)
+
+    @staticmethod
+    async def record_rows(db: AsyncSession, rows: Iterable[dict[str, Any]]) -> None:
+        """Count rows written with a Core insert (which bypasses flush events)."""
+        signed = [(1, row) for row in rows]
+        if signed:
+            await db.run_sync(GameStatsService.record, signed)
+
+    @staticmethod
+    def _counters_query(dialect: str):
+        """Counter rows aggregated from ``progress``, in ``game_stats_daily`` column order."""
+        # Same flooring as age_bucket(); Postgres rounds on CAST, SQLite truncates
+        if dialect == "postgresql":
+            bucket = func.floor(Profile.age * 2) / 2
+        else:
+            bucket = cast(cast(Profile.age * 2, Integer), Float) / 2
+        day = func.date(Progress.completed_at)
+        return (
+            select(
+                Progress.content_id,
+                day,
+                bucket,
+                func.count(),
+                func.sum(case((Progress.completed, 1), else_=0)),
+                func.coalesce(func.sum(Progress.duration_seconds), 0),
+            )
+            .join(Profile, Profile.id == Progress.profile_id)
+            .where(Progress.activity_type == GAME_ACTIVITY)
+            # Rows the flush hook skips (no timestamp or no age) aren't counted
+            .where(Progress.completed_at.is_not(None), Profile.age.is_not(None))
+            .group_by(Progress.content_id, day, bucket)
+        )
+
+    @staticmethod
+    def _before_flush(session: Session, flush_context: Any, instances: Any) -> None:
+        """Subtract the game progress of profiles about to be deleted."""
+        profile_ids = {obj.id for obj in session.deleted if isinstance(obj, Profile)}
+        user_ids = [obj.id for obj in session.deleted if isinstance(obj, User)]
+        if not profile_ids and not user_ids:
+            return
+
+        connection = session.connection()
+        if user_ids:
+            result = connection.execute(select(Profile.id).where(Profile.parent_id.in_(user_ids)))
+            profile_ids.update(result.scalars())
+        # Progress deleted through the ORM is subtracted by _after_flush
+        deleted_progress = [obj.id for obj in session.deleted if isinstance(obj, Progress)]
+        query = GameStatsService._counters_query(connection.dialect.name).where(
+            Progress.profile_id.in_(profile_ids)
+        )
+        if deleted_progress:
+            query = query.where(Progress.id.not_in(deleted_progress))
+
+        deltas = []
+        for game_key, day, bucket, plays, completed_sum, duration_sum in connection.execute(query):
+            if isinstance(day, str):
+                day = datetime.fromisoformat(day).date()
+            deltas.append(
+                {
+                    "game_key": game_key,
+                    "day": day,
+                    "age_bucket": float(bucket),
+                    "plays": -int(plays),
+                    "completed_sum": -int(completed_sum or 0),
+                    "duration_sum": -int(duration_sum or 0),
+                }
+            )
+        if deltas:
+            GameStatsService._upsert(session, deltas)
+
+    @staticmethod
+    def _after_flush(session: Session, flush_context: Any) -> None:
+        rows: list[tuple[int, dict[str, Any]]] = []
+        for obj in session.new:
+            if isinstance(obj, Progress):
+                rows.append((1, dict(inspect(obj).dict)))
+        for obj in session.deleted:
+            if isinstance(obj, Progress):
+                rows.append((-1, dict(inspect(obj).dict)))
+        for obj in session.dirty:
+            if not isinstance(obj, Progress):
+                continue
+            state = inspect(obj)
+            if not any(state.attrs[f].history.has_changes() for f in _COUNTED_FIELDS):
+                continue
+            current = dict(state.dict)
+            previous = dict(current)
+            for field in _COUNTED_FIELDS:
+                history = state.attrs[field].history
+                if history.deleted:
+                    previous[field] = history.deleted[0]
+            rows.append((-1, previous))
+            rows.append((1, current))
+        if rows:
+            GameStatsService.record(session, rows)
+
+    @staticmethod
+    async def get_stats(
+        db: AsyncSession,
+        since: Optional[date] = None,
+        age_min: Optional[float] = None,
+        age_max: Optional[float] = None,
+    ) -> list[dict[str, Any]]:
+        """Sum the counters per game.
+
+        The counters are only as fine as their keys, so two filters are
+        approximate: ``since`` matches whole UTC days, and the age range is
+        applied to half-year buckets.  A bound between buckets is moved
+        inwards to the nearest bucket edge; an ``age_max`` on a bucket edge
+        keeps that bucket, i.e. ages up to ``age_max + 0.5`` (exclusive).
+
+        Returns dicts with ``game_key``, ``game_name``, ``total_plays``,
+        ``avg_session_minutes`` and ``completion_rate``.
+        """
+        filters = [GameStatsDaily.plays > 0]
+        if since is not None:
+            filters.append(GameStatsDaily.day >= since)
+        if age_min is not None:
+            filters.append(GameStatsDaily.age_bucket >= math.ceil(age_min * 2) / 2)
+        if age_max is not None:
+            upper = age_bucket(age_max)
+            if upper != age_max:
+                # The bucket holding age_max also holds ages above it
+                upper -= 0.5
+            filters.append(GameStatsDaily.age_bucket <= upper)
+
+        plays = func.sum(GameStatsDaily.plays)
+        game_name = func.coalesce(Game.title, GameStatsDaily.game_key)
+        stmt = (
+            select(
+                GameStatsDaily.game_key,
+                game_name.label("game_name"),
+                plays.label("total_plays"),
+                func.sum(GameStatsDaily.duration_sum).label("duration_sum"),
+                func.sum(GameStatsDaily.completed_sum).label("completed_sum"),
+            )
+            .outerjoin(Game, Game.slug == GameStatsDaily.game_key)
+            .where(and_(*filters))
+            .group_by(GameStatsDaily.game_key, game_name)
+        )
+
+        stats = []
+        for row in (await db.execute(stmt)).all():
+            total_plays = int(row.total_plays or 0)
+            if total_plays <= 0:
+                continue
+            stats.append(
+                {
+                    "game_key": str(row.game_key),
+                    "game_name": str(row.game_name),
+                    "total_plays": total_plays,
+                    "avg_session_minutes": float(row.duration_sum or 0) / total_plays / 60.0,
+                    "completion_rate": float(row.completed_sum or 0) / total_plays,
+                }
+            )
+        return stats
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> int:
+        """Recompute every counter from ``progress`` and retire cached responses."""
+        query = GameStatsService._counters_query(db.get_bind().dialect.name)
+        await db.execute(delete(GameStatsDaily))
+        await db.execute(
+            insert(GameStatsDaily).from_select(
+                ["game_key", "day", "age_bucket", "plays", "completed_sum", "duration_sum"],
+                query,
+            )
+        )
+        await db.commit()
+        await GameStatsService.bump_version()
+
+        count = await db.execute(select(func.count()).select_from(GameStatsDaily))
+        return int(count.scalar_one())
+
+    @staticmethod
+    async def get_version() -> str:
+        """Current stats version, used as part of every cached response key.
+
+        With Redis this is the ``games:stats`` cache namespace version, so a
+        bump on any worker retires every cached response with one INCR.
+        """
+        if not settings.REDIS_URL:
+            return _local_version
+        return str(await cache_service.namespace_version(STATS_NAMESPACE))
+
+    @staticmethod
+    async def bump_version() -> str:
+        """Retire every cached stats response (e.g. after a game is renamed)."""
+        global _local_version
+        _local_version = uuid4().hex[:12]
+        if settings.REDIS_URL:
+            return str(await cache_service.bump_namespace(STATS_NAMESPACE))
+        return _local_version
+
+
+event.listen(Session, "before_flush", GameStatsService._before_flush)
+event.listen(Session, "after_flush", GameStatsService._after_flush)
@@ -0,0 +1,190 @@
+"""Async payment gateway interface, circuit breaker and in-process fake.
+
+Endpoints talk to a ``PaymentGateway`` obtained from ``get_dodo_client()``:
+``DodoPaymentService`` in normal operation, or ``FakePaymentGateway`` when
+``PAYMENT_GATEWAY=fake`` (load tests, local development without Dodo).
+"""
+
+import abc
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from typing import Optional
+from uuid import uuid4
+
+from app.db.models.subscription_model import SubscriptionPlanType
+from app.services.subscription_service import PLAN_PRICES
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentGatewayUnavailable(Exception):
+    """Raised when the payment provider can't be reached or is shedding load."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def compute_webhook_signature(
+    secret: str, webhook_id: str, webhook_timestamp: str, payload: bytes
+) -> str:
+    """HMAC-SHA256 over ``"{webhook_id}.{webhook_timestamp}.{raw_payload}"``."""
+    message_to_sign = f"{webhook_id}.{webhook_timestamp}.".encode() + payload
+    return hmac.new(secret.encode(), message_to_sign, hashlib.sha256).hexdigest()
+
+
+class CircuitBreaker:
+    """Fail fast after repeated provider failures.
+
+    Closed until ``failure_threshold`` consecutive failures, then open for
+    ``reset_seconds``; after that a single trial call is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+
+    def before_call(self) -> None:
+        """Raise PaymentGatewayUnavailable unless a call may proceed."""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        retry_after = self.reset_seconds
+        if self.opened_at is not None:
+            retry_after = max(self.reset_seconds - (time.monotonic() - self.opened_at), 1.0)
+        raise PaymentGatewayUnavailable("Payment provider temporarily unavailable", retry_after)
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Give up a half-open trial that ended without an outcome (e.g. cancelled)."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning("Payment provider circuit opened after %d failures", self.failures)
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class PaymentGateway(abc.ABC):
+    """Operations the subscription endpoints need from a payment provider."""
+
+    @abc.abstractmethod
+    async def create_checkout_session(
+        self,
+        plan_type: SubscriptionPlanType,
+        user_id: str,
+        user_email: str,
+        success_url: str,
+        cancel_url: str,
+    ) -> dict:
+        """Create a checkout session; returns ``checkout_url`` and ``session_id``."""
+
+    @abc.abstractmethod
+    async def get_payment_status(self, session_id: str) -> dict:
+        """Return ``id``, ``status``, ``customer_email``, ``metadata`` and ``amount_paid``."""
+
+    @abc.abstractmethod
+    def verify_webhook_signature(
+        self, payload: bytes, webhook_id: str, webhook_timestamp: str, webhook_signature: str
+    ) -> bool:
+        """Check a webhook's signature headers against its raw body."""
+
+    async def aclose(self) -> None:
+        """Release pooled connections."""
+
+
+class FakePaymentGateway(PaymentGateway):
+    """In-process gateway that completes every checkout immediately.
+
+    ``latency_seconds`` simulates provider round-trips for load tests.
+    Webhooks are verified with ``webhook_secret`` using the Dodo scheme, and
+    ``sign_webhook`` produces matching headers for test clients.
+    """
+
+    def __init__(self, webhook_secret: str, latency_seconds: float = 0.0):
+        if not webhook_secret:
+            raise ValueError("A webhook secret is required to initialize the fake gateway")
+        self.latency_seconds = latency_seconds
+        self.webhook_secret = webhook_secret
+        self.sessions: dict[str, dict] = {}
+
+    async def _simulate_latency(self) -> None:
+        if self.latency_seconds > 0:
+            await asyncio.sleep(self.latency_seconds)
+
+    async def create_checkout_session(
+        self,
+        plan_type: SubscriptionPlanType,
+        user_id: str,
+        user_email: str,
+        success_url: str,
+        cancel_url: str,
+    ) -> dict:
+        await self._simulate_latency()
+        session_id = f"fake_{uuid4().hex}"
+        self.sessions[session_id] = {
+            "id": session_id,
+            "status": "completed",
+            "customer_email": user_email,
+            "metadata": {
+                "user_id": user_id,
+                "plan_type": plan_type.value,
+                "expected_amount": PLAN_PRICES[plan_type],
+            },
+            "amount_paid": PLAN_PRICES[plan_type],
+        }
+        return {
+            "checkout_url": f"{success_url}?session_id={session_id}",
+            "session_id": session_id,
+        }
+
+    async def get_payment_status(self, session_id: str) -> dict:
+        await self._simulate_latency()
+        if session_id not in self.sessions:
+            raise ValueError(f"Unknown checkout session {session_id}")
+        return dict(self.sessions[session_id])
+
+    def sign_webhook(self, payload: bytes, webhook_id: Optional[str] = None) -> dict[str, str]:
+        """Headers a real Dodo delivery of ``payload`` would carry."""
+        webhook_id = webhook_id or f"fake_wh_{uuid4().hex}"
+        timestamp = str(int(time.time()))
+        return {
+            "webhook-id": webhook_id,
+            "webhook-timestamp": timestamp,
+            "webhook-signature": compute_webhook_signature(
+                self.webhook_secret, webhook_id, timestamp, payload
+            ),
+        }
+
+    def verify_webhook_signature(
+        self, payload: bytes, webhook_id: str, webhook_timestamp: str, webhook_signature: str
+    ) -> bool:
+        expected = compute_webhook_signature(
+            self.webhook_secret, webhook_id, webhook_timestamp, payload
+        )
+        return hmac.compare_digest(expected, webhook_signature)
@@ -0,0 +1,96 @@
+"""Authenticated-principal cache for the request auth hot path.
+
+``get_current_principal`` resolves every authenticated request to an
+``AuthPrincipal``.  Without caching that costs a ``users`` load per request
+(the revocation check is answered by ``revocation_index``).  Principals are
+keyed by the token ``sub`` and live in a per-worker LRU with TTL.  When
+``REDIS_URL`` is configured they are also written through ``CacheService`` so
+other workers can warm from Redis instead of the database.  Writes that
+change what a principal is allowed to do (role change, deactivation,
+deletion) must call ``invalidate_user``.
+"""
+
+import logging
+from typing import Optional
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.schemas.user import AuthPrincipal
+from app.services.cache_service import CacheService, cache_key, cache_service
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_KEY_PREFIX = "auth:principal"
+
+
+class PrincipalCacheService:
+    """Two-tier (local LRU + optional Redis) cache of authenticated principals."""
+
+    def __init__(
+        self,
+        cache: Optional[CacheService] = None,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self._cache = cache
+        self.ttl_seconds = ttl_seconds or settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+        maxsize = max_entries or settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES
+        self._principals: TTLCache[str, AuthPrincipal] = TTLCache(
+            maxsize=maxsize, ttl=self.ttl_seconds
+        )
+
+    def _remote(self) -> Optional[CacheService]:
+        """Return the shared cache tier, or None when Redis isn't configured."""
+        if self._cache is None or not settings.REDIS_URL:
+            return None
+        return self._cache
+
+    async def get_principal(self, user_id: str) -> Optional[AuthPrincipal]:
+        """Get a cached principal by user ID (``sub`` claim)."""
+        principal = self._principals.get(user_id)
+        if principal is not None:
+            return principal
+
+        remote = self._remote()
+        if remote is None:
+            return None
+
+        # The local tier above already plays L1's role
+        data = await remote.get(cache_key(PRINCIPAL_KEY_PREFIX, user_id), local_ttl=0)
+        if not data:
+            return None
+        try:
+            principal = AuthPrincipal.model_validate(data)
+        except ValueError:
+            logger.warning("Discarding malformed cached principal for user %s", user_id)
+            return None
+
+        self._principals[user_id] = principal
+        return principal
+
+    async def set_principal(self, principal: AuthPrincipal) -> None:
+        """Cache a principal locally and in the shared tier."""
+        self._principals[principal.id] = principal
+        remote = self._remote()
+        if remote is not None:
+            await remote.set(
+                cache_key(PRINCIPAL_KEY_PREFIX, principal.id),
+                principal.model_dump(mode="json"),
+                ttl=self.ttl_seconds,
+                local_ttl=0,
+            )
+
+    async def invalidate_user(self, user_id: str) -> None:
+        """Drop a cached principal after a role change, deactivation or deletion."""
+        self._principals.pop(user_id, None)
+        remote = self._remote()
+        if remote is not None:
+            await remote.delete(cache_key(PRINCIPAL_KEY_PREFIX, user_id))
+
+    def clear(self) -> None:
+        """Clear the local tier (used by tests and on shutdown)."""
+        self._principals.clear()
+
+
+principal_cache = PrincipalCacheService(cache=cache_service)
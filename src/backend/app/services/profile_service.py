@@ -5,23 +5,37 @@ from typing import List, Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.loaders import ProfileLoad, profile_load_options
 from app.db.models.profile import Profile
 from app.schemas.profile import ProfileCreate, ProfileUpdate
+from app.services.data_export_service import DataExportService
 
 
 class ProfileService:
     """Profile service."""
 
     @staticmethod
-    async def get_by_id(db: AsyncSession, profile_id: str) -> Optional[Profile]:
-        """Get profile by ID."""
-        result = await db.execute(select(Profile).where(Profile.id == profile_id))
+    async def get_by_id(
+        db: AsyncSession, profile_id: str, load: ProfileLoad = ProfileLoad.SUMMARY
+    ) -> Optional[Profile]:
+        """Get profile by ID, loading only the relationships ``load`` asks for."""
+        result = await db.execute(
+            select(Profile)
+            .where(Profile.id == profile_id)
+            .options(*profile_load_options(load))
+        )
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def get_by_parent(db: AsyncSession, parent_id: str) -> List[Profile]:
-        """Get profiles by parent ID."""
-        result = await db.execute(select(Profile).where(Profile.parent_id == parent_id))
+    async def get_by_parent(
+        db: AsyncSession, parent_id: str, load: ProfileLoad = ProfileLoad.SUMMARY
+    ) -> List[Profile]:
+        """Get profiles by parent ID, loading only the relationships ``load`` asks for."""
+        result = await db.execute(
+            select(Profile)
+            .where(Profile.parent_id == parent_id)
+            .options(*profile_load_options(load))
+        )
         return list(result.scalars().all())
 
     @staticmethod
@@ -38,6 +52,7 @@ class ProfileService:
         )
         db.add(profile)
         await db.commit()
+        await DataExportService.invalidate_summary(parent_id)
         await db.refresh(profile)
         return profile
 
@@ -60,3 +75,4 @@ class ProfileService:
         """Delete profile."""
         await db.delete(profile)
         await db.commit()
+        await DataExportService.invalidate_summary(profile.parent_id)
@@ -0,0 +1,196 @@
+"""Maintenance of the per-profile progress rollup table."""
+
+import logging
+from datetime import datetime
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import case, delete, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.profile import Profile
+from app.db.models.progress import Progress
+from app.db.models.progress_rollup import ProfileProgressRollup
+
+logger = logging.getLogger(__name__)
+
+Rollup = ProfileProgressRollup
+_KEY_COLUMNS = ["profile_id", "activity_type", "content_id"]
+
+
+def _max_or_none(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+class ProgressRollupService:
+    """Keeps ``profile_progress_rollup`` in step with ``progress``.
+
+    All methods run inside the caller's transaction and never commit, except
+    ``backfill`` which commits once per chunk.
+    """
+
+    @staticmethod
+    def _aggregate(profile_id: str, rows: Iterable[Any]) -> List[dict[str, Any]]:
+        """Fold progress rows (ORM objects or mappings) into per-key deltas."""
+        deltas: dict[tuple[str, str], dict[str, Any]] = {}
+        for row in rows:
+            get = row.get if isinstance(row, dict) else lambda k, r=row: getattr(r, k)
+            key = (get("activity_type"), get("content_id"))
+            score = get("score") or 0
+            delta = deltas.get(key)
+            if delta is None:
+                delta = deltas[key] = {
+                    "profile_id": profile_id,
+                    "activity_type": key[0],
+                    "content_id": key[1],
+                    "attempts": 0,
+                    "total_score": 0,
+                    "best_score": score,
+                    "total_duration_seconds": 0,
+                    "last_completed_at": None,
+                    "completed": False,
+                }
+            delta["attempts"] += 1
+            delta["total_score"] += score
+            delta["best_score"] = max(delta["best_score"], score)
+            delta["total_duration_seconds"] += get("duration_seconds") or 0
+            delta["last_completed_at"] = _max_or_none(
+                delta["last_completed_at"], get("completed_at")
+            )
+            delta["completed"] = delta["completed"] or bool(get("completed"))
+        return list(deltas.values())
+
+    @staticmethod
+    async def apply(db: AsyncSession, profile_id: str, rows: Iterable[Any]) -> None:
+        """Fold newly inserted progress rows into the rollup with one upsert."""
+        deltas = ProgressRollupService._aggregate(profile_id, rows)
+        if not deltas:
+            return
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(Rollup).values(deltas)
+            greatest = func.greatest
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(Rollup).values(deltas)
+            greatest = func.max
+        else:
+            for delta in deltas:
+                await ProgressRollupService.refresh(
+                    db, profile_id, delta["activity_type"], delta["content_id"]
+                )
+            return
+
+        excluded = stmt.excluded
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=_KEY_COLUMNS,
+                set_={
+                    "attempts": Rollup.attempts + excluded.attempts,
+                    "total_score": Rollup.total_score + excluded.total_score,
+                    "best_score": greatest(Rollup.best_score, excluded.best_score),
+                    "total_duration_seconds": (
+                        Rollup.total_duration_seconds + excluded.total_duration_seconds
+                    ),
+                    "last_completed_at": func.coalesce(
+                        greatest(Rollup.last_completed_at, excluded.last_completed_at),
+                        Rollup.last_completed_at,
+                        excluded.last_completed_at,
+                    ),
+                    "completed": or_(Rollup.completed, excluded.completed),
+                },
+            )
+        )
+
+    @staticmethod
+    def _aggregate_select():
+        """SELECT producing rollup rows from ``progress``, in column order."""
+        return select(
+            Progress.profile_id,
+            Progress.activity_type,
+            Progress.content_id,
+            func.count(),
+            func.coalesce(func.sum(Progress.score), 0),
+            func.coalesce(func.max(Progress.score), 0),
+            func.coalesce(func.sum(Progress.duration_seconds), 0),
+            func.max(Progress.completed_at),
+            func.max(case((Progress.completed, 1), else_=0)) == 1,
+        ).group_by(Progress.profile_id, Progress.activity_type, Progress.content_id)
+
+    @staticmethod
+    async def _insert_from_progress(db: AsyncSession, *criteria: Any) -> None:
+        query = ProgressRollupService._aggregate_select().where(*criteria)
+        await db.execute(
+            insert(Rollup).from_select(
+                [
+                    "profile_id",
+                    "activity_type",
+                    "content_id",
+                    "attempts",
+                    "total_score",
+                    "best_score",
+                    "total_duration_seconds",
+                    "last_completed_at",
+                    "completed",
+                ],
+                query,
+            )
+        )
+
+    @staticmethod
+    async def refresh(
+        db: AsyncSession, profile_id: str, activity_type: str, content_id: str
+    ) -> None:
+        """Recompute one rollup row from ``progress`` (after an update or delete)."""
+        await db.execute(
+            delete(Rollup).where(
+                Rollup.profile_id == profile_id,
+                Rollup.activity_type == activity_type,
+                Rollup.content_id == content_id,
+            )
+        )
+        await ProgressRollupService._insert_from_progress(
+            db,
+            Progress.profile_id == profile_id,
+            Progress.activity_type == activity_type,
+            Progress.content_id == content_id,
+        )
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, profile_ids: List[str]) -> None:
+        """Recompute every rollup row for the given profiles."""
+        if not profile_ids:
+            return
+        await db.execute(delete(Rollup).where(Rollup.profile_id.in_(profile_ids)))
+        await ProgressRollupService._insert_from_progress(
+            db, Progress.profile_id.in_(profile_ids)
+        )
+
+    @staticmethod
+    async def backfill(db: AsyncSession, chunk_size: int = 500) -> int:
+        """Rebuild the rollup for every profile, ``chunk_size`` profiles per transaction.
+
+        Profiles are walked in primary-key order so the job can be interrupted
+        and re-run safely; each chunk replaces its profiles' rows wholesale.
+        Returns the number of profiles processed.
+        """
+        processed = 0
+        last_id: Optional[str] = None
+        while True:
+            query = select(Profile.id).order_by(Profile.id).limit(chunk_size)
+            if last_id is not None:
+                query = query.where(Profile.id > last_id)
+            profile_ids = list((await db.execute(query)).scalars().all())
+            if not profile_ids:
+                return processed
+
+            await ProgressRollupService.rebuild(db, profile_ids)
+            await db.commit()
+
+            processed += len(profile_ids)
+            last_id = profile_ids[-1]
+            logger.info("Progress rollup backfill: %d profiles processed", processed)
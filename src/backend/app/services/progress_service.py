@@ -1,17 +1,46 @@
 """Progress service for business logic."""
 
+import base64
+import binascii
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, AsyncIterator, List, Optional, Tuple
+from uuid import uuid4
 
-from sqlalchemy import desc, select
+from cachetools import TTLCache
+from pydantic import ValidationError
+from sqlalchemy import Select, and_, desc, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.db.models.progress import Progress
+from app.db.models.progress_rollup import ProfileProgressRollup
 from app.schemas.progress import ProgressCreate, ProgressUpdate
+from app.services.cache_service import cache_key, cache_service
+from app.services.game_stats_service import GameStatsService
+from app.services.progress_rollup_service import ProgressRollupService
 
 settings = get_settings()
 
+# Score at or above which a content item counts as completed in stats
+COMPLETION_SCORE = 80
+STATS_KEY_PREFIX = "progress:stats"
+# Cache tag carried by entries derived from a profile's progress; dropped on
+# every progress write (see ``invalidate_stats``)
+PROGRESS_TAG_PREFIX = "progress:profile"
+
+# Local per-profile stats cache, used when Redis isn't configured
+_STATS_CACHE: TTLCache[str, dict[str, Any]] = TTLCache(
+    maxsize=settings.PROGRESS_STATS_CACHE_MAX_ENTRIES,
+    ttl=max(settings.PROGRESS_STATS_CACHE_TTL_SECONDS, 1),
+)
+
+
+def progress_tag(profile_id: str) -> str:
+    """Cache tag for entries that must be dropped when a profile's progress changes."""
+    return cache_key(PROGRESS_TAG_PREFIX, profile_id)
+
 
 class DuplicateProgressError(Exception):
     """Raised when an idempotency_key for a profile already exists."""
@@ -21,6 +50,10 @@ class DuplicateProgressError(Exception):
         self.existing_id = existing_id
 
 
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded."""
+
+
 class ProgressService:
     """Progress service."""
 
@@ -45,15 +78,194 @@ class ProgressService:
         result = await db.execute(select(Progress).where(Progress.id == progress_id))
         return result.scalar_one_or_none()
 
+    @staticmethod
+    def _to_naive_utc(value: datetime) -> datetime:
+        if value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    @staticmethod
+    def encode_cursor(progress: Progress) -> str:
+        """Encode the keyset position just after ``progress``."""
+        raw = f"{progress.completed_at.isoformat()}|{progress.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        """Decode a cursor produced by ``encode_cursor``."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            completed_at, progress_id = (
+                base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+            )
+            return datetime.fromisoformat(completed_at), progress_id
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise InvalidCursorError("Invalid cursor") from e
+
+    @staticmethod
+    def _history_query(
+        profile_id: str,
+        activity_type: Optional[str] = None,
+        content_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Select:
+        """Newest-first history query served by ``ix_progress_profile_completed_at_id``."""
+        query = select(Progress).where(Progress.profile_id == profile_id)
+        if activity_type is not None:
+            query = query.where(Progress.activity_type == activity_type)
+        if content_id is not None:
+            query = query.where(Progress.content_id == content_id)
+        if since is not None:
+            query = query.where(Progress.completed_at >= ProgressService._to_naive_utc(since))
+        if until is not None:
+            query = query.where(Progress.completed_at < ProgressService._to_naive_utc(until))
+        return query.order_by(desc(Progress.completed_at), Progress.id)
+
     @staticmethod
     async def get_by_profile(db: AsyncSession, profile_id: str) -> List[Progress]:
         """Get progress by profile ID."""
+        result = await db.execute(ProgressService._history_query(profile_id))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_page(
+        db: AsyncSession,
+        profile_id: str,
+        limit: Optional[int],
+        cursor: Optional[str] = None,
+        activity_type: Optional[str] = None,
+        content_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Tuple[List[Progress], Optional[str]]:
+        """Get one newest-first page of progress and the cursor for the next page.
+
+        Pages are keyed on ``(completed_at, id)`` so each page is an index
+        range scan regardless of depth. The returned cursor is None on the
+        last page. With no ``limit`` every remaining row is returned.
+        """
+        query = ProgressService._history_query(
+            profile_id, activity_type, content_id, since, until
+        )
+        if cursor:
+            after_completed_at, after_id = ProgressService.decode_cursor(cursor)
+            query = query.where(
+                or_(
+                    Progress.completed_at < after_completed_at,
+                    and_(Progress.completed_at == after_completed_at, Progress.id > after_id),
+                )
+            )
+
+        if limit is None:
+            result = await db.execute(query)
+            return list(result.scalars().all()), None
+
+        result = await db.execute(query.limit(limit + 1))
+        rows = list(result.scalars().all())
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, ProgressService.encode_cursor(rows[-1])
+
+    @staticmethod
+    async def stream_by_profile(
+        db: AsyncSession,
+        profile_id: str,
+        activity_type: Optional[str] = None,
+        content_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[Progress]:
+        """Yield a profile's full history newest-first without buffering it."""
+        query = ProgressService._history_query(
+            profile_id, activity_type, content_id, since, until
+        ).execution_options(yield_per=chunk_size)
+        result = await db.stream_scalars(query)
+        async for progress in result:
+            yield progress
+
+    @staticmethod
+    async def get_stats(
+        db: AsyncSession, profile_id: str, use_cache: bool = True
+    ) -> dict[str, Any]:
+        """Get progress statistics for a profile.
+
+        Computed in one aggregate query over ``profile_progress_rollup``, so
+        the cost scales with distinct content rather than the profile's full
+        history.
+        """
+        ttl = settings.PROGRESS_STATS_CACHE_TTL_SECONDS
+        use_cache = use_cache and ttl > 0
+        key = cache_key(STATS_KEY_PREFIX, profile_id)
+
+        if use_cache:
+            cached = await ProgressService._get_cached_stats(key)
+            if cached is not None:
+                return cached
+
+        rollup = ProfileProgressRollup
         result = await db.execute(
-            select(Progress)
-            .where(Progress.profile_id == profile_id)
-            .order_by(desc(Progress.completed_at))
+            select(
+                rollup.content_id,
+                func.sum(rollup.attempts),
+                func.sum(rollup.total_score),
+                func.max(rollup.best_score),
+            )
+            .where(rollup.profile_id == profile_id)
+            .group_by(rollup.content_id)
+        )
+
+        total_activities = 0
+        total_score = 0
+        completed_content: List[str] = []
+        for content_id, attempts, score_sum, best_score in result.all():
+            total_activities += int(attempts)
+            total_score += int(score_sum)
+            if best_score is not None and best_score >= COMPLETION_SCORE:
+                completed_content.append(content_id)
+        completed_content.sort()
+
+        avg_score = total_score / total_activities if total_activities > 0 else 0
+        stats = {
+            "total_activities": total_activities,
+            "total_score": total_score,
+            "average_score": round(avg_score, 2),
+            "completed_content": completed_content,
+            "completion_count": len(completed_content),
+        }
+
+        if use_cache:
+            await ProgressService._set_cached_stats(key, stats, ttl)
+        return stats
+
+    @staticmethod
+    async def _get_cached_stats(key: str) -> Optional[dict[str, Any]]:
+        if settings.REDIS_URL:
+            return await cache_service.get(key)
+        return _STATS_CACHE.get(key)
+
+    @staticmethod
+    async def _set_cached_stats(key: str, stats: dict[str, Any], ttl: int) -> None:
+        if settings.REDIS_URL:
+            await cache_service.set(key, stats, ttl=ttl)
+        else:
+            _STATS_CACHE[key] = stats
+
+    @staticmethod
+    async def invalidate_stats(profile_id: str) -> None:
+        """Drop cached stats for a profile after its progress changes.
+
+        Also drops every entry tagged with ``progress_tag(profile_id)``.
+        """
+        key = cache_key(STATS_KEY_PREFIX, profile_id)
+        _STATS_CACHE.pop(key, None)
+        if settings.REDIS_URL:
+            await cache_service.delete(key)
+        await cache_service.invalidate_tag(
+            progress_tag(profile_id), remote=bool(settings.REDIS_URL)
         )
-        return list(result.scalars().all())
 
     @staticmethod
     async def create(
@@ -117,6 +329,8 @@ class ProgressService:
         db.add(progress)
 
         try:
+            await db.flush()
+            await ProgressRollupService.apply(db, profile_id, [progress])
             await db.commit()
         except Exception:
             # If an integrity error occurs due to a unique constraint, convert to DuplicateProgressError
@@ -136,9 +350,173 @@ class ProgressService:
                     )
             raise
 
+        await ProgressService.invalidate_stats(profile_id)
         await db.refresh(progress)
         return progress
 
+    @staticmethod
+    def _build_row(profile_id: str, data: ProgressCreate) -> dict[str, Any]:
+        """Build a column mapping for a bulk insert, with client-side defaults applied."""
+        completed_at = None
+        if settings.USE_CLIENT_EVENT_TIME:
+            completed_at = ProgressService._parse_client_timestamp(data.timestamp)
+
+        return {
+            "id": str(uuid4()),
+            "profile_id": profile_id,
+            "activity_type": data.activity_type,
+            "content_id": data.content_id,
+            "score": data.score,
+            "duration_seconds": data.duration_seconds,
+            "meta_data": data.meta_data or {},
+            "idempotency_key": data.idempotency_key,
+            "completed": data.completed,
+            "completed_at": completed_at or datetime.utcnow(),
+        }
+
+    @staticmethod
+    async def create_many(
+        db: AsyncSession, profile_id: str, items: List[Any]
+    ) -> List[dict[str, Any]]:
+        """Create a batch of progress entries in one INSERT and one commit.
+
+        Items are validated up front; rows whose ``idempotency_key`` already
+        exists for the profile (or repeats earlier in the batch) are skipped by
+        ``ON CONFLICT DO NOTHING`` and reported as duplicates.
+
+        Returns one result per input item, in order, shaped like
+        ``{"idempotency_key", "status": "ok"|"duplicate"|"error", "server_id"|"error"}``.
+        """
+        results: List[dict[str, Any]] = [{} for _ in items]
+        rows: List[dict[str, Any]] = []
+        row_index: List[int] = []
+        first_by_key: dict[str, int] = {}
+        repeats: dict[int, str] = {}
+
+        for i, item in enumerate(items):
+            key = item.get("idempotency_key") if isinstance(item, dict) else None
+            try:
+                data = (
+                    item
+                    if isinstance(item, ProgressCreate)
+                    else ProgressCreate.model_validate(item)
+                )
+            except ValidationError as e:
+                results[i] = {"idempotency_key": key, "status": "error", "error": str(e)}
+                continue
+
+            key = data.idempotency_key
+            if key and key in first_by_key:
+                repeats[i] = key
+                continue
+            if key:
+                first_by_key[key] = len(rows)
+
+            rows.append(ProgressService._build_row(profile_id, data))
+            row_index.append(i)
+
+        inserted: set[str] = set()
+        if rows:
+            try:
+                inserted = await ProgressService._insert_ignoring_duplicates(db, rows)
+                inserted_rows = [row for row in rows if row["id"] in inserted]
+                await ProgressRollupService.apply(db, profile_id, inserted_rows)
+                # Core inserts bypass the flush hook that maintains game stats
+                await GameStatsService.record_rows(db, inserted_rows)
+                await db.commit()
+            except DBAPIError:
+                # Don't let one bad row fail the whole batch: retry item by item
+                await db.rollback()
+                return await ProgressService._create_each(db, profile_id, items)
+            if inserted:
+                await ProgressService.invalidate_stats(profile_id)
+
+        conflicting = [
+            row["idempotency_key"]
+            for row in rows
+            if row["id"] not in inserted and row["idempotency_key"]
+        ]
+        existing_ids: dict[str, str] = {}
+        if conflicting:
+            result = await db.execute(
+                select(Progress.idempotency_key, Progress.id).where(
+                    Progress.profile_id == profile_id,
+                    Progress.idempotency_key.in_(conflicting),
+                )
+            )
+            existing_ids = {key: str(id_) for key, id_ in result.all()}
+
+        for row, i in zip(rows, row_index):
+            key = row["idempotency_key"]
+            if row["id"] in inserted:
+                results[i] = {"idempotency_key": key, "status": "ok", "server_id": row["id"]}
+            else:
+                results[i] = {
+                    "idempotency_key": key,
+                    "status": "duplicate",
+                    "server_id": existing_ids.get(key),
+                }
+
+        for i, key in repeats.items():
+            first = rows[first_by_key[key]]
+            server_id = first["id"] if first["id"] in inserted else existing_ids.get(key)
+            results[i] = {"idempotency_key": key, "status": "duplicate", "server_id": server_id}
+
+        return results
+
+    @staticmethod
+    async def _insert_ignoring_duplicates(
+        db: AsyncSession, rows: List[dict[str, Any]]
+    ) -> set[str]:
+        """Insert rows, skipping idempotency-key conflicts; return the inserted IDs."""
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(Progress).on_conflict_do_nothing(
+                index_elements=["profile_id", "idempotency_key"]
+            )
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(Progress).on_conflict_do_nothing(
+                index_elements=["profile_id", "idempotency_key"]
+            )
+        else:
+            # No portable ON CONFLICT: filter out keys that already exist first
+            keys = [row["idempotency_key"] for row in rows if row["idempotency_key"]]
+            taken: set[str] = set()
+            if keys:
+                result = await db.execute(
+                    select(Progress.idempotency_key).where(
+                        Progress.profile_id == rows[0]["profile_id"],
+                        Progress.idempotency_key.in_(keys),
+                    )
+                )
+                taken = set(result.scalars().all())
+            rows = [row for row in rows if row["idempotency_key"] not in taken]
+            if rows:
+                await db.execute(insert(Progress), rows)
+            return {row["id"] for row in rows}
+
+        result = await db.execute(stmt.returning(Progress.id), rows)
+        return set(result.scalars().all())
+
+    @staticmethod
+    async def _create_each(
+        db: AsyncSession, profile_id: str, items: List[Any]
+    ) -> List[dict[str, Any]]:
+        """Per-item fallback for ``create_many`` (one transaction per item)."""
+        results: List[dict[str, Any]] = []
+        for item in items:
+            key = item.get("idempotency_key") if isinstance(item, dict) else None
+            try:
+                progress = await ProgressService.create(db, profile_id, item)
+                results.append({"idempotency_key": key, "status": "ok", "server_id": str(progress.id)})
+            except DuplicateProgressError as e:
+                results.append(
+                    {"idempotency_key": key, "status": "duplicate", "server_id": e.existing_id}
+                )
+            except Exception as e:
+                results.append({"idempotency_key": key, "status": "error", "error": str(e)})
+        return results
+
     @staticmethod
     async def update(
         db: AsyncSession, progress: Progress, progress_in: ProgressUpdate
@@ -149,12 +527,23 @@ class ProgressService:
         for field, value in update_data.items():
             setattr(progress, field, value)
 
+        await db.flush()
+        await ProgressRollupService.refresh(
+            db, progress.profile_id, progress.activity_type, progress.content_id
+        )
         await db.commit()
+        await ProgressService.invalidate_stats(progress.profile_id)
         await db.refresh(progress)
         return progress
 
     @staticmethod
     async def delete(db: AsyncSession, progress: Progress) -> None:
         """Delete progress."""
+        profile_id = progress.profile_id
         await db.delete(progress)
+        await db.flush()
+        await ProgressRollupService.refresh(
+            db, profile_id, progress.activity_type, progress.content_id
+        )
         await db.commit()
+        await ProgressService.invalidate_stats(profile_id)
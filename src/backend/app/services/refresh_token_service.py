@@ -1,107 +1,181 @@
-"""Refresh token service for managing refresh token lifecycle."""
+"""Refresh token service for managing refresh token lifecycle.
 
+Tokens are looked up by the SHA-256 digest of the JWT.  Each refresh rotates
+the token: one ``UPDATE ... RETURNING`` checks that the presented token is
+live and retires it in the same statement, so two concurrent refreshes can't
+both succeed.  A retired token presented again means it was copied, so the
+whole rotation family is revoked and the user has to sign in again.
+"""
+
+import logging
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import uuid4
 
 from jose import jwt
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.security import token_digest
+from app.db.batching import delete_in_chunks
 from app.db.models.refresh_token import RefreshToken
 from app.db.models.user import User
 
+logger = logging.getLogger(__name__)
+
+
+def _live(now: datetime):
+    """Predicates for a token that can still be used."""
+    return (
+        RefreshToken.is_active,
+        ~RefreshToken.is_revoked,
+        RefreshToken.expires_at > now,
+    )
+
+
+def _new_token(user_id: str, family_id: str, jti: Optional[str] = None) -> RefreshToken:
+    """Sign a refresh JWT and build its row; only the digest is stored."""
+    jti = jti or str(uuid4())
+    token = jwt.encode(
+        {
+            "sub": user_id,
+            "jti": jti,
+            "exp": datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        },
+        settings.SECRET_KEY,
+        algorithm="HS256",
+    )
+    return RefreshToken(
+        id=jti,
+        token=token,
+        user_id=user_id,
+        family_id=family_id,
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
 
 class RefreshTokenService:
     """Refresh token service for managing refresh token lifecycle."""
 
     @staticmethod
-    async def create_refresh_token(db: AsyncSession, user_id: str) -> RefreshToken:
-        """Create a new refresh token for a user."""
-        # Generate a unique token
-        token_uuid = str(uuid4())
-        token = jwt.encode(
-            {
-                "sub": user_id,
-                "jti": token_uuid,
-                "exp": datetime.now(timezone.utc)
-                + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
-            },
-            settings.SECRET_KEY,
-            algorithm="HS256",
-        )
-
-        # Create refresh token record
-        refresh_token = RefreshToken(
-            token=token,
-            user_id=user_id,
-            expires_at=datetime.utcnow()
-            + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
-        )
-
+    async def create_refresh_token(
+        db: AsyncSession, user_id: str, family_id: Optional[str] = None
+    ) -> RefreshToken:
+        """Create a new refresh token for a user, in a new family unless given one."""
+        refresh_token = _new_token(user_id, family_id or str(uuid4()))
         db.add(refresh_token)
         await db.commit()
-        await db.refresh(refresh_token)
 
         return refresh_token
 
     @staticmethod
     async def get_refresh_token(db: AsyncSession, token: str) -> Optional[RefreshToken]:
-        """Get refresh token by token value."""
+        """Get a live refresh token by token value."""
         result = await db.execute(
             select(RefreshToken)
-            .where(RefreshToken.token == token)
-            .where(RefreshToken.is_active)
-            .where(~RefreshToken.is_revoked)
-            .where(RefreshToken.expires_at > datetime.utcnow())
+            .where(RefreshToken.token_hash == token_digest(token))
+            .where(*_live(datetime.utcnow()))
         )
         return result.scalar_one_or_none()
 
     @staticmethod
     async def revoke_refresh_token(db: AsyncSession, token: str) -> bool:
         """Revoke a refresh token."""
-        refresh_token = await RefreshTokenService.get_refresh_token(db, token)
-        if not refresh_token:
-            return False
-
-        refresh_token.is_revoked = True
-        refresh_token.is_active = False
-        refresh_token.revoked_at = datetime.utcnow()
-
+        result = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.token_hash == token_digest(token))
+            .where(RefreshToken.is_active, ~RefreshToken.is_revoked)
+            .values(is_active=False, is_revoked=True, revoked_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
         await db.commit()
-        return True
+        return result.rowcount > 0
 
     @staticmethod
     async def revoke_all_user_refresh_tokens(db: AsyncSession, user_id: str) -> int:
         """Revoke all refresh tokens for a user."""
         result = await db.execute(
-            select(RefreshToken)
-            .where(RefreshToken.user_id == user_id)
-            .where(RefreshToken.is_active)
-            .where(~RefreshToken.is_revoked)
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.is_active)
+            .values(is_active=False, is_revoked=True, revoked_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
         )
-        tokens = result.scalars().all()
-
-        count = 0
-        for token in tokens:
-            token.is_revoked = True
-            token.is_active = False
-            token.revoked_at = datetime.utcnow()
-            count += 1
+        await db.commit()
+        return result.rowcount
 
+    @staticmethod
+    async def revoke_family(db: AsyncSession, family_id: str) -> int:
+        """Revoke every live token rotated from the same login."""
+        result = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.is_active)
+            .values(is_active=False, is_revoked=True, revoked_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
         await db.commit()
-        return count
+        return result.rowcount
 
     @staticmethod
     async def validate_refresh_token(db: AsyncSession, token: str, user: User) -> bool:
         """Validate a refresh token belongs to the user and is not revoked."""
-        refresh_token = await RefreshTokenService.get_refresh_token(db, token)
-        if not refresh_token:
-            return False
+        result = await db.execute(
+            select(RefreshToken.id)
+            .where(RefreshToken.token_hash == token_digest(token))
+            .where(RefreshToken.user_id == user.id)
+            .where(*_live(datetime.utcnow()))
+        )
+        return result.first() is not None
 
-        # Check if token belongs to the user
-        if refresh_token.user_id != user.id:
-            return False
+    @staticmethod
+    async def rotate_refresh_token(
+        db: AsyncSession, token: str, user_id: str
+    ) -> Optional[RefreshToken]:
+        """Exchange a live refresh token for a new one in the same family.
+
+        Returns None if the token is unknown, expired, revoked or belongs to
+        someone else.  If it was already rotated, the family is revoked.
+        """
+        now = datetime.utcnow()
+        digest = token_digest(token)
+        new_id = str(uuid4())
+        result = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.token_hash == digest, RefreshToken.user_id == user_id)
+            .where(*_live(now))
+            .values(is_active=False, is_revoked=True, revoked_at=now, replaced_by=new_id)
+            .returning(RefreshToken.family_id)
+            .execution_options(synchronize_session=False)
+        )
+        family_id = result.scalar_one_or_none()
+
+        if family_id is None:
+            reused = await db.execute(
+                select(RefreshToken.family_id)
+                .where(RefreshToken.token_hash == digest, RefreshToken.user_id == user_id)
+                .where(RefreshToken.replaced_by.is_not(None))
+            )
+            reused_family = reused.scalar_one_or_none()
+            if reused_family is not None:
+                logger.warning(
+                    "Rotated refresh token reused; revoking family %s for user %s",
+                    reused_family,
+                    user_id,
+                )
+                await RefreshTokenService.revoke_family(db, reused_family)
+            return None
+
+        refresh_token = _new_token(user_id, family_id, jti=new_id)
+        db.add(refresh_token)
+        await db.commit()
+        return refresh_token
 
-        return True
+    @staticmethod
+    async def cleanup_expired(db: AsyncSession, chunk_size: int = 1000) -> int:
+        """Delete refresh tokens past their expiry (revoked or not)."""
+        return await delete_in_chunks(
+            db,
+            RefreshToken.id,
+            RefreshToken.expires_at < datetime.utcnow(),
+            chunk_size=chunk_size,
+        )
@@ -0,0 +1,244 @@
+"""In-memory index of revoked access tokens.
+
+Revocations are rare and short-lived (an access token only needs to stay on
+the blacklist until it would have expired anyway), so each worker keeps the
+full set of live revoked ``jti`` values in a dict and answers
+``TokenService.is_token_revoked`` from memory.
+
+The index is kept in sync in three ways:
+
+* it is loaded from ``revoked_tokens`` at startup (or on first use);
+* ``TokenService.revoke_access_token`` publishes each new revocation on a
+  Redis pub/sub channel that every worker subscribes to (without Redis the
+  publish is delivered only to the local index);
+* while no subscription is active, the index re-reads rows revoked since its
+  last sync every ``REVOCATION_INDEX_RESYNC_SECONDS``, so a worker without
+  pub/sub still converges without a per-request query.  After every
+  (re)subscribe the listener resyncs once before periodic resync is switched
+  off, so revocations published while it was not listening aren't lost.
+
+Expired entries are pruned lazily on lookup and in bulk from
+``TokenService.cleanup_expired``.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import redis.asyncio as redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHANNEL = "auth:revoked-tokens"
+# Re-read a little before the last high-water mark to tolerate clock skew
+# between workers and commit ordering.
+RESYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _to_epoch(value: datetime) -> float:
+    """Convert a (naive UTC or aware) datetime to a POSIX timestamp."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RevocationIndex:
+    """Per-worker expiring set of revoked access-token ``jti`` values."""
+
+    def __init__(self, resync_seconds: Optional[int] = None):
+        self.resync_seconds = (
+            resync_seconds
+            if resync_seconds is not None
+            else settings.REVOCATION_INDEX_RESYNC_SECONDS
+        )
+        self._entries: dict[str, float] = {}
+        self._loaded = False
+        self._high_water: Optional[datetime] = None
+        self._synced_at = 0.0
+        self._sync_lock = asyncio.Lock()
+        self._client: Optional[redis.Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        """Record a revoked token locally."""
+        self._entries[jti] = _to_epoch(expires_at)
+
+    def contains(self, jti: str) -> bool:
+        """Return True if ``jti`` is revoked and not yet expired."""
+        expires_at = self._entries.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            self._entries.pop(jti, None)
+            return False
+        return True
+
+    def prune(self) -> int:
+        """Drop expired entries and return how many were removed."""
+        now = time.time()
+        expired = [jti for jti, expires_at in self._entries.items() if expires_at <= now]
+        for jti in expired:
+            del self._entries[jti]
+        return len(expired)
+
+    def clear(self) -> None:
+        """Forget all entries; the next lookup reloads from the database."""
+        self._entries.clear()
+        self._loaded = False
+        self._high_water = None
+        self._synced_at = 0.0
+
+    async def load(self, db: AsyncSession) -> int:
+        """(Re)load every unexpired revocation from the database."""
+        async with self._sync_lock:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            result = await db.execute(
+                select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).where(
+                    RevokedToken.expires_at > now
+                )
+            )
+            entries: dict[str, float] = {}
+            high_water = self._high_water
+            for jti, expires_at, revoked_at in result.all():
+                entries[jti] = _to_epoch(expires_at)
+                if high_water is None or revoked_at > high_water:
+                    high_water = revoked_at
+
+            # Keep anything published while the query was in flight
+            entries.update(self._entries)
+            self._entries = entries
+            self._high_water = high_water or now
+            self._loaded = True
+            self._synced_at = time.monotonic()
+            return len(entries)
+
+    async def sync(self, db: AsyncSession) -> int:
+        """Pull revocations recorded since the last load/sync."""
+        if not self._loaded:
+            return await self.load(db)
+
+        async with self._sync_lock:
+            since = (self._high_water or datetime.min) - RESYNC_OVERLAP
+            result = await db.execute(
+                select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).where(
+                    RevokedToken.revoked_at >= since
+                )
+            )
+            count = 0
+            for jti, expires_at, revoked_at in result.all():
+                self._entries[jti] = _to_epoch(expires_at)
+                if self._high_water is None or revoked_at > self._high_water:
+                    self._high_water = revoked_at
+                count += 1
+            self._synced_at = time.monotonic()
+            return count
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Load the index on first use and resync when pub/sub isn't delivering."""
+        if not self._loaded:
+            await self.load(db)
+            return
+        if self._subscribed:
+            return
+        if time.monotonic() - self._synced_at >= self.resync_seconds:
+            await self.sync(db)
+
+    async def publish(self, jti: str, expires_at: datetime) -> None:
+        """Record a revocation locally and broadcast it to other workers."""
+        self.add(jti, expires_at)
+        if not settings.REDIS_URL:
+            return
+        try:
+            client = await self._get_client()
+            await client.publish(
+                REVOCATION_CHANNEL,
+                json.dumps({"jti": jti, "exp": _to_epoch(expires_at)}),
+            )
+        except Exception as e:
+            # Other workers fall back to periodic resync
+            logger.warning("Failed to publish token revocation %s: %s", jti, e)
+
+    async def _get_client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self._client
+
+    def _handle_message(self, data: str) -> None:
+        try:
+            message = json.loads(data)
+            self._entries[str(message["jti"])] = float(message["exp"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring malformed revocation message: %s", e)
+
+    async def _catch_up(self) -> None:
+        """Resync from the database on a session of our own."""
+        from app.db import session as db_session
+
+        async with db_session.async_session() as db:
+            await self.sync(db)
+
+    async def _listen(self) -> None:
+        """Subscribe to the revocation channel, reconnecting on failure."""
+        backoff = 1.0
+        while True:
+            try:
+                client = await self._get_client()
+                pubsub = client.pubsub()
+                try:
+                    await pubsub.subscribe(REVOCATION_CHANNEL)
+                    # Messages are buffered from here on; catch up on anything
+                    # published before the subscription was in place
+                    await self._catch_up()
+                    self._subscribed = True
+                    backoff = 1.0
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self._handle_message(message["data"])
+                finally:
+                    self._subscribed = False
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Revocation channel unavailable, retrying in %.0fs: %s", backoff, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+    def start_listener(self) -> None:
+        """Start the pub/sub listener task (no-op without Redis)."""
+        if not settings.REDIS_URL or self._listener is not None:
+            return
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        """Stop the pub/sub listener and close the Redis connection."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._subscribed = False
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+revocation_index = RevocationIndex()
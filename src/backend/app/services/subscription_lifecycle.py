@@ -0,0 +1,194 @@
+"""Periodic maintenance of subscription lifecycle state.
+
+Each sweep:
+
+* marks active subscriptions past their ``end_date`` as ``expired`` (an
+  indexed scan over ``ix_subscriptions_active_end_date``);
+* recomputes ``next_refresh_at`` for quarterly packs whose window has opened;
+* purges settled webhook events older than ``WEBHOOK_EVENT_RETENTION_DAYS``,
+  expired revoked / refresh tokens and expired data export artifacts.
+
+Work is done in chunks of ``LIFECYCLE_SWEEP_CHUNK_SIZE`` rows, each in its
+own short transaction.  Sweeps run in-process every
+``LIFECYCLE_SWEEP_INTERVAL_SECONDS`` or from cron via
+``scripts/sweep_subscriptions.py``; every step is idempotent, so concurrent
+sweepers only duplicate work.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.batching import delete_in_chunks
+from app.db.models.subscription_model import (
+    DodoWebhookEvent,
+    Subscription,
+    SubscriptionPlanType,
+    SubscriptionStatus,
+)
+from app.services.data_export_jobs import DataExportJobQueue
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.subscription_service import SubscriptionService
+from app.services.token_service import TokenService
+from app.services.webhook_queue import FAILED, PROCESSED
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionLifecycle:
+    """Individual sweep steps; each returns the number of rows touched."""
+
+    @staticmethod
+    async def expire_subscriptions(
+        db: AsyncSession, now: Optional[datetime] = None, chunk_size: int = 1000
+    ) -> int:
+        """Mark active subscriptions whose end date has passed as expired."""
+        now = now or datetime.now(timezone.utc)
+        total = 0
+        while True:
+            result = await db.execute(
+                select(Subscription.id, Subscription.parent_id)
+                .where(Subscription.status == SubscriptionStatus.ACTIVE)
+                .where(Subscription.end_date < now)
+                .limit(chunk_size)
+            )
+            rows = result.all()
+            if not rows:
+                return total
+            await db.execute(
+                update(Subscription)
+                .where(Subscription.id.in_([row.id for row in rows]))
+                .where(Subscription.status == SubscriptionStatus.ACTIVE)
+                .values(status=SubscriptionStatus.EXPIRED, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            for row in rows:
+                await SubscriptionService.invalidate_entitlement(row.parent_id)
+            total += len(rows)
+            if len(rows) < chunk_size:
+                return total
+
+    @staticmethod
+    async def advance_refresh_windows(
+        db: AsyncSession, now: Optional[datetime] = None, chunk_size: int = 1000
+    ) -> int:
+        """Recompute ``next_refresh_at`` for quarterly packs that reached it."""
+        now = now or datetime.now(timezone.utc)
+        total = 0
+        last_id = ""
+        while True:
+            result = await db.execute(
+                select(Subscription)
+                .where(Subscription.status == SubscriptionStatus.ACTIVE)
+                .where(Subscription.plan_type == SubscriptionPlanType.GAME_PACK_10)
+                .where(
+                    or_(
+                        Subscription.next_refresh_at.is_(None),
+                        Subscription.next_refresh_at <= now,
+                    )
+                )
+                .where(Subscription.id > last_id)
+                .order_by(Subscription.id)
+                .limit(chunk_size)
+            )
+            subscriptions = list(result.scalars().all())
+            if not subscriptions:
+                return total
+
+            changed = []
+            for subscription in subscriptions:
+                next_refresh_at = SubscriptionService._get_next_refresh_at(subscription, now)
+                current = subscription.next_refresh_at
+                if current is not None:
+                    current = SubscriptionService._normalize_datetime(current)
+                if next_refresh_at != current:
+                    subscription.next_refresh_at = next_refresh_at
+                    changed.append(subscription.parent_id)
+            await db.commit()
+            for parent_id in changed:
+                await SubscriptionService.invalidate_entitlement(parent_id)
+            total += len(changed)
+            last_id = subscriptions[-1].id
+            if len(subscriptions) < chunk_size:
+                return total
+
+    @staticmethod
+    async def purge_webhook_events(
+        db: AsyncSession, now: Optional[datetime] = None, chunk_size: int = 1000
+    ) -> int:
+        """Delete processed or failed webhook events past the retention window."""
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=settings.WEBHOOK_EVENT_RETENTION_DAYS)
+        return await delete_in_chunks(
+            db,
+            DodoWebhookEvent.id,
+            DodoWebhookEvent.status.in_([PROCESSED, FAILED]),
+            DodoWebhookEvent.processed_at < cutoff,
+            chunk_size=chunk_size,
+        )
+
+    @staticmethod
+    async def run_once(
+        now: Optional[datetime] = None, chunk_size: Optional[int] = None
+    ) -> dict[str, int]:
+        """Run every sweep step and return how many rows each touched."""
+        now = now or datetime.now(timezone.utc)
+        chunk_size = chunk_size or settings.LIFECYCLE_SWEEP_CHUNK_SIZE
+        counts: dict[str, int] = {}
+        async with db_session.async_session() as db:
+            counts["expired_subscriptions"] = await SubscriptionLifecycle.expire_subscriptions(
+                db, now, chunk_size
+            )
+            counts["refresh_windows"] = await SubscriptionLifecycle.advance_refresh_windows(
+                db, now, chunk_size
+            )
+            counts["webhook_events"] = await SubscriptionLifecycle.purge_webhook_events(
+                db, now, chunk_size
+            )
+            counts["revoked_tokens"] = await TokenService.cleanup_expired(db, chunk_size)
+            counts["refresh_tokens"] = await RefreshTokenService.cleanup_expired(db, chunk_size)
+            counts["export_jobs"] = await DataExportJobQueue.purge_expired(db, now, chunk_size)
+        return counts
+
+
+class LifecycleSweeper:
+    """Background task running ``SubscriptionLifecycle.run_once`` periodically."""
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """Start sweeping every ``interval`` seconds (no-op if already running)."""
+        if self._task is not None:
+            return
+        interval = settings.LIFECYCLE_SWEEP_INTERVAL_SECONDS if interval is None else interval
+        self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        """Cancel the sweep task."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            try:
+                counts = await SubscriptionLifecycle.run_once()
+                logger.info("Lifecycle sweep finished: %s", counts)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Lifecycle sweep failed")
+            await asyncio.sleep(interval)
+
+
+lifecycle_sweeper = LifecycleSweeper()
@@ -1,20 +1,25 @@
 """Subscription service for managing game pack subscriptions."""
 
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Optional
 from uuid import uuid4
 
+from cachetools import TTLCache
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.db.models.subscription_model import (
     Subscription,
     SubscriptionGameSelection,
     SubscriptionPlanType,
     SubscriptionStatus,
 )
+from app.services.cache_service import cache_key, cache_service
 
 PLAN_DURATIONS = {
     SubscriptionPlanType.GAME_PACK_5: 30,  # days
@@ -41,6 +46,61 @@ PACK_PLANS = {
 QUARTERLY_REFRESH_WINDOW_DAYS = 30
 QUARTERLY_TOTAL_CYCLES = 3
 
+ENTITLEMENT_KEY_PREFIX = "subscriptions:entitlement"
+
+# Local entitlement tier, used when Redis isn't configured
+_ENTITLEMENT_CACHE: TTLCache[str, dict[str, Any]] = TTLCache(
+    maxsize=settings.SUBSCRIPTION_ENTITLEMENT_CACHE_MAX_ENTRIES,
+    ttl=max(settings.SUBSCRIPTION_ENTITLEMENT_CACHE_TTL_SECONDS, 1),
+)
+
+
+@dataclass(frozen=True)
+class Entitlement:
+    """What a parent's active subscription unlocks."""
+
+    subscription_id: str
+    plan_type: SubscriptionPlanType
+    end_date: datetime
+    game_ids: frozenset[str]
+    refresh_state: dict[str, Any]
+
+    def can_access(self, game_id: str) -> tuple[bool, str]:
+        """Same answers as ``SubscriptionService.can_access_game``."""
+        if self.plan_type == SubscriptionPlanType.FULL_ANNUAL:
+            return True, "Full annual subscription"
+        if game_id in self.game_ids:
+            return True, "Game selected in pack"
+        return False, f"Game not in your {self.plan_type.value} selection"
+
+    def to_cache(self) -> dict[str, Any]:
+        next_refresh_at = self.refresh_state.get("next_refresh_at")
+        return {
+            "subscription_id": self.subscription_id,
+            "plan_type": self.plan_type.value,
+            "end_date": self.end_date.isoformat(),
+            "game_ids": sorted(self.game_ids),
+            "refresh_state": {
+                **self.refresh_state,
+                "next_refresh_at": next_refresh_at.isoformat() if next_refresh_at else None,
+            },
+        }
+
+    @classmethod
+    def from_cache(cls, data: dict[str, Any]) -> "Entitlement":
+        refresh_state = dict(data["refresh_state"])
+        if refresh_state.get("next_refresh_at"):
+            refresh_state["next_refresh_at"] = datetime.fromisoformat(
+                refresh_state["next_refresh_at"]
+            )
+        return cls(
+            subscription_id=data["subscription_id"],
+            plan_type=SubscriptionPlanType(data["plan_type"]),
+            end_date=datetime.fromisoformat(data["end_date"]),
+            game_ids=frozenset(data["game_ids"]),
+            refresh_state=refresh_state,
+        )
+
 
 class SubscriptionService:
     """Service for managing subscriptions."""
@@ -106,6 +166,22 @@ class SubscriptionService:
         elapsed_days = max(0, (reference_now - start_date).days)
         return min(QUARTERLY_TOTAL_CYCLES, (elapsed_days // QUARTERLY_REFRESH_WINDOW_DAYS) + 1)
 
+    @staticmethod
+    def _get_next_refresh_at(
+        subscription: Subscription, now: datetime | None = None
+    ) -> Optional[datetime]:
+        """Start of the next monthly refresh window, or None when no window is left."""
+        normalized_plan = SubscriptionService._normalize_plan_type(subscription.plan_type)
+        if normalized_plan != SubscriptionPlanType.GAME_PACK_10:
+            return None
+
+        current_cycle = SubscriptionService._get_quarterly_cycle(subscription, now)
+        if current_cycle >= QUARTERLY_TOTAL_CYCLES:
+            return None
+        return SubscriptionService._normalize_datetime(subscription.start_date) + timedelta(
+            days=current_cycle * QUARTERLY_REFRESH_WINDOW_DAYS
+        )
+
     @staticmethod
     def _get_refresh_state(subscription: Subscription, now: datetime | None = None) -> dict:
         normalized_plan = SubscriptionService._normalize_plan_type(subscription.plan_type)
@@ -121,11 +197,14 @@ class SubscriptionService:
 
         reference_now = now or datetime.now(timezone.utc)
         current_cycle = SubscriptionService._get_quarterly_cycle(subscription, reference_now)
-        next_refresh_at = None
-        if current_cycle < QUARTERLY_TOTAL_CYCLES:
-            next_refresh_at = SubscriptionService._normalize_datetime(subscription.start_date) + timedelta(
-                days=current_cycle * QUARTERLY_REFRESH_WINDOW_DAYS
-            )
+        # Use the checkpoint the lifecycle sweeper keeps on the row; fall back
+        # to computing it when it is unset or has passed and the sweep hasn't
+        # caught up yet
+        next_refresh_at = subscription.next_refresh_at
+        if next_refresh_at is not None:
+            next_refresh_at = SubscriptionService._normalize_datetime(next_refresh_at)
+        if next_refresh_at is None or next_refresh_at <= reference_now:
+            next_refresh_at = SubscriptionService._get_next_refresh_at(subscription, reference_now)
 
         return {
             "refresh_available": current_cycle > 1 and subscription.last_refresh_cycle_used < current_cycle,
@@ -167,6 +246,7 @@ class SubscriptionService:
             status=SubscriptionStatus.ACTIVE,
             payment_reference=payment_reference,
         )
+        subscription.next_refresh_at = SubscriptionService._get_next_refresh_at(subscription, now)
 
         try:
             db.add(subscription)
@@ -185,6 +265,7 @@ class SubscriptionService:
             else:
                 raise  # Re-raise if it's a different integrity error
 
+        await SubscriptionService.invalidate_entitlement(parent_id)
         return subscription
 
     @staticmethod
@@ -290,6 +371,7 @@ class SubscriptionService:
                 raise
 
         await db.commit()
+        await SubscriptionService.invalidate_entitlement(subscription.parent_id)
         for sel in selections:
             await db.refresh(sel)
         return selections
@@ -337,6 +419,7 @@ class SubscriptionService:
         subscription.last_refresh_cycle_used = refresh_state["current_cycle_index"]
         await db.flush()
         await db.commit()
+        await SubscriptionService.invalidate_entitlement(subscription.parent_id)
         for selection in new_selections:
             await db.refresh(selection)
         return new_selections
@@ -434,6 +517,9 @@ class SubscriptionService:
             payment_reference=f"UPGRADE:{subscription_id}",
             notes=". ".join(notes_parts),
         )
+        new_subscription.next_refresh_at = SubscriptionService._get_next_refresh_at(
+            new_subscription, now
+        )
 
         db.add(new_subscription)
         await db.flush()  # Flush to get new_subscription.id assigned and persisted
@@ -442,6 +528,7 @@ class SubscriptionService:
         old_subscription.upgraded_to_id = new_subscription.id
 
         await db.commit()
+        await SubscriptionService.invalidate_entitlement(new_subscription.parent_id)
         await db.refresh(new_subscription)
         return new_subscription
 
@@ -458,6 +545,7 @@ class SubscriptionService:
 
         subscription.status = SubscriptionStatus.CANCELLED
         await db.commit()
+        await SubscriptionService.invalidate_entitlement(subscription.parent_id)
         await db.refresh(subscription)
         return subscription
 
@@ -496,6 +584,94 @@ class SubscriptionService:
             "renewal_prompt": renewal_prompt,
         }
 
+    @staticmethod
+    def _entitlement_ttl(entitlement: Optional[Entitlement], now: datetime) -> float:
+        """Cache lifetime: the configured TTL, cut short at expiry or the next refresh window.
+
+        Without Redis a purchase processed by another process can't drop this
+        worker's entry, so a missing subscription is only cached briefly.
+        """
+        ttl = float(settings.SUBSCRIPTION_ENTITLEMENT_CACHE_TTL_SECONDS)
+        if entitlement is None:
+            if not settings.REDIS_URL:
+                ttl = min(ttl, float(settings.SUBSCRIPTION_ENTITLEMENT_LOCAL_NEGATIVE_TTL_SECONDS))
+            return ttl
+        deadlines = [SubscriptionService._normalize_datetime(entitlement.end_date)]
+        if entitlement.refresh_state.get("next_refresh_at"):
+            deadlines.append(entitlement.refresh_state["next_refresh_at"])
+        for deadline in deadlines:
+            ttl = min(ttl, (deadline - now).total_seconds())
+        return ttl
+
+    @staticmethod
+    async def _get_cached_entitlement(key: str) -> Optional[dict[str, Any]]:
+        if settings.REDIS_URL:
+            cached = await cache_service.get(key)
+        else:
+            cached = _ENTITLEMENT_CACHE.get(key)
+        if cached is None or cached.get("cached_until", 0) <= time.time():
+            return None
+        return cached
+
+    @staticmethod
+    async def _set_cached_entitlement(key: str, value: dict[str, Any], ttl: float) -> None:
+        value["cached_until"] = time.time() + ttl
+        if settings.REDIS_URL:
+            await cache_service.set(key, value, ttl=max(int(ttl), 1))
+        else:
+            _ENTITLEMENT_CACHE[key] = value
+
+    @staticmethod
+    async def get_entitlement(
+        db: AsyncSession, parent_id: str, use_cache: bool = True
+    ) -> Optional[Entitlement]:
+        """Resolve what the parent's active subscription unlocks, or None without one.
+
+        Cached per parent for at most ``SUBSCRIPTION_ENTITLEMENT_CACHE_TTL_SECONDS``
+        and never past the subscription's end date; subscription mutations in
+        this service drop the entry.  Raises ValueError for an unsupported
+        stored plan type.
+        """
+        use_cache = use_cache and settings.SUBSCRIPTION_ENTITLEMENT_CACHE_TTL_SECONDS > 0
+        key = cache_key(ENTITLEMENT_KEY_PREFIX, parent_id)
+        if use_cache:
+            cached = await SubscriptionService._get_cached_entitlement(key)
+            if cached is not None:
+                if not cached.get("active"):
+                    return None
+                return Entitlement.from_cache(cached["entitlement"])
+
+        subscription = await SubscriptionService.get_active_subscription(db=db, parent_id=parent_id)
+        now = datetime.now(timezone.utc)
+        entitlement = None
+        if subscription is not None:
+            entitlement = Entitlement(
+                subscription_id=subscription.id,
+                plan_type=SubscriptionService._normalize_plan_type(subscription.plan_type),
+                end_date=SubscriptionService._normalize_datetime(subscription.end_date),
+                game_ids=frozenset(
+                    selection.game_id
+                    for selection in SubscriptionService._get_active_selections(subscription)
+                ),
+                refresh_state=SubscriptionService._get_refresh_state(subscription, now),
+            )
+
+        ttl = SubscriptionService._entitlement_ttl(entitlement, now)
+        if use_cache and ttl > 0:
+            value: dict[str, Any] = {"active": entitlement is not None}
+            if entitlement is not None:
+                value["entitlement"] = entitlement.to_cache()
+            await SubscriptionService._set_cached_entitlement(key, value, ttl)
+        return entitlement
+
+    @staticmethod
+    async def invalidate_entitlement(parent_id: str) -> None:
+        """Drop the cached entitlement after a parent's subscription changes."""
+        key = cache_key(ENTITLEMENT_KEY_PREFIX, parent_id)
+        _ENTITLEMENT_CACHE.pop(key, None)
+        if settings.REDIS_URL:
+            await cache_service.delete(key)
+
     @staticmethod
     async def can_access_game(
         db: AsyncSession, parent_id: str, game_id: str
@@ -505,28 +681,10 @@ class SubscriptionService:
         Returns:
             tuple of (can_access: bool, reason: str)
         """
-        subscription = await SubscriptionService.get_active_subscription(
-            db=db, parent_id=parent_id
-        )
-
-        if not subscription:
+        entitlement = await SubscriptionService.get_entitlement(db=db, parent_id=parent_id)
+        if entitlement is None:
             return False, "No active subscription"
-
-        # Full annual = access to all games
-        normalized_plan = SubscriptionService._normalize_plan_type(subscription.plan_type)
-        if normalized_plan == SubscriptionPlanType.FULL_ANNUAL:
-            return True, "Full annual subscription"
-
-        # For packs, check only active game selections (swapped_at IS NULL)
-        active_selections = {
-            selection.game_id
-            for selection in await SubscriptionService._list_active_selections(db, subscription.id)
-        }
-
-        if game_id in active_selections:
-            return True, "Game selected in pack"
-
-        return False, f"Game not in your {normalized_plan.value} selection"
+        return entitlement.can_access(game_id)
 
     @staticmethod
     async def get_subscription_for_parent(
@@ -2,10 +2,11 @@
 
 from datetime import datetime
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.batching import delete_in_chunks
 from app.db.models.revoked_token import RevokedToken
+from app.services.revocation_index import revocation_index
 
 
 class TokenService:
@@ -20,26 +21,26 @@ class TokenService:
         revoked = RevokedToken(jti=jti, expires_at=expires_at)
         db.add(revoked)
         await db.commit()
+        await revocation_index.publish(jti, expires_at)
         return True
 
     @staticmethod
     async def is_token_revoked(db: AsyncSession, jti: str) -> bool:
-        """Check whether a token has been revoked or expired.
+        """Check whether a token has been revoked.
 
-        Expired revoked tokens can be cleaned up by a background job if desired.
+        Answered from the per-worker ``revocation_index``; the database is only
+        read to load the index on first use or to resync it when the pub/sub
+        channel is unavailable.
         """
-        result = await db.execute(
-            select(RevokedToken).where(RevokedToken.jti == jti)
-        )
-        return result.scalar_one_or_none() is not None
+        await revocation_index.ensure_fresh(db)
+        return revocation_index.contains(jti)
 
     @staticmethod
-    async def cleanup_expired(db: AsyncSession) -> int:
+    async def cleanup_expired(db: AsyncSession, chunk_size: int = 1000) -> int:
         """Remove revoked-token records that have passed their expiration."""
-        from sqlalchemy import delete
-
         now = datetime.utcnow()
-        q = delete(RevokedToken).where(RevokedToken.expires_at < now)
-        res = await db.execute(q)
-        await db.commit()
-        return res.rowcount
+        deleted = await delete_in_chunks(
+            db, RevokedToken.jti, RevokedToken.expires_at < now, chunk_size=chunk_size
+        )
+        revocation_index.prune()
+        return deleted
@@ -7,9 +7,11 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.email import EmailService
-from app.core.security import get_password_hash, verify_password
+from app.core.password_hasher import password_hasher
+from app.db.loaders import UserLoad, user_load_options
 from app.db.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.principal_cache_service import principal_cache
 
 
 class UserService:
@@ -28,9 +30,13 @@ class UserService:
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def get_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
-        """Get user by ID."""
-        result = await db.execute(select(User).where(User.id == user_id))
+    async def get_by_id(
+        db: AsyncSession, user_id: str, load: UserLoad = UserLoad.SUMMARY
+    ) -> Optional[User]:
+        """Get user by ID, loading only the relationships ``load`` asks for."""
+        result = await db.execute(
+            select(User).where(User.id == user_id).options(*user_load_options(load))
+        )
         return result.scalar_one_or_none()
 
     @staticmethod
@@ -43,7 +49,7 @@ class UserService:
 
         user = User(
             email=normalized_email,
-            hashed_password=get_password_hash(user_in.password),
+            hashed_password=await password_hasher.hash(user_in.password),
             role=user_in.role,
             is_active=user_in.is_active,
             email_verified=False,  # New users need to verify email
@@ -80,6 +86,7 @@ class UserService:
         user.email_verification_expires = None
         await db.commit()
         await db.refresh(user)
+        await principal_cache.invalidate_user(user.id)
         return user
 
     @staticmethod
@@ -118,9 +125,7 @@ class UserService:
     @staticmethod
     async def reset_password(db: AsyncSession, user: User, new_password: str) -> User:
         """Reset user's password and clear reset token."""
-        from app.core.security import get_password_hash
-
-        user.hashed_password = get_password_hash(new_password)
+        user.hashed_password = await password_hasher.hash(new_password)
         user.password_reset_token = None
         user.password_reset_expires = None
         await db.commit()
@@ -136,20 +141,24 @@ class UserService:
             update_data["email"] = UserService._normalize_email(str(update_data["email"]))
 
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+            update_data["hashed_password"] = await password_hasher.hash(update_data.pop("password"))
 
         for field, value in update_data.items():
             setattr(user, field, value)
 
         await db.commit()
         await db.refresh(user)
+        # email/is_active are part of the cached principal
+        await principal_cache.invalidate_user(user.id)
         return user
 
     @staticmethod
     async def delete(db: AsyncSession, user: User) -> None:
         """Delete user."""
+        user_id = user.id
         await db.delete(user)
         await db.commit()
+        await principal_cache.invalidate_user(user_id)
 
     @staticmethod
     async def authenticate(db: AsyncSession, email: str, password: str) -> Optional[User]:
@@ -160,13 +169,15 @@ class UserService:
         if not user:
             # Perform dummy verification to maintain constant time
             # This prevents user enumeration via timing analysis
-            # Using a valid bcrypt hash that will never match any real password
-            verify_password(
-                password, "$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW"
-            )
+            await password_hasher.verify_dummy(password)
             return None
 
-        if not verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             return None
 
+        # Transparently upgrade hashes made with an outdated cost factor
+        if password_hasher.needs_rehash(user.hashed_password):
+            user.hashed_password = await password_hasher.hash(password)
+            await db.commit()
+
         return user
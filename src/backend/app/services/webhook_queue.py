@@ -0,0 +1,341 @@
+"""Durable work queue for Dodo webhook events.
+
+``POST /subscriptions/webhook`` only verifies the signature and records the
+raw body in ``dodo_webhook_events`` (status ``received``) before answering
+202.  Workers then claim due events with ``FOR UPDATE SKIP LOCKED`` (status
+``processing``), run the business logic and mark them ``processed`` or
+``failed``.  Unexpected errors are retried with exponential backoff; business
+validation errors (``ValueError``) fail immediately, as they would on every
+retry.
+
+Workers run in-process (``WEBHOOK_QUEUE_WORKERS``) or standalone via
+``scripts/run_webhook_worker.py``.  Handlers are looked up in
+``WebhookQueue.handlers``, so tests can register local stubs.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+from uuid import uuid4
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.models.subscription_model import DodoWebhookEvent, SubscriptionPlanType
+from app.services.subscription_service import SubscriptionService
+
+logger = logging.getLogger(__name__)
+
+RECEIVED = "received"
+PROCESSING = "processing"
+PROCESSED = "processed"
+FAILED = "failed"
+
+# Legacy/compatibility aliases -> official Dodo events
+CANONICAL_EVENT_TYPES = {
+    "payment.completed": "payment.succeeded",
+    "payment.success": "payment.succeeded",
+}
+
+WebhookHandler = Callable[[AsyncSession, dict], Awaitable[Any]]
+
+
+class InvalidWebhookPayload(ValueError):
+    """Raised when a webhook body can't be routed (bad JSON, no event type)."""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def handle_payment_succeeded(db: AsyncSession, event_data: dict) -> Any:
+    """Create the subscription paid for by a ``payment.succeeded`` event."""
+    session_id = event_data.get("id")
+    metadata = event_data.get("metadata", {})
+    user_id = metadata.get("user_id")
+    plan_type_value = metadata.get("plan_type")
+
+    if not user_id or not plan_type_value:
+        raise ValueError("Missing payment metadata (user_id or plan_type)")
+
+    try:
+        plan = SubscriptionPlanType(plan_type_value)
+    except ValueError:
+        raise ValueError(f"Invalid plan type in payment: {plan_type_value}")
+
+    # Payment validation (using metadata as primary source)
+    expected_amount = metadata.get("expected_amount")
+    if not expected_amount:
+        raise ValueError("Missing expected_amount in payment metadata")
+
+    try:
+        expected_amount = int(expected_amount)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid expected_amount type in metadata: {type(expected_amount)}")
+
+    # Per Dodo FAQ: subscription webhooks may not include product_id, so this
+    # check is informational only
+    product = event_data.get("product")
+    webhook_product_id = event_data.get("product_id") or (
+        product.get("id") if isinstance(product, dict) else None
+    )
+    if webhook_product_id:
+        from app.services.dodo_payment_service import PLAN_PRODUCT_IDS
+
+        expected_product_id = PLAN_PRODUCT_IDS.get(plan)
+        if expected_product_id and webhook_product_id != expected_product_id:
+            logger.warning(
+                f"Product ID mismatch for {plan}: expected {expected_product_id}, "
+                f"got {webhook_product_id}. Continuing as this may be a subscription flow."
+            )
+    else:
+        logger.debug(f"No product_id in webhook payload for {plan} - may be subscription flow")
+
+    # Validate webhook amount using exact Dodo schema field names
+    for field_name in ["amount_total", "amount", "total"]:
+        if field_name in event_data:
+            webhook_amount = event_data.get(field_name)
+            try:
+                if int(webhook_amount) != expected_amount:
+                    raise ValueError(
+                        f"Payment amount mismatch for {plan}: expected {expected_amount}, "
+                        f"got {webhook_amount} from field '{field_name}'"
+                    )
+            except TypeError:
+                logger.warning(
+                    f"Invalid webhook amount type in payload: {type(webhook_amount)} "
+                    f"for field '{field_name}'"
+                )
+            break
+
+    # Create subscription (idempotent on payment_reference)
+    return await SubscriptionService.create_subscription(
+        db=db,
+        parent_id=user_id,
+        plan_type=plan,
+        payment_reference=session_id,
+    )
+
+
+class WebhookQueue:
+    """Enqueue, claim and process ``dodo_webhook_events`` rows."""
+
+    def __init__(self) -> None:
+        self.handlers: dict[str, WebhookHandler] = {
+            "payment.succeeded": handle_payment_succeeded,
+        }
+
+    @staticmethod
+    def backoff(attempts: int) -> timedelta:
+        """Delay before retry number ``attempts + 1``."""
+        delay = settings.WEBHOOK_QUEUE_BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+        return timedelta(seconds=min(delay, settings.WEBHOOK_QUEUE_BACKOFF_MAX_SECONDS))
+
+    @staticmethod
+    def _parse(body: bytes) -> tuple[str, dict]:
+        try:
+            event = json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError) as exc:
+            raise InvalidWebhookPayload("Invalid JSON payload") from exc
+        if not isinstance(event, dict) or not event.get("type"):
+            raise InvalidWebhookPayload("Missing required field: event_type")
+        event_type = CANONICAL_EVENT_TYPES.get(event["type"], event["type"])
+        return event_type, event
+
+    async def enqueue(
+        self, db: AsyncSession, webhook_id: str, body: bytes
+    ) -> tuple[DodoWebhookEvent, bool]:
+        """Record a verified webhook for processing.
+
+        Returns the event row and whether it was newly queued.  A redelivery
+        of a still-pending event makes it due immediately.  Bodies that can't
+        be routed are recorded as ``failed`` and raise InvalidWebhookPayload.
+        """
+        now = _utcnow()
+        event_type, error = "unknown", None
+        try:
+            event_type, _ = self._parse(body)
+        except InvalidWebhookPayload as exc:
+            error = str(exc)
+
+        webhook_event = DodoWebhookEvent(
+            id=str(uuid4()),
+            webhook_id=webhook_id,
+            event_type=event_type,
+            status=FAILED if error else RECEIVED,
+            last_error=error,
+            processed_at=now if error else None,
+            attempts=0,
+            payload=body.decode("utf-8", errors="replace"),
+            next_attempt_at=now,
+        )
+        try:
+            db.add(webhook_event)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            result = await db.execute(
+                select(DodoWebhookEvent).where(DodoWebhookEvent.webhook_id == webhook_id)
+            )
+            existing = result.scalar_one()
+            if existing.status == RECEIVED:
+                existing.next_attempt_at = now
+                await db.commit()
+            return existing, False
+
+        if error:
+            logger.error("Rejected webhook %s: %s", webhook_id, error)
+            raise InvalidWebhookPayload(error)
+        return webhook_event, True
+
+    async def claim(self, db: AsyncSession, limit: int) -> list[str]:
+        """Mark up to ``limit`` due events as processing and return their ids.
+
+        Rows locked by another worker are skipped; events stuck in
+        ``processing`` longer than ``WEBHOOK_QUEUE_LEASE_SECONDS`` (a crashed
+        worker) are claimed again.
+        """
+        now = _utcnow()
+        stale = now - timedelta(seconds=settings.WEBHOOK_QUEUE_LEASE_SECONDS)
+        result = await db.execute(
+            select(DodoWebhookEvent)
+            .where(
+                or_(
+                    and_(
+                        DodoWebhookEvent.status == RECEIVED,
+                        or_(
+                            DodoWebhookEvent.next_attempt_at.is_(None),
+                            DodoWebhookEvent.next_attempt_at <= now,
+                        ),
+                    ),
+                    and_(
+                        DodoWebhookEvent.status == PROCESSING,
+                        DodoWebhookEvent.locked_at < stale,
+                    ),
+                )
+            )
+            .order_by(DodoWebhookEvent.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        events = list(result.scalars().all())
+        for event in events:
+            event.status = PROCESSING
+            event.locked_at = now
+            event.attempts += 1
+        await db.commit()
+        return [event.id for event in events]
+
+    async def process(self, db: AsyncSession, event_id: str) -> str:
+        """Run the handler for one claimed event and record the outcome."""
+        event = await db.get(DodoWebhookEvent, event_id)
+        if event is None:
+            return FAILED
+
+        try:
+            event_type, body = self._parse((event.payload or "").encode("utf-8"))
+            event.event_type = event_type
+            handler = self.handlers.get(event_type)
+            if handler is None:
+                # Successfully received and handled (by ignoring)
+                event.last_error = f"Unhandled event type: {event_type}"
+                logger.info(f"Received unhandled webhook event type: {event_type}")
+            else:
+                data = body.get("data", {})
+                await handler(db, data)
+                event.session_id = data.get("id")
+                event.last_error = None
+            event.status = PROCESSED
+            event.processed_at = _utcnow()
+            event.locked_at = None
+            await db.commit()
+            return PROCESSED
+        except ValueError as exc:
+            # Business validation errors would fail identically on every retry
+            await db.rollback()
+            event = await db.get(DodoWebhookEvent, event_id, populate_existing=True)
+            event.status = FAILED
+            event.last_error = str(exc)
+            event.processed_at = _utcnow()
+            event.locked_at = None
+            await db.commit()
+            logger.warning("Webhook %s failed: %s", event.webhook_id, exc)
+            return FAILED
+        except Exception as exc:
+            await db.rollback()
+            logger.exception("Webhook processing failed for event %s", event_id)
+            event = await db.get(DodoWebhookEvent, event_id, populate_existing=True)
+            event.last_error = f"{type(exc).__name__}: {exc}"
+            event.locked_at = None
+            if event.attempts >= settings.WEBHOOK_QUEUE_MAX_ATTEMPTS:
+                event.status = FAILED
+                event.processed_at = _utcnow()
+            else:
+                event.status = RECEIVED
+                event.next_attempt_at = _utcnow() + self.backoff(event.attempts)
+            await db.commit()
+            return event.status
+
+    async def process_due(self, limit: Optional[int] = None) -> int:
+        """Claim and process one batch of due events; returns how many were claimed."""
+        limit = limit or settings.WEBHOOK_QUEUE_BATCH_SIZE
+        async with db_session.async_session() as db:
+            event_ids = await self.claim(db, limit)
+        for event_id in event_ids:
+            async with db_session.async_session() as db:
+                await self.process(db, event_id)
+        return len(event_ids)
+
+
+class WebhookWorker:
+    """Pool of tasks draining the webhook queue."""
+
+    def __init__(self, queue: WebhookQueue):
+        self.queue = queue
+        self._tasks: list[asyncio.Task] = []
+        self._wake = asyncio.Event()
+
+    def start(self, concurrency: Optional[int] = None) -> None:
+        """Start ``concurrency`` polling tasks (no-op if already running)."""
+        if self._tasks:
+            return
+        concurrency = settings.WEBHOOK_QUEUE_WORKERS if concurrency is None else concurrency
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(concurrency)]
+
+    async def stop(self) -> None:
+        """Cancel the polling tasks."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def notify(self) -> None:
+        """Wake idle workers after a new event is queued."""
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await self.queue.process_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Webhook worker iteration failed")
+                claimed = 0
+            if claimed:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.WEBHOOK_QUEUE_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+
+webhook_queue = WebhookQueue()
+webhook_worker = WebhookWorker(webhook_queue)
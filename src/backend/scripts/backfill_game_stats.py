@@ -0,0 +1,31 @@
+"""Rebuild game_stats_daily from the progress table.
+
+Replaces every counter row in one transaction and bumps the stats version so
+cached /games/stats responses are retired.
+
+Usage:
+    python scripts/backfill_game_stats.py
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import async_session  # noqa: E402
+from app.services.game_stats_service import GameStatsService  # noqa: E402
+
+
+async def backfill() -> int:
+    async with async_session() as session:
+        return await GameStatsService.rebuild(session)
+
+
+def main() -> None:
+    rows = asyncio.run(backfill())
+    print(f"Rebuilt game stats: {rows} counter rows")
+
+
+if __name__ == "__main__":
+    main()
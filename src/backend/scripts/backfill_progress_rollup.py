@@ -0,0 +1,43 @@
+"""Rebuild profile_progress_rollup from the progress table.
+
+Walks profiles in chunks and replaces each chunk's rollup rows in its own
+transaction, so it is safe to interrupt and re-run.
+
+Usage:
+    python scripts/backfill_progress_rollup.py [--chunk-size 500]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import async_session  # noqa: E402
+from app.services.progress_rollup_service import ProgressRollupService  # noqa: E402
+
+
+async def backfill(chunk_size: int) -> int:
+    async with async_session() as session:
+        return await ProgressRollupService.backfill(session, chunk_size=chunk_size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill the progress rollup table")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=500,
+        help="Profiles rebuilt per transaction (default: 500)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    processed = asyncio.run(backfill(args.chunk_size))
+    print(f"Rebuilt progress rollup for {processed} profiles")
+
+
+if __name__ == "__main__":
+    main()
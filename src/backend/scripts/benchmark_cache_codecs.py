@@ -0,0 +1,143 @@
+"""Compare cache codecs and compression on real response payloads.
+
+Encodes and decodes a games list (``GameList``) and a stats response
+(``GlobalGameStatsResponse``) with every installed codec/compression pair and
+prints payload size and per-operation timings.  The pydantic baseline is what
+the cache did before: ``model_dump`` + JSON on write, JSON + ``model_validate``
+on read.  With ``--from-db`` the games come from the configured database.
+
+Usage:
+    python scripts/benchmark_cache_codecs.py [--games 60] [--iterations 2000] [--from-db]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.schemas.game import (  # noqa: E402
+    Game,
+    GameList,
+    GlobalGameStat,
+    GlobalGameStatsResponse,
+)
+from app.services.cache_codecs import CODECS, COMPRESSORS, CacheSerializer  # noqa: E402
+
+
+def sample_games(count: int) -> list[Game]:
+    now = datetime.now(timezone.utc)
+    return [
+        Game(
+            id=str(uuid4()),
+            title=f"Game {i}",
+            slug=f"game-{i}",
+            description="Trace the letters with your finger while the camera follows along. " * 2,
+            icon="✏️",
+            category=("Alphabets", "Numbers", "Shapes", "Colors")[i % 4],
+            age_range_min=3 + i % 3,
+            age_range_max=7 + i % 4,
+            difficulty=("Easy", "Medium", "Hard")[i % 3],
+            duration_minutes=5 + i % 10,
+            game_path=f"/games/game-{i}",
+            is_published=True,
+            is_featured=i % 5 == 0,
+            config_json={"levels": list(range(i % 8)), "hints": True, "timer_seconds": 60},
+            total_plays=i * 37,
+            avg_score=72.5,
+            completion_rate=0.64,
+            created_at=now - timedelta(days=i),
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+async def games_from_db() -> list[Game]:
+    from app.db.session import async_session
+    from app.services.game_service import GameService
+
+    async with async_session() as db:
+        catalog = await GameService.get_catalog(db)
+    return list(catalog.games)
+
+
+def stats_response(games: list[Game]) -> GlobalGameStatsResponse:
+    return GlobalGameStatsResponse(
+        period="week",
+        generated_at=datetime.now(timezone.utc),
+        games=[
+            GlobalGameStat(
+                game_key=game.slug,
+                game_name=game.title,
+                total_plays=game.total_plays,
+                avg_session_minutes=4.25,
+                completion_rate=0.6412,
+                popularity_score=float(game.total_plays),
+                age_cohort_rank=rank,
+            )
+            for rank, game in enumerate(games, start=1)
+        ],
+    )
+
+
+def bench(label: str, encode, decode, iterations: int) -> None:
+    payload = encode()
+    encode_us = timeit.timeit(encode, number=iterations) / iterations * 1e6
+    decode_us = timeit.timeit(lambda: decode(payload), number=iterations) / iterations * 1e6
+    print(f"  {label:<28} {len(payload):>9,} B {encode_us:>10.1f} us {decode_us:>10.1f} us")
+
+
+def run(payloads: dict[str, object], iterations: int) -> None:
+    for name, model in payloads.items():
+        model_type = type(model)
+        data = model.model_dump(mode="json")
+        print(f"\n{name}")
+        print(f"  {'codec':<28} {'size':>11} {'encode':>13} {'decode':>13}")
+        bench(
+            "pydantic + stdlib json",
+            lambda: json.dumps(model.model_dump(mode="json")).encode(),
+            lambda payload: model_type.model_validate(json.loads(payload)),
+            iterations,
+        )
+        bench(
+            "pre-rendered body",
+            lambda: model.model_dump_json(by_alias=True).encode(),
+            lambda payload: payload,
+            iterations,
+        )
+        for codec in CODECS:
+            for compression in COMPRESSORS:
+                serializer = CacheSerializer(codec, compression)
+                bench(
+                    f"{codec} + {compression}",
+                    lambda: serializer.encode(data),
+                    serializer.decode,
+                    iterations,
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=60, help="synthetic games in the catalog")
+    parser.add_argument("--iterations", type=int, default=2000, help="runs per measurement")
+    parser.add_argument("--from-db", action="store_true", help="use games from the database")
+    args = parser.parse_args()
+
+    games = asyncio.run(games_from_db()) if args.from_db else sample_games(args.games)
+    page = games[:20]
+    payloads = {
+        f"GameList ({len(page)} games)": GameList(games=page, total=len(games), page=1, page_size=20),
+        f"GlobalGameStatsResponse ({len(games)} games)": stats_response(games),
+    }
+    print(f"codecs: {', '.join(CODECS)}; compression: {', '.join(COMPRESSORS)}")
+    run(payloads, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Measure rate limiter overhead per request.
+
+Times a GCRA check against each available store (the in-memory store, and
+Redis when ``--redis`` or ``REDIS_URL`` gives a server), then the same
+request through a minimal app with and without ``@limiter.limit`` so the
+difference is the limiter's full cost: key building, the check, and the
+RateLimit-* headers middleware.  Keys are spread over ``--keys`` identities
+to mimic many clients.
+
+Usage:
+    python scripts/benchmark_rate_limiter.py [--iterations 5000] [--keys 1000] [--redis URL]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.rate_limit import (  # noqa: E402
+    Limiter,
+    MemoryRateLimitStore,
+    RedisRateLimitStore,
+    parse_rate,
+)
+
+RATE = "1000000/second"
+
+
+async def bench_store(label: str, store, iterations: int, keys: int) -> None:
+    rate = parse_rate(RATE)
+    await store.hit("ratelimit:bench:warmup", rate)
+    started = time.perf_counter()
+    for i in range(iterations):
+        await store.hit(f"ratelimit:bench:{i % keys}", rate)
+    per_check_us = (time.perf_counter() - started) / iterations * 1e6
+    print(f"  {label:<34} {per_check_us:>10.1f} us/check")
+
+
+async def bench_requests(iterations: int, keys: int) -> None:
+    from fastapi import FastAPI, Request
+    from httpx import ASGITransport, AsyncClient
+
+    from app.middleware.rate_limit_headers import RateLimitHeadersMiddleware
+
+    limiter = Limiter(store=MemoryRateLimitStore(max_keys=keys * 2))
+    app = FastAPI()
+    app.add_middleware(RateLimitHeadersMiddleware)
+
+    @app.get("/plain")
+    async def plain(request: Request) -> dict:
+        return {"ok": True}
+
+    @app.get("/limited")
+    @limiter.limit(RATE, key_func=lambda request: request.headers["x-client"])
+    async def limited(request: Request) -> dict:
+        return {"ok": True}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        timings = {}
+        for path in ("/plain", "/limited"):
+            await client.get(path, headers={"x-client": "warmup"})
+            started = time.perf_counter()
+            for i in range(iterations):
+                await client.get(path, headers={"x-client": str(i % keys)})
+            timings[path] = (time.perf_counter() - started) / iterations * 1e6
+
+    print(f"  {'request without limiter':<34} {timings['/plain']:>10.1f} us/request")
+    print(f"  {'request with @limiter.limit':<34} {timings['/limited']:>10.1f} us/request")
+    print(f"  {'limiter overhead':<34} {timings['/limited'] - timings['/plain']:>10.1f} us/request")
+
+
+async def run(iterations: int, keys: int, redis_url: str | None) -> None:
+    print(f"\nstore checks ({iterations} iterations over {keys} keys)")
+    await bench_store("memory", MemoryRateLimitStore(max_keys=keys * 2), iterations, keys)
+    if redis_url:
+        os.environ["REDIS_URL"] = redis_url
+        await bench_store(f"redis ({redis_url})", RedisRateLimitStore(), iterations, keys)
+
+    print("\nend-to-end (in-process ASGI, memory store)")
+    await bench_requests(iterations, keys)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000, help="checks per measurement")
+    parser.add_argument("--keys", type=int, default=1000, help="distinct client identities")
+    parser.add_argument("--redis", default=os.getenv("REDIS_URL"), help="Redis URL to benchmark")
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations, args.keys, args.redis))
+
+
+if __name__ == "__main__":
+    main()
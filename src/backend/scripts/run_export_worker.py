@@ -0,0 +1,49 @@
+"""Build queued data export archives outside the API process.
+
+Use this with DATA_EXPORT_JOB_WORKERS=0 on the API, or alongside in-process
+workers; claims use FOR UPDATE SKIP LOCKED so workers never share a job.
+Artifacts are written under LOCAL_STORAGE_PATH/exports, which must be the
+same directory the API serves downloads from.
+
+Usage:
+    python scripts/run_export_worker.py [--concurrency 2] [--once]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.data_export_jobs import data_export_queue, data_export_worker  # noqa: E402
+
+
+async def run(concurrency: int, once: bool) -> None:
+    if once:
+        total = 0
+        while claimed := await data_export_queue.process_due():
+            total += claimed
+        print(f"Built {total} data exports")
+        return
+
+    data_export_worker.start(concurrency)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await data_export_worker.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=1, help="worker tasks")
+    parser.add_argument("--once", action="store_true", help="build queued exports and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.concurrency, args.once))
+
+
+if __name__ == "__main__":
+    main()
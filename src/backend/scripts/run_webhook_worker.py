@@ -0,0 +1,47 @@
+"""Process queued Dodo webhook events outside the API process.
+
+Use this with WEBHOOK_QUEUE_WORKERS=0 on the API, or alongside in-process
+workers; claims use FOR UPDATE SKIP LOCKED so workers never share an event.
+
+Usage:
+    python scripts/run_webhook_worker.py [--concurrency 4] [--once]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.webhook_queue import webhook_queue, webhook_worker  # noqa: E402
+
+
+async def run(concurrency: int, once: bool) -> None:
+    if once:
+        total = 0
+        while claimed := await webhook_queue.process_due():
+            total += claimed
+        print(f"Processed {total} webhook events")
+        return
+
+    webhook_worker.start(concurrency)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await webhook_worker.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=2, help="worker tasks")
+    parser.add_argument("--once", action="store_true", help="drain due events and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.concurrency, args.once))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Run one subscription lifecycle sweep and exit.
+
+Expires lapsed subscriptions, refreshes ``next_refresh_at`` for quarterly
+packs and purges stale webhook events and tokens.  Schedule it from cron
+with LIFECYCLE_SWEEP_INTERVAL_SECONDS=0 on the API, or run it once after
+migrating to backfill ``next_refresh_at``.
+
+Usage:
+    python scripts/sweep_subscriptions.py [--chunk-size 1000]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.subscription_lifecycle import SubscriptionLifecycle  # noqa: E402
+
+
+async def run(chunk_size: int | None) -> None:
+    counts = await SubscriptionLifecycle.run_once(chunk_size=chunk_size)
+    for step, count in counts.items():
+        print(f"{step}: {count}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=None, help="rows per transaction")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
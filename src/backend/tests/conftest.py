@@ -1,12 +1,14 @@
 import asyncio
 import os
-from typing import AsyncGenerator, Generator
+from contextlib import contextmanager
+from typing import AsyncGenerator, Callable, ContextManager, Generator, Iterator
 
 import pytest
 
 # Load test environment before any app imports
 from dotenv import load_dotenv
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
@@ -79,6 +81,42 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
+class StatementLog(list):
+    """SQL statements captured by the ``count_queries`` fixture."""
+
+    def touching(self, table: str) -> list[str]:
+        """Return the captured statements that mention ``table``."""
+        return [s for s in self if table in s]
+
+
+@contextmanager
+def _count_queries() -> Iterator[StatementLog]:
+    statements = StatementLog()
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sync_engine = db_session_module.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _before_cursor_execute)
+
+
+@pytest.fixture
+def count_queries() -> Callable[[], ContextManager[StatementLog]]:
+    """Count SQL statements executed against the test engine.
+
+    Usage::
+
+        with count_queries() as statements:
+            await client.get(...)
+        assert len(statements) <= 3
+    """
+    return _count_queries
+
+
 @pytest.fixture(scope="function")
 async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """Create a test client."""
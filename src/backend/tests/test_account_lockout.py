@@ -0,0 +1,182 @@
+"""Tests for account lockout backends and combined email / IP windows."""
+
+import time
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.services.account_lockout_service import (
+    AccountLockoutService,
+    LockoutBackend,
+    MemoryLockoutBackend,
+    lockout_key,
+)
+
+
+@pytest.fixture
+def lockout_backend():
+    """Give each test its own in-memory backend."""
+    backend = MemoryLockoutBackend(max_keys=1000, sweep_interval=60)
+    AccountLockoutService.set_backend(backend)
+    yield backend
+    AccountLockoutService.set_backend(None)
+
+
+class TestMemoryLockoutBackend:
+    """Test the sliding-window counters and memory bounds."""
+
+    async def test_locks_at_limit(self):
+        """The limit-th failure in a window locks the key."""
+        backend = MemoryLockoutBackend(max_keys=10)
+
+        for _ in range(2):
+            assert await backend.record_failure({"k": 3}, window=60, lockout=30) == 0
+        assert 29 < await backend.record_failure({"k": 3}, window=60, lockout=30) <= 30
+        assert await backend.locked_for(["other", "k"]) > 29
+
+    async def test_previous_window_is_weighted(self, monkeypatch):
+        """Failures from the previous window count by how much of it overlaps."""
+        backend = MemoryLockoutBackend(max_keys=10)
+        now = 1_000_000.0
+        monkeypatch.setattr(time, "time", lambda: now)
+        for _ in range(4):
+            await backend.record_failure({"k": 5}, window=100, lockout=30)
+
+        # Three quarters into the next window only 1 of the 4 still counts
+        now += 175
+        assert await backend.record_failure({"k": 5}, window=100, lockout=30) == 0
+        # Half-way through it, 2 of the 4 count: 2 + 2 failures stays under 5
+        now -= 25
+        assert await backend.record_failure({"k": 5}, window=100, lockout=30) == 0
+        assert await backend.record_failure({"k": 5}, window=100, lockout=30) == 30
+
+        # Two windows later the counter starts over
+        now += 400
+        assert await backend.locked_for(["k"]) == 0
+        assert await backend.record_failure({"k": 5}, window=100, lockout=30) == 0
+
+    async def test_lru_cap_and_sweep(self, monkeypatch):
+        """Keys beyond the cap are evicted oldest first; expired keys are swept."""
+        backend = MemoryLockoutBackend(max_keys=3, sweep_interval=10)
+        now = 1_000_000.0
+        monkeypatch.setattr(time, "time", lambda: now)
+
+        for i in range(5):
+            await backend.record_failure({f"k{i}": 5}, window=60, lockout=30)
+        assert len(backend) == 3
+        assert backend.evictions == 2
+
+        now += 121
+        await backend.locked_for(["k4"])
+        assert len(backend) == 0
+
+
+class TestAccountLockoutService:
+    """Test the combined email and IP limits."""
+
+    async def test_email_lock_applies_from_any_ip(self, lockout_backend, monkeypatch):
+        """An email locked from one IP is locked from every IP."""
+        monkeypatch.setattr(settings, "LOCKOUT_MAX_FAILED_ATTEMPTS", 3)
+        email = f"lock_{uuid4()}@test.com"
+
+        for ip in ("10.0.0.1", "10.0.0.2"):
+            assert not await AccountLockoutService.record_failed_attempt(email, ip)
+        assert await AccountLockoutService.record_failed_attempt(email, "10.0.0.3")
+
+        assert await AccountLockoutService.is_account_locked(email, "10.9.9.9")
+        assert await AccountLockoutService.is_account_locked(email.upper())
+        assert not await AccountLockoutService.is_account_locked("other@test.com", "10.0.0.1")
+
+    async def test_ip_lock_spans_emails(self, lockout_backend, monkeypatch):
+        """Guesses spread over many emails still lock the source IP."""
+        monkeypatch.setattr(settings, "LOCKOUT_IP_MAX_FAILED_ATTEMPTS", 4)
+
+        results = [
+            await AccountLockoutService.record_failed_attempt(f"{uuid4()}@test.com", "10.0.0.9")
+            for _ in range(4)
+        ]
+
+        assert results == [False, False, False, True]
+        assert await AccountLockoutService.is_account_locked("victim@test.com", "10.0.0.9")
+        assert not await AccountLockoutService.is_account_locked("victim@test.com", "10.0.0.8")
+
+    async def test_known_accounts_do_not_count_against_ip(self, lockout_backend, monkeypatch):
+        """Wrong passwords for real accounts behind one IP never lock that IP."""
+        monkeypatch.setattr(settings, "LOCKOUT_IP_MAX_FAILED_ATTEMPTS", 2)
+
+        for _ in range(3):
+            assert not await AccountLockoutService.record_failed_attempt(
+                f"{uuid4()}@test.com", "10.0.0.7", known_account=True
+            )
+
+        assert not await AccountLockoutService.is_account_locked("victim@test.com", "10.0.0.7")
+
+    async def test_success_clears_email_but_not_ip(self, lockout_backend, monkeypatch):
+        """A good login resets the email's count; the IP's count survives."""
+        monkeypatch.setattr(settings, "LOCKOUT_MAX_FAILED_ATTEMPTS", 3)
+        email = f"clear_{uuid4()}@test.com"
+        for _ in range(2):
+            await AccountLockoutService.record_failed_attempt(email, "10.0.0.5")
+
+        await AccountLockoutService.clear_failed_attempts(email)
+
+        assert len(lockout_backend) == 1
+        assert await lockout_backend.locked_for([lockout_key("ip", "10.0.0.5")]) == 0
+        assert not await AccountLockoutService.record_failed_attempt(email, "10.0.0.5")
+
+    async def test_falls_back_to_memory_when_backend_fails(self, monkeypatch):
+        """Backend errors don't fail logins; local counters take over."""
+
+        class BrokenBackend(LockoutBackend):
+            async def locked_for(self, keys):
+                raise ConnectionError("redis down")
+
+            async def record_failure(self, limits, window, lockout):
+                raise ConnectionError("redis down")
+
+            async def clear(self, keys):
+                raise ConnectionError("redis down")
+
+        monkeypatch.setattr(settings, "LOCKOUT_MAX_FAILED_ATTEMPTS", 1)
+        monkeypatch.setattr(AccountLockoutService, "_fallback", None)
+        AccountLockoutService.set_backend(BrokenBackend())
+        try:
+            assert await AccountLockoutService.record_failed_attempt("down@test.com")
+            assert await AccountLockoutService.is_account_locked("down@test.com")
+        finally:
+            AccountLockoutService.set_backend(None)
+
+    async def test_login_reports_lockout(
+        self, client: AsyncClient, test_user: dict, lockout_backend, monkeypatch
+    ):
+        """The login endpoint locks after the limit, even for the right password."""
+        monkeypatch.setattr(settings, "LOCKOUT_MAX_FAILED_ATTEMPTS", 2)
+        bad = {"username": test_user["email"], "password": "WrongPassword1"}
+
+        first = await client.post("/api/v1/auth/login", data=bad)
+        second = await client.post("/api/v1/auth/login", data=bad)
+        good = await client.post(
+            "/api/v1/auth/login",
+            data={"username": test_user["email"], "password": test_user["password"]},
+        )
+
+        assert first.status_code == 401
+        assert second.status_code == 423
+        assert good.status_code == 423
+        assert good.json()["error"]["code"] == second.json()["error"]["code"]
+
+    async def test_login_wrong_passwords_leave_ip_open(
+        self, client: AsyncClient, test_user: dict, lockout_backend, monkeypatch
+    ):
+        """Typos on a real account don't lock other users sharing the IP."""
+        monkeypatch.setattr(settings, "LOCKOUT_IP_MAX_FAILED_ATTEMPTS", 2)
+        bad = {"username": test_user["email"], "password": "WrongPassword1"}
+
+        for _ in range(2):
+            assert (await client.post("/api/v1/auth/login", data=bad)).status_code == 401
+
+        unknown = {"username": f"{uuid4()}@test.com", "password": "WrongPassword1"}
+        assert (await client.post("/api/v1/auth/login", data=unknown)).status_code == 401
+        assert (await client.post("/api/v1/auth/login", data=unknown)).status_code == 423
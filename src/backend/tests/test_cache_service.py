@@ -381,3 +381,521 @@ class TestCacheServiceErrors:
         # Should fallback to memory
         result = await cache.set("key", "value")
         assert result is True
+
+
+class _FakeSharedCache:
+    """In-memory stand-in for the Redis tier used by single_flight."""
+
+    def __init__(self):
+        self.values: dict = {}
+        self.locks: set = set()
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl=300):
+        self.values[key] = value
+        return True
+
+    async def acquire_lock(self, key, ttl_ms):
+        if key in self.locks:
+            return None
+        self.locks.add(key)
+        return "token"
+
+    async def release_lock(self, key, token):
+        self.locks.discard(key)
+
+
+class TestSingleFlight:
+    """Test the single_flight request-coalescing decorator."""
+
+    async def test_concurrent_calls_share_one_computation(self):
+        """Identical concurrent calls run the function once per key."""
+        import asyncio
+
+        from app.services.cache_service import single_flight
+
+        calls = []
+
+        @single_flight("test:sf", ttl=30)
+        async def compute(db, x):
+            calls.append(x)
+            await asyncio.sleep(0.01)
+            return x * 2
+
+        results = await asyncio.gather(*(compute(object(), 2) for _ in range(5)), compute(None, 3))
+        assert results == [4, 4, 4, 4, 4, 6]
+        assert calls == [2, 3]
+        assert compute.inflight == {}
+
+        # Not cached once settled without Redis
+        await compute(None, 2)
+        assert calls == [2, 3, 2]
+
+    async def test_errors_reach_every_waiter(self):
+        """A failed computation raises in every coalesced caller and isn't remembered."""
+        import asyncio
+
+        from app.services.cache_service import single_flight
+
+        attempts = []
+
+        @single_flight("test:sf-error", ttl=30)
+        async def compute(db):
+            attempts.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(compute(None), compute(None), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert len(attempts) == 1
+
+        with pytest.raises(ValueError):
+            await compute(None)
+        assert len(attempts) == 2
+
+    async def test_computation_uses_its_own_session(self, db_session):
+        """The shared load doesn't borrow the first caller's request session."""
+        import asyncio
+
+        from sqlalchemy import text
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        from app.services.cache_service import single_flight
+
+        sessions = []
+
+        @single_flight("test:sf-session", ttl=30)
+        async def compute(db, x):
+            sessions.append(db)
+            await asyncio.sleep(0.01)
+            return (await db.execute(text("SELECT :x"), {"x": x})).scalar_one()
+
+        assert await asyncio.gather(compute(db_session, 7), compute(db_session, 7)) == [7, 7]
+        assert len(sessions) == 1
+        assert isinstance(sessions[0], AsyncSession)
+        assert sessions[0] is not db_session
+
+    async def test_shared_tier_serves_fresh_and_stale_values(self, monkeypatch):
+        """With Redis, fresh values skip the call and stale ones are served while locked."""
+        import time
+
+        from app.services import cache_service as cache_module
+        from app.services.cache_service import single_flight
+
+        monkeypatch.setattr(cache_module.settings, "REDIS_URL", "redis://fake")
+        shared = _FakeSharedCache()
+        calls = []
+
+        @single_flight("test:sf-shared", ttl=30, stale_ttl=30, cache=shared)
+        async def compute(db, x):
+            calls.append(x)
+            return {"x": x}
+
+        assert await compute(None, 1) == {"x": 1}
+        key = "test:sf-shared:x=1"
+        assert shared.values[key]["value"] == {"x": 1}
+        assert shared.locks == set()
+
+        # Fresh: served from the shared tier
+        assert await compute(None, 1) == {"x": 1}
+        assert calls == [1]
+
+        # Stale while another worker holds the lock: stale value, no recompute
+        shared.values[key] = {"value": {"x": "stale"}, "fresh_until": time.time() - 1}
+        shared.locks.add(f"{key}:lock")
+        assert await compute(None, 1) == {"x": "stale"}
+        assert calls == [1]
+
+        # Stale and the lock is free: this worker revalidates
+        shared.locks.clear()
+        assert await compute(None, 1) == {"x": 1}
+        assert calls == [1, 1]
+
+    async def test_acquire_lock_uses_set_nx_px(self):
+        """acquire_lock issues SET NX PX and reports contention."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        mock_client = AsyncMock()
+        mock_client.set = AsyncMock(side_effect=[True, None])
+        cache._client = mock_client
+
+        token = await cache.acquire_lock("lock:key", 5000)
+        assert token
+        _, kwargs = mock_client.set.call_args
+        assert kwargs == {"nx": True, "px": 5000}
+        assert await cache.acquire_lock("lock:key", 5000) is None
+
+        await cache.release_lock("lock:key", token)
+        mock_client.eval.assert_called_once()
+
+
+class _Clock:
+    """Manually advanced timer for LocalCache expiry tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLocalCache:
+    """Test the bounded LRU used for L1 and the Redis fallback."""
+
+    def test_entries_expire_with_their_ttl(self):
+        """Each key keeps the TTL it was set with."""
+        from app.services.cache_service import LocalCache
+
+        clock = _Clock()
+        local = LocalCache(max_bytes=1024, timer=clock)
+        local.set("short", '"a"', ttl=5)
+        local.set("long", '"b"', ttl=60)
+
+        clock.now = 10
+        assert local.get("short") is None
+        assert "short" not in local
+        assert local.get("long") == '"b"'
+        assert local.stats()["hits"] == 1
+        assert local.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used_over_byte_cap(self):
+        """Inserting past max_bytes evicts the coldest keys first."""
+        from app.services.cache_service import LocalCache
+
+        local = LocalCache(max_bytes=25)
+        local.set("k1", "x" * 8)
+        local.set("k2", "x" * 8)
+        local.get("k1")  # k2 is now least recently used
+        local.set("k3", "x" * 8)
+
+        assert "k1" in local and "k3" in local
+        assert "k2" not in local
+        assert local.bytes <= 25
+        assert local.stats()["evictions"] == 1
+
+        # Values larger than the whole cache are not stored
+        local.set("huge", "x" * 100)
+        assert "huge" not in local
+
+    def test_discard_matching_uses_glob_patterns(self):
+        """Pattern invalidation clears matching local keys."""
+        from app.services.cache_service import LocalCache
+
+        local = LocalCache(max_bytes=1024)
+        for key in ("games:1", "games:2", "users:1"):
+            local.set(key, "1")
+
+        assert local.discard_matching("games:*") == 2
+        assert len(local) == 1
+        assert "users:1" in local
+
+
+class TestTwoTierCache:
+    """Test the L1 tier in front of Redis."""
+
+    async def test_l1_serves_repeat_reads_without_redis(self):
+        """A value read from Redis is served locally until its L1 TTL ends."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        mock_client = AsyncMock()
+        mock_client.get = AsyncMock(return_value=json.dumps({"a": 1}))
+        cache._client = mock_client
+
+        assert await cache.get("key") == {"a": 1}
+        assert await cache.get("key") == {"a": 1}
+        mock_client.get.assert_called_once_with("key")
+        assert cache.stats()["l1"]["hits"] == 1
+
+        # local_ttl=0 always goes to Redis
+        await cache.get("other", local_ttl=0)
+        await cache.get("other", local_ttl=0)
+        assert mock_client.get.call_count == 3
+
+    async def test_l1_returns_copies(self):
+        """Callers mutating a cached value don't corrupt the local tier."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        cache._client = AsyncMock()
+
+        await cache.set("key", {"items": [1]})
+        value = await cache.get("key")
+        value["items"].append(2)
+        assert await cache.get("key") == {"items": [1]}
+
+    async def test_delete_clears_local_tiers(self):
+        """Deleted keys disappear from L1 and the fallback store."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        mock_client = AsyncMock()
+        mock_client.setex = AsyncMock(side_effect=redis.RedisError("down"))
+        cache._client = mock_client
+        await cache.set("key", "value")
+        assert "key" in cache._fallback
+
+        await cache.delete("key")
+        assert "key" not in cache._fallback
+        assert "key" not in cache.l1
+
+    async def test_get_many_fetches_only_l1_misses(self):
+        """get_many answers from L1 and issues one MGET for the rest."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        mock_client = AsyncMock()
+        mock_client.mget = AsyncMock(return_value=[json.dumps(2), None])
+        cache._client = mock_client
+        await cache.set("a", 1)
+
+        values = await cache.get_many(["a", "b", "c"])
+
+        assert values == {"a": 1, "b": 2}
+        mock_client.mget.assert_called_once_with(["b", "c"])
+        assert "b" in cache.l1
+
+    async def test_set_many_pipelines_writes(self):
+        """set_many queues every SETEX on one non-transactional pipeline."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        pipe = MagicMock()
+        pipe.__aenter__ = AsyncMock(return_value=pipe)
+        pipe.__aexit__ = AsyncMock(return_value=False)
+        pipe.execute = AsyncMock(return_value=[True, True])
+        mock_client = MagicMock()
+        mock_client.pipeline = MagicMock(return_value=pipe)
+        cache._client = mock_client
+
+        assert await cache.set_many({"a": 1, "b": [2]}, ttl=60) is True
+
+        mock_client.pipeline.assert_called_once_with(transaction=False)
+        written = {c.args[0]: (c.args[1], cache.serializer.decode(c.args[2])) for c in pipe.setex.call_args_list}
+        assert written == {"a": (60, 1), "b": (60, [2])}
+        pipe.execute.assert_awaited_once()
+
+    async def test_set_many_falls_back_when_redis_fails(self):
+        """Pipelined writes land in the fallback store during an outage."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        mock_client = MagicMock()
+        mock_client.pipeline = MagicMock(side_effect=redis.ConnectionError("down"))
+        mock_client.mget = AsyncMock(side_effect=redis.ConnectionError("down"))
+        cache._client = mock_client
+
+        assert await cache.set_many({"a": 1, "b": 2}, local_ttl=0) is True
+        assert await cache.get_many(["a", "b"]) == {"a": 1, "b": 2}
+
+
+class TestCachedDecorator:
+    """Test the cached() result-caching decorator."""
+
+    async def test_results_are_cached_by_arguments(self):
+        """Calls with the same arguments (minus db) reuse the cached result."""
+        from app.services.cache_service import CacheService, cached
+
+        cache = CacheService()
+        calls = []
+
+        @cached("test:cached", ttl=60, cache=cache)
+        async def lookup(db, x, flag=False):
+            calls.append(x)
+            return None if flag else {"x": x}
+
+        assert await lookup(object(), 1) == {"x": 1}
+        assert await lookup(object(), 1) == {"x": 1}
+        assert await lookup(None, 2, flag=True) is None
+        assert await lookup(None, 2, flag=True) is None
+        assert calls == [1, 2]
+
+        key = lookup.key_for(None, 1)
+        assert key == "test:cached:flag=False:x=1"
+        await cache.delete(key, remote=False)
+        await lookup(None, 1)
+        assert calls == [1, 2, 1]
+
+
+class TestCacheSerializer:
+    """Test cache value framing, codecs and compression."""
+
+    def test_round_trips_with_every_available_codec(self):
+        """Each installed codec/compression pair decodes what it encodes."""
+        from app.services.cache_codecs import CODECS, COMPRESSORS, CacheSerializer
+
+        value = {"games": [{"id": "g1", "plays": 3, "rate": 0.5}] * 50, "ok": True, "none": None}
+        for codec in CODECS:
+            for compression in COMPRESSORS:
+                serializer = CacheSerializer(codec, compression, min_compress_bytes=64)
+                payload = serializer.encode(value)
+                assert isinstance(payload, bytes)
+                assert serializer.decode(payload) == value
+                # Any worker can read it regardless of its own settings
+                assert CacheSerializer("json", "none").decode(payload) == value
+
+    def test_compresses_only_above_threshold(self):
+        """Small values are stored uncompressed; large ones are compressed."""
+        from app.services.cache_codecs import CacheSerializer
+
+        serializer = CacheSerializer("json", "zlib", min_compress_bytes=100)
+        small = serializer.encode({"a": 1})
+        large = serializer.encode({"a": "x" * 1000})
+
+        assert small[2:3] == b"0"
+        assert large[2:3] == b"z"
+        assert len(large) < 1000
+
+    def test_encodes_pydantic_models_and_datetimes(self):
+        """Models are stored in their JSON form, ready for model_validate."""
+        from datetime import datetime, timezone
+
+        from app.schemas.game import GlobalGameStatsResponse
+        from app.services.cache_codecs import CacheSerializer
+
+        generated_at = datetime(2026, 1, 2, tzinfo=timezone.utc)
+        response = GlobalGameStatsResponse(period="week", generated_at=generated_at, games=[])
+        serializer = CacheSerializer("json", "none")
+
+        decoded = serializer.decode(serializer.encode({"response": response, "at": generated_at}))
+
+        assert decoded["response"]["generated_at"].startswith("2026-01-02T00:00:00")
+        assert decoded["at"] == generated_at.isoformat()
+        with pytest.raises(TypeError):
+            serializer.encode(object())
+
+    def test_reads_legacy_json_and_rejects_unknown_frames(self):
+        """Unframed JSON still decodes; unknown codecs raise CacheDecodeError."""
+        from app.services.cache_codecs import CacheDecodeError, CacheSerializer
+
+        serializer = CacheSerializer("json", "none")
+        assert serializer.decode(json.dumps({"a": 1})) == {"a": 1}
+        with pytest.raises(CacheDecodeError):
+            serializer.decode(b"\x01?0{}")
+        with pytest.raises(CacheDecodeError):
+            serializer.decode(b"\x01jz-not-zlib")
+
+    def test_unavailable_codec_falls_back_to_json(self):
+        """Configuring a codec that isn't installed degrades to stdlib json."""
+        from app.services.cache_codecs import CacheSerializer
+
+        serializer = CacheSerializer("not-a-codec", "not-a-compressor")
+        assert serializer.codec.name == "json"
+        assert serializer.compression == "zlib"
+
+
+def _mock_pipeline() -> MagicMock:
+    pipe = MagicMock()
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=False)
+    pipe.execute = AsyncMock(return_value=[])
+    return pipe
+
+
+class TestNamespaceInvalidation:
+    """Test versioned namespaces."""
+
+    async def test_bump_namespace_moves_keys_to_new_version(self):
+        """Bumping is one INCR and changes every key built in the namespace."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        mock_client = AsyncMock()
+        mock_client.get = AsyncMock(return_value=b"3")
+        mock_client.incr = AsyncMock(return_value=4)
+        cache._client = mock_client
+
+        assert await cache.namespace_key("games", "list", page=1) == "ns:games:v3:list:page=1"
+        assert await cache.bump_namespace("games") == 4
+        mock_client.incr.assert_awaited_once_with("ns:games:version")
+        assert await cache.namespace_key("games", "list", page=1) == "ns:games:v4:list:page=1"
+        # The bumped version is reused without another GET
+        mock_client.get.assert_awaited_once()
+
+    async def test_namespace_version_is_reread_after_max_age(self):
+        """Other workers' bumps are seen once the cached version is older than max_age."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        mock_client = AsyncMock()
+        mock_client.get = AsyncMock(side_effect=[None, b"7"])
+        cache._client = mock_client
+
+        assert await cache.namespace_version("stats") == 0
+        assert await cache.namespace_version("stats", max_age=0) == 7
+
+    async def test_local_namespaces_without_redis(self):
+        """remote=False keeps versions in-process; outages keep the last known version."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        assert await cache.namespace_version("local", remote=False) == 0
+        assert await cache.bump_namespace("local", remote=False) == 1
+        assert await cache.namespace_key("local", "x", remote=False) == "ns:local:v1:x"
+
+        mock_client = AsyncMock()
+        mock_client.get = AsyncMock(side_effect=redis.ConnectionError("down"))
+        cache._client = mock_client
+        assert await cache.namespace_version("local", max_age=0) == 1
+
+
+class TestTagInvalidation:
+    """Test tag-set invalidation."""
+
+    async def test_tagged_set_records_key_in_tag_sets(self):
+        """Tagged writes add SADD + EXPIRE to the same pipeline as the SETEX."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        pipe = _mock_pipeline()
+        mock_client = MagicMock()
+        mock_client.pipeline = MagicMock(return_value=pipe)
+        cache._client = mock_client
+
+        assert await cache.set("stats:p1", {"a": 1}, ttl=60, tags=["profile:p1"]) is True
+
+        pipe.setex.assert_called_once()
+        pipe.sadd.assert_called_once_with("tag:profile:p1", "stats:p1")
+        pipe.expire.assert_any_call("tag:profile:p1", 60, nx=True)
+        pipe.expire.assert_any_call("tag:profile:p1", 60, gt=True)
+
+    async def test_invalidate_tag_deletes_only_tagged_keys(self):
+        """invalidate_tag renames the tag set away and unlinks its members."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        pipe = _mock_pipeline()
+        mock_client = MagicMock()
+        mock_client.pipeline = MagicMock(return_value=pipe)
+        mock_client.rename = AsyncMock(return_value=True)
+        mock_client.smembers = AsyncMock(return_value={b"k1", b"k2"})
+        cache._client = mock_client
+        await cache.set("k1", 1, tags=["t"], remote=False)
+        await cache.set("k3", 3, tags=["other"], remote=False)
+
+        assert await cache.invalidate_tag("t") is True
+
+        doomed = mock_client.rename.call_args.args[1]
+        assert mock_client.rename.call_args.args[0] == "tag:t"
+        assert doomed.startswith("tag:t:")
+        unlinked = [c.args for c in pipe.unlink.call_args_list]
+        assert sorted(unlinked[0]) == [b"k1", b"k2"]
+        assert unlinked[-1] == (doomed,)
+        assert "k1" not in cache.l1
+        assert "k3" in cache.l1
+
+    async def test_invalidate_missing_tag_is_a_no_op(self):
+        """A tag with no keys (RENAME fails) needs no further round-trips."""
+        from app.services.cache_service import CacheService
+
+        cache = CacheService()
+        mock_client = MagicMock()
+        mock_client.rename = AsyncMock(side_effect=redis.ResponseError("no such key"))
+        mock_client.smembers = AsyncMock()
+        cache._client = mock_client
+
+        assert await cache.invalidate_tag("empty") is True
+        mock_client.smembers.assert_not_called()
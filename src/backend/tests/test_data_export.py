@@ -1,5 +1,6 @@
 """Tests for data export endpoints and service (GDPR/COPPA compliance)."""
 
+import json
 from unittest.mock import patch
 
 import pytest
@@ -304,7 +305,6 @@ class TestDataExportCSVGeneration:
 
     async def test_csv_generation(self, db_session: AsyncSession, test_user: dict):
         """Test CSV content generation."""
-        from app.api.v1.endpoints.data_export import _generate_csv
         from app.services.data_export_service import DataExportService
         from app.services.user_service import UserService
 
@@ -318,7 +318,7 @@ class TestDataExportCSVGeneration:
             include_subscriptions=True,
         )
 
-        csv_content = _generate_csv(export_data)
+        csv_content = _expected_csv(export_data)
 
         # Verify CSV structure
         assert "USER INFORMATION" in csv_content
@@ -343,3 +343,279 @@ class TestDataExportCSVGeneration:
         # Should contain user info section
         assert any("USER INFORMATION" in line for line in lines)
         assert any("PROFILES" in line for line in lines)
+
+
+async def _create_user_with_history(db_session: AsyncSession, progress_count: int = 5):
+    """Create a parent with one profile, some progress and a subscription."""
+    from datetime import datetime, timedelta, timezone
+    from uuid import uuid4
+
+    from app.core.security import get_password_hash
+    from app.db.models.profile import Profile
+    from app.db.models.progress import Progress
+    from app.db.models.subscription_model import (
+        Subscription,
+        SubscriptionPlanType,
+        SubscriptionStatus,
+    )
+    from app.db.models.user import User
+
+    user = User(
+        email=f"export_{uuid4()}@test.com",
+        hashed_password=get_password_hash("password123"),
+        is_active=True,
+        email_verified=True,
+    )
+    db_session.add(user)
+    await db_session.flush()
+    profile = Profile(parent_id=user.id, name="Kid", age=5, preferred_language="en")
+    db_session.add(profile)
+    await db_session.flush()
+    db_session.add_all(
+        Progress(
+            profile_id=profile.id,
+            activity_type="drawing",
+            content_id=f"letter_{i}",
+            score=i * 10,
+            meta_data={"attempt": i},
+            completed=True,
+        )
+        for i in range(progress_count)
+    )
+    now = datetime.now(timezone.utc)
+    db_session.add(
+        Subscription(
+            parent_id=user.id,
+            plan_type=SubscriptionPlanType.GAME_PACK_5,
+            start_date=now,
+            end_date=now + timedelta(days=30),
+            amount_paid=0,
+            status=SubscriptionStatus.ACTIVE,
+        )
+    )
+    await db_session.commit()
+    return user
+
+
+async def _collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+def _expected_csv(export_data) -> str:
+    """Build the CSV download for an in-memory ``DataExportResponse``."""
+    from app.services.data_export_service import (
+        CSV_PROFILE_HEADER,
+        CSV_PROGRESS_HEADER,
+        CSV_SUBSCRIPTION_HEADER,
+        CsvLineWriter,
+        csv_profile_row,
+        csv_progress_row,
+        csv_subscription_row,
+        csv_user_rows,
+    )
+
+    writer = CsvLineWriter()
+    parts = [writer.rows(csv_user_rows(export_data.user))]
+    parts.append(writer.rows([["PROFILES"], CSV_PROFILE_HEADER]))
+    parts.append(writer.rows(csv_profile_row(profile) for profile in export_data.profiles))
+    parts.append(writer.row([]))
+    if export_data.progress:
+        parts.append(writer.rows([["PROGRESS"], CSV_PROGRESS_HEADER]))
+        parts.append(writer.rows(csv_progress_row(progress) for progress in export_data.progress))
+        parts.append(writer.row([]))
+    if export_data.subscriptions:
+        parts.append(writer.rows([["SUBSCRIPTIONS"], CSV_SUBSCRIPTION_HEADER]))
+        parts.append(writer.rows(csv_subscription_row(sub) for sub in export_data.subscriptions))
+    return "".join(parts)
+
+
+class TestDataExportStreaming:
+    """Test the streamed download path."""
+
+    async def test_streamed_json_matches_export(self, db_session: AsyncSession):
+        """The streamed document is a valid DataExportResponse with the same data."""
+        from app.schemas.data_export import DataExportResponse
+        from app.services.data_export_service import DataExportService
+
+        user = await _create_user_with_history(db_session)
+        expected = await DataExportService.export_user_data(db_session, user.id)
+        user_export = await DataExportService.get_user_export(db_session, user.id)
+
+        body = await _collect(DataExportService.stream_export(user_export, format="json"))
+        streamed = DataExportResponse.model_validate_json(body)
+
+        assert len(streamed.progress) == 5
+        assert len(streamed.subscriptions) == 1
+        assert streamed.subscriptions[0].plan_type == "game_pack_5"
+        exclude = {"export_id", "generated_at"}
+        progress_key = lambda p: p["id"]  # noqa: E731
+        actual = streamed.model_dump(exclude=exclude)
+        wanted = expected.model_dump(exclude=exclude)
+        actual["progress"].sort(key=progress_key)
+        wanted["progress"].sort(key=progress_key)
+        assert actual == wanted
+
+    async def test_streamed_json_respects_excludes(self, db_session: AsyncSession):
+        """Excluded sections are written as empty arrays."""
+        from app.services.data_export_service import DataExportService
+
+        user = await _create_user_with_history(db_session)
+        user_export = await DataExportService.get_user_export(db_session, user.id)
+
+        body = await _collect(
+            DataExportService.stream_export(
+                user_export, include_progress=False, include_subscriptions=False
+            )
+        )
+        data = json.loads(body)
+
+        assert len(data["profiles"]) == 1
+        assert data["progress"] == []
+        assert data["subscriptions"] == []
+
+    async def test_streamed_csv_matches_export(self, db_session: AsyncSession):
+        """Streamed CSV has the same sections and rows as the in-memory export."""
+        from app.services.data_export_service import DataExportService
+
+        user = await _create_user_with_history(db_session, progress_count=3)
+        expected = await DataExportService.export_user_data(db_session, user.id)
+        user_export = await DataExportService.get_user_export(db_session, user.id)
+
+        body = await _collect(DataExportService.stream_export(user_export, format="csv"))
+        content = body.decode("utf-8")
+
+        for section in ("USER INFORMATION", "PROFILES", "PROGRESS", "SUBSCRIPTIONS"):
+            assert section in content
+        assert sorted(content.splitlines()) == sorted(_expected_csv(expected).splitlines())
+
+    async def test_stream_progress_fetches_in_chunks(self, db_session: AsyncSession):
+        """A chunk size smaller than the history still yields every row."""
+        from app.services.data_export_service import DataExportService
+
+        user = await _create_user_with_history(db_session, progress_count=7)
+
+        rows = [
+            progress
+            async for progress in DataExportService.stream_progress(
+                db_session, user.id, chunk_size=2
+            )
+        ]
+
+        assert len(rows) == 7
+        assert len({row.id for row in rows}) == 7
+
+
+class TestDataExportSummaryCounts:
+    """Test the aggregate, cached export summary."""
+
+    async def _parent_with_profile(self, db_session: AsyncSession):
+        from uuid import uuid4
+
+        from app.core.security import get_password_hash
+        from app.db.models.user import User
+        from app.schemas.profile import ProfileCreate
+        from app.services.profile_service import ProfileService
+
+        user = User(
+            email=f"summary_{uuid4()}@test.com",
+            hashed_password=get_password_hash("password123"),
+            is_active=True,
+            email_verified=True,
+        )
+        db_session.add(user)
+        await db_session.commit()
+        profile = await ProfileService.create(db_session, user.id, ProfileCreate(name="Kid", age=5))
+        return user, profile
+
+    async def test_summary_is_one_query_then_cached(
+        self, db_session: AsyncSession, count_queries
+    ):
+        """Counts come from a single statement; repeat calls hit the cache."""
+        from app.schemas.progress import ProgressCreate
+        from app.services.data_export_service import DataExportService
+        from app.services.progress_service import ProgressService
+
+        user, profile = await self._parent_with_profile(db_session)
+        for i in range(3):
+            await ProgressService.create(
+                db_session, profile.id, ProgressCreate(activity_type="drawing", content_id=f"c{i}")
+            )
+
+        with count_queries() as statements:
+            summary = await DataExportService.get_data_summary(db_session, user.id)
+        assert len(statements) == 1
+        assert summary["profile_count"] == 1
+        assert summary["progress_count"] == 3
+        assert summary["subscription_count"] == 0
+
+        with count_queries() as statements:
+            assert await DataExportService.get_data_summary(db_session, user.id) == summary
+        assert statements == []
+
+    async def test_summary_counts_match_export_rows(self, db_session: AsyncSession):
+        """progress_count is the number of rows an export writes, not the rollup."""
+        from app.db.models.progress import Progress
+        from app.services.data_export_service import DataExportService
+
+        user, profile = await self._parent_with_profile(db_session)
+        # Inserted directly, so the rollup doesn't see them
+        db_session.add_all(
+            Progress(profile_id=profile.id, activity_type="drawing", content_id=f"raw{i}")
+            for i in range(4)
+        )
+        await db_session.commit()
+
+        summary = await DataExportService.get_data_summary(db_session, user.id)
+        counts = await DataExportService.count_export_rows(db_session, user.id)
+        assert summary["progress_count"] == counts["progress"] == 4
+
+    async def test_progress_and_profile_writes_invalidate_summary(
+        self, db_session: AsyncSession
+    ):
+        """New progress or profiles show up in the next summary."""
+        from app.schemas.profile import ProfileCreate
+        from app.schemas.progress import ProgressCreate
+        from app.services.data_export_service import DataExportService
+        from app.services.profile_service import ProfileService
+        from app.services.progress_service import ProgressService
+
+        user, profile = await self._parent_with_profile(db_session)
+        assert (await DataExportService.get_data_summary(db_session, user.id))[
+            "progress_count"
+        ] == 0
+
+        await ProgressService.create(
+            db_session, profile.id, ProgressCreate(activity_type="drawing", content_id="a")
+        )
+        assert (await DataExportService.get_data_summary(db_session, user.id))[
+            "progress_count"
+        ] == 1
+
+        await ProfileService.create(db_session, user.id, ProfileCreate(name="Sibling"))
+        assert (await DataExportService.get_data_summary(db_session, user.id))[
+            "profile_count"
+        ] == 2
+
+    async def test_summary_estimates_size_and_delivery(
+        self, db_session: AsyncSession, monkeypatch
+    ):
+        """Byte estimates grow with row counts and drive the delivery hint."""
+        from app.core.config import settings
+        from app.services.data_export_service import DataExportService, estimate_export_bytes
+
+        user, _ = await self._parent_with_profile(db_session)
+        summary = await DataExportService.get_data_summary(db_session, user.id)
+        assert summary["estimated_bytes"] == estimate_export_bytes(
+            {"profiles": 1, "progress": 0, "subscriptions": 0}
+        )
+        assert summary["recommended_delivery"] == "inline"
+
+        small = estimate_export_bytes({"progress": 10})
+        large = estimate_export_bytes({"progress": 10_000})
+        assert large["json"] > small["json"] > 0
+        assert large["csv"] > small["csv"] > 0
+
+        await DataExportService.invalidate_summary(user.id)
+        monkeypatch.setattr(settings, "DATA_EXPORT_INLINE_MAX_BYTES", 100)
+        summary = await DataExportService.get_data_summary(db_session, user.id)
+        assert summary["recommended_delivery"] == "background"
@@ -0,0 +1,278 @@
+"""Tests for background data export jobs."""
+
+import io
+import json
+import zipfile
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def export_storage(tmp_path, monkeypatch):
+    """Write export artifacts to a per-test directory."""
+    monkeypatch.setattr(settings, "LOCAL_STORAGE_PATH", str(tmp_path))
+    return tmp_path / "exports"
+
+
+async def _create_parent(db_session: AsyncSession, progress_count: int = 3):
+    """Create a parent with one profile and some progress; returns (user, headers)."""
+    from app.core.security import create_access_token, get_password_hash
+    from app.db.models.profile import Profile
+    from app.db.models.progress import Progress
+    from app.db.models.user import User
+
+    user = User(
+        email=f"export_job_{uuid4()}@test.com",
+        hashed_password=get_password_hash("password123"),
+        is_active=True,
+        email_verified=True,
+    )
+    db_session.add(user)
+    await db_session.flush()
+    profile = Profile(parent_id=user.id, name="Kid", age=6, preferred_language="en")
+    db_session.add(profile)
+    await db_session.flush()
+    db_session.add_all(
+        Progress(
+            profile_id=profile.id,
+            activity_type="drawing",
+            content_id=f"letter_{i}",
+            score=i,
+            completed=True,
+        )
+        for i in range(progress_count)
+    )
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': user.id})}"}
+    return user, headers
+
+
+async def _drain() -> None:
+    from app.services.data_export_jobs import data_export_queue
+
+    while await data_export_queue.process_due():
+        pass
+
+
+class TestDataExportJobEndpoints:
+    """Test the job API from request to download."""
+
+    async def test_job_lifecycle_and_download(self, client: AsyncClient, db_session: AsyncSession):
+        """A queued job is built into a zip with one member per section."""
+        _, headers = await _create_parent(db_session, progress_count=4)
+
+        response = await client.post(
+            "/api/v1/export/export/jobs", json={"format": "jsonl"}, headers=headers
+        )
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+        assert job["download_url"] is None
+
+        await _drain()
+
+        response = await client.get(f"/api/v1/export/export/jobs/{job['id']}", headers=headers)
+        assert response.status_code == 200
+        status = response.json()
+        assert status["status"] == "completed"
+        assert status["progress_percent"] == 100
+        assert status["rows_written"] == status["rows_total"] == 5
+        assert status["download_url"].endswith(f"/export/jobs/{job['id']}/download")
+
+        response = await client.get(status["download_url"], headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert "attachment" in response.headers["content-disposition"]
+        assert int(response.headers["content-length"]) == status["artifact_size"]
+
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert sorted(archive.namelist()) == [
+            "profiles.jsonl",
+            "progress.jsonl",
+            "subscriptions.jsonl",
+            "user.json",
+        ]
+        progress_lines = archive.read("progress.jsonl").decode().splitlines()
+        assert len(progress_lines) == 4
+        assert {json.loads(line)["content_id"] for line in progress_lines} == {
+            f"letter_{i}" for i in range(4)
+        }
+
+    async def test_download_supports_range_requests(
+        self, client: AsyncClient, db_session: AsyncSession
+    ):
+        """Partial downloads resume with a Range header."""
+        _, headers = await _create_parent(db_session)
+        job = (await client.post("/api/v1/export/export/jobs", json={}, headers=headers)).json()
+        await _drain()
+        url = f"/api/v1/export/export/jobs/{job['id']}/download"
+        full = (await client.get(url, headers=headers)).content
+
+        response = await client.get(url, headers={**headers, "Range": "bytes=10-"})
+
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes 10-{len(full) - 1}/{len(full)}"
+        assert response.content == full[10:]
+
+    async def test_repeated_requests_share_a_job(
+        self, client: AsyncClient, db_session: AsyncSession
+    ):
+        """The same options within the dedupe window return the existing job."""
+        _, headers = await _create_parent(db_session)
+
+        first = await client.post("/api/v1/export/export/jobs", json={}, headers=headers)
+        second = await client.post("/api/v1/export/export/jobs", json={}, headers=headers)
+        other = await client.post(
+            "/api/v1/export/export/jobs", json={"format": "csv"}, headers=headers
+        )
+
+        assert first.status_code == 202
+        assert second.status_code == 200
+        assert second.json()["id"] == first.json()["id"]
+        assert other.status_code == 202
+        assert other.json()["id"] != first.json()["id"]
+
+        # Still deduped once the artifact exists
+        await _drain()
+        third = await client.post("/api/v1/export/export/jobs", json={}, headers=headers)
+        assert third.json()["id"] == first.json()["id"]
+        assert third.json()["status"] == "completed"
+
+    async def test_jobs_are_private_and_downloads_wait_for_completion(
+        self, client: AsyncClient, db_session: AsyncSession
+    ):
+        """Other users get 404; unfinished jobs can't be downloaded yet."""
+        _, headers = await _create_parent(db_session)
+        _, other_headers = await _create_parent(db_session)
+        job = (await client.post("/api/v1/export/export/jobs", json={}, headers=headers)).json()
+
+        response = await client.get(f"/api/v1/export/export/jobs/{job['id']}/download", headers=headers)
+        assert response.status_code == 409
+        response = await client.get(f"/api/v1/export/export/jobs/{job['id']}", headers=other_headers)
+        assert response.status_code == 404
+
+    async def test_invalid_format_rejected(self, client: AsyncClient, auth_headers: dict):
+        """Only json, jsonl and csv archives are supported."""
+        response = await client.post(
+            "/api/v1/export/export/jobs", json={"format": "xml"}, headers=auth_headers
+        )
+        assert response.status_code == 422
+
+
+class TestDataExportJobQueue:
+    """Test artifact building and cleanup."""
+
+    async def test_csv_archive_has_section_headers(self, db_session: AsyncSession):
+        """CSV archives hold one CSV per section with its header row."""
+        from app.services.data_export_jobs import COMPLETED, data_export_queue
+
+        user, _ = await _create_parent(db_session, progress_count=2)
+        job, created = await data_export_queue.enqueue(
+            db_session, user.id, format="csv", include_subscriptions=False
+        )
+        assert created
+
+        await _drain()
+        await db_session.refresh(job)
+
+        assert job.status == COMPLETED
+        path = data_export_queue.artifact_path(job)
+        with zipfile.ZipFile(path) as archive:
+            assert sorted(archive.namelist()) == ["profiles.csv", "progress.csv", "user.csv"]
+            progress = archive.read("progress.csv").decode().splitlines()
+            assert progress[0].startswith("ID,Profile ID,Activity")
+            assert len(progress) == 3
+            assert user.email in archive.read("user.csv").decode()
+
+    async def test_running_job_renews_its_lease(self, db_session: AsyncSession, monkeypatch):
+        """locked_at is pushed back while the archive is written."""
+        from app.db.models.data_export_job import DataExportJob
+        from app.services.data_export_jobs import COMPLETED, DataExportJobQueue, data_export_queue
+
+        monkeypatch.setattr(settings, "DATA_EXPORT_JOB_LEASE_SECONDS", 0)
+        renewals = []
+        renew_lease = DataExportJobQueue.renew_lease
+
+        async def tracking_renew_lease(job_id, attempt):
+            renewed = await renew_lease(job_id, attempt)
+            renewals.append(renewed)
+            return renewed
+
+        monkeypatch.setattr(DataExportJobQueue, "renew_lease", staticmethod(tracking_renew_lease))
+
+        user, _ = await _create_parent(db_session)
+        job, _ = await data_export_queue.enqueue(db_session, user.id)
+        await _drain()
+
+        job = await db_session.get(DataExportJob, job.id, populate_existing=True)
+        assert job.status == COMPLETED
+        assert renewals and all(renewals)
+
+    async def test_reclaimed_job_is_not_finished_twice(
+        self, db_session: AsyncSession, monkeypatch, export_storage
+    ):
+        """A worker that lost its lease discards its file and leaves the row alone."""
+        from sqlalchemy import update
+
+        from app.db import session as db_session_module
+        from app.db.models.data_export_job import DataExportJob
+        from app.services.data_export_jobs import RUNNING, DataExportJobQueue, data_export_queue
+
+        monkeypatch.setattr(settings, "DATA_EXPORT_JOB_LEASE_SECONDS", 0)
+        renew_lease = DataExportJobQueue.renew_lease
+
+        async def reclaimed_then_renew(job_id, attempt):
+            # Another worker claims the job before this one renews
+            async with db_session_module.async_session() as other:
+                await other.execute(
+                    update(DataExportJob)
+                    .where(DataExportJob.id == job_id)
+                    .values(attempts=DataExportJob.attempts + 1)
+                )
+                await other.commit()
+            return await renew_lease(job_id, attempt)
+
+        monkeypatch.setattr(
+            DataExportJobQueue, "renew_lease", staticmethod(reclaimed_then_renew)
+        )
+
+        user, _ = await _create_parent(db_session)
+        job, _ = await data_export_queue.enqueue(db_session, user.id)
+        async with db_session_module.async_session() as worker_db:
+            [job_id] = await data_export_queue.claim(worker_db, 1)
+
+        assert await data_export_queue.process(job_id) == RUNNING
+
+        job = await db_session.get(DataExportJob, job_id, populate_existing=True)
+        assert job.status == RUNNING
+        assert job.attempts == 2
+        assert job.artifact_name is None
+        assert not export_storage.exists() or list(export_storage.iterdir()) == []
+
+    async def test_purge_expired_removes_artifacts(
+        self, db_session: AsyncSession, export_storage
+    ):
+        """Expired jobs and their files are deleted by the sweep."""
+        from app.db.models.data_export_job import DataExportJob
+        from app.services.data_export_jobs import DataExportJobQueue, data_export_queue
+
+        user, _ = await _create_parent(db_session)
+        job, _ = await data_export_queue.enqueue(db_session, user.id)
+        await _drain()
+        await db_session.refresh(job)
+        artifact = export_storage / job.artifact_name
+        assert artifact.is_file()
+
+        later = datetime.now(timezone.utc) + timedelta(
+            hours=settings.DATA_EXPORT_ARTIFACT_TTL_HOURS + 1
+        )
+        assert await DataExportJobQueue.purge_expired(db_session, later) >= 1
+
+        assert not artifact.exists()
+        assert await db_session.get(DataExportJob, job.id, populate_existing=True) is None
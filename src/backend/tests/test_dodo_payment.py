@@ -153,3 +153,197 @@ class TestDodoSignatureVerification:
                 webhook_signature=signature2,
             )
             assert result2 is False
+
+
+class TestCircuitBreaker:
+    """Test the payment provider circuit breaker."""
+
+    def test_opens_after_threshold_and_half_opens_after_reset(self):
+        """Consecutive failures open the circuit; one trial call is let through later."""
+        import pytest
+
+        from app.services.payment_gateway import CircuitBreaker, PaymentGatewayUnavailable
+
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        with pytest.raises(PaymentGatewayUnavailable) as exc_info:
+            breaker.before_call()
+        assert exc_info.value.retry_after >= 1
+
+        breaker.opened_at -= 31
+        assert breaker.state == "half_open"
+        breaker.before_call()  # the trial call
+        with pytest.raises(PaymentGatewayUnavailable):
+            breaker.before_call()  # everyone else waits for the trial
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+
+class TestDodoGateway:
+    """Test the async Dodo client wrapper."""
+
+    async def test_transport_failures_trip_the_breaker(self):
+        """Connection errors surface as PaymentGatewayUnavailable and stop further calls."""
+        from unittest.mock import AsyncMock
+
+        import dodopayments
+        import httpx
+        import pytest
+
+        from app.db.models.subscription_model import SubscriptionPlanType
+        from app.services.payment_gateway import PaymentGatewayUnavailable
+
+        with patch.dict("os.environ", {"DODO_API_KEY": "test_key"}):
+            service = DodoPaymentService()
+        service.breaker.failure_threshold = 2
+        retrieve = AsyncMock(
+            side_effect=dodopayments.APIConnectionError(
+                request=httpx.Request("GET", "https://test.dodopayments.com")
+            )
+        )
+        service.client.checkout_sessions.retrieve = retrieve
+
+        for _ in range(2):
+            with pytest.raises(PaymentGatewayUnavailable):
+                await service.get_payment_status("sess_123")
+        assert service.breaker.state == "open"
+
+        with pytest.raises(PaymentGatewayUnavailable):
+            await service.get_payment_status("sess_123")
+        assert retrieve.await_count == 2  # the open circuit didn't call Dodo
+
+        with patch(
+            "app.services.dodo_payment_service.PLAN_PRODUCT_IDS",
+            {SubscriptionPlanType.GAME_PACK_5: "prod_5"},
+        ):
+            with pytest.raises(PaymentGatewayUnavailable):
+                await service.create_checkout_session(
+                    SubscriptionPlanType.GAME_PACK_5, "user", "a@b.c", "https://ok", "https://no"
+                )
+        await service.aclose()
+
+    async def test_cancelled_trial_releases_the_half_open_slot(self):
+        """A trial call cancelled mid-flight doesn't block every later trial."""
+        import asyncio
+        from unittest.mock import AsyncMock
+
+        import pytest
+
+        with patch.dict("os.environ", {"DODO_API_KEY": "test_key"}):
+            service = DodoPaymentService()
+        service.breaker.opened_at = 0.0  # long past its reset window: half-open
+        service.client.checkout_sessions.retrieve = AsyncMock(
+            side_effect=asyncio.CancelledError
+        )
+
+        with pytest.raises(asyncio.CancelledError):
+            await service.get_payment_status("sess_123")
+        assert service.breaker.state == "half_open"
+        service.breaker.before_call()  # the next trial is let through
+        await service.aclose()
+
+
+class TestFakePaymentGateway:
+    """Test the purchase flow end to end against the in-process fake gateway."""
+
+    async def test_purchase_and_confirm_with_fake_gateway(self, client, db_session):
+        """Checkout, payment confirmation and signed webhooks all work without Dodo."""
+        import json
+        from uuid import uuid4
+
+        from app.core.security import get_password_hash
+        from app.db.models.user import User
+        from app.services.payment_gateway import FakePaymentGateway
+
+        user = User(
+            email=f"fake_gateway_{uuid4().hex[:8]}@test.com",
+            hashed_password=get_password_hash("TestPassword123"),
+            is_active=True,
+            email_verified=True,
+        )
+        db_session.add(user)
+        await db_session.commit()
+        response = await client.post(
+            "/api/v1/auth/login", data={"username": user.email, "password": "TestPassword123"}
+        )
+        auth_headers = {"Authorization": f"Bearer {response.cookies.get('access_token')}"}
+
+        gateway = FakePaymentGateway(webhook_secret="test_secret_key")
+        with patch("app.api.v1.endpoints.subscriptions.get_dodo_client", return_value=gateway):
+            response = await client.post(
+                "/api/v1/subscriptions/purchase",
+                params={"plan_type": "game_pack_5"},
+                headers=auth_headers,
+            )
+            assert response.status_code == 200
+            session_id = response.json()["session_id"]
+
+            response = await client.get(
+                "/api/v1/subscriptions/payment-success",
+                params={"session_id": session_id},
+                headers=auth_headers,
+            )
+            assert response.status_code == 200
+            assert response.json()["success"] is True
+
+            payload = json.dumps({"type": "test.unhandled", "data": {}}).encode()
+            response = await client.post(
+                "/api/v1/subscriptions/webhook",
+                content=payload,
+                headers={**gateway.sign_webhook(payload), "Content-Type": "application/json"},
+            )
+            assert response.status_code == 202
+
+            response = await client.post(
+                "/api/v1/subscriptions/webhook",
+                content=payload,
+                headers={
+                    **gateway.sign_webhook(payload),
+                    "webhook-signature": "forged",
+                    "Content-Type": "application/json",
+                },
+            )
+            assert response.status_code == 401
+
+    def test_fake_gateway_is_refused_for_real_payments(self):
+        """The fake can't be enabled in production, against live Dodo, or without a secret."""
+        import pytest
+        from pydantic import ValidationError
+
+        from app.core.config import Settings
+
+        base = {"SECRET_KEY": "x" * 32, "PAYMENT_GATEWAY": "fake"}
+        for overrides in (
+            {"APP_ENV": "production", "DODO_WEBHOOK_SECRET": "whsec"},
+            {"DODO_ENV": "live", "DODO_WEBHOOK_SECRET": "whsec"},
+            {"DODO_WEBHOOK_SECRET": ""},
+        ):
+            with pytest.raises(ValidationError):
+                Settings(_env_file=None, **base, **overrides)
+
+        allowed = Settings(_env_file=None, **base, DODO_WEBHOOK_SECRET="whsec")
+        assert allowed.PAYMENT_GATEWAY == "fake"
+
+    async def test_gateway_outage_returns_503(self, client, auth_headers):
+        """An open circuit is reported as 503 with Retry-After."""
+        from unittest.mock import AsyncMock
+
+        from app.services.payment_gateway import PaymentGatewayUnavailable
+
+        gateway = AsyncMock()
+        gateway.create_checkout_session.side_effect = PaymentGatewayUnavailable(
+            "down", retry_after=12
+        )
+        with patch("app.api.v1.endpoints.subscriptions.get_dodo_client", return_value=gateway):
+            response = await client.post(
+                "/api/v1/subscriptions/purchase",
+                params={"plan_type": "game_pack_5"},
+                headers=auth_headers,
+            )
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "12"
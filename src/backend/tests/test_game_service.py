@@ -326,3 +326,72 @@ class TestDelete:
         result = await GameService.delete(db_session, "nonexistent-id")
         
         assert result is False
+
+
+class TestGameCatalog:
+    """Test the in-process catalog snapshot behind the read methods."""
+
+    async def test_warm_reads_run_no_sql(
+        self, db_session: AsyncSession, test_games: list[Game], count_queries
+    ):
+        """Once built, listings and lookups are served without touching the database."""
+        await GameService.get_all(db_session)
+
+        with count_queries() as statements:
+            games, total = await GameService.get_all(db_session, category="math", age_max=8)
+            by_slug = await GameService.get_by_slug(db_session, test_games[1].slug)
+            by_id = await GameService.get_by_id(db_session, test_games[1].id)
+
+        assert len(statements) == 0
+        assert by_slug is not None and by_slug.id == test_games[1].id
+        assert by_id is not None and by_id.slug == test_games[1].slug
+        ids = {g.id for g in games}
+        assert test_games[0].id in ids and test_games[2].id in ids
+        assert test_games[4].id not in ids  # age_range_max == 12
+        assert all(g.category == "math" and g.age_range_max <= 8 for g in games)
+        assert total >= 2
+
+    async def test_filter_matches_sql_ordering_and_paging(
+        self, db_session: AsyncSession, test_games: list[Game]
+    ):
+        """Results are newest first and pages don't overlap."""
+        games, total = await GameService.get_all(db_session, page_size=100)
+        created = [g.created_at for g in games]
+        assert created == sorted(created, reverse=True)
+        assert total == len(games)
+
+        first, _ = await GameService.get_all(db_session, page=1, page_size=2)
+        second, _ = await GameService.get_all(db_session, page=2, page_size=2)
+        assert [g.id for g in first + second] == [g.id for g in games[:4]]
+
+    async def test_writes_through_service_rebuild_snapshot(self, db_session: AsyncSession):
+        """create/update/delete publish a new catalog version."""
+        from app.services.game_catalog import game_catalog
+
+        before = await game_catalog.get(db_session)
+        unique_id = str(uuid.uuid4())[:8]
+        game = await GameService.create(
+            db_session,
+            GameCreate(
+                title="Catalog Game",
+                slug=f"catalog-game-{unique_id}",
+                description="Catalog test",
+                icon="🎲",
+                category="logic",
+                age_range_min=4,
+                age_range_max=9,
+                difficulty="easy",
+                game_path="/games/catalog",
+            ),
+            created_by="admin",
+        )
+
+        after = await game_catalog.get(db_session)
+        assert after.version != before.version
+        assert after.by_id[game.id].title == "Catalog Game"
+
+        await GameService.update(db_session, game.id, GameUpdate(title="Renamed"))
+        assert (await GameService.get_by_id(db_session, game.id)).title == "Renamed"
+
+        await GameService.delete(db_session, game.id)
+        assert await GameService.get_by_slug(db_session, f"catalog-game-{unique_id}") is None
@@ -46,6 +46,22 @@ async def test_list_games_pagination(client: AsyncClient):
     assert data["page_size"] == 10
 
 
+@pytest.mark.asyncio
+async def test_list_games_body_matches_schema(client: AsyncClient, db_session: AsyncSession):
+    """The pre-rendered list body is exactly what GameList would serialize."""
+    from app.schemas.game import GameList
+    from app.services.game_service import GameService
+
+    response = await client.get("/api/v1/games/?page=1&page_size=5", follow_redirects=True)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+
+    games, total = await GameService.get_all(db_session, page=1, page_size=5)
+    expected = GameList(games=games, total=total, page=1, page_size=5)
+    assert response.json() == expected.model_dump(mode="json")
+    assert GameList.model_validate_json(response.content) == expected
+
+
 @pytest.mark.asyncio
 async def test_games_stats_returns_aggregates(client: AsyncClient, db_session):
     """Stats endpoint should aggregate per game with age-cohort filtering."""
@@ -387,3 +403,242 @@ async def login_user(client: AsyncClient, user: UserModel, db_session: AsyncSess
         raise ValueError("No access token in response")
 
     return token
+
+
+@pytest.mark.asyncio
+async def test_games_stats_counters_follow_progress_writes(db_session: AsyncSession):
+    """Game progress writes keep game_stats_daily in step, including bulk inserts."""
+    from app.schemas.progress import ProgressCreate, ProgressUpdate
+    from app.services.game_stats_service import GameStatsService
+    from app.services.progress_service import ProgressService
+
+    parent = User(
+        id=str(uuid4()),
+        email=f"counter-parent-{uuid4()}@test.com",
+        hashed_password=get_password_hash("Test123!@#"),
+        is_active=True,
+        email_verified=True,
+    )
+    db_session.add(parent)
+    await db_session.flush()
+    profile = Profile(id=str(uuid4()), parent_id=parent.id, name="Kid", age=10.5)
+    db_session.add(profile)
+    await db_session.commit()
+
+    game_key = f"counter-game-{uuid4()}"
+
+    async def current() -> dict:
+        stats = await GameStatsService.get_stats(db_session, age_min=10, age_max=11)
+        return next(s for s in stats if s["game_key"] == game_key)
+
+    single = await ProgressService.create(
+        db_session,
+        profile.id,
+        ProgressCreate(activity_type="game", content_id=game_key, duration_seconds=60),
+    )
+    await ProgressService.create_many(
+        db_session,
+        profile.id,
+        [
+            {"activity_type": "game", "content_id": game_key, "duration_seconds": 120,
+             "completed": True},
+            {"activity_type": "letter_tracing", "content_id": game_key},
+        ],
+    )
+    stats = await current()
+    assert stats["total_plays"] == 2
+    assert stats["completion_rate"] == 0.5
+    assert stats["avg_session_minutes"] == 1.5
+
+    await ProgressService.update(db_session, single, ProgressUpdate(duration_seconds=180))
+    assert (await current())["avg_session_minutes"] == 2.5
+
+    await ProgressService.delete(db_session, single)
+    stats = await current()
+    assert stats["total_plays"] == 1
+    assert stats["completion_rate"] == 1.0
+
+    # A full rebuild from progress agrees with the incremental counters
+    await GameStatsService.rebuild(db_session)
+    assert await current() == stats
+
+
+@pytest.mark.asyncio
+async def test_games_stats_forget_deleted_profiles_and_users(db_session: AsyncSession):
+    """Progress removed by the profile/user delete cascade leaves the counters too."""
+    from app.schemas.progress import ProgressCreate
+    from app.services.game_stats_service import GameStatsService
+    from app.services.profile_service import ProfileService
+    from app.services.progress_service import ProgressService
+    from app.services.user_service import UserService
+
+    game_key = f"cascade-game-{uuid4()}"
+    parent = User(
+        id=str(uuid4()),
+        email=f"cascade-parent-{uuid4()}@test.com",
+        hashed_password=get_password_hash("Test123!@#"),
+        is_active=True,
+        email_verified=True,
+    )
+    db_session.add(parent)
+    await db_session.flush()
+    profiles = [
+        Profile(id=str(uuid4()), parent_id=parent.id, name=f"Kid {i}", age=7.0)
+        for i in range(2)
+    ]
+    db_session.add_all(profiles)
+    await db_session.commit()
+    for profile in profiles:
+        for _ in range(2):
+            await ProgressService.create(
+                db_session,
+                profile.id,
+                ProgressCreate(activity_type="game", content_id=game_key, duration_seconds=60),
+            )
+
+    async def plays() -> int:
+        stats = await GameStatsService.get_stats(db_session)
+        return next((s["total_plays"] for s in stats if s["game_key"] == game_key), 0)
+
+    assert await plays() == 4
+
+    await ProfileService.delete(db_session, profiles[0])
+    assert await plays() == 2
+
+    await UserService.delete(db_session, parent)
+    assert await plays() == 0
+
+
+@pytest.mark.asyncio
+async def test_games_stats_age_bounds_snap_inwards(db_session: AsyncSession):
+    """Age bounds between half-year buckets never pull in ages outside the range."""
+    from app.schemas.progress import ProgressCreate
+    from app.services.game_stats_service import GameStatsService
+    from app.services.progress_service import ProgressService
+
+    game_key = f"bounds-game-{uuid4()}"
+    parent = User(
+        id=str(uuid4()),
+        email=f"bounds-parent-{uuid4()}@test.com",
+        hashed_password=get_password_hash("Test123!@#"),
+        is_active=True,
+        email_verified=True,
+    )
+    db_session.add(parent)
+    await db_session.flush()
+    profiles = [
+        Profile(id=str(uuid4()), parent_id=parent.id, name=f"Kid {age}", age=age)
+        for age in (4.2, 5.0, 6.6)
+    ]
+    db_session.add_all(profiles)
+    await db_session.commit()
+    for profile in profiles:
+        await ProgressService.create(
+            db_session,
+            profile.id,
+            ProgressCreate(activity_type="game", content_id=game_key, duration_seconds=60),
+        )
+
+    async def plays(age_min: float, age_max: float) -> int:
+        stats = await GameStatsService.get_stats(db_session, age_min=age_min, age_max=age_max)
+        return next((s["total_plays"] for s in stats if s["game_key"] == game_key), 0)
+
+    assert await plays(4, 7) == 3
+    # 4.2 sits in the 4.0 bucket, 6.6 in the 6.5 one: both straddle these bounds
+    assert await plays(4.3, 6.7) == 1
+    # A bound on a bucket edge keeps the whole bucket
+    assert await plays(4, 6.5) == 3
+
+
+@pytest.mark.asyncio
+async def test_games_stats_reads_counters_and_versioned_cache(client: AsyncClient, count_queries):
+    """Stats requests never scan progress, and bumping the version retires cached answers."""
+    from app.services.game_stats_service import GameStatsService
+
+    await GameStatsService.bump_version()
+    with count_queries() as statements:
+        first = await client.get("/api/v1/games/stats?period=month&ageGroup=3-5")
+    assert first.status_code == 200
+    assert not statements.touching("FROM progress")
+
+    cached = await client.get("/api/v1/games/stats?period=month&ageGroup=3-5")
+    assert cached.json()["generatedAt"] == first.json()["generatedAt"]
+
+    await GameStatsService.bump_version()
+    fresh = await client.get("/api/v1/games/stats?period=month&ageGroup=3-5")
+    assert fresh.json()["generatedAt"] != first.json()["generatedAt"]
+
+
+@pytest.mark.asyncio
+async def test_check_game_access_batch(client: AsyncClient, db_session: AsyncSession, count_queries):
+    """One call answers access for many games, with a constant number of queries."""
+    from app.db.models.subscription_model import SubscriptionPlanType
+    from app.services.game_service import GameService
+    from app.services.subscription_service import SubscriptionService
+
+    user = User(
+        id=str(uuid4()),
+        email=f"batch_access_{uuid4().hex[:8]}@test.com",
+        hashed_password=get_password_hash("Test123!@#"),
+        is_active=True,
+        email_verified=True,
+        role=UserRole.PARENT,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    token = await login_user(client, user, db_session)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    games, _ = await GameService.get_all(db_session, page_size=3)
+    slugs = [game.slug for game in games]
+
+    response = await client.post(
+        "/api/v1/games/access:batch", json={"identifiers": slugs}, headers=headers
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["subscription_status"] == "none"
+    assert [r["can_access"] for r in body["results"]] == [False, False, False]
+
+    subscription = await SubscriptionService.create_subscription(
+        db=db_session,
+        parent_id=user.id,
+        plan_type=SubscriptionPlanType.GAME_PACK_5,
+        payment_reference=f"pay_batch_{uuid4()}",
+    )
+    await SubscriptionService.add_game_selection(db_session, subscription.id, [games[0].id])
+
+    with count_queries() as statements:
+        response = await client.post(
+            "/api/v1/games/access:batch",
+            json={"identifiers": [slugs[0], slugs[1], "no-such-game", slugs[0], slugs[2]]},
+            headers=headers,
+        )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["subscription_status"] == "active"
+    assert body["plan_type"] == "game_pack_5"
+    results = {r["identifier"]: r for r in body["results"]}
+    assert len(body["results"]) == 4
+    assert results[slugs[0]]["can_access"] is True
+    assert results[slugs[0]]["game_id"] == games[0].id
+    assert results[slugs[1]]["can_access"] is False
+    assert results["no-such-game"]["found"] is False
+    assert len(statements.touching("games")) == 0
+    assert len(statements.touching("subscriptions")) <= 1
+
+
+@pytest.mark.asyncio
+async def test_check_game_access_batch_limits(client: AsyncClient, auth_headers: dict):
+    """Empty batches and batches over 100 identifiers are rejected."""
+    response = await client.post(
+        "/api/v1/games/access:batch", json={"identifiers": []}, headers=auth_headers
+    )
+    assert response.status_code == 422
+
+    response = await client.post(
+        "/api/v1/games/access:batch",
+        json={"identifiers": [f"game-{i}" for i in range(101)]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 422
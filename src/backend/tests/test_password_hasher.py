@@ -0,0 +1,135 @@
+"""Tests for the bounded bcrypt worker pool."""
+
+import asyncio
+import time
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import ServiceOverloadedError
+from app.core.password_hasher import PasswordHasher
+from app.core.security import get_password_hash, password_hash_rounds
+
+
+class TestPasswordHasher:
+    """Test hashing off the event loop, caps and shedding."""
+
+    async def test_hash_and_verify_round_trip(self):
+        """Hashes made on the pool verify, and the counters record them."""
+        hasher = PasswordHasher(max_workers=2, max_pending=4, queue_timeout=5)
+        try:
+            hashed = await hasher.hash("CorrectHorse1")
+            assert await hasher.verify("CorrectHorse1", hashed)
+            assert not await hasher.verify("wrong", hashed)
+            stats = hasher.stats()
+            assert stats["completed"] == 3
+            assert stats["in_flight"] == stats["waiting"] == 0
+        finally:
+            hasher.shutdown()
+
+    async def test_event_loop_keeps_running_during_hash(self):
+        """Other coroutines make progress while bcrypt runs."""
+        hasher = PasswordHasher(max_workers=1, max_pending=4, queue_timeout=5)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            await hasher.hash("CorrectHorse1")
+        finally:
+            task.cancel()
+            hasher.shutdown()
+        assert ticks >= 5
+
+    async def test_sheds_when_queue_is_full(self):
+        """With every slot busy and the queue full, calls fail fast with 503."""
+        hasher = PasswordHasher(max_workers=1, max_pending=0, queue_timeout=5)
+        try:
+            busy = asyncio.create_task(hasher._run(time.sleep, 0.2))
+            await asyncio.sleep(0.01)
+            with pytest.raises(ServiceOverloadedError) as exc_info:
+                await hasher._run(time.sleep, 0)
+            await busy
+        finally:
+            hasher.shutdown()
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers == {"Retry-After": "1"}
+        assert hasher.stats()["rejected"] == 1
+
+    async def test_sheds_after_queue_timeout(self):
+        """Queued calls give up once the wait exceeds the timeout."""
+        hasher = PasswordHasher(max_workers=1, max_pending=5, queue_timeout=0.05)
+        try:
+            busy = asyncio.create_task(hasher._run(time.sleep, 0.3))
+            await asyncio.sleep(0.01)
+            with pytest.raises(ServiceOverloadedError):
+                await hasher._run(time.sleep, 0)
+            await busy
+        finally:
+            hasher.shutdown()
+        assert hasher.stats()["waiting"] == 0
+
+    def test_needs_rehash(self, monkeypatch):
+        """Hashes made at another cost are flagged for rehashing."""
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+        assert PasswordHasher.needs_rehash(get_password_hash("pw", rounds=4))
+        assert not PasswordHasher.needs_rehash(get_password_hash("pw", rounds=5))
+        assert password_hash_rounds("not-a-hash") is None
+
+
+class TestRehashOnLogin:
+    """Test transparent cost upgrades and load shedding on login."""
+
+    async def test_authenticate_upgrades_outdated_hash(self, db_session: AsyncSession):
+        """A successful login rehashes a password stored at an old cost."""
+        from app.core.config import settings
+        from app.db.models.user import User
+        from app.services.user_service import UserService
+
+        user = User(
+            email=f"rehash_{uuid4()}@test.com",
+            hashed_password=get_password_hash("Password123", rounds=4),
+            is_active=True,
+            email_verified=True,
+        )
+        db_session.add(user)
+        await db_session.commit()
+
+        assert await UserService.authenticate(db_session, user.email, "wrong") is None
+        assert password_hash_rounds(user.hashed_password) == 4
+
+        authenticated = await UserService.authenticate(db_session, user.email, "Password123")
+
+        assert authenticated is not None
+        await db_session.refresh(user)
+        assert password_hash_rounds(user.hashed_password) == settings.BCRYPT_ROUNDS
+        assert await UserService.authenticate(db_session, user.email, "Password123") is not None
+
+    async def test_login_returns_503_when_saturated(
+        self, client: AsyncClient, test_user: dict, monkeypatch
+    ):
+        """Shed hash requests surface as 503 with Retry-After."""
+        from app.core.password_hasher import password_hasher
+
+        async def overloaded(*args):
+            raise ServiceOverloadedError("Too many sign-in requests, please retry shortly")
+
+        monkeypatch.setattr(password_hasher, "verify", overloaded)
+        response = await client.post(
+            "/api/v1/auth/login",
+            data={"username": test_user["email"], "password": test_user["password"]},
+        )
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert response.json()["error"]["code"] == "SERVICE_OVERLOADED"
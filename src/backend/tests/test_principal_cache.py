@@ -0,0 +1,104 @@
+"""Tests for the authenticated-principal cache."""
+
+from uuid import uuid4
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.user import AuthPrincipal, UserRole
+
+
+async def _login(client: AsyncClient, db_session: AsyncSession) -> tuple[str, str]:
+    """Create a verified user, log in and return (user_id, access_token)."""
+    from app.schemas.user import UserCreate
+    from app.services.user_service import UserService
+
+    email = f"principal-{uuid4()}@test.com"
+    user = await UserService.create(db_session, UserCreate(email=email, password="StrongPass!7890"))
+    await UserService.verify_email(db_session, user)
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": "StrongPass!7890"},
+    )
+    assert response.status_code == 200
+    return user.id, response.cookies.get("access_token")
+
+
+class TestPrincipalCacheService:
+    """Unit tests for PrincipalCacheService."""
+
+    async def test_set_and_get_principal(self):
+        from app.services.principal_cache_service import PrincipalCacheService
+
+        cache = PrincipalCacheService(ttl_seconds=60, max_entries=10)
+        principal = AuthPrincipal(id="u1", email="a@test.com", role=UserRole.PARENT)
+
+        assert await cache.get_principal("u1") is None
+        await cache.set_principal(principal)
+        assert await cache.get_principal("u1") == principal
+
+        await cache.invalidate_user("u1")
+        assert await cache.get_principal("u1") is None
+
+    async def test_lru_bound(self):
+        from app.services.principal_cache_service import PrincipalCacheService
+
+        cache = PrincipalCacheService(ttl_seconds=60, max_entries=2)
+        for i in range(3):
+            await cache.set_principal(AuthPrincipal(id=f"u{i}", email=f"{i}@test.com"))
+
+        assert await cache.get_principal("u0") is None
+        assert await cache.get_principal("u2") is not None
+
+
+class TestPrincipalCacheIntegration:
+    """The auth dependency should serve warm requests without touching the DB."""
+
+    async def test_warm_request_costs_no_auth_queries(
+        self, client: AsyncClient, db_session: AsyncSession, count_queries
+    ):
+        _, access = await _login(client, db_session)
+        headers = {"Authorization": f"Bearer {access}"}
+
+        # Warm the cache
+        response = await client.get("/api/v1/subscriptions/games/catalog", headers=headers)
+        assert response.status_code == 200
+
+        with count_queries() as statements:
+            response = await client.get("/api/v1/subscriptions/games/catalog", headers=headers)
+        assert response.status_code == 200
+        assert not any("revoked_tokens" in s or "FROM users" in s for s in statements)
+
+    async def test_deactivation_invalidates_cached_principal(
+        self, client: AsyncClient, db_session: AsyncSession
+    ):
+        from app.schemas.user import UserUpdate
+        from app.services.user_service import UserService
+
+        user_id, access = await _login(client, db_session)
+        headers = {"Authorization": f"Bearer {access}"}
+
+        assert (await client.get("/api/v1/users/me/profiles", headers=headers)).status_code == 200
+
+        user = await UserService.get_by_id(db_session, user_id)
+        await UserService.update(db_session, user, UserUpdate(is_active=False))
+
+        response = await client.get("/api/v1/users/me/profiles", headers=headers)
+        assert response.status_code == 400
+
+    async def test_account_deletion_invalidates_cached_principal(
+        self, client: AsyncClient, db_session: AsyncSession
+    ):
+        from app.services.user_service import UserService
+
+        user_id, access = await _login(client, db_session)
+        headers = {"Authorization": f"Bearer {access}"}
+
+        assert (await client.get("/api/v1/users/me/profiles", headers=headers)).status_code == 200
+
+        user = await UserService.get_by_id(db_session, user_id)
+        await UserService.delete(db_session, user)
+
+        response = await client.get("/api/v1/users/me/profiles", headers=headers)
+        assert response.status_code == 401
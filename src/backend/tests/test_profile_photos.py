@@ -13,6 +13,16 @@ VALID_JPEG_BYTES = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x0
 VALID_PNG_BYTES = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde\x00\x00\x00\x00IEND\xaeB`\x82'
 
 
+@pytest.fixture(autouse=True)
+def photo_storage(tmp_path, monkeypatch):
+    """Write uploaded photos to a per-test directory."""
+    storage = tmp_path / "profile_photos"
+    monkeypatch.setattr(
+        "app.api.v1.endpoints.profile_photos.LOCAL_STORAGE_DIR", storage
+    )
+    return storage
+
+
 class TestValidateImageMagicBytes:
     """Test image magic bytes validation function."""
 
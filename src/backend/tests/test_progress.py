@@ -97,3 +97,146 @@ class TestProgress:
         assert "total_activities" in data
         assert "average_score" in data
         assert data["total_activities"] >= 3
+
+    async def test_stats_aggregate_and_cache_invalidation(
+        self, client: AsyncClient, auth_headers: dict, count_queries
+    ):
+        """Stats are aggregated in SQL, cached, and refreshed after a write."""
+        profile_response = await client.post(
+            "/api/v1/users/me/profiles",
+            headers=auth_headers,
+            json={"name": "Stats Child", "age": 6},
+        )
+        profile_id = profile_response.json()["id"]
+
+        async def save(content_id: str, score: int):
+            response = await client.post(
+                "/api/v1/progress/",
+                headers=auth_headers,
+                params={"profile_id": profile_id},
+                json={"activity_type": "letter_tracing", "content_id": content_id, "score": score},
+            )
+            assert response.status_code == 200
+
+        # A reaches 80 on a retry, B never does
+        await save("A", 50)
+        await save("A", 90)
+        await save("B", 70)
+
+        params = {"profile_id": profile_id}
+        data = (await client.get("/api/v1/progress/stats", headers=auth_headers, params=params)).json()
+        assert data == {
+            "total_activities": 3,
+            "total_score": 210,
+            "average_score": 70.0,
+            "completed_content": ["A"],
+            "completion_count": 1,
+        }
+
+        with count_queries() as statements:
+            cached = await client.get("/api/v1/progress/stats", headers=auth_headers, params=params)
+        assert cached.json() == data
+        assert not statements.touching("FROM progress")
+
+        await save("B", 85)
+        data = (await client.get("/api/v1/progress/stats", headers=auth_headers, params=params)).json()
+        assert data["total_activities"] == 4
+        assert data["completed_content"] == ["A", "B"]
+
+    async def test_get_progress_keyset_pagination(
+        self, client: AsyncClient, auth_headers: dict, db_session
+    ):
+        """History pages follow X-Next-Cursor until exhausted, newest first."""
+        from datetime import datetime, timedelta
+
+        from app.db.models.progress import Progress
+
+        profile_response = await client.post(
+            "/api/v1/users/me/profiles",
+            headers=auth_headers,
+            json={"name": "Paged Child", "age": 6},
+        )
+        profile_id = profile_response.json()["id"]
+
+        base = datetime(2026, 1, 1)
+        for i in range(7):
+            db_session.add(
+                Progress(
+                    profile_id=profile_id,
+                    activity_type="tracing" if i % 2 else "game",
+                    content_id=f"C{i}",
+                    # Two rows share a timestamp to exercise the id tie-break
+                    completed_at=base + timedelta(minutes=min(i, 5)),
+                )
+            )
+        await db_session.commit()
+
+        seen: list[str] = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {"profile_id": profile_id, "limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get("/api/v1/progress/", headers=auth_headers, params=params)
+            assert response.status_code == 200
+            seen.extend(item["content_id"] for item in response.json())
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert pages == 3
+        assert len(seen) == len(set(seen)) == 7
+        assert seen[-5:] == ["C4", "C3", "C2", "C1", "C0"]
+
+        # Without limit or cursor the full history comes back in one response
+        response = await client.get(
+            "/api/v1/progress/", headers=auth_headers, params={"profile_id": profile_id}
+        )
+        assert len(response.json()) == 7
+        assert "X-Next-Cursor" not in response.headers
+
+        response = await client.get(
+            "/api/v1/progress/",
+            headers=auth_headers,
+            params={
+                "profile_id": profile_id,
+                "activity_type": "tracing",
+                "since": "2026-01-01T00:02:00Z",
+            },
+        )
+        assert [item["content_id"] for item in response.json()] == ["C5", "C3"]
+
+        response = await client.get(
+            "/api/v1/progress/",
+            headers=auth_headers,
+            params={"profile_id": profile_id, "cursor": "not-a-cursor"},
+        )
+        assert response.status_code == 422
+
+    async def test_stream_progress_ndjson(self, client: AsyncClient, auth_headers: dict):
+        """The stream variant returns every row as one JSON object per line."""
+        import json
+
+        profile_response = await client.post(
+            "/api/v1/users/me/profiles",
+            headers=auth_headers,
+            json={"name": "Stream Child", "age": 6},
+        )
+        profile_id = profile_response.json()["id"]
+        for letter in "ABC":
+            await client.post(
+                "/api/v1/progress/",
+                headers=auth_headers,
+                params={"profile_id": profile_id},
+                json={"activity_type": "letter_tracing", "content_id": letter, "score": 50},
+            )
+
+        response = await client.get(
+            "/api/v1/progress/stream", headers=auth_headers, params={"profile_id": profile_id}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(item["content_id"] for item in lines) == ["A", "B", "C"]
@@ -69,3 +69,70 @@ async def test_progress_batch_endpoint(client: AsyncClient, auth_headers):
     assert len(data3["results"]) == 2
     assert data3["results"][0]["status"] == "duplicate"
     assert data3["results"][1]["status"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_progress_batch_mixed_errors_and_repeats(client: AsyncClient, auth_headers):
+    profile_response = await client.post(
+        "/api/v1/users/me/profiles",
+        headers=auth_headers,
+        json={"name": "Mixed Child", "age": 5},
+    )
+    profile_id = profile_response.json()["id"]
+
+    items = [
+        {"idempotency_key": "m-1", "activity_type": "letter_tracing", "content_id": "A"},
+        {"idempotency_key": "m-2", "content_id": "B"},  # missing activity_type
+        {"idempotency_key": "m-1", "activity_type": "letter_tracing", "content_id": "A"},
+        {"activity_type": "letter_tracing", "content_id": "C"},  # no key, always inserted
+    ]
+    response = await client.post(
+        "/api/v1/progress/batch",
+        json={"profile_id": profile_id, "items": items},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["ok", "error", "duplicate", "ok"]
+    assert results[2]["server_id"] == results[0]["server_id"]
+    assert results[3]["idempotency_key"] is None
+
+
+@pytest.mark.asyncio
+async def test_progress_batch_statement_budget(client: AsyncClient, auth_headers, count_queries):
+    profile_response = await client.post(
+        "/api/v1/users/me/profiles",
+        headers=auth_headers,
+        json={"name": "Budget Child", "age": 5},
+    )
+    profile_id = profile_response.json()["id"]
+    items = [
+        {
+            "idempotency_key": f"b-{i}",
+            "activity_type": "letter_tracing",
+            "content_id": f"L{i}",
+            "score": i,
+        }
+        for i in range(100)
+    ]
+
+    with count_queries() as statements:
+        response = await client.post(
+            "/api/v1/progress/batch",
+            json={"profile_id": profile_id, "items": items},
+            headers=auth_headers,
+        )
+    assert response.status_code == 200
+    assert all(r["status"] == "ok" for r in response.json()["results"])
+    assert len(statements.touching("INSERT INTO progress")) == 1
+
+    # Replaying the batch resolves every duplicate with one lookup
+    with count_queries() as statements:
+        response = await client.post(
+            "/api/v1/progress/batch",
+            json={"profile_id": profile_id, "items": items},
+            headers=auth_headers,
+        )
+    results = response.json()["results"]
+    assert all(r["status"] == "duplicate" and r["server_id"] for r in results)
+    assert len(statements.touching("FROM progress")) == 1
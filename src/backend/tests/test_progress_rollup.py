@@ -0,0 +1,124 @@
+"""Tests for the per-profile progress rollup."""
+
+from uuid import uuid4
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def _profile(db_session: AsyncSession) -> str:
+    from app.schemas.profile import ProfileCreate
+    from app.schemas.user import UserCreate
+    from app.services.profile_service import ProfileService
+    from app.services.user_service import UserService
+
+    user = await UserService.create(
+        db_session, UserCreate(email=f"rollup-{uuid4()}@test.com", password="StrongPass!7890")
+    )
+    profile = await ProfileService.create(db_session, user.id, ProfileCreate(name="Kid", age=5))
+    return profile.id
+
+
+async def _rollup(db_session: AsyncSession, profile_id: str) -> dict:
+    from app.db.models.progress_rollup import ProfileProgressRollup
+
+    result = await db_session.execute(
+        select(ProfileProgressRollup)
+        .where(ProfileProgressRollup.profile_id == profile_id)
+        .execution_options(populate_existing=True)
+    )
+    return {(r.activity_type, r.content_id): r for r in result.scalars().all()}
+
+
+class TestProgressRollup:
+    """Rollup rows track progress writes in the same transaction."""
+
+    async def test_create_and_create_many_update_rollup(self, db_session: AsyncSession):
+        from app.schemas.progress import ProgressCreate
+        from app.services.progress_service import ProgressService
+
+        profile_id = await _profile(db_session)
+        await ProgressService.create(
+            db_session,
+            profile_id,
+            ProgressCreate(activity_type="tracing", content_id="A", score=40, duration_seconds=10),
+        )
+        results = await ProgressService.create_many(
+            db_session,
+            profile_id,
+            [
+                {"idempotency_key": "r1", "activity_type": "tracing", "content_id": "A",
+                 "score": 90, "duration_seconds": 20, "completed": True},
+                {"idempotency_key": "r2", "activity_type": "tracing", "content_id": "B",
+                 "score": 60},
+            ],
+        )
+        assert [r["status"] for r in results] == ["ok", "ok"]
+
+        # Replayed keys must not be counted twice
+        await ProgressService.create_many(
+            db_session,
+            profile_id,
+            [{"idempotency_key": "r1", "activity_type": "tracing", "content_id": "A",
+              "score": 90}],
+        )
+
+        rollup = await _rollup(db_session, profile_id)
+        a = rollup[("tracing", "A")]
+        assert (a.attempts, a.total_score, a.best_score) == (2, 130, 90)
+        assert a.total_duration_seconds == 30
+        assert a.completed is True
+        assert a.last_completed_at is not None
+        assert rollup[("tracing", "B")].attempts == 1
+
+    async def test_update_and_delete_recompute_rollup(self, db_session: AsyncSession):
+        from app.schemas.progress import ProgressCreate, ProgressUpdate
+        from app.services.progress_service import ProgressService
+
+        profile_id = await _profile(db_session)
+        first = await ProgressService.create(
+            db_session, profile_id, ProgressCreate(activity_type="t", content_id="A", score=50)
+        )
+        second = await ProgressService.create(
+            db_session, profile_id, ProgressCreate(activity_type="t", content_id="A", score=70)
+        )
+
+        await ProgressService.update(db_session, second, ProgressUpdate(score=95))
+        a = (await _rollup(db_session, profile_id))[("t", "A")]
+        assert (a.attempts, a.total_score, a.best_score) == (2, 145, 95)
+
+        await ProgressService.delete(db_session, second)
+        a = (await _rollup(db_session, profile_id))[("t", "A")]
+        assert (a.attempts, a.total_score, a.best_score) == (1, 50, 50)
+
+        await ProgressService.delete(db_session, first)
+        assert await _rollup(db_session, profile_id) == {}
+
+    async def test_backfill_rebuilds_from_progress(self, db_session: AsyncSession):
+        from app.db.models.progress import Progress
+        from app.db.models.progress_rollup import ProfileProgressRollup
+        from app.services.progress_rollup_service import ProgressRollupService
+        from app.services.progress_service import ProgressService
+
+        profile_id = await _profile(db_session)
+        # Rows written before the rollup existed
+        for score in (30, 85, 60):
+            db_session.add(
+                Progress(profile_id=profile_id, activity_type="t", content_id="A", score=score)
+            )
+        await db_session.commit()
+        await db_session.execute(
+            delete(ProfileProgressRollup).where(ProfileProgressRollup.profile_id == profile_id)
+        )
+        await db_session.commit()
+
+        processed = await ProgressRollupService.backfill(db_session, chunk_size=2)
+        assert processed >= 1
+
+        a = (await _rollup(db_session, profile_id))[("t", "A")]
+        assert (a.attempts, a.total_score, a.best_score) == (3, 175, 85)
+        assert a.completed is False
+
+        stats = await ProgressService.get_stats(db_session, profile_id, use_cache=False)
+        assert stats["total_activities"] == 3
+        assert stats["completed_content"] == ["A"]
@@ -0,0 +1,130 @@
+"""SQL statement budgets for hot endpoints.
+
+Relationships are ``lazy="raise"`` and loaded only through explicit load
+profiles; these tests pin how many statements each endpoint issues so an
+accidental eager load or N+1 shows up as a failure.
+"""
+
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def _seed(client: AsyncClient, db_session: AsyncSession, rows: int = 5) -> tuple[dict, str]:
+    """Create a verified parent with one profile and some history."""
+    from app.db.models.achievement import Achievement
+    from app.db.models.progress import Progress
+    from app.schemas.profile import ProfileCreate
+    from app.schemas.user import UserCreate
+    from app.services.profile_service import ProfileService
+    from app.services.user_service import UserService
+
+    email = f"counts-{uuid4()}@test.com"
+    user = await UserService.create(db_session, UserCreate(email=email, password="StrongPass!7890"))
+    await UserService.verify_email(db_session, user)
+    profile = await ProfileService.create(db_session, user.id, ProfileCreate(name="Kid", age=5))
+
+    for i in range(rows):
+        db_session.add(
+            Progress(
+                profile_id=profile.id,
+                activity_type="letter_tracing",
+                content_id=f"letter-{i}",
+                score=70 + i * 5,
+            )
+        )
+    db_session.add(Achievement(profile_id=profile.id, achievement_type="first_letter"))
+    await db_session.commit()
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": "StrongPass!7890"},
+    )
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.cookies.get('access_token')}"}
+
+    # Warm the principal cache and revocation index so budgets cover the handler only
+    assert (await client.get("/api/v1/users/me/profiles", headers=headers)).status_code == 200
+    return headers, profile.id
+
+
+class TestProfileLoadProfiles:
+    """ProfileService only loads the relationships a caller asks for."""
+
+    async def test_summary_does_not_load_children(self, db_session: AsyncSession):
+        from app.db.loaders import ProfileLoad
+        from app.db.models.progress import Progress
+        from app.schemas.profile import ProfileCreate
+        from app.schemas.user import UserCreate
+        from app.services.profile_service import ProfileService
+        from app.services.user_service import UserService
+
+        user = await UserService.create(
+            db_session, UserCreate(email=f"load-{uuid4()}@test.com", password="StrongPass!7890")
+        )
+        profile = await ProfileService.create(db_session, user.id, ProfileCreate(name="Kid", age=5))
+        db_session.add(Progress(profile_id=profile.id, activity_type="a", content_id="c"))
+        await db_session.commit()
+        db_session.expunge_all()
+
+        summary = await ProfileService.get_by_id(db_session, profile.id)
+        with pytest.raises(InvalidRequestError):
+            summary.progress  # noqa: B018
+        db_session.expunge_all()
+
+        loaded = await ProfileService.get_by_id(
+            db_session, profile.id, load=ProfileLoad.WITH_PROGRESS
+        )
+        assert [p.content_id for p in loaded.progress] == ["c"]
+
+
+class TestEndpointQueryCounts:
+    """Per-endpoint SQL statement budgets with a warm auth cache."""
+
+    async def test_get_profile(self, client: AsyncClient, db_session: AsyncSession, count_queries):
+        headers, profile_id = await _seed(client, db_session)
+
+        with count_queries() as statements:
+            response = await client.get(f"/api/v1/users/me/profiles/{profile_id}", headers=headers)
+        assert response.status_code == 200
+        assert len(statements) == 1
+        assert not statements.touching("progress")
+        assert not statements.touching("achievements")
+
+    async def test_list_profiles(self, client: AsyncClient, db_session: AsyncSession, count_queries):
+        headers, _ = await _seed(client, db_session)
+
+        with count_queries() as statements:
+            response = await client.get("/api/v1/users/me/profiles", headers=headers)
+        assert response.status_code == 200
+        assert len(statements) == 1
+
+    async def test_get_progress(self, client: AsyncClient, db_session: AsyncSession, count_queries):
+        headers, profile_id = await _seed(client, db_session, rows=20)
+
+        with count_queries() as statements:
+            response = await client.get(
+                "/api/v1/progress/", params={"profile_id": profile_id}, headers=headers
+            )
+        assert response.status_code == 200
+        assert len(response.json()) == 20
+        # One profile ownership check plus one progress read, no join back to profiles
+        assert len(statements) == 2
+        assert not any("JOIN" in s for s in statements.touching("FROM progress"))
+        assert not statements.touching("achievements")
+
+    async def test_get_progress_stats(
+        self, client: AsyncClient, db_session: AsyncSession, count_queries
+    ):
+        headers, profile_id = await _seed(client, db_session)
+
+        with count_queries() as statements:
+            response = await client.get(
+                "/api/v1/progress/stats", params={"profile_id": profile_id}, headers=headers
+            )
+        assert response.status_code == 200
+        assert len(statements) == 2
+        assert not statements.touching("achievements")
@@ -0,0 +1,147 @@
+"""Tests for the GCRA rate limiter and RateLimit headers."""
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import rate_limit
+from app.core.exceptions import RateLimitExceededError
+from app.core.rate_limit import (
+    Limiter,
+    MemoryRateLimitStore,
+    Rate,
+    RateLimits,
+    limiter,
+    parse_rate,
+)
+
+
+@pytest.fixture
+def rate_store(monkeypatch):
+    """Give each test its own in-memory store, with the limiter's clock frozen."""
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=lambda: 1000.0))
+    store = MemoryRateLimitStore(max_keys=1000)
+    limiter.set_store(store)
+    yield store
+    limiter.set_store(None)
+
+
+class TestGcra:
+    """Test the in-memory GCRA store."""
+
+    def test_parse_rate(self):
+        """Rates are parsed from the RateLimits strings."""
+        assert parse_rate("5/minute") == Rate(limit=5, period=60)
+        assert parse_rate("120/hours") == Rate(limit=120, period=3600)
+
+    async def test_burst_then_steady_rate(self, monkeypatch):
+        """A full burst is allowed, then one request per emission interval."""
+        store = MemoryRateLimitStore(max_keys=10)
+        now = 1000.0
+        monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=lambda: now))
+        rate = parse_rate("3/minute")
+
+        results = [await store.hit("k", rate) for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert [r.remaining for r in results[:3]] == [2, 1, 0]
+        assert results[2].reset_after == pytest.approx(60)
+        assert results[3].retry_after == pytest.approx(20)
+        assert results[3].headers()["Retry-After"] == "20"
+
+        # Denied requests don't push the next slot further out
+        now += 20
+        allowed = await store.hit("k", rate)
+        assert allowed.allowed
+        assert allowed.remaining == 0
+        assert not (await store.hit("k", rate)).allowed
+
+        # A full period later the whole burst is available again
+        now += 60
+        assert (await store.hit("k", rate)).remaining == 2
+
+    async def test_lru_cap(self):
+        """The store never holds more than max_keys keys."""
+        store = MemoryRateLimitStore(max_keys=3)
+        for i in range(5):
+            await store.hit(f"k{i}", parse_rate("5/minute"))
+
+        assert len(store) == 3
+        assert store.evictions == 2
+
+    async def test_falls_back_to_memory_when_store_fails(self):
+        """Store errors don't fail requests; a local store takes over."""
+
+        class BrokenStore:
+            async def hit(self, key, rate):
+                raise ConnectionError("redis down")
+
+        local = Limiter(store=BrokenStore())
+        first = await local.hit("k", "1/minute")
+        second = await local.hit("k", "1/minute")
+
+        assert first.allowed
+        assert not second.allowed
+
+
+class TestRateLimitedEndpoints:
+    """Test limits and headers on the API."""
+
+    async def test_login_sends_ratelimit_headers(self, client: AsyncClient, rate_store):
+        """Each check reports the remaining budget for the endpoint and IP."""
+        data = {"username": f"{uuid4()}@test.com", "password": "wrong"}
+
+        first = await client.post("/api/v1/auth/login", data=data)
+        second = await client.post("/api/v1/auth/login", data=data)
+
+        assert first.status_code == second.status_code == 401
+        limit = int(RateLimits.AUTH_STRICT.split("/")[0])
+        assert first.headers["RateLimit-Limit"] == str(limit)
+        assert first.headers["RateLimit-Remaining"] == str(limit - 1)
+        assert second.headers["RateLimit-Remaining"] == str(limit - 2)
+        assert first.headers["RateLimit-Policy"] == f"{limit};w=60"
+
+    async def test_progress_limits_are_per_user(
+        self, client: AsyncClient, db_session: AsyncSession, auth_headers: dict, rate_store
+    ):
+        """One user's exhausted budget doesn't affect others behind the same IP."""
+        from app.core.security import create_access_token
+        from app.db.models.user import User
+
+        me = (await client.get("/api/v1/users/me", headers=auth_headers)).json()
+        other = User(
+            email=f"ratelimit_{uuid4()}@test.com",
+            hashed_password="x",
+            is_active=True,
+            email_verified=True,
+        )
+        db_session.add(other)
+        await db_session.commit()
+        other_headers = {
+            "Authorization": f"Bearer {create_access_token(data={'sub': other.id})}"
+        }
+
+        read_limit = parse_rate(RateLimits.PROGRESS_READ).limit
+        for _ in range(read_limit):
+            await limiter.hit(f"progress:read:user:{me['id']}", RateLimits.PROGRESS_READ)
+
+        params = {"profile_id": str(uuid4())}
+        blocked = await client.get("/api/v1/progress/stats", headers=auth_headers, params=params)
+        allowed = await client.get("/api/v1/progress/stats", headers=other_headers, params=params)
+
+        assert blocked.status_code == 429
+        assert blocked.json()["error"]["code"] == "RATE_LIMIT_EXCEEDED"
+        assert int(blocked.headers["Retry-After"]) >= 1
+        assert blocked.headers["RateLimit-Remaining"] == "0"
+        # Past the limiter: the unknown profile is a 404
+        assert allowed.status_code == 404
+        assert allowed.headers["RateLimit-Remaining"] == str(read_limit - 1)
+
+    async def test_rejected_exception_carries_headers(self):
+        """429s carry Retry-After even without a recorded result."""
+        exc = RateLimitExceededError(retry_after=7)
+        assert exc.status_code == 429
+        assert exc.headers == {"Retry-After": "7"}
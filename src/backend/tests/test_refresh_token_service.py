@@ -182,3 +182,126 @@ class TestRefreshTokenService:
 
         # Should not raise
         await RefreshTokenService.revoke_refresh_token(db_session, "nonexistent_token")
+
+
+async def _create_user(db_session: AsyncSession) -> User:
+    user = User(
+        email=f"rt_rotate_{uuid4()}@test.com",
+        hashed_password="x",
+        is_active=True,
+        email_verified=True,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+class TestRefreshTokenRotation:
+    """Test digest storage, rotation families and bulk revocation."""
+
+    async def test_only_digest_is_stored(self, db_session: AsyncSession):
+        """The row is keyed by the jti and holds the token's SHA-256 digest."""
+        from jose import jwt
+
+        from app.core.config import settings
+        from app.core.security import token_digest
+        from app.services.refresh_token_service import RefreshTokenService
+
+        user = await _create_user(db_session)
+        created = await RefreshTokenService.create_refresh_token(db_session, user.id)
+
+        stored = await db_session.get(RefreshToken, created.id, populate_existing=True)
+        payload = jwt.decode(created.token, settings.SECRET_KEY, algorithms=["HS256"])
+        assert stored.id == payload["jti"]
+        assert stored.token_hash == token_digest(created.token)
+        assert len(stored.token_hash) == 64
+
+    async def test_rotate_is_single_use(self, db_session: AsyncSession, count_queries):
+        """Rotation retires the token in one statement and keeps the family."""
+        from app.services.refresh_token_service import RefreshTokenService
+
+        user = await _create_user(db_session)
+        first = await RefreshTokenService.create_refresh_token(db_session, user.id)
+
+        with count_queries() as statements:
+            second = await RefreshTokenService.rotate_refresh_token(db_session, first.token, user.id)
+        assert second is not None
+        assert second.family_id == first.family_id
+        assert len(statements.touching("UPDATE refresh_tokens")) == 1
+        assert not statements.touching("SELECT")
+
+        old = await db_session.get(RefreshToken, first.id, populate_existing=True)
+        assert old.replaced_by == second.id
+        assert not old.is_active
+        assert await RefreshTokenService.validate_refresh_token(db_session, second.token, user)
+
+    async def test_reuse_revokes_family(self, db_session: AsyncSession):
+        """Presenting a rotated token again revokes every token in its family."""
+        from app.services.refresh_token_service import RefreshTokenService
+
+        user = await _create_user(db_session)
+        first = await RefreshTokenService.create_refresh_token(db_session, user.id)
+        other_login = await RefreshTokenService.create_refresh_token(db_session, user.id)
+        second = await RefreshTokenService.rotate_refresh_token(db_session, first.token, user.id)
+
+        assert await RefreshTokenService.rotate_refresh_token(db_session, first.token, user.id) is None
+
+        assert not await RefreshTokenService.validate_refresh_token(db_session, second.token, user)
+        assert await RefreshTokenService.validate_refresh_token(db_session, other_login.token, user)
+
+    async def test_rotate_rejects_other_users_token(self, db_session: AsyncSession):
+        """A token can only be rotated by the user it was issued to."""
+        from app.services.refresh_token_service import RefreshTokenService
+
+        owner = await _create_user(db_session)
+        other = await _create_user(db_session)
+        token = await RefreshTokenService.create_refresh_token(db_session, owner.id)
+
+        assert await RefreshTokenService.rotate_refresh_token(db_session, token.token, other.id) is None
+        assert await RefreshTokenService.validate_refresh_token(db_session, token.token, owner)
+
+    async def test_revoke_all_is_one_update(self, db_session: AsyncSession, count_queries):
+        """Bulk revocation is a single UPDATE and reports the rows it revoked."""
+        from app.services.refresh_token_service import RefreshTokenService
+
+        user = await _create_user(db_session)
+        tokens = [
+            await RefreshTokenService.create_refresh_token(db_session, user.id) for _ in range(3)
+        ]
+
+        with count_queries() as statements:
+            revoked = await RefreshTokenService.revoke_all_user_refresh_tokens(db_session, user.id)
+
+        assert revoked == 3
+        assert len(statements.touching("UPDATE refresh_tokens")) == 1
+        assert not statements.touching("SELECT")
+        for token in tokens:
+            assert not await RefreshTokenService.validate_refresh_token(db_session, token.token, user)
+
+
+class TestRefreshEndpointRotation:
+    """Test reuse detection through the refresh endpoint."""
+
+    async def test_replayed_refresh_cookie_logs_out_family(
+        self, client, db_session: AsyncSession
+    ):
+        """Refreshing with a stale cookie fails and kills the rotated session too."""
+        from app.services.refresh_token_service import RefreshTokenService
+
+        user = await _create_user(db_session)
+        stolen = await RefreshTokenService.create_refresh_token(db_session, user.id)
+
+        client.cookies.set("refresh_token", stolen.token)
+        response = await client.post("/api/v1/auth/refresh")
+        assert response.status_code == 200
+        rotated = response.cookies.get("refresh_token")
+        assert rotated and rotated != stolen.token
+
+        client.cookies.clear()
+        client.cookies.set("refresh_token", stolen.token)
+        replay = await client.post("/api/v1/auth/refresh")
+        assert replay.status_code == 401
+
+        client.cookies.clear()
+        client.cookies.set("refresh_token", rotated)
+        assert (await client.post("/api/v1/auth/refresh")).status_code == 401
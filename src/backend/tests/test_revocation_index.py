@@ -0,0 +1,166 @@
+"""Tests for the in-memory access-token revocation index."""
+
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.revoked_token import RevokedToken
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class TestRevocationIndex:
+    """Unit tests for RevocationIndex."""
+
+    async def test_contains_and_expiry(self):
+        from app.services.revocation_index import RevocationIndex
+
+        index = RevocationIndex(resync_seconds=30)
+        index.add("live", _utcnow() + timedelta(minutes=5))
+        index.add("stale", _utcnow() - timedelta(minutes=5))
+
+        assert index.contains("live") is True
+        assert index.contains("missing") is False
+        # Expired entries are dropped on lookup
+        assert index.contains("stale") is False
+        assert len(index) == 1
+
+    async def test_prune_removes_expired_entries(self):
+        from app.services.revocation_index import RevocationIndex
+
+        index = RevocationIndex(resync_seconds=30)
+        index.add("a", _utcnow() - timedelta(seconds=1))
+        index.add("b", _utcnow() - timedelta(seconds=1))
+        index.add("c", _utcnow() + timedelta(minutes=1))
+
+        assert index.prune() == 2
+        assert len(index) == 1
+
+    async def test_handle_message(self):
+        from app.services.revocation_index import RevocationIndex
+
+        index = RevocationIndex(resync_seconds=30)
+        exp = (datetime.now(timezone.utc) + timedelta(minutes=1)).timestamp()
+        index._handle_message(json.dumps({"jti": "from-peer", "exp": exp}))
+        index._handle_message("not json")
+
+        assert index.contains("from-peer") is True
+
+    async def test_load_and_sync_from_database(self, db_session: AsyncSession):
+        from app.services.revocation_index import RevocationIndex
+
+        index = RevocationIndex(resync_seconds=0)
+        existing = f"existing-{uuid4()}"
+        db_session.add(RevokedToken(jti=existing, expires_at=_utcnow() + timedelta(minutes=5)))
+        await db_session.commit()
+
+        await index.ensure_fresh(db_session)
+        assert index.is_loaded
+        assert index.contains(existing)
+
+        # A revocation recorded by another worker is picked up on resync
+        later = f"later-{uuid4()}"
+        db_session.add(RevokedToken(jti=later, expires_at=_utcnow() + timedelta(minutes=5)))
+        await db_session.commit()
+        assert not index.contains(later)
+
+        await index.ensure_fresh(db_session)
+        assert index.contains(later)
+
+    async def test_negative_lookup_does_not_query(self, db_session: AsyncSession):
+        from app.db import session as db_session_module
+        from app.services.revocation_index import RevocationIndex
+
+        index = RevocationIndex(resync_seconds=3600)
+        await index.load(db_session)
+
+        statements: list[str] = []
+
+        def _before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sync_engine = db_session_module.engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        try:
+            await index.ensure_fresh(db_session)
+            assert index.contains(str(uuid4())) is False
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", _before_cursor_execute)
+
+        assert statements == []
+
+
+class TestTokenServiceRevocation:
+    """TokenService should read and feed the shared index."""
+
+    async def test_revoke_then_check(self, db_session: AsyncSession):
+        from app.services.token_service import TokenService
+
+        jti = str(uuid4())
+        assert await TokenService.is_token_revoked(db_session, jti) is False
+
+        await TokenService.revoke_access_token(
+            db_session, jti, datetime.now(timezone.utc) + timedelta(minutes=5)
+        )
+        assert await TokenService.is_token_revoked(db_session, jti) is True
+
+    async def test_cleanup_expired_prunes_index(self, db_session: AsyncSession):
+        from app.services.revocation_index import revocation_index
+        from app.services.token_service import TokenService
+
+        jti = str(uuid4())
+        await TokenService.revoke_access_token(
+            db_session, jti, datetime.now(timezone.utc) - timedelta(seconds=1)
+        )
+        await TokenService.cleanup_expired(db_session)
+
+        assert jti not in revocation_index._entries
+
+    async def test_listener_resyncs_after_subscribe(self, db_session: AsyncSession):
+        import asyncio
+
+        from app.services.revocation_index import RevocationIndex
+
+        subscribed = asyncio.Event()
+
+        class FakePubSub:
+            async def subscribe(self, channel):
+                pass
+
+            async def listen(self):
+                subscribed.set()
+                await asyncio.Event().wait()
+                yield {}
+
+            async def aclose(self):
+                pass
+
+        class FakeClient:
+            def pubsub(self):
+                return FakePubSub()
+
+            async def aclose(self):
+                pass
+
+        index = RevocationIndex(resync_seconds=3600)
+        index._client = FakeClient()
+        await index.load(db_session)
+
+        # Revoked by another worker before this one was listening
+        missed = f"missed-{uuid4()}"
+        db_session.add(RevokedToken(jti=missed, expires_at=_utcnow() + timedelta(minutes=5)))
+        await db_session.commit()
+        assert not index.contains(missed)
+
+        index._listener = asyncio.create_task(index._listen())
+        try:
+            await asyncio.wait_for(subscribed.wait(), timeout=5)
+            assert index._subscribed
+            assert index.contains(missed)
+        finally:
+            await index.stop_listener()
@@ -639,16 +639,9 @@ class TestAuthRateLimiting:
             data={"username": "test@test.com", "password": "wrong"},
         )
 
-        # Check for rate limit headers (slowapi adds these)
-        # X-RateLimit-Limit, X-RateLimit-Remaining, X-RateLimit-Reset
-        # headers = response.headers
-        # has_ratelimit_headers = any(
-        #     h.lower().startswith('x-ratelimit') for h in headers.keys()
-        # )
-
-        # In test mode with high limits, headers may or may not be present
-        # depending on slowapi configuration. Just verify no error.
         assert response.status_code in [401, 429]  # Unauthorized or rate limited
+        assert response.headers["RateLimit-Limit"] == "10000"
+        assert "RateLimit-Remaining" in response.headers
 
     @pytest.mark.skip(reason="Production rate limits disabled in test mode")
     async def test_login_rate_limiting_production(self, client: AsyncClient):
@@ -0,0 +1,221 @@
+"""Tests for the subscription lifecycle sweeper."""
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.revoked_token import RevokedToken
+from app.db.models.subscription_model import (
+    DodoWebhookEvent,
+    Subscription,
+    SubscriptionPlanType,
+    SubscriptionStatus,
+)
+from app.db.models.user import User
+
+
+async def _create_parent(db_session: AsyncSession) -> User:
+    from app.core.security import get_password_hash
+
+    user = User(
+        email=f"lifecycle_{uuid4()}@test.com",
+        hashed_password=get_password_hash("password123"),
+        is_active=True,
+        email_verified=True,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+async def _create_subscription(
+    db_session: AsyncSession,
+    plan_type: SubscriptionPlanType,
+    start_date: datetime,
+    end_date: datetime,
+) -> Subscription:
+    parent = await _create_parent(db_session)
+    subscription = Subscription(
+        parent_id=parent.id,
+        plan_type=plan_type,
+        start_date=start_date,
+        end_date=end_date,
+        amount_paid=0,
+        status=SubscriptionStatus.ACTIVE,
+    )
+    db_session.add(subscription)
+    await db_session.commit()
+    return subscription
+
+
+async def _reload(db_session: AsyncSession, model, pk):
+    result = await db_session.execute(
+        select(model).execution_options(populate_existing=True).where(model.id == pk)
+    )
+    return result.scalar_one_or_none()
+
+
+class TestSubscriptionLifecycle:
+    """Test expiry, refresh windows and purges."""
+
+    async def test_expires_lapsed_subscriptions_and_drops_entitlement(
+        self, db_session: AsyncSession
+    ):
+        """Lapsed subscriptions become expired in chunks; cached entitlements go."""
+        from app.services.subscription_lifecycle import SubscriptionLifecycle
+        from app.services.subscription_service import SubscriptionService
+
+        now = datetime.now(timezone.utc)
+        lapsed = [
+            await _create_subscription(
+                db_session,
+                SubscriptionPlanType.GAME_PACK_5,
+                now - timedelta(days=40),
+                now - timedelta(days=i + 1),
+            )
+            for i in range(3)
+        ]
+        current = await _create_subscription(
+            db_session,
+            SubscriptionPlanType.GAME_PACK_5,
+            now - timedelta(days=1),
+            now + timedelta(days=29),
+        )
+        # Entitlement cached while the subscription was still valid
+        await SubscriptionService._set_cached_entitlement(
+            f"subscriptions:entitlement:{lapsed[0].parent_id}", {"active": True}, 60
+        )
+
+        expired = await SubscriptionLifecycle.expire_subscriptions(db_session, now, chunk_size=2)
+
+        assert expired >= 3
+        for subscription in lapsed:
+            reloaded = await _reload(db_session, Subscription, subscription.id)
+            assert reloaded.status == SubscriptionStatus.EXPIRED
+        assert (await _reload(db_session, Subscription, current.id)).status == (
+            SubscriptionStatus.ACTIVE
+        )
+        assert (
+            await SubscriptionService._get_cached_entitlement(
+                f"subscriptions:entitlement:{lapsed[0].parent_id}"
+            )
+            is None
+        )
+
+    async def test_advances_quarterly_refresh_windows(self, db_session: AsyncSession):
+        """next_refresh_at moves to the next monthly checkpoint once reached."""
+        from app.services.subscription_lifecycle import SubscriptionLifecycle
+
+        now = datetime.now(timezone.utc)
+        start = now - timedelta(days=35)
+        subscription = await _create_subscription(
+            db_session, SubscriptionPlanType.GAME_PACK_10, start, start + timedelta(days=90)
+        )
+        assert subscription.next_refresh_at is None
+
+        assert await SubscriptionLifecycle.advance_refresh_windows(db_session, now) >= 1
+
+        reloaded = await _reload(db_session, Subscription, subscription.id)
+        assert reloaded.next_refresh_at.replace(tzinfo=timezone.utc) == start + timedelta(
+            days=60
+        )
+
+        # Already current: nothing to do on the next sweep
+        before = reloaded.next_refresh_at
+        await SubscriptionLifecycle.advance_refresh_windows(db_session, now)
+        assert (await _reload(db_session, Subscription, subscription.id)).next_refresh_at == before
+
+    async def test_refresh_state_reads_next_refresh_at(self, db_session: AsyncSession):
+        """Entitlements use the persisted checkpoint while it is still ahead."""
+        from app.services.subscription_service import SubscriptionService
+
+        now = datetime.now(timezone.utc)
+        start = now - timedelta(days=5)
+        subscription = await _create_subscription(
+            db_session, SubscriptionPlanType.GAME_PACK_10, start, start + timedelta(days=90)
+        )
+
+        # Unset (not swept yet): computed from start_date
+        state = SubscriptionService._get_refresh_state(subscription, now)
+        assert state["next_refresh_at"] == start + timedelta(days=30)
+
+        stored = now + timedelta(days=3)
+        subscription.next_refresh_at = stored
+        await db_session.commit()
+        reloaded = await _reload(db_session, Subscription, subscription.id)
+        state = SubscriptionService._get_refresh_state(reloaded, now)
+        assert state["next_refresh_at"] == stored
+
+        # Passed but not yet advanced by the sweeper: recomputed
+        state = SubscriptionService._get_refresh_state(reloaded, stored + timedelta(seconds=1))
+        assert state["next_refresh_at"] == start + timedelta(days=30)
+
+    async def test_create_subscription_sets_next_refresh_at(self, db_session: AsyncSession):
+        """Quarterly packs start with their first refresh checkpoint filled in."""
+        from app.services.subscription_service import SubscriptionService
+
+        parent = await _create_parent(db_session)
+        subscription = await SubscriptionService.create_subscription(
+            db=db_session, parent_id=parent.id, plan_type=SubscriptionPlanType.GAME_PACK_10
+        )
+
+        expected = subscription.start_date + timedelta(days=30)
+        assert subscription.next_refresh_at == expected
+
+    async def test_purges_stale_webhook_events_and_tokens(self, db_session: AsyncSession):
+        """Old settled events and expired tokens are deleted; the rest stay."""
+        from app.services.subscription_lifecycle import SubscriptionLifecycle
+
+        now = datetime.now(timezone.utc)
+        old = now - timedelta(days=60)
+        stale_events = [
+            DodoWebhookEvent(
+                webhook_id=f"wh_{uuid4().hex}",
+                event_type="payment.succeeded",
+                status=status,
+                processed_at=old,
+            )
+            for status in ("processed", "failed", "processed")
+        ]
+        pending = DodoWebhookEvent(
+            webhook_id=f"wh_{uuid4().hex}", event_type="payment.succeeded", status="received"
+        )
+        recent = DodoWebhookEvent(
+            webhook_id=f"wh_{uuid4().hex}",
+            event_type="payment.succeeded",
+            status="processed",
+            processed_at=now,
+        )
+        parent = await _create_parent(db_session)
+        expired_token = RefreshToken(
+            token=f"expired_{uuid4().hex}",
+            user_id=parent.id,
+            expires_at=datetime.utcnow() - timedelta(days=1),
+        )
+        live_token = RefreshToken(
+            token=f"live_{uuid4().hex}",
+            user_id=parent.id,
+            expires_at=datetime.utcnow() + timedelta(days=1),
+        )
+        revoked = RevokedToken(jti=uuid4().hex, expires_at=datetime.utcnow() - timedelta(days=1))
+        db_session.add_all([*stale_events, pending, recent, expired_token, live_token, revoked])
+        await db_session.commit()
+
+        counts = await SubscriptionLifecycle.run_once(now=now, chunk_size=2)
+
+        assert counts["webhook_events"] >= 3
+        assert counts["refresh_tokens"] >= 1
+        assert counts["revoked_tokens"] >= 1
+        for event in stale_events:
+            assert await _reload(db_session, DodoWebhookEvent, event.id) is None
+        assert await _reload(db_session, DodoWebhookEvent, pending.id) is not None
+        assert await _reload(db_session, DodoWebhookEvent, recent.id) is not None
+        assert await _reload(db_session, RefreshToken, expired_token.id) is None
+        assert await _reload(db_session, RefreshToken, live_token.id) is not None
+        remaining = await db_session.execute(
+            select(RevokedToken).where(RevokedToken.jti == revoked.jti)
+        )
+        assert remaining.scalar_one_or_none() is None
@@ -452,6 +452,91 @@ class TestCanAccessGame:
             await SubscriptionService.can_access_game(db_session, user.id, "game-1")
 
 
+class TestEntitlementCache:
+    """Test the per-parent entitlement cache behind can_access_game."""
+
+    async def test_repeat_checks_are_served_from_cache(self, db_session: AsyncSession, count_queries):
+        """Only the first access check reads subscriptions."""
+        from app.services.subscription_service import SubscriptionService
+
+        user = await create_subscription_test_user(db_session, "sub_entitlement_cache")
+        subscription = await SubscriptionService.create_subscription(
+            db=db_session,
+            parent_id=user.id,
+            plan_type=SubscriptionPlanType.GAME_PACK_5,
+            payment_reference=f"pay_entitlement_{uuid4()}",
+        )
+        await SubscriptionService.add_game_selection(
+            db_session, subscription.id, ["game-1", "game-2"]
+        )
+
+        with count_queries() as statements:
+            first = await SubscriptionService.can_access_game(db_session, user.id, "game-1")
+            second = await SubscriptionService.can_access_game(db_session, user.id, "game-9")
+            third = await SubscriptionService.can_access_game(db_session, user.id, "game-2")
+
+        assert first == (True, "Game selected in pack")
+        assert second == (False, "Game not in your game_pack_5 selection")
+        assert third[0] is True
+        assert len(statements.touching("subscriptions")) == 1
+
+    async def test_mutations_invalidate_entitlement(self, db_session: AsyncSession):
+        """Creating, selecting and cancelling all refresh the cached answer."""
+        from app.services.subscription_service import SubscriptionService
+
+        user = await create_subscription_test_user(db_session, "sub_entitlement_invalidate")
+        assert await SubscriptionService.get_entitlement(db_session, user.id) is None
+
+        subscription = await SubscriptionService.create_subscription(
+            db=db_session,
+            parent_id=user.id,
+            plan_type=SubscriptionPlanType.GAME_PACK_5,
+            payment_reference=f"pay_entitlement_{uuid4()}",
+        )
+        entitlement = await SubscriptionService.get_entitlement(db_session, user.id)
+        assert entitlement is not None
+        assert entitlement.game_ids == frozenset()
+
+        await SubscriptionService.add_game_selection(db_session, subscription.id, ["game-4"])
+        entitlement = await SubscriptionService.get_entitlement(db_session, user.id)
+        assert entitlement.game_ids == frozenset({"game-4"})
+
+        await SubscriptionService.cancel_subscription(db_session, subscription.id)
+        assert await SubscriptionService.get_entitlement(db_session, user.id) is None
+
+    async def test_ttl_never_outlives_subscription(self):
+        """A subscription ending soon is cached only until its end date."""
+        from app.services.subscription_service import Entitlement, SubscriptionService
+
+        now = datetime.now(timezone.utc)
+        entitlement = Entitlement(
+            subscription_id="sub",
+            plan_type=SubscriptionPlanType.FULL_ANNUAL,
+            end_date=now + timedelta(seconds=5),
+            game_ids=frozenset(),
+            refresh_state={"next_refresh_at": None},
+        )
+
+        assert SubscriptionService._entitlement_ttl(entitlement, now) == pytest.approx(5)
+        assert Entitlement.from_cache(entitlement.to_cache()) == entitlement
+
+    async def test_no_subscription_is_cached_briefly_without_redis(self, monkeypatch):
+        """Out-of-process invalidations can't reach the local tier, so misses expire fast."""
+        from app.core.config import settings
+        from app.services.subscription_service import SubscriptionService
+
+        now = datetime.now(timezone.utc)
+        monkeypatch.setattr(settings, "REDIS_URL", None)
+        assert SubscriptionService._entitlement_ttl(None, now) == (
+            settings.SUBSCRIPTION_ENTITLEMENT_LOCAL_NEGATIVE_TTL_SECONDS
+        )
+
+        monkeypatch.setattr(settings, "REDIS_URL", "redis://cache")
+        assert SubscriptionService._entitlement_ttl(None, now) == (
+            settings.SUBSCRIPTION_ENTITLEMENT_CACHE_TTL_SECONDS
+        )
+
+
 class TestPackRefreshBehavior:
     """Test quarterly refresh-window behavior."""
 
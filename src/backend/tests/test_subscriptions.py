@@ -1,7 +1,7 @@
 """Tests for subscription endpoints."""
 
 from datetime import datetime, timedelta
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from httpx import AsyncClient
@@ -44,7 +44,7 @@ class TestSubscriptionPurchase:
         with patch(
             "app.api.v1.endpoints.subscriptions.get_dodo_client"
         ) as mock_get_client:
-            mock_client = MagicMock()
+            mock_client = AsyncMock()
             mock_client.create_checkout_session.return_value = mock_checkout
             mock_get_client.return_value = mock_client
 
@@ -87,7 +87,7 @@ class TestSubscriptionPurchase:
         with patch(
             "app.api.v1.endpoints.subscriptions.get_dodo_client"
         ) as mock_get_client:
-            mock_client = MagicMock()
+            mock_client = AsyncMock()
             mock_client.create_checkout_session.side_effect = Exception(
                 "Dodo API error"
             )
@@ -126,7 +126,7 @@ class TestPaymentSuccess:
         ) as mock_get_client, patch(
             "app.api.v1.endpoints.subscriptions.SubscriptionService"
         ) as mock_service:
-            mock_client = MagicMock()
+            mock_client = AsyncMock()
             mock_client.get_payment_status.return_value = mock_payment
             mock_get_client.return_value = mock_client
 
@@ -151,7 +151,7 @@ class TestPaymentSuccess:
         with patch(
             "app.api.v1.endpoints.subscriptions.get_dodo_client"
         ) as mock_get_client:
-            mock_client = MagicMock()
+            mock_client = AsyncMock()
             mock_client.get_payment_status.side_effect = Exception("Invalid session")
             mock_get_client.return_value = mock_client
 
@@ -173,7 +173,7 @@ class TestPaymentSuccess:
         with patch(
             "app.api.v1.endpoints.subscriptions.get_dodo_client"
         ) as mock_get_client:
-            mock_client = MagicMock()
+            mock_client = AsyncMock()
             mock_client.get_payment_status.return_value = mock_payment
             mock_get_client.return_value = mock_client
 
@@ -234,11 +234,10 @@ class TestSubscriptionWebhook:
                 },
             )
 
-            # Webhook endpoint processes asynchronously, may return 200, 400 (if processing fails), or 500
-            # The key thing is that signature verification passed (would be 401 if signature failed)
-            assert response.status_code in [200, 400, 500]
-            if response.status_code == 200:
-                assert response.json().get("received") is True
+            # Verified webhooks are queued for asynchronous processing
+            # (signature failure would be 401)
+            assert response.status_code in [200, 202]
+            assert response.json().get("received") is True
 
     async def test_webhook_invalid_signature(self, client: AsyncClient):
         """Test webhook with invalid signature is rejected."""
@@ -0,0 +1,241 @@
+"""Tests for the Dodo webhook work queue."""
+
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.subscription_model import DodoWebhookEvent, Subscription
+from app.db.models.user import User
+
+
+class _StubDodoClient:
+    """Local stand-in for the Dodo client: accepts every signature."""
+
+    def verify_webhook_signature(self, *args, **kwargs) -> bool:
+        return True
+
+
+async def _post_webhook(client: AsyncClient, webhook_id: str, event: dict):
+    with patch(
+        "app.api.v1.endpoints.subscriptions.get_dodo_client", return_value=_StubDodoClient()
+    ):
+        return await client.post(
+            "/api/v1/subscriptions/webhook",
+            content=json.dumps(event).encode(),
+            headers={
+                "webhook-id": webhook_id,
+                "webhook-timestamp": "1234567890",
+                "webhook-signature": "stub",
+                "Content-Type": "application/json",
+            },
+        )
+
+
+async def _load(db_session: AsyncSession, webhook_id: str) -> DodoWebhookEvent:
+    result = await db_session.execute(
+        select(DodoWebhookEvent)
+        .execution_options(populate_existing=True)
+        .where(DodoWebhookEvent.webhook_id == webhook_id)
+    )
+    return result.scalar_one()
+
+
+@pytest.fixture
+def stub_handler():
+    """Register a temporary handler for a test-only event type."""
+    from app.services.webhook_queue import webhook_queue
+
+    registered = []
+
+    def register(event_type: str, handler):
+        webhook_queue.handlers[event_type] = handler
+        registered.append(event_type)
+
+    yield register
+    for event_type in registered:
+        webhook_queue.handlers.pop(event_type, None)
+
+
+class TestWebhookQueue:
+    """Test queueing, processing and retries."""
+
+    async def test_payment_webhook_is_acknowledged_then_processed(
+        self, client: AsyncClient, db_session: AsyncSession
+    ):
+        """The endpoint only queues; a worker creates the subscription."""
+        from app.core.security import get_password_hash
+        from app.db.models.subscription_model import SubscriptionPlanType
+        from app.services.subscription_service import PLAN_PRICES
+        from app.services.webhook_queue import webhook_queue
+
+        user = User(
+            email=f"webhook_queue_{uuid4()}@test.com",
+            hashed_password=get_password_hash("password123"),
+            is_active=True,
+            email_verified=True,
+        )
+        db_session.add(user)
+        await db_session.commit()
+
+        webhook_id = f"wh_{uuid4().hex}"
+        session_id = f"sess_{uuid4().hex}"
+        event = {
+            "type": "payment.succeeded",
+            "data": {
+                "id": session_id,
+                "metadata": {
+                    "user_id": user.id,
+                    "plan_type": "game_pack_5",
+                    "expected_amount": PLAN_PRICES[SubscriptionPlanType.GAME_PACK_5],
+                },
+            },
+        }
+
+        response = await _post_webhook(client, webhook_id, event)
+        assert response.status_code == 202
+        assert response.json()["status"] == "queued"
+        queued = await _load(db_session, webhook_id)
+        assert queued.status == "received"
+        assert queued.attempts == 0
+
+        assert await webhook_queue.process_due() >= 1
+
+        processed = await _load(db_session, webhook_id)
+        assert processed.status == "processed"
+        assert processed.attempts == 1
+        assert processed.session_id == session_id
+        subscription = await db_session.execute(
+            select(Subscription).where(Subscription.payment_reference == session_id)
+        )
+        assert subscription.scalar_one().parent_id == user.id
+
+        # Dodo redelivery after processing is acknowledged without requeueing
+        response = await _post_webhook(client, webhook_id, event)
+        assert response.status_code == 200
+        assert response.json()["status"] == "already_processed"
+
+    async def test_invalid_payload_is_rejected_and_recorded(
+        self, client: AsyncClient, db_session: AsyncSession
+    ):
+        """Bodies without an event type fail fast with 400."""
+        webhook_id = f"wh_{uuid4().hex}"
+        response = await _post_webhook(client, webhook_id, {"data": {}})
+
+        assert response.status_code == 400
+        event = await _load(db_session, webhook_id)
+        assert event.status == "failed"
+        assert "event_type" in event.last_error
+
+    async def test_transient_errors_retry_with_backoff(
+        self, client: AsyncClient, db_session: AsyncSession, stub_handler
+    ):
+        """Unexpected errors reschedule the event; validation errors fail it."""
+        from app.services.webhook_queue import webhook_queue
+
+        calls = []
+
+        async def flaky(db, data):
+            calls.append(data)
+            if len(calls) == 1:
+                raise RuntimeError("database unavailable")
+
+        stub_handler("test.flaky", flaky)
+        webhook_id = f"wh_{uuid4().hex}"
+        assert (await _post_webhook(client, webhook_id, {"type": "test.flaky"})).status_code == 202
+
+        await webhook_queue.process_due()
+        event = await _load(db_session, webhook_id)
+        assert event.status == "received"
+        assert event.attempts == 1
+        assert "database unavailable" in event.last_error
+        next_attempt_at = event.next_attempt_at.replace(tzinfo=timezone.utc)
+        assert next_attempt_at > datetime.now(timezone.utc)
+
+        # Not due yet
+        await webhook_queue.process_due()
+        assert len(calls) == 1
+
+        event.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await db_session.commit()
+        await webhook_queue.process_due()
+
+        event = await _load(db_session, webhook_id)
+        assert event.status == "processed"
+        assert event.attempts == 2
+        assert len(calls) == 2
+
+    async def test_gives_up_after_max_attempts(
+        self, client: AsyncClient, db_session: AsyncSession, stub_handler
+    ):
+        """An event that keeps failing is eventually marked failed."""
+        from app.services.webhook_queue import webhook_queue
+
+        async def broken(db, data):
+            raise RuntimeError("still broken")
+
+        stub_handler("test.broken", broken)
+        webhook_id = f"wh_{uuid4().hex}"
+        await _post_webhook(client, webhook_id, {"type": "test.broken"})
+
+        with patch("app.services.webhook_queue.settings.WEBHOOK_QUEUE_MAX_ATTEMPTS", 2):
+            for _ in range(2):
+                event = await _load(db_session, webhook_id)
+                event.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+                await db_session.commit()
+                await webhook_queue.process_due()
+
+        event = await _load(db_session, webhook_id)
+        assert event.status == "failed"
+        assert event.attempts == 2
+        assert event.processed_at is not None
+
+    async def test_stale_claims_are_reclaimed(self, db_session: AsyncSession, stub_handler):
+        """Events left in processing by a dead worker are picked up after the lease."""
+        from app.services.webhook_queue import webhook_queue
+
+        stub_handler("test.noop", lambda db, data: _noop())
+        now = datetime.now(timezone.utc)
+        fresh = DodoWebhookEvent(
+            webhook_id=f"wh_{uuid4().hex}",
+            event_type="test.noop",
+            status="processing",
+            attempts=1,
+            payload='{"type": "test.noop"}',
+            locked_at=now,
+        )
+        stale = DodoWebhookEvent(
+            webhook_id=f"wh_{uuid4().hex}",
+            event_type="test.noop",
+            status="processing",
+            attempts=1,
+            payload='{"type": "test.noop"}',
+            locked_at=now - timedelta(hours=1),
+        )
+        db_session.add_all([fresh, stale])
+        await db_session.commit()
+
+        claimed = await webhook_queue.claim(db_session, limit=100)
+
+        assert stale.id in claimed
+        assert fresh.id not in claimed
+
+    def test_backoff_is_exponential_and_capped(self):
+        """Delays double per attempt up to the configured maximum."""
+        from app.services.webhook_queue import WebhookQueue
+
+        with patch("app.services.webhook_queue.settings.WEBHOOK_QUEUE_BACKOFF_BASE_SECONDS", 5), patch(
+            "app.services.webhook_queue.settings.WEBHOOK_QUEUE_BACKOFF_MAX_SECONDS", 60
+        ):
+            delays = [WebhookQueue.backoff(n).total_seconds() for n in range(1, 6)]
+
+        assert delays == [5, 10, 20, 40, 60]
+
+
+async def _noop() -> None:
+    return None